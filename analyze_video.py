@@ -1,17 +1,25 @@
 """
-Video frame-by-frame analyzer CLI.
+Video analyzer CLI.
 Detects duplicate frames, dropped frames, timing issues.
 Uses app.services.video_analyzer when run from project root.
+
+Usage:
+    python analyze_video.py clip.mp4 [more.mp4 ...] [--deep] [--workers 4]
+
+Without --deep, duration and frame count come from the container and
+duplicates are estimated from sampled frame pairs; several files are
+analyzed in parallel.
 """
+import argparse
 import sys
 from pathlib import Path
 
-def analyze_video(video_path: str):
+def analyze_video(video_path: str, deep: bool = True):
     """Analyze video frame by frame."""
     # Use service when available
     try:
         from app.services.video_analyzer import analyze_video as run_analysis
-        result = run_analysis(video_path)
+        result = run_analysis(video_path, deep=deep)
         if result is None:
             print("ERROR: Could not open video")
             return
@@ -75,8 +83,8 @@ def analyze_video(video_path: str):
         
         if prev_frame is not None:
             # Calculate MSE (Mean Squared Error)
-            diff = cv2.absdiff(gray, prev_frame)
-            mse = np.mean(diff ** 2)
+            diff = cv2.absdiff(gray, prev_frame).astype(np.float32)
+            mse = np.mean(diff * diff)
             diff_score = mse
             
             # If MSE < threshold, frames are identical/duplicate
@@ -262,11 +270,14 @@ def _print_results(result: dict):
     print(f"  FPS: {vp['fps']}")
     print(f"  Frames: {vp['frame_count']}")
     print(f"  Duration: {vp['duration']}s")
-    print(f"\n=== ANALYSIS ===")
+    print(f"\n=== ANALYSIS ({result.get('mode', 'deep')}) ===")
     a = result["analysis"]
     print(f"  Duplicate frames: {a['duplicate_frames']} ({a['duplicate_percentage']}%)")
-    print(f"  Timestamp jumps: {a['timestamp_jumps']}")
-    print(f"  Est. missing frames: ~{a['estimated_missing_frames']}")
+    if "sampled_pairs" in a:
+        print(f"  Sampled frame pairs: {a['sampled_pairs']}")
+    if "timestamp_jumps" in a:
+        print(f"  Timestamp jumps: {a['timestamp_jumps']}")
+        print(f"  Est. missing frames: ~{a['estimated_missing_frames']}")
     print(f"\n=== SUMMARY ===")
     if result["ok"]:
         print("  [OK] Video looks good")
@@ -275,6 +286,28 @@ def _print_results(result: dict):
             print(f"  [X] {issue}")
 
 
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Analyze event videos for duplicate and dropped frames")
+    parser.add_argument("videos", nargs="+", help="Video files")
+    parser.add_argument("--deep", action="store_true", help="Decode every frame (timestamp jumps, duplicate sequences)")
+    parser.add_argument("--workers", type=int, default=4, help="Files analyzed in parallel")
+    args = parser.parse_args()
+
+    try:
+        from app.services.video_analyzer import analyze_videos
+    except ImportError:
+        for video_path in args.videos:
+            analyze_video(video_path, deep=True)
+        return
+
+    results = analyze_videos(args.videos, deep=args.deep, workers=args.workers)
+    for video_path, result in results.items():
+        print(f"\n##### {video_path}")
+        if result is None:
+            print("ERROR: Could not open video")
+            continue
+        _print_results(result)
+
+
 if __name__ == "__main__":
-    video_path = sys.argv[1] if len(sys.argv) > 1 else r"c:\Users\Administrator\OneDrive\Desktop\event-9083995b-34d9-4e64-a792-d61f3ee6b89a-timelapse.mp4"
-    analyze_video(video_path)
+    main()
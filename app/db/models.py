@@ -199,6 +199,32 @@ class Event(Base):
     )
 
 
+class EventRollup(Base):
+    """
+    Per-camera hourly event counts.
+
+    Maintained by SQLite triggers on the events table (see
+    app.db.session._migrate_event_rollups) so every insert, AI verdict,
+    delete and camera cascade keeps it current.
+    """
+    __tablename__ = "event_rollups"
+
+    camera_id = Column(
+        String(36),
+        ForeignKey("cameras.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    hour = Column(Integer, primary_key=True)  # Hours since the Unix epoch (UTC)
+    event_count = Column(Integer, default=0, nullable=False)
+    rejected_count = Column(Integer, default=0, nullable=False)
+    max_confidence = Column(Float, nullable=True)
+    person_count_sum = Column(Integer, default=0, nullable=False)
+
+    __table_args__ = (
+        Index("idx_event_rollup_hour", "hour"),
+    )
+
+
 class RecordingState(Base):
     """
     Recording state model for per-camera record toggles.
@@ -4,10 +4,12 @@ Database session management for Thermal Dual Vision.
 This module handles database connection, session creation, and initialization.
 """
 import logging
+import os
 from contextlib import contextmanager
 from typing import Generator
 
 from sqlalchemy import create_engine, event, text
+from sqlalchemy.exc import DatabaseError
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.db.models import Base
@@ -23,23 +25,38 @@ DATABASE_DIR = DATA_DIR
 DATABASE_FILE = DATABASE_DIR / "app.db"
 DATABASE_URL = f"sqlite:///{DATABASE_FILE}"
 
+# Connection profile. Page cache and mmap are per connection; the defaults
+# fit a Raspberry Pi class host and can be raised with the env overrides.
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "10000"))
+DB_CACHE_SIZE_MB = int(os.getenv("DB_CACHE_SIZE_MB", "16"))
+DB_MMAP_SIZE_MB = int(os.getenv("DB_MMAP_SIZE_MB", "128"))
+
 # Create engine
 engine = create_engine(
     DATABASE_URL,
     echo=False,
-    connect_args={"check_same_thread": False},
+    connect_args={"check_same_thread": False, "timeout": DB_BUSY_TIMEOUT_MS / 1000.0},
 )
 
 
-@event.listens_for(engine, "connect")
-def _set_sqlite_pragma(dbapi_conn, _connection_record):
-    """Enable WAL mode and foreign key enforcement for every new connection."""
+def tune_sqlite_connection(dbapi_conn) -> None:
+    """Apply the connection profile to a raw sqlite3 connection."""
     cursor = dbapi_conn.cursor()
     cursor.execute("PRAGMA journal_mode=WAL")
     cursor.execute("PRAGMA foreign_keys=ON")
     cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA cache_size=-{DB_CACHE_SIZE_MB * 1024}")  # negative = KiB
+    cursor.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE_MB * 1024 * 1024}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
     cursor.close()
 
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragma(dbapi_conn, _connection_record):
+    """Apply WAL, foreign keys and the tuned profile to every new connection."""
+    tune_sqlite_connection(dbapi_conn)
+
 # Create session factory
 SessionLocal = sessionmaker(
     autocommit=False,
@@ -148,6 +165,147 @@ def _migrate_add_person_count() -> None:
             _MIGRATION_STATUS["person_count"] = {"ok": False, "error": str(e)}
 
 
+# Hour bucket of an events.timestamp value, in hours since the Unix epoch.
+_ROLLUP_HOUR = "CAST(strftime('%s', {row}.timestamp) AS INTEGER) / 3600"
+
+_ROLLUP_ADD = """
+    INSERT INTO event_rollups (camera_id, hour, event_count, rejected_count, max_confidence, person_count_sum)
+    VALUES (NEW.camera_id, {hour}, 1, NEW.rejected_by_ai, NEW.confidence, NEW.person_count)
+    ON CONFLICT (camera_id, hour) DO UPDATE SET
+        event_count = event_count + 1,
+        rejected_count = rejected_count + excluded.rejected_count,
+        max_confidence = MAX(COALESCE(max_confidence, 0), excluded.max_confidence),
+        person_count_sum = person_count_sum + excluded.person_count_sum;
+""".format(hour=_ROLLUP_HOUR.format(row="NEW"))
+
+# The max is only recomputed (from the camera/timestamp index, one hour of
+# rows) when the removed event could have been the bucket maximum.
+_ROLLUP_REMOVE = """
+    UPDATE event_rollups SET
+        event_count = event_count - 1,
+        rejected_count = rejected_count - OLD.rejected_by_ai,
+        person_count_sum = person_count_sum - OLD.person_count,
+        max_confidence = CASE
+            WHEN OLD.confidence < max_confidence THEN max_confidence
+            ELSE (
+                SELECT MAX(confidence) FROM events
+                WHERE camera_id = OLD.camera_id
+                  AND timestamp >= datetime(event_rollups.hour * 3600, 'unixepoch')
+                  AND timestamp < datetime((event_rollups.hour + 1) * 3600, 'unixepoch')
+            )
+        END
+    WHERE camera_id = OLD.camera_id AND hour = {hour};
+    DELETE FROM event_rollups
+    WHERE camera_id = OLD.camera_id AND hour = {hour} AND event_count <= 0;
+""".format(hour=_ROLLUP_HOUR.format(row="OLD"))
+
+_ROLLUP_TRIGGERS = {
+    "trg_event_rollup_insert": f"AFTER INSERT ON events BEGIN {_ROLLUP_ADD} END",
+    "trg_event_rollup_delete": f"AFTER DELETE ON events BEGIN {_ROLLUP_REMOVE} END",
+    "trg_event_rollup_update": (
+        "AFTER UPDATE OF camera_id, timestamp, confidence, person_count, rejected_by_ai ON events "
+        f"BEGIN {_ROLLUP_REMOVE} {_ROLLUP_ADD} END"
+    ),
+}
+
+
+def _migrate_event_rollups() -> None:
+    """Install the event_rollups triggers and backfill from existing events."""
+    with engine.begin() as conn:
+        try:
+            existing = {
+                row[0] for row in conn.execute(text(
+                    "SELECT name FROM sqlite_master WHERE type='trigger' AND name LIKE 'trg_event_rollup_%'"
+                ))
+            }
+            missing = [name for name in _ROLLUP_TRIGGERS if name not in existing]
+            if missing:
+                # Triggers and table are rebuilt together so counts never drift.
+                for name in existing:
+                    conn.execute(text(f"DROP TRIGGER IF EXISTS {name}"))
+                conn.execute(text("DELETE FROM event_rollups"))
+                conn.execute(text(
+                    "INSERT INTO event_rollups "
+                    "(camera_id, hour, event_count, rejected_count, max_confidence, person_count_sum) "
+                    f"SELECT camera_id, {_ROLLUP_HOUR.format(row='events')}, COUNT(*), "
+                    "SUM(rejected_by_ai), MAX(confidence), SUM(person_count) "
+                    "FROM events WHERE camera_id IN (SELECT id FROM cameras) "
+                    "GROUP BY 1, 2"
+                ))
+                for name, body in _ROLLUP_TRIGGERS.items():
+                    conn.execute(text(f"CREATE TRIGGER {name} {body}"))
+                logger.info("Migration: built event_rollups")
+            _MIGRATION_STATUS["event_rollups"] = {"ok": True, "error": ""}
+        except Exception as e:
+            logger.warning("Migration event_rollups: %s", e)
+            _MIGRATION_STATUS["event_rollups"] = {"ok": False, "error": str(e)}
+
+
+# External-content FTS5 index over events.summary, keyed by the events rowid.
+# A full VACUUM may renumber rowids of tables without an INTEGER PRIMARY KEY
+# and rows written without the triggers are missing from the index; startup
+# checks the index against the table and rebuilds it when they differ.
+_SEARCH_TRIGGERS = {
+    "trg_event_search_insert": (
+        "AFTER INSERT ON events BEGIN "
+        "INSERT INTO events_fts(rowid, summary) VALUES (NEW.rowid, NEW.summary); END"
+    ),
+    "trg_event_search_delete": (
+        "AFTER DELETE ON events BEGIN "
+        "INSERT INTO events_fts(events_fts, rowid, summary) VALUES ('delete', OLD.rowid, OLD.summary); END"
+    ),
+    "trg_event_search_update": (
+        "AFTER UPDATE OF summary ON events BEGIN "
+        "INSERT INTO events_fts(events_fts, rowid, summary) VALUES ('delete', OLD.rowid, OLD.summary); "
+        "INSERT INTO events_fts(rowid, summary) VALUES (NEW.rowid, NEW.summary); END"
+    ),
+}
+
+
+def _migrate_event_search() -> None:
+    """Create the events_fts full-text index and its sync triggers."""
+    with engine.begin() as conn:
+        try:
+            exists = conn.execute(text(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type='table' AND name='events_fts'"
+            )).scalar()
+            if not exists:
+                conn.execute(text(
+                    "CREATE VIRTUAL TABLE events_fts USING fts5("
+                    "summary, content='events', content_rowid='rowid', "
+                    "tokenize='unicode61 remove_diacritics 2')"
+                ))
+                conn.execute(text("INSERT INTO events_fts(events_fts) VALUES ('rebuild')"))
+                logger.info("Migration: built events_fts search index")
+            for name, body in _SEARCH_TRIGGERS.items():
+                conn.execute(text(f"CREATE TRIGGER IF NOT EXISTS {name} {body}"))
+            _MIGRATION_STATUS["event_search"] = {"ok": True, "error": ""}
+        except Exception as e:
+            # SQLite builds without FTS5 fall back to LIKE search.
+            logger.warning("Migration event_search: %s", e)
+            _MIGRATION_STATUS["event_search"] = {"ok": False, "error": str(e)}
+            return
+    if not event_search_index_in_sync():
+        rebuild_event_search_index()
+        logger.info("Migration: rebuilt events_fts search index (out of sync with events)")
+
+
+def event_search_index_in_sync() -> bool:
+    """Whether events_fts matches the summaries in the events table."""
+    try:
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO events_fts(events_fts, rank) VALUES ('integrity-check', 1)"))
+    except DatabaseError:
+        return False
+    return True
+
+
+def rebuild_event_search_index() -> None:
+    """Rebuild events_fts from the events table."""
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO events_fts(events_fts) VALUES ('rebuild')"))
+
+
 def get_migration_status() -> dict[str, dict[str, str | bool]]:
     return dict(_MIGRATION_STATUS)
 
@@ -168,6 +326,8 @@ def init_db() -> None:
     _migrate_add_rejected_by_ai()
     _migrate_add_person_count()
     _migrate_add_rtsp_url_detection()
+    _migrate_event_rollups()
+    _migrate_event_search()
 
     logger.info(f"Database initialized at {DATABASE_FILE}")
 
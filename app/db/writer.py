@@ -0,0 +1,249 @@
+"""
+Single-writer queue for the SQLite database.
+
+Detector threads, media threads, the MP event handler, retention and the
+event delete jobs all used to open their own session and commit, so a burst
+across many cameras turned into many small transactions fighting over the
+one WAL write lock (and SQLITE_BUSY retries under busy_timeout).
+
+DatabaseWriter funnels those writes through one thread. Callers submit a
+function that receives a Session; the writer drains whatever is queued,
+runs each job in its own SAVEPOINT (a failing job only rolls back itself)
+and commits the whole batch once. Under load batches grow on their own
+(group commit); an idle write commits immediately. Between batches the
+writer runs PRAGMA wal_checkpoint(TRUNCATE) on a timer so the WAL file
+does not grow without bound while readers keep it pinned.
+"""
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.session import SessionLocal
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+MAX_BATCH = 64
+CHECKPOINT_INTERVAL_SECONDS = 300.0
+DEFAULT_TIMEOUT_SECONDS = 30.0
+
+_STOP = object()
+
+
+class DatabaseWriter:
+    """Serializes database writes through one thread with batched commits."""
+
+    def __init__(
+        self,
+        session_factory: sessionmaker = SessionLocal,
+        max_batch: int = MAX_BATCH,
+        checkpoint_interval: float = CHECKPOINT_INTERVAL_SECONDS,
+    ):
+        self.session_factory = session_factory
+        self.engine = session_factory.kw["bind"]
+        self.max_batch = max(1, int(max_batch))
+        self.checkpoint_interval = checkpoint_interval
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._active_session: Optional[Session] = None
+        self._last_checkpoint = time.monotonic()
+        self._jobs = 0
+        self._failed = 0
+        self._batches = 0
+        self._largest_batch = 0
+        self._commit_ms_avg = 0.0
+        self._checkpoints = 0
+        self._last_checkpoint_result: Optional[Dict[str, int]] = None
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+
+    def submit(self, fn: Callable[[Session], T]) -> "Future[T]":
+        """Queue fn(session); the future resolves after its batch commits."""
+        future: "Future[T]" = Future()
+        if self._on_writer_thread():
+            # Nested write from inside a job: run it in the current batch.
+            try:
+                with self._active_session.begin_nested():
+                    future.set_result(fn(self._active_session))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        self._ensure_started()
+        self._queue.put((fn, future))
+        return future
+
+    def run(self, fn: Callable[[Session], T], timeout: Optional[float] = DEFAULT_TIMEOUT_SECONDS) -> T:
+        """Run fn(session) on the writer and wait for the commit."""
+        return self.submit(fn).result(timeout=timeout)
+
+    def apply(self, db: Session, fn: Callable[[Session], T]) -> T:
+        """
+        Run a write for code that already holds a session.
+
+        Writes against this writer's database go through the writer thread;
+        db sees them on its next query. Sessions bound to another engine
+        (tests, tools) write and commit directly.
+
+        The caller must not have uncommitted writes on db: it would hold
+        the write lock the writer is waiting for.
+        """
+        if db.get_bind() is not self.engine:
+            result = fn(db)
+            db.commit()
+            return result
+        return self.run(fn)
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Commit everything queued, then stop the writer thread."""
+        with self._start_lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.put(_STOP)
+            thread.join(timeout=timeout)
+            self._thread = None
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, daemon=True, name="db-writer")
+                self._thread.start()
+
+    def _on_writer_thread(self) -> bool:
+        return self._active_session is not None and threading.current_thread() is self._thread
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def _loop(self) -> None:
+        while True:
+            wait = max(0.1, self.checkpoint_interval - (time.monotonic() - self._last_checkpoint))
+            try:
+                item = self._queue.get(timeout=wait)
+            except queue.Empty:
+                self.checkpoint()
+                continue
+            stopping = item is _STOP
+            batch: List[Tuple[Callable, Future]] = [] if stopping else [item]
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    continue
+                batch.append(item)
+            if batch:
+                self._commit_batch(batch)
+            if stopping and self._queue.empty():
+                return
+            if time.monotonic() - self._last_checkpoint >= self.checkpoint_interval and self._queue.empty():
+                self.checkpoint()
+
+    def _commit_batch(self, batch: List[Tuple[Callable, Future]]) -> None:
+        started = time.perf_counter()
+        outcomes: List[Tuple[Future, Any, Optional[BaseException]]] = []
+        db = self.session_factory(expire_on_commit=False)
+        try:
+            # Take the write lock up front so the savepoints below nest in
+            # one transaction instead of each RELEASE committing on its own.
+            db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+            self._active_session = db
+            for fn, future in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    with db.begin_nested():
+                        outcomes.append((future, fn(db), None))
+                except Exception as e:
+                    outcomes.append((future, None, e))
+            db.commit()
+        except Exception as e:
+            logger.error("DB writer batch of %d failed: %s", len(batch), e)
+            db.rollback()
+            ran = {id(future) for future, _, _ in outcomes}
+            outcomes = [(future, None, error or e) for future, _, error in outcomes] + [
+                (future, None, e) for _, future in batch if id(future) not in ran and not future.cancelled()
+            ]
+        finally:
+            self._active_session = None
+            db.close()
+
+        commit_ms = (time.perf_counter() - started) * 1000.0
+        failed = 0
+        for future, result, error in outcomes:
+            if error is not None:
+                failed += 1
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        with self._stats_lock:
+            self._jobs += len(outcomes)
+            self._failed += failed
+            self._batches += 1
+            self._largest_batch = max(self._largest_batch, len(outcomes))
+            self._commit_ms_avg = commit_ms if self._batches == 1 else self._commit_ms_avg * 0.9 + commit_ms * 0.1
+
+    def checkpoint(self) -> Optional[Dict[str, int]]:
+        """Run PRAGMA wal_checkpoint(TRUNCATE); returns busy/log/checkpointed pages."""
+        self._last_checkpoint = time.monotonic()
+        try:
+            with self.engine.connect() as conn:
+                busy, log_pages, checkpointed = conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        except Exception as e:
+            logger.warning("WAL checkpoint failed: %s", e)
+            return None
+        result = {"busy": int(busy), "log_pages": int(log_pages), "checkpointed_pages": int(checkpointed)}
+        with self._stats_lock:
+            self._checkpoints += 1
+            self._last_checkpoint_result = result
+        if busy:
+            logger.debug("WAL checkpoint incomplete (readers active): %s", result)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "running": self._thread is not None and self._thread.is_alive(),
+                "queue_depth": self._queue.qsize(),
+                "jobs": self._jobs,
+                "failed_jobs": self._failed,
+                "batches": self._batches,
+                "avg_batch_size": round(self._jobs / self._batches, 2) if self._batches else 0.0,
+                "largest_batch": self._largest_batch,
+                "commit_ms_avg": round(self._commit_ms_avg, 2),
+                "checkpoints": self._checkpoints,
+                "last_checkpoint": self._last_checkpoint_result,
+            }
+
+
+# Global singleton instance
+_db_writer: Optional[DatabaseWriter] = None
+
+
+def get_db_writer() -> DatabaseWriter:
+    """
+    Get or create the global database writer.
+
+    Returns:
+        DatabaseWriter: Global writer instance
+    """
+    global _db_writer
+    if _db_writer is None:
+        _db_writer = DatabaseWriter()
+    return _db_writer
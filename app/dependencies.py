@@ -5,12 +5,15 @@ All module-level singleton instances are initialized here so that
 both main.py and router files can import from a single source without
 circular imports.
 """
+import os
 import threading
 
 from app.db.session import init_db
+from app.db.writer import get_db_writer
 from app.services.camera import get_camera_service
 from app.services.camera_crud import get_camera_crud_service
 from app.services.events import get_event_service
+from app.services.event_jobs import get_event_job_service
 from app.services.media import get_media_service
 from app.services.settings import get_settings_service
 from app.services.websocket import get_websocket_manager
@@ -22,6 +25,11 @@ from app.services.mqtt import get_mqtt_service
 from app.services.recording_state import get_recording_state_service
 from app.services.metrics import get_metrics_service
 from app.services.recorder import get_continuous_recorder
+from app.services.ingest import get_ingest_manager
+from app.services.live_frames import get_live_frame_hub
+from app.services.startup import get_startup_progress
+from app.services.event_loop import get_event_loop_monitor
+from app.services.system_stats import get_system_stats
 from app.workers.retention import get_retention_worker
 from app.workers.detector import get_detector_worker
 
@@ -34,6 +42,8 @@ event_service = get_event_service()
 ai_service = get_ai_service()
 media_service = get_media_service()
 retention_worker = get_retention_worker()
+event_job_service = get_event_job_service()
+db_writer = get_db_writer()
 
 # Default: threading mode. Overridden in lifespan based on performance.worker_mode
 detector_worker = get_detector_worker()
@@ -46,6 +56,12 @@ mqtt_service = get_mqtt_service()
 recording_state_service = get_recording_state_service()
 metrics_service = get_metrics_service()
 continuous_recorder = get_continuous_recorder()
+ingest_manager = get_ingest_manager()
+live_frame_hub = get_live_frame_hub()
+startup_progress = get_startup_progress()
+event_loop_monitor = get_event_loop_monitor()
+system_stats = get_system_stats()
 
-# Max 2 concurrent live MJPEG streams (each stream = full RTSP decode + encode)
-live_stream_semaphore = threading.Semaphore(2)
+# Concurrent live MJPEG streams. Viewers of the same camera share one
+# decode + encode through live_frame_hub, so extra viewers are cheap.
+live_stream_semaphore = threading.Semaphore(int(os.getenv("LIVE_MAX_STREAMS", "6")))
@@ -6,9 +6,9 @@ import logging
 import os
 import sys
 import time
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -31,8 +31,15 @@ from app.dependencies import (
     metrics_service,
     continuous_recorder,
     retention_worker,
+    event_job_service,
+    db_writer,
     live_stream_semaphore,
+    live_frame_hub,
+    startup_progress,
+    event_loop_monitor,
+    system_stats,
 )
+from app.services.event_loop import configure_api_thread_pool
 from app.utils.stream_helpers import get_recording_rtsp_url
 from app.routers import cameras, events, live, settings as settings_router, system, websocket_router
 
@@ -103,6 +110,28 @@ def _debug_headers_enabled() -> bool:
     return os.getenv("DEBUG_HEADERS", "").strip().lower() in {"1", "true", "yes", "on"}
 
 
+def _probe_startup_dependencies() -> tuple:
+    """Blocking reachability checks: (db_ok, go2rtc_ok, mqtt_ready)."""
+    try:
+        with session_scope() as db:
+            db.query(Camera).count()
+            db_ok = True
+    except Exception:
+        db_ok = False
+
+    try:
+        go2rtc_ok = bool(go2rtc_service and go2rtc_service.ensure_enabled())
+    except Exception:
+        go2rtc_ok = False
+
+    try:
+        mqtt_cfg = settings_service.load_config().mqtt
+        mqtt_ready = (not mqtt_cfg.enabled) or bool(mqtt_service.client) or bool(mqtt_service.connected)
+    except Exception:
+        mqtt_ready = True
+    return db_ok, go2rtc_ok, mqtt_ready
+
+
 async def _wait_for_startup_readiness(timeout_seconds: float = 15.0) -> None:
     """Wait until critical startup dependencies are reachable."""
     deadline = time.monotonic() + timeout_seconds
@@ -110,23 +139,8 @@ async def _wait_for_startup_readiness(timeout_seconds: float = 15.0) -> None:
     go2rtc_ok = False
     mqtt_ready = False
     while time.monotonic() < deadline:
-        try:
-            with session_scope() as db:
-                db.query(Camera).count()
-                db_ok = True
-        except Exception:
-            db_ok = False
-
-        try:
-            go2rtc_ok = bool(go2rtc_service and go2rtc_service.ensure_enabled())
-        except Exception:
-            go2rtc_ok = False
-
-        try:
-            mqtt_cfg = settings_service.load_config().mqtt
-            mqtt_ready = (not mqtt_cfg.enabled) or bool(mqtt_service.client) or bool(mqtt_service.connected)
-        except Exception:
-            mqtt_ready = True
+        # Off the event loop: go2rtc probing can block for its HTTP timeout.
+        db_ok, go2rtc_ok, mqtt_ready = await asyncio.to_thread(_probe_startup_dependencies)
 
         if db_ok and go2rtc_ok and mqtt_ready:
             logger.info("Startup readiness checks passed")
@@ -148,20 +162,74 @@ async def _wait_for_startup_readiness(timeout_seconds: float = 15.0) -> None:
 # Lifespan
 # ---------------------------------------------------------------------------
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Application lifespan for startup/shutdown tasks."""
-    logger.info("Starting Thermal Dual Vision")
+def _select_detector_worker() -> None:
+    """Pick the detector worker for performance.worker_mode."""
+    try:
+        config = settings_service.load_config()
+        worker_mode = getattr(getattr(config, "performance", None), "worker_mode", "threading") or "threading"
+    except Exception as e:
+        logger.warning(f"Failed to load config for worker mode: {e}")
+        worker_mode = "threading"
+    if worker_mode == "multiprocessing":
+        deps.detector_worker = get_mp_detector_worker()
+        logger.info("Using multiprocessing detector worker (experimental)")
+    else:
+        deps.detector_worker = get_detector_worker()
+        logger.info("Using threading detector worker")
 
-    retention_worker.start()
-    logger.info("Retention worker started")
 
-    await _wait_for_startup_readiness()
+def _start_continuous_recording() -> int:
+    continuous_recorder.start()
+    started = 0
+    with session_scope() as db:
+        cameras = camera_crud_service.get_cameras(db)
+        for camera in cameras:
+            if camera.enabled:
+                rtsp_url = get_recording_rtsp_url(camera)
+                if rtsp_url:
+                    if continuous_recorder.start_recording(camera.id, rtsp_url):
+                        started += 1
+    return started
+
+
+async def _start_in_thread(start: Callable[[], Any], stop: Callable[[], None]) -> Any:
+    """
+    Run a blocking start() off the event loop.
+
+    A thread cannot be interrupted: if startup is cancelled (shutdown during
+    startup) while start() runs, wait for it to return and stop() what it
+    started, so nothing it launched outlives the shutdown.
+    """
+    starting = asyncio.ensure_future(asyncio.to_thread(start))
+    try:
+        return await asyncio.shield(starting)
+    except asyncio.CancelledError:
+        with suppress(BaseException):
+            await starting
+        stop()
+        raise
+
+
+async def _staged_startup() -> None:
+    """
+    Bring up the slow parts of the app in the background.
+
+    The API is already serving while this runs; each step is reported as a
+    stage of startup_progress (see /ready). A failed stage is logged and the
+    remaining stages still run.
+    """
+    progress = startup_progress
+
+    with progress.stage("dependencies"):
+        await _wait_for_startup_readiness()
 
     try:
-        with session_scope() as db:
-            cameras = camera_crud_service.get_cameras(db)
-            go2rtc_service.sync_all_cameras(cameras)
+        with progress.stage("go2rtc_sync"):
+            def _sync_go2rtc() -> None:
+                with session_scope() as db:
+                    go2rtc_service.sync_all_cameras(camera_crud_service.get_cameras(db))
+
+            await asyncio.to_thread(_sync_go2rtc)
             logger.info("Cameras synced to go2rtc")
     except Exception as e:
         logger.error(f"Failed to sync cameras to go2rtc: {e}")
@@ -169,55 +237,101 @@ async def lifespan(app: FastAPI):
     try:
         config = settings_service.load_config()
         if hasattr(config, "performance") and config.performance.enable_metrics:
-            metrics_service.start_server(config.performance.metrics_port)
-            logger.info(f"Metrics server started on port {config.performance.metrics_port}")
-
-        worker_mode = getattr(getattr(config, "performance", None), "worker_mode", "threading") or "threading"
-        if worker_mode == "multiprocessing":
-            deps.detector_worker = get_mp_detector_worker()
-            logger.info("Using multiprocessing detector worker (experimental)")
+            with progress.stage("metrics"):
+                metrics_service.start_server(config.performance.metrics_port)
+                logger.info(f"Metrics server started on port {config.performance.metrics_port}")
         else:
-            deps.detector_worker = get_detector_worker()
-            logger.info("Using threading detector worker")
+            progress.skip("metrics")
     except Exception as e:
-        logger.warning(f"Failed to load config / start metrics: {e}")
-        deps.detector_worker = get_detector_worker()
-        logger.info("Using threading detector worker (fallback)")
-
-    deps.detector_worker.start()
-    logger.info("Detector worker started")
+        logger.warning(f"Failed to start metrics: {e}")
 
-    continuous_recorder.start()
+    # Recording starts before detection so detector cameras can attach to
+    # the shared ingest stream instead of opening their own.
     try:
-        with session_scope() as db:
-            cameras = camera_crud_service.get_cameras(db)
-            started = 0
-            for camera in cameras:
-                if camera.enabled:
-                    rtsp_url = get_recording_rtsp_url(camera)
-                    if rtsp_url:
-                        if continuous_recorder.start_recording(camera.id, rtsp_url):
-                            started += 1
+        with progress.stage("recorder"):
+            started = await _start_in_thread(_start_continuous_recording, continuous_recorder.stop)
             logger.info(f"Started continuous recording for {started} cameras")
     except Exception as e:
         logger.error(f"Failed to start continuous recording: {e}")
 
-    mqtt_service.start()
-    logger.info("MQTT service started")
+    _select_detector_worker()
+    # Model load, backend export and warmup are the slowest step; camera
+    # processes in multiprocessing mode load their own model.
+    worker = deps.detector_worker
+    try:
+        if hasattr(worker, "load_model"):
+            with progress.stage("model"):
+                await asyncio.to_thread(worker.load_model)
+        else:
+            progress.skip("model")
+        with progress.stage("detector"):
+            await _start_in_thread(worker.start, worker.stop)
+            logger.info("Detector worker started")
+    except Exception as e:
+        logger.error(f"Failed to start detector worker: {e}")
+
+    try:
+        with progress.stage("mqtt"):
+            mqtt_service.start()
+            logger.info("MQTT service started")
+    except Exception as e:
+        logger.error(f"Failed to start MQTT service: {e}")
+
+    progress.finish()
+    logger.info("Startup complete in %.1fs", progress.snapshot()["elapsed_s"])
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan for startup/shutdown tasks."""
+    logger.info("Starting Thermal Dual Vision")
+    startup_progress.reset()
+
+    try:
+        performance = settings_service.load_config().performance
+        api_threads = performance.api_threads
+        stats_interval = performance.stats_interval_seconds
+    except Exception as e:
+        logger.warning(f"Failed to load performance config: {e}")
+        api_threads = 40
+        stats_interval = 5.0
+    configure_api_thread_pool(api_threads)
+    event_loop_monitor.start()
+    system_stats.start(stats_interval)
+
+    retention_worker.start()
+    logger.info("Retention worker started")
 
-    logger.info("Services initialized, application ready")
+    startup_task = asyncio.create_task(_staged_startup())
+    logger.info("API ready; background startup in progress")
     try:
         yield
     finally:
         logger.info("Shutting down Thermal Dual Vision")
+        if not startup_task.done():
+            startup_task.cancel()
+            try:
+                await startup_task
+            except BaseException:
+                pass
         mqtt_service.stop()
         logger.info("MQTT service stopped")
+        telegram_service.stop()
+        logger.info("Telegram sender stopped")
+        live_frame_hub.stop()
+        logger.info("Live frame publishers stopped")
         deps.detector_worker.stop()
         logger.info("Detector worker stopped")
         continuous_recorder.stop()
         logger.info("Continuous recording stopped")
+        event_job_service.shutdown()
         retention_worker.stop()
         logger.info("Retention worker stopped")
+        system_stats.stop()
+        # Last: flushes writes queued by the workers stopped above.
+        db_writer.stop()
+        logger.info("DB writer stopped")
+        await event_loop_monitor.stop()
 
 
 # ---------------------------------------------------------------------------
@@ -259,7 +373,10 @@ async def root():
 
 @app.get("/ready")
 async def ready():
-    return {"ready": True, "status": "ok"}
+    # The API answers as soon as it is up; background startup stages
+    # (model load, camera threads, recorders) are reported alongside.
+    startup = startup_progress.snapshot()
+    return {"ready": True, "status": startup["status"], "startup": startup}
 
 
 if _debug_headers_enabled():
@@ -273,7 +390,7 @@ if _debug_headers_enabled():
 
 
 @app.get("/api/health")
-async def health():
+def health():
     from app.routers.system import get_worker_info
     uptime_s = max(0, int(time.time() - APP_START_TS))
     try:
@@ -293,7 +410,12 @@ async def health():
         ai_enabled = False
         ai_reason = "not_configured"
 
-    pipeline_status = "ok" if deps.detector_worker.running else "down"
+    if deps.detector_worker.running:
+        pipeline_status = "ok"
+    elif not startup_progress.is_complete:
+        pipeline_status = "starting"
+    else:
+        pipeline_status = "down"
     telegram_status = "ok" if telegram_service.is_enabled() else "disabled"
     try:
         mqtt_cfg = settings_service.load_config().mqtt
@@ -315,6 +437,8 @@ async def health():
         "migrations": migrations,
         "migration_degraded": external_migration_degraded,
         "worker": get_worker_info(),
+        "event_loop": event_loop_monitor.get_stats(),
+        "db_writer": db_writer.get_stats(),
     }
 
 
@@ -58,9 +58,23 @@ class DetectionConfig(BaseModel):
         default=False,
         description="Enable object tracking (future feature)"
     )
-    inference_backend: Literal["auto", "cpu", "onnx", "openvino", "tensorrt"] = Field(
+    inference_backend: Literal["auto", "cpu", "onnx", "openvino", "tensorrt", "onnx_int8", "openvino_int8"] = Field(
         default="auto",
-        description="Inference backend: auto (TensorRT>OpenVINO>ONNX>PT, if available), onnx, openvino (Intel iGPU/NPU/CPU), tensorrt (NVIDIA GPU), cpu (PyTorch)"
+        description="Inference backend: auto (TensorRT>OpenVINO GPU>INT8>ONNX>PT, if available), onnx, openvino (Intel iGPU/NPU/CPU), tensorrt (NVIDIA GPU), cpu (PyTorch), onnx_int8/openvino_int8 (quantized variants)"
+    )
+    roi_inference: bool = Field(
+        default=True,
+        description="Infer on the motion region (plus padding) instead of the full frame when motion is localized (dynamic-input models only)"
+    )
+    roi_full_frame_interval: int = Field(
+        default=8,
+        ge=1,
+        le=100,
+        description="Run a full-frame inference every N inferences while ROI inference is active (1 = always full frame)"
+    )
+    frame_change_gate: bool = Field(
+        default=True,
+        description="Reuse the previous detection result for near-identical frames instead of running inference"
     )
 
     @field_validator("inference_resolution")
@@ -194,6 +208,10 @@ class StreamConfig(BaseModel):
         default="auto",
         description="Capture backend for RTSP streams"
     )
+    shared_ingest: bool = Field(
+        default=True,
+        description="Read each recorded camera stream once and share it between recording, detection and snapshots"
+    )
     buffer_size: int = Field(
         default=1,
         ge=1,
@@ -220,6 +238,12 @@ class StreamConfig(BaseModel):
         le=60.0,
         description="Seconds without frames before reconnect"
     )
+    frozen_stream_seconds: float = Field(
+        default=30.0,
+        ge=0.0,
+        le=600.0,
+        description="Reconnect when frames stay identical for this long (stalled encoder / frozen sensor); 0 = disabled"
+    )
 
 
 class WebRTCConfig(BaseModel):
@@ -301,6 +325,16 @@ class EventConfig(BaseModel):
         ge=1,
         description="Frame buffer size for collage generation"
     )
+    buffer_mode: Literal["raw", "jpeg"] = Field(
+        default="jpeg",
+        description="How buffered event frames are held in memory (jpeg = compressed, decoded only for events)"
+    )
+    buffer_jpeg_quality: int = Field(
+        default=90,
+        ge=50,
+        le=100,
+        description="JPEG quality for buffered event frames when buffer_mode is jpeg"
+    )
     
     frame_interval: int = Field(
         default=2,
@@ -334,6 +368,10 @@ class MediaConfig(BaseModel):
         le=95,
         description="Maximum disk usage percentage"
     )
+    preview_format: Literal["webp", "mp4", "gif"] = Field(
+        default="webp",
+        description="Event preview format: animated WebP, muted H.264 loop or GIF"
+    )
 
 
 class AIConfig(BaseModel):
@@ -497,6 +535,28 @@ class PerformanceConfig(BaseModel):
         le=65535,
         description="Prometheus metrics HTTP port"
     )
+    auto_tune: bool = Field(
+        default=False,
+        description="Benchmark inference backends/threads on first start and use the fastest (backend=auto); the measured capacity becomes the global inference budget"
+    )
+    scheduler_min_fps: float = Field(
+        default=1.0,
+        ge=0.1,
+        le=10.0,
+        description="Inference FPS every camera is guaranteed by the fair-share scheduler, even when the global budget is exhausted"
+    )
+    api_threads: int = Field(
+        default=40,
+        ge=4,
+        le=200,
+        description="Worker threads for blocking API work (database, filesystem, RTSP probes) so it never runs on the event loop"
+    )
+    stats_interval_seconds: float = Field(
+        default=5.0,
+        ge=1.0,
+        le=60.0,
+        description="How often the background collector samples CPU, memory, disk and thread usage"
+    )
 
 
 class MqttConfig(BaseModel):
@@ -1,21 +1,20 @@
 import base64
 import logging
-from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Response
 from fastapi.responses import JSONResponse
 from pydantic import ValidationError
-from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.db.models import Camera, Event, Zone, ZoneMode
+from app.db.models import Camera, Zone, ZoneMode
 from app.db.session import get_session
 from app.dependencies import (
     camera_crud_service,
     camera_service,
     continuous_recorder,
     detector_worker,
+    event_service,
     go2rtc_service,
     mqtt_service,
     recording_state_service,
@@ -58,12 +57,8 @@ def _sanitize_rtsp_updates(payload: Dict[str, Any]) -> Dict[str, Optional[str]]:
     return sanitized
 
 
-def _utc_now_naive() -> datetime:
-    return datetime.now(timezone.utc).replace(tzinfo=None)
-
-
 @router.post("/api/cameras/test", response_model=CameraTestResponse)
-async def test_camera(request: CameraTestRequest) -> CameraTestResponse:
+def test_camera(request: CameraTestRequest) -> CameraTestResponse:
     try:
         if request.type == "thermal":
             result = camera_service.test_rtsp_connection(request.rtsp_url_thermal)
@@ -87,7 +82,7 @@ async def test_camera(request: CameraTestRequest) -> CameraTestResponse:
 
 
 @router.get("/api/cameras")
-async def get_cameras(db: Session = Depends(get_session)) -> Dict[str, Any]:
+def get_cameras(db: Session = Depends(get_session)) -> Dict[str, Any]:
     try:
         cameras = camera_crud_service.get_cameras(db)
         return {"cameras": [camera_crud_service.mask_rtsp_urls(cam) for cam in cameras]}
@@ -97,31 +92,14 @@ async def get_cameras(db: Session = Depends(get_session)) -> Dict[str, Any]:
 
 
 @router.get("/api/cameras/status")
-async def get_cameras_status(db: Session = Depends(get_session)) -> Dict[str, Any]:
+def get_cameras_status(db: Session = Depends(get_session)) -> Dict[str, Any]:
     """Return camera monitor status payload used by CameraMonitor page."""
     try:
         cameras = camera_crud_service.get_cameras(db)
         go2rtc_ok = bool(go2rtc_service.ensure_enabled())
 
-        # Aggregate event stats once to avoid per-camera N+1 queries.
-        since_24h = _utc_now_naive() - timedelta(hours=24)
-        event_rows = (
-            db.query(
-                Event.camera_id.label("camera_id"),
-                func.count(Event.id).label("event_count_24h"),
-                func.max(Event.timestamp).label("last_event_ts"),
-            )
-            .filter(Event.timestamp >= since_24h)
-            .group_by(Event.camera_id)
-            .all()
-        )
-        event_map = {
-            row.camera_id: {
-                "count": int(row.event_count_24h or 0),
-                "last_ts": row.last_event_ts,
-            }
-            for row in event_rows
-        }
+        # Per-camera counts from the hourly rollup table: O(cameras x 24).
+        event_map = event_service.get_recent_activity(db, hours=24)
 
         # Determine detecting state from the active worker mode.
         detecting_ids: set[str] = set()
@@ -174,7 +152,7 @@ async def get_cameras_status(db: Session = Depends(get_session)) -> Dict[str, An
 
 
 @router.post("/api/cameras")
-async def create_camera(request: Dict[str, Any], db: Session = Depends(get_session)) -> JSONResponse:
+def create_camera(request: Dict[str, Any], db: Session = Depends(get_session)) -> JSONResponse:
     try:
         try:
             rtsp_updates = _sanitize_rtsp_updates(request)
@@ -204,14 +182,7 @@ async def create_camera(request: Dict[str, Any], db: Session = Depends(get_sessi
             rtsp_url_detection=camera.rtsp_url_detection,
             default_url=resolve_default_rtsp_url(camera),
         )
-        roles = camera.stream_roles if isinstance(camera.stream_roles, list) else []
-        if camera.enabled and (not roles or "detect" in roles):
-            try:
-                detector_worker.start_camera_detection(camera)
-            except Exception as e:
-                logger.error("Failed to start detection for camera %s: %s", camera.id, e)
-        else:
-            detector_worker.stop_camera_detection(camera.id)
+        # Recording first: the detector attaches to its shared ingest stream.
         if camera.enabled:
             try:
                 rtsp_url = get_recording_rtsp_url(camera)
@@ -221,6 +192,14 @@ async def create_camera(request: Dict[str, Any], db: Session = Depends(get_sessi
                 logger.error("Failed to start continuous recording for camera %s: %s", camera.id, e)
         else:
             continuous_recorder.stop_recording(camera.id)
+        roles = camera.stream_roles if isinstance(camera.stream_roles, list) else []
+        if camera.enabled and (not roles or "detect" in roles):
+            try:
+                detector_worker.start_camera_detection(camera)
+            except Exception as e:
+                logger.error("Failed to start detection for camera %s: %s", camera.id, e)
+        else:
+            detector_worker.stop_camera_detection(camera.id)
         mqtt_service.publish_camera_update(camera.id)
         return JSONResponse(content=camera_crud_service.mask_rtsp_urls(camera), status_code=201)
     except ValueError as e:
@@ -231,7 +210,7 @@ async def create_camera(request: Dict[str, Any], db: Session = Depends(get_sessi
 
 
 @router.put("/api/cameras/{camera_id}")
-async def update_camera(camera_id: str, request: Dict[str, Any], db: Session = Depends(get_session)) -> Dict[str, Any]:
+def update_camera(camera_id: str, request: Dict[str, Any], db: Session = Depends(get_session)) -> Dict[str, Any]:
     try:
         try:
             request.update(_sanitize_rtsp_updates(request))
@@ -249,12 +228,7 @@ async def update_camera(camera_id: str, request: Dict[str, Any], db: Session = D
             rtsp_url_detection=camera.rtsp_url_detection,
             default_url=resolve_default_rtsp_url(camera),
         )
-        roles = camera.stream_roles if isinstance(camera.stream_roles, list) else []
-        if camera.enabled and (not roles or "detect" in roles):
-            try:
-                detector_worker.start_camera_detection(camera)
-            except Exception as e:
-                logger.error("Failed to start detection for camera %s: %s", camera.id, e)
+        # Recording first: the detector attaches to its shared ingest stream.
         if camera.enabled:
             try:
                 rtsp_url = get_recording_rtsp_url(camera)
@@ -264,6 +238,12 @@ async def update_camera(camera_id: str, request: Dict[str, Any], db: Session = D
                 logger.error("Failed to start continuous recording for camera %s: %s", camera.id, e)
         else:
             continuous_recorder.stop_recording(camera.id)
+        roles = camera.stream_roles if isinstance(camera.stream_roles, list) else []
+        if camera.enabled and (not roles or "detect" in roles):
+            try:
+                detector_worker.start_camera_detection(camera)
+            except Exception as e:
+                logger.error("Failed to start detection for camera %s: %s", camera.id, e)
         mqtt_service.publish_camera_update(camera.id)
         return camera_crud_service.mask_rtsp_urls(camera)
     except HTTPException:
@@ -276,7 +256,7 @@ async def update_camera(camera_id: str, request: Dict[str, Any], db: Session = D
 
 
 @router.delete("/api/cameras/{camera_id}")
-async def delete_camera(camera_id: str, db: Session = Depends(get_session)) -> Response:
+def delete_camera(camera_id: str, db: Session = Depends(get_session)) -> Response:
     try:
         go2rtc_service.remove_camera(camera_id)
         continuous_recorder.stop_recording(camera_id)
@@ -295,7 +275,7 @@ async def delete_camera(camera_id: str, db: Session = Depends(get_session)) -> R
 
 
 @router.get("/api/cameras/{camera_id}/record")
-async def get_recording_status(camera_id: str, db: Session = Depends(get_session)) -> Dict[str, Any]:
+def get_recording_status(camera_id: str, db: Session = Depends(get_session)) -> Dict[str, Any]:
     camera = camera_crud_service.get_camera(db, camera_id)
     if not camera:
         raise HTTPException(status_code=404, detail={"error": True, "code": "CAMERA_NOT_FOUND", "message": f"Camera not found: {camera_id}"})
@@ -303,7 +283,7 @@ async def get_recording_status(camera_id: str, db: Session = Depends(get_session
 
 
 @router.post("/api/cameras/{camera_id}/record/start")
-async def start_recording(camera_id: str, db: Session = Depends(get_session)) -> Dict[str, Any]:
+def start_recording(camera_id: str, db: Session = Depends(get_session)) -> Dict[str, Any]:
     camera = camera_crud_service.get_camera(db, camera_id)
     if not camera:
         raise HTTPException(status_code=404, detail={"error": True, "code": "CAMERA_NOT_FOUND", "message": f"Camera not found: {camera_id}"})
@@ -316,7 +296,7 @@ async def start_recording(camera_id: str, db: Session = Depends(get_session)) ->
 
 
 @router.post("/api/cameras/{camera_id}/record/stop")
-async def stop_recording(camera_id: str, db: Session = Depends(get_session)) -> Dict[str, Any]:
+def stop_recording(camera_id: str, db: Session = Depends(get_session)) -> Dict[str, Any]:
     camera = camera_crud_service.get_camera(db, camera_id)
     if not camera:
         raise HTTPException(status_code=404, detail={"error": True, "code": "CAMERA_NOT_FOUND", "message": f"Camera not found: {camera_id}"})
@@ -326,7 +306,7 @@ async def stop_recording(camera_id: str, db: Session = Depends(get_session)) ->
 
 
 @router.get("/api/cameras/{camera_id}/snapshot")
-async def get_camera_snapshot(camera_id: str, db: Session = Depends(get_session)) -> Response:
+def get_camera_snapshot(camera_id: str, db: Session = Depends(get_session)) -> Response:
     camera = camera_crud_service.get_camera(db, camera_id)
     if not camera:
         raise HTTPException(status_code=404, detail={"error": True, "code": "CAMERA_NOT_FOUND", "message": f"Camera not found: {camera_id}"})
@@ -349,7 +329,7 @@ async def get_camera_snapshot(camera_id: str, db: Session = Depends(get_session)
 
 
 @router.get("/api/cameras/{camera_id}/zones")
-async def get_camera_zones(camera_id: str, db: Session = Depends(get_session)) -> Dict[str, Any]:
+def get_camera_zones(camera_id: str, db: Session = Depends(get_session)) -> Dict[str, Any]:
     camera = camera_crud_service.get_camera(db, camera_id)
     if not camera:
         raise HTTPException(status_code=404, detail={"error": True, "code": "CAMERA_NOT_FOUND", "message": f"Camera not found: {camera_id}"})
@@ -358,7 +338,7 @@ async def get_camera_zones(camera_id: str, db: Session = Depends(get_session)) -
 
 
 @router.post("/api/cameras/{camera_id}/zones")
-async def create_zone(camera_id: str, request: Dict[str, Any], db: Session = Depends(get_session)) -> Dict[str, Any]:
+def create_zone(camera_id: str, request: Dict[str, Any], db: Session = Depends(get_session)) -> Dict[str, Any]:
     camera = camera_crud_service.get_camera(db, camera_id)
     if not camera:
         raise HTTPException(status_code=404, detail={"error": True, "code": "CAMERA_NOT_FOUND", "message": f"Camera not found: {camera_id}"})
@@ -380,7 +360,7 @@ async def create_zone(camera_id: str, request: Dict[str, Any], db: Session = Dep
 
 
 @router.put("/api/zones/{zone_id}")
-async def update_zone(zone_id: str, request: Dict[str, Any], db: Session = Depends(get_session)) -> Dict[str, Any]:
+def update_zone(zone_id: str, request: Dict[str, Any], db: Session = Depends(get_session)) -> Dict[str, Any]:
     zone = db.query(Zone).filter(Zone.id == zone_id).first()
     if not zone:
         raise HTTPException(status_code=404, detail={"error": True, "code": "ZONE_NOT_FOUND", "message": f"Zone not found: {zone_id}"})
@@ -398,7 +378,7 @@ async def update_zone(zone_id: str, request: Dict[str, Any], db: Session = Depen
 
 
 @router.delete("/api/zones/{zone_id}")
-async def delete_zone(zone_id: str, db: Session = Depends(get_session)) -> Dict[str, Any]:
+def delete_zone(zone_id: str, db: Session = Depends(get_session)) -> Dict[str, Any]:
     zone = db.query(Zone).filter(Zone.id == zone_id).first()
     if not zone:
         raise HTTPException(status_code=404, detail={"error": True, "code": "ZONE_NOT_FOUND", "message": f"Zone not found: {zone_id}"})
@@ -1,40 +1,46 @@
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import FileResponse
-from sqlalchemy import and_
 from sqlalchemy.orm import Session
 
 from app.db.models import Camera, Event
 from app.db.session import get_session
-from app.dependencies import event_service, media_service, retention_worker
+from app.dependencies import event_job_service, event_service, media_service
+from app.services.event_jobs import build_event_filters
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+PREVIEW_MEDIA_TYPES = {"gif": "image/gif", "webp": "image/webp", "mp4": "video/mp4"}
+
 
 def _resolve_media_urls(event, ingress_path: str = "") -> Dict[str, Optional[str]]:
     collage_path = media_service.get_media_path(event.id, "collage")
     gif_path = media_service.get_media_path(event.id, "gif")
+    preview_path = media_service.get_media_path(event.id, "preview")
     mp4_path = media_service.get_media_path(event.id, "mp4")
     prefix = ingress_path.rstrip("/") if ingress_path else ""
     base_collage = event.collage_url or f"/api/events/{event.id}/collage"
-    base_gif = event.gif_url or f"/api/events/{event.id}/preview.gif"
+    base_gif = f"/api/events/{event.id}/preview.gif"
+    base_preview = f"/api/events/{event.id}/{preview_path.name if preview_path else 'preview.gif'}"
     base_mp4 = event.mp4_url or f"/api/events/{event.id}/timelapse.mp4"
     collage_url = f"{prefix}{base_collage}" if prefix else base_collage
     gif_url = f"{prefix}{base_gif}" if prefix else base_gif
+    preview_url = f"{prefix}{base_preview}" if prefix else base_preview
     mp4_url = f"{prefix}{base_mp4}" if prefix else base_mp4
     return {
         "collage_url": collage_url if collage_path and collage_path.exists() else None,
         "gif_url": gif_url if gif_path and gif_path.exists() else None,
+        "preview_url": preview_url if preview_path else None,
         "mp4_url": mp4_url if mp4_path and mp4_path.exists() else None,
     }
 
 
 @router.get("/api/events")
-async def get_events(
+def get_events(
     request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
@@ -42,6 +48,7 @@ async def get_events(
     date: Optional[datetime] = Query(None),
     confidence: Optional[float] = Query(None, ge=0.0, le=1.0),
     rejected: Optional[bool] = Query(None),
+    q: Optional[str] = Query(None, max_length=200),
     db: Session = Depends(get_session),
 ) -> Dict[str, Any]:
     try:
@@ -53,6 +60,7 @@ async def get_events(
             date_filter=date,
             min_confidence=confidence,
             rejected_only=rejected,
+            search=q,
         )
         ingress_path = request.headers.get("X-Ingress-Path", "")
         events_list = []
@@ -67,6 +75,7 @@ async def get_events(
                 "summary": event.summary,
                 "collage_url": media_urls["collage_url"],
                 "gif_url": media_urls["gif_url"],
+                "preview_url": media_urls["preview_url"],
                 "mp4_url": media_urls["mp4_url"],
                 "rejected_by_ai": getattr(event, "rejected_by_ai", False),
             })
@@ -76,8 +85,48 @@ async def get_events(
         raise HTTPException(status_code=500, detail={"error": True, "code": "INTERNAL_ERROR", "message": f"Failed to retrieve events: {str(e)}"})
 
 
+# Hourly buckets over a year; wider ranges should use bucket=day.
+MAX_STATS_BUCKETS = 24 * 366
+
+
+def _to_utc_naive(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+@router.get("/api/events/stats")
+def get_event_stats(
+    start: Optional[datetime] = Query(None),
+    end: Optional[datetime] = Query(None),
+    camera_id: Optional[str] = Query(None),
+    bucket: str = Query("hour", pattern="^(hour|day)$"),
+    db: Session = Depends(get_session),
+) -> Dict[str, Any]:
+    end_ts = _to_utc_naive(end) if end else datetime.now(timezone.utc).replace(tzinfo=None)
+    start_ts = _to_utc_naive(start) if start else end_ts - timedelta(hours=24)
+    bucket_hours = 24 if bucket == "day" else 1
+    if start_ts >= end_ts:
+        raise HTTPException(status_code=400, detail={"error": True, "code": "VALIDATION_ERROR", "message": "start must be before end"})
+    if (end_ts - start_ts) / timedelta(hours=bucket_hours) > MAX_STATS_BUCKETS:
+        raise HTTPException(status_code=400, detail={"error": True, "code": "VALIDATION_ERROR", "message": f"Range too large for bucket={bucket}"})
+    try:
+        result = event_service.get_event_stats(
+            db=db,
+            start=start_ts,
+            end=end_ts,
+            camera_id=camera_id,
+            bucket_hours=bucket_hours,
+        )
+        result["bucket"] = bucket
+        return result
+    except Exception as e:
+        logger.error(f"Failed to get event stats: {e}")
+        raise HTTPException(status_code=500, detail={"error": True, "code": "INTERNAL_ERROR", "message": f"Failed to retrieve event stats: {str(e)}"})
+
+
 @router.get("/api/events/{event_id}")
-async def get_event(request: Request, event_id: str, db: Session = Depends(get_session)) -> Dict[str, Any]:
+def get_event(request: Request, event_id: str, db: Session = Depends(get_session)) -> Dict[str, Any]:
     try:
         event = event_service.get_event_by_id(db=db, event_id=event_id)
         if not event:
@@ -92,7 +141,7 @@ async def get_event(request: Request, event_id: str, db: Session = Depends(get_s
             "event_type": event.event_type,
             "summary": event.summary,
             "ai": {"enabled": event.ai_enabled, "reason": event.ai_reason, "text": event.summary},
-            "media": {"collage_url": media_urls["collage_url"], "gif_url": media_urls["gif_url"], "mp4_url": media_urls["mp4_url"]},
+            "media": {"collage_url": media_urls["collage_url"], "gif_url": media_urls["gif_url"], "preview_url": media_urls["preview_url"], "mp4_url": media_urls["mp4_url"]},
         }
     except HTTPException:
         raise
@@ -102,7 +151,7 @@ async def get_event(request: Request, event_id: str, db: Session = Depends(get_s
 
 
 @router.delete("/api/events/{event_id}")
-async def delete_event(event_id: str, db: Session = Depends(get_session)) -> Dict[str, Any]:
+def delete_event(event_id: str, db: Session = Depends(get_session)) -> Dict[str, Any]:
     try:
         deleted = event_service.delete_event(db=db, event_id=event_id)
         if not deleted:
@@ -115,81 +164,52 @@ async def delete_event(event_id: str, db: Session = Depends(get_session)) -> Dic
         raise HTTPException(status_code=500, detail={"error": True, "code": "INTERNAL_ERROR", "message": f"Failed to delete event: {str(e)}"})
 
 
-@router.post("/api/events/bulk-delete")
-async def bulk_delete_events(request: Dict[str, Any], db: Session = Depends(get_session)) -> Dict[str, Any]:
+@router.post("/api/events/bulk-delete", status_code=202)
+def bulk_delete_events(request: Dict[str, Any]) -> Dict[str, Any]:
+    event_ids = request.get("event_ids", [])
+    if not event_ids or not isinstance(event_ids, list):
+        raise HTTPException(status_code=400, detail={"error": True, "code": "VALIDATION_ERROR", "message": "event_ids is required"})
     try:
-        event_ids = request.get("event_ids", [])
-        if not event_ids:
-            raise HTTPException(status_code=400, detail={"error": True, "code": "VALIDATION_ERROR", "message": "event_ids is required"})
-        deleted_count = 0
-        failed_ids = []
-        for event_id in event_ids:
-            try:
-                retention_worker.delete_event_media(event_id)
-                if event_service.delete_event(db=db, event_id=event_id):
-                    deleted_count += 1
-                else:
-                    failed_ids.append(event_id)
-            except Exception as e:
-                logger.error(f"Failed to delete event {event_id}: {e}")
-                failed_ids.append(event_id)
-        return {"deleted_count": deleted_count, "failed_ids": failed_ids}
-    except HTTPException:
-        raise
+        return event_job_service.submit_delete(event_ids)
     except Exception as e:
         logger.error(f"Bulk delete failed: {e}")
         raise HTTPException(status_code=500, detail={"error": True, "code": "INTERNAL_ERROR", "message": f"Bulk delete failed: {str(e)}"})
 
 
-@router.post("/api/events/clear")
-async def clear_events(request: Dict[str, Any], db: Session = Depends(get_session)) -> Dict[str, Any]:
+@router.post("/api/events/clear", status_code=202)
+def clear_events(request: Dict[str, Any]) -> Dict[str, Any]:
+    camera_id = request.get("camera_id")
+    date_raw = request.get("date")
+    min_confidence = request.get("min_confidence")
+    date_filter = None
+    if date_raw:
+        try:
+            date_filter = datetime.fromisoformat(date_raw).date()
+        except Exception:
+            raise HTTPException(status_code=400, detail={"error": True, "code": "VALIDATION_ERROR", "message": "Invalid date format. Use YYYY-MM-DD."})
+    if min_confidence is not None:
+        try:
+            min_confidence = float(min_confidence)
+        except Exception:
+            raise HTTPException(status_code=400, detail={"error": True, "code": "VALIDATION_ERROR", "message": "min_confidence must be a number."})
     try:
-        camera_id = request.get("camera_id")
-        date_raw = request.get("date")
-        min_confidence = request.get("min_confidence")
-        date_filter = None
-        if date_raw:
-            try:
-                date_filter = datetime.fromisoformat(date_raw).date()
-            except Exception:
-                raise HTTPException(status_code=400, detail={"error": True, "code": "VALIDATION_ERROR", "message": "Invalid date format. Use YYYY-MM-DD."})
-
-        query = db.query(Event)
-        filters = []
-        if camera_id:
-            filters.append(Event.camera_id == camera_id)
-        if date_filter:
-            start_of_day = datetime.combine(date_filter, datetime.min.time())
-            end_of_day = datetime.combine(date_filter, datetime.max.time())
-            filters.append(and_(Event.timestamp >= start_of_day, Event.timestamp <= end_of_day))
-        if min_confidence is not None:
-            try:
-                filters.append(Event.confidence >= float(min_confidence))
-            except Exception:
-                raise HTTPException(status_code=400, detail={"error": True, "code": "VALIDATION_ERROR", "message": "min_confidence must be a number."})
-        if filters:
-            query = query.filter(and_(*filters))
-
-        events = query.all()
-        deleted_count = 0
-        for event in events:
-            try:
-                retention_worker.delete_event_media(event.id)
-                db.delete(event)
-                deleted_count += 1
-            except Exception as e:
-                logger.error("Failed to delete event %s: %s", event.id, e)
-        db.commit()
-        return {"deleted_count": deleted_count}
-    except HTTPException:
-        raise
+        filters = build_event_filters(camera_id=camera_id, date_filter=date_filter, min_confidence=min_confidence)
+        return event_job_service.submit_clear(filters)
     except Exception as e:
         logger.error(f"Failed to clear events: {e}")
         raise HTTPException(status_code=500, detail={"error": True, "code": "INTERNAL_ERROR", "message": f"Failed to clear events: {str(e)}"})
 
 
+@router.get("/api/events/jobs/{job_id}")
+def get_event_job(job_id: str) -> Dict[str, Any]:
+    job = event_job_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail={"error": True, "code": "JOB_NOT_FOUND", "message": f"Job {job_id} not found"})
+    return job
+
+
 @router.get("/api/events/{event_id}/collage")
-async def get_event_collage(event_id: str) -> FileResponse:
+def get_event_collage(event_id: str) -> FileResponse:
     try:
         media_service.ensure_user_collage_quality(event_id)
         media_path = media_service.get_media_path(event_id, "collage")
@@ -203,22 +223,29 @@ async def get_event_collage(event_id: str) -> FileResponse:
         raise HTTPException(status_code=500, detail={"error": True, "code": "INTERNAL_ERROR", "message": f"Failed to retrieve collage: {str(e)}"})
 
 
-@router.get("/api/events/{event_id}/preview.gif")
-async def get_event_gif(event_id: str) -> FileResponse:
+@router.get("/api/events/{event_id}/preview.{ext}")
+def get_event_preview(event_id: str, ext: str) -> FileResponse:
+    """
+    Serve the event preview loop in the format it was written.
+
+    Each format has its own URL: preview.gif is only ever a GIF.
+    """
     try:
-        media_path = media_service.get_media_path(event_id, "gif")
-        if not media_path or not media_path.exists():
-            raise HTTPException(status_code=404, detail={"error": True, "code": "MEDIA_NOT_FOUND", "message": f"GIF not found for event {event_id}"})
-        return FileResponse(path=str(media_path), media_type="image/gif", filename=f"event-{event_id}-preview.gif", content_disposition_type="inline")
+        if ext not in PREVIEW_MEDIA_TYPES:
+            raise HTTPException(status_code=404, detail={"error": True, "code": "MEDIA_NOT_FOUND", "message": f"Unknown preview format: {ext}"})
+        media_path = media_service.get_media_path(event_id, "preview")
+        if not media_path or media_path.suffix != f".{ext}":
+            raise HTTPException(status_code=404, detail={"error": True, "code": "MEDIA_NOT_FOUND", "message": f"Preview not found for event {event_id}"})
+        return FileResponse(path=str(media_path), media_type=PREVIEW_MEDIA_TYPES[ext], filename=f"event-{event_id}-preview.{ext}", content_disposition_type="inline")
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to get GIF for event {event_id}: {e}")
-        raise HTTPException(status_code=500, detail={"error": True, "code": "INTERNAL_ERROR", "message": f"Failed to retrieve GIF: {str(e)}"})
+        logger.error(f"Failed to get preview for event {event_id}: {e}")
+        raise HTTPException(status_code=500, detail={"error": True, "code": "INTERNAL_ERROR", "message": f"Failed to retrieve preview: {str(e)}"})
 
 
 @router.get("/api/events/{event_id}/timelapse.mp4")
-async def get_event_mp4(event_id: str) -> FileResponse:
+def get_event_mp4(event_id: str) -> FileResponse:
     try:
         media_path = media_service.get_media_path(event_id, "mp4")
         if not media_path or not media_path.exists():
@@ -1,7 +1,6 @@
 import asyncio
 import base64
 import logging
-import time
 from typing import Any, Dict, List, Optional
 
 import cv2
@@ -17,6 +16,8 @@ from app.dependencies import (
     camera_service,
     detector_worker,
     go2rtc_service,
+    ingest_manager,
+    live_frame_hub,
     live_stream_semaphore,
     settings_service,
 )
@@ -52,40 +53,76 @@ def _resolve_go2rtc_stream_name(camera) -> Optional[str]:
 
 
 def _get_latest_worker_frame(camera_id: str) -> Optional[np.ndarray]:
+    frame = None
     try:
         if hasattr(detector_worker, "get_latest_frame"):
-            return detector_worker.get_latest_frame(camera_id)
+            frame = detector_worker.get_latest_frame(camera_id)
     except Exception as e:
         logger.debug("Live frame fetch failed for %s: %s", camera_id, e)
-    return None
+    if frame is None:
+        # The shared ingest keeps decoding while the detector restarts.
+        frame = ingest_manager.latest_frame(camera_id)
+    return frame
+
+
+def _mjpeg_part(jpg: bytes) -> bytes:
+    return (
+        b"--frame\r\n"
+        + b"Content-Type: image/jpeg\r\n"
+        + f"Content-Length: {len(jpg)}\r\n\r\n".encode("ascii")
+        + jpg
+        + b"\r\n"
+    )
+
+
+def _worker_reader_factory(camera_id: str):
+    def _factory():
+        return (lambda: _get_latest_worker_frame(camera_id)), None
+    return _factory
+
+
+def _rtsp_reader_factory(rtsp_url: str):
+    """Single shared RTSP capture, opened lazily on the publisher thread."""
+    def _factory():
+        state: Dict[str, Any] = {"cap": None}
+
+        def _read() -> Optional[np.ndarray]:
+            cap = state["cap"]
+            if cap is None:
+                cap = cv2.VideoCapture(rtsp_url, cv2.CAP_FFMPEG)
+                cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                if hasattr(cv2, "CAP_PROP_OPEN_TIMEOUT_MSEC"):
+                    cap.set(cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, 10000)
+                if hasattr(cv2, "CAP_PROP_READ_TIMEOUT_MSEC"):
+                    cap.set(cv2.CAP_PROP_READ_TIMEOUT_MSEC, 10000)
+                state["cap"] = cap
+            ok, frame = cap.read()
+            if not ok or frame is None:
+                cap.release()
+                state["cap"] = None
+                return None
+            return frame
 
+        def _close() -> None:
+            cap = state["cap"]
+            state["cap"] = None
+            if cap is not None:
+                try:
+                    cap.release()
+                except Exception:
+                    pass
 
-def _iter_mjpeg_from_worker(camera_id: str, fps: float, quality: int):
-    boundary = b"--frame\r\n"
-    delay = 1.0 / max(fps, 1.0)
-    while True:
-        frame = _get_latest_worker_frame(camera_id)
-        if frame is None:
-            time.sleep(0.2)
-            continue
-        ok, buffer = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
-        if not ok:
-            time.sleep(0.2)
-            continue
-        jpg = buffer.tobytes()
-        yield (
-            boundary
-            + b"Content-Type: image/jpeg\r\n"
-            + f"Content-Length: {len(jpg)}\r\n\r\n".encode("ascii")
-            + jpg
-            + b"\r\n"
-        )
-        if delay > 0:
-            time.sleep(delay)
+        return _read, _close
+    return _factory
+
+
+async def _iter_mjpeg_from_hub(key: str, reader_factory, fps: float, quality: int, dedupe: bool = True):
+    async for jpg in live_frame_hub.subscribe(key, reader_factory, fps, quality, dedupe=dedupe):
+        yield _mjpeg_part(jpg)
 
 
 @router.get("/api/live")
-async def get_live_streams(request: Request, db: Session = Depends(get_session)) -> Dict[str, Any]:
+def get_live_streams(request: Request, db: Session = Depends(get_session)) -> Dict[str, Any]:
     try:
         cameras = camera_crud_service.get_cameras(db)
         ingress_path = request.headers.get("X-Ingress-Path", "")
@@ -110,17 +147,18 @@ async def get_live_stream(
     probe: bool = Query(False),
 ) -> Response:
     """Stream live MJPEG from go2rtc with fallbacks."""
-    camera = camera_crud_service.get_camera(db, camera_id)
+    # Database, config and go2rtc checks block; keep them off the event loop.
+    camera = await asyncio.to_thread(camera_crud_service.get_camera, db, camera_id)
     if not camera:
         raise HTTPException(status_code=404, detail={"error": True, "code": "CAMERA_NOT_FOUND", "message": f"Camera not found: {camera_id}"})
 
-    config = settings_service.load_config()
+    config = await asyncio.to_thread(settings_service.load_config)
     go2rtc_mjpeg = None
     media_type = "multipart/x-mixed-replace; boundary=frame"
     use_go2rtc_mjpeg = False
     stream_name = None
     go2rtc_error = None
-    go2rtc_ready = bool(go2rtc_service and go2rtc_service.ensure_enabled())
+    go2rtc_ready = bool(go2rtc_service and await asyncio.to_thread(go2rtc_service.ensure_enabled))
 
     if go2rtc_ready:
         stream_name = _resolve_go2rtc_stream_name(camera)
@@ -182,29 +220,6 @@ async def get_live_stream(
         raise HTTPException(status_code=503, detail={"error": True, "code": "TOO_MANY_LIVE_STREAMS", "message": "Another live stream is open. Close it and try again."})
     release_guard = _ReleaseGuard(live_stream_semaphore)
 
-    def _proxy_rtsp_mjpeg(rtsp_url: str, quality: int):
-        try:
-            cap = cv2.VideoCapture(rtsp_url, cv2.CAP_FFMPEG)
-            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
-            if hasattr(cv2, "CAP_PROP_OPEN_TIMEOUT_MSEC"):
-                cap.set(cv2.CAP_PROP_OPEN_TIMEOUT_MSEC, 10000)
-            if hasattr(cv2, "CAP_PROP_READ_TIMEOUT_MSEC"):
-                cap.set(cv2.CAP_PROP_READ_TIMEOUT_MSEC, 10000)
-            while True:
-                ok, frame = cap.read()
-                if not ok or frame is None:
-                    break
-                ok, buffer = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
-                if not ok:
-                    continue
-                yield b"--frame\r\nContent-Type: image/jpeg\r\n\r\n" + buffer.tobytes() + b"\r\n"
-        finally:
-            try:
-                cap.release()
-            except Exception:
-                pass
-            release_guard.release()
-
     stream_headers = {
         "Cache-Control": "no-cache, no-store, must-revalidate",
         "Pragma": "no-cache",
@@ -230,9 +245,12 @@ async def get_live_stream(
         fallback_fps = float(getattr(config.detection, "inference_fps", 2))
         fallback_fps = max(1.0, min(fallback_fps, 10.0))
 
-        def fallback_stream():
+        async def fallback_stream():
             try:
-                yield from _iter_mjpeg_from_worker(camera_id, fallback_fps, mjpeg_quality)
+                async for part in _iter_mjpeg_from_hub(
+                    f"worker:{camera_id}", _worker_reader_factory(camera_id), fallback_fps, mjpeg_quality
+                ):
+                    yield part
             finally:
                 release_guard.release()
 
@@ -242,15 +260,26 @@ async def get_live_stream(
     stream_urls = get_live_rtsp_urls(camera)
     if stream_urls:
         quality = int(getattr(getattr(config, "live", None), "mjpeg_quality", 92))
+        rtsp_url = stream_urls[0]
+
+        async def rtsp_stream():
+            try:
+                async for part in _iter_mjpeg_from_hub(
+                    f"rtsp:{rtsp_url}", _rtsp_reader_factory(rtsp_url), 25.0, quality, dedupe=False
+                ):
+                    yield part
+            finally:
+                release_guard.release()
+
         logger.info("Live stream fallback via RTSP for %s", camera_id)
-        return StreamingResponse(_proxy_rtsp_mjpeg(stream_urls[0], quality), media_type="multipart/x-mixed-replace; boundary=frame", headers=stream_headers)
+        return StreamingResponse(rtsp_stream(), media_type="multipart/x-mixed-replace; boundary=frame", headers=stream_headers)
 
     release_guard.release()
     raise HTTPException(status_code=503, detail={"error": True, "code": "LIVE_FRAME_UNAVAILABLE", "message": "Live frame not available. Check go2rtc and detection stream."})
 
 
 @router.get("/api/live/{camera_id}.jpg")
-async def get_live_snapshot(camera_id: str, db: Session = Depends(get_session)) -> Response:
+def get_live_snapshot(camera_id: str, db: Session = Depends(get_session)) -> Response:
     """Return a single JPEG frame for live view."""
     camera = camera_crud_service.get_camera(db, camera_id)
     if not camera:
@@ -260,6 +289,10 @@ async def get_live_snapshot(camera_id: str, db: Session = Depends(get_session))
     quality = int(getattr(getattr(config, "live", None), "mjpeg_quality", 92))
     headers = {"Cache-Control": "no-cache, no-store, must-revalidate", "Pragma": "no-cache"}
 
+    cached = live_frame_hub.latest_jpeg(f"worker:{camera_id}", quality)
+    if cached is not None:
+        return Response(content=cached, media_type="image/jpeg", headers=headers)
+
     frame = _get_latest_worker_frame(camera_id)
     if frame is not None:
         ok, buffer = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
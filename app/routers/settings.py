@@ -12,7 +12,7 @@ router = APIRouter()
 
 
 @router.get("/api/settings")
-async def get_settings() -> Dict[str, Any]:
+def get_settings() -> Dict[str, Any]:
     try:
         return settings_service.get_settings()
     except Exception as e:
@@ -21,7 +21,7 @@ async def get_settings() -> Dict[str, Any]:
 
 
 @router.get("/api/settings/defaults")
-async def get_default_settings() -> Dict[str, Any]:
+def get_default_settings() -> Dict[str, Any]:
     try:
         defaults = settings_service.get_default_config()
         return settings_service._mask_secrets(defaults)
@@ -31,7 +31,7 @@ async def get_default_settings() -> Dict[str, Any]:
 
 
 @router.post("/api/settings/reset")
-async def reset_settings() -> Dict[str, Any]:
+def reset_settings() -> Dict[str, Any]:
     try:
         defaults = settings_service.get_default_config()
         settings_service.save_config(AppConfig(**defaults))
@@ -43,7 +43,7 @@ async def reset_settings() -> Dict[str, Any]:
 
 
 @router.put("/api/settings")
-async def update_settings(partial_data: Dict[str, Any]) -> Dict[str, Any]:
+def update_settings(partial_data: Dict[str, Any]) -> Dict[str, Any]:
     try:
         updated_settings = settings_service.update_settings(partial_data)
         if "mqtt" in partial_data:
@@ -60,7 +60,7 @@ async def update_settings(partial_data: Dict[str, Any]) -> Dict[str, Any]:
 
 
 @router.get("/api/mqtt/status")
-async def get_mqtt_status() -> Dict[str, Any]:
+def get_mqtt_status() -> Dict[str, Any]:
     try:
         return mqtt_service.get_monitoring_status()
     except Exception as e:
@@ -1,8 +1,8 @@
+import asyncio
 import logging
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
-import psutil
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
@@ -16,12 +16,16 @@ from app.dependencies import (
     logs_service,
     media_service,
     settings_service,
+    system_stats,
     telegram_service,
+    websocket_manager,
 )
 from app.services.ai_probe import test_openai_connection
+from app.services.inference_scheduler import get_inference_scheduler
+from app.services.perf_profile import get_perf_tuner
+from app.services.quantization import get_quantization_service
 from app.services.time_utils import get_detection_source
-from app.services.video_analyzer import analyze_video as run_video_analysis
-from app.utils.paths import DATA_DIR
+from app.services.video_analyzer import analyze_video as run_video_analysis, analyze_videos
 from app.version import __version__
 
 logger = logging.getLogger(__name__)
@@ -45,6 +49,9 @@ def get_worker_info() -> Dict[str, Any]:
 class VideoAnalyzeRequest(BaseModel):
     event_id: Optional[str] = None
     path: Optional[str] = None
+    event_ids: Optional[List[str]] = None
+    paths: Optional[List[str]] = None
+    deep: bool = False
 
 
 class AiEventTestRequest(BaseModel):
@@ -58,7 +65,7 @@ class TelegramTestRequest(BaseModel):
 
 
 @router.get("/api/logs")
-async def get_logs(lines: int = 200) -> Dict[str, Any]:
+def get_logs(lines: int = 200) -> Dict[str, Any]:
     try:
         log_lines = logs_service.get_logs(lines)
         return {"lines": log_lines, "count": len(log_lines)}
@@ -68,7 +75,7 @@ async def get_logs(lines: int = 200) -> Dict[str, Any]:
 
 
 @router.post("/api/logs/clear")
-async def clear_logs() -> Dict[str, Any]:
+def clear_logs() -> Dict[str, Any]:
     try:
         cleared = logs_service.clear_logs()
         return {"success": True, "cleared": cleared}
@@ -78,46 +85,114 @@ async def clear_logs() -> Dict[str, Any]:
 
 
 @router.get("/api/system/info")
-async def get_system_info() -> Dict[str, Any]:
+def get_system_info() -> Dict[str, Any]:
     try:
-        cpu_percent = psutil.cpu_percent(interval=1)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage("/")
-        addon_data_gb = 0.0
-        try:
-            total_bytes = sum(p.stat().st_size for p in DATA_DIR.rglob("*") if p.is_file())
-            addon_data_gb = round(total_bytes / (1024 ** 3), 2)
-        except Exception:
-            pass
+        # Latest background sample; only the very first request samples inline.
+        sample = system_stats.latest() or system_stats.sample()
+        memory = sample["memory"]
+        disk = sample["disk"]
+        data_bytes = sample["data_dir_bytes"]
         return {
-            "cpu": {"percent": round(cpu_percent, 1)},
+            "cpu": {"percent": sample["cpu_percent"]},
             "memory": {
-                "used_gb": round(memory.used / (1024 ** 3), 2),
-                "total_gb": round(memory.total / (1024 ** 3), 2),
-                "percent": round(memory.percent, 1),
+                "used_gb": round(memory["used_bytes"] / (1024 ** 3), 2),
+                "total_gb": round(memory["total_bytes"] / (1024 ** 3), 2),
+                "percent": memory["percent"],
             },
             "disk": {
-                "used_gb": round(disk.used / (1024 ** 3), 2),
-                "total_gb": round(disk.total / (1024 ** 3), 2),
-                "percent": round(disk.percent, 1),
+                "used_gb": round(disk["used_bytes"] / (1024 ** 3), 2),
+                "total_gb": round(disk["total_bytes"] / (1024 ** 3), 2),
+                "percent": disk["percent"],
             },
-            "addon_data_gb": addon_data_gb,
+            "addon_data_gb": round(data_bytes / (1024 ** 3), 2) if data_bytes is not None else 0.0,
+            "process": {
+                "cpu_percent": sample["process"]["cpu_percent"],
+                "rss_mb": round(sample["process"]["rss_bytes"] / (1024 ** 2), 1),
+                "threads": sample["process"]["threads"],
+                "busiest_threads": sample["threads"],
+            },
+            "sampled_at": sample["ts"],
             "version": __version__,
             "worker": get_worker_info(),
+            "websocket": websocket_manager.get_stats(),
         }
     except Exception as e:
         logger.error(f"Failed to get system info: {e}")
         raise HTTPException(status_code=500, detail={"error": True, "code": "INTERNAL_ERROR", "message": f"Failed to retrieve system info: {str(e)}"})
 
 
+@router.get("/api/system/perf-profile")
+def get_perf_profile() -> Dict[str, Any]:
+    """Last inference benchmark profile and whether a run is in progress."""
+    return get_perf_tuner().get_status()
+
+
+@router.post("/api/system/perf-profile", status_code=202)
+def run_perf_profile() -> Dict[str, Any]:
+    """Re-benchmark inference backends in the background (on demand)."""
+    config = settings_service.load_config()
+    model_name = config.detection.model.replace("-person", "")
+    input_size = int(max(config.detection.inference_resolution))
+    tuner = get_perf_tuner()
+    if not tuner.run_async(model_name, input_size):
+        raise HTTPException(status_code=409, detail={"error": True, "code": "PERF_TUNE_RUNNING", "message": "A benchmark is already running"})
+    return {"started": True, "model": model_name, "input_size": input_size}
+
+
+@router.get("/api/system/inference-scheduler")
+def get_inference_scheduler_stats() -> Dict[str, Any]:
+    """Global inference budget and per-camera granted FPS / deferred frames."""
+    return get_inference_scheduler().get_stats()
+
+
+class QuantizeRequest(BaseModel):
+    formats: list = ["onnx", "openvino"]
+
+
+@router.get("/api/system/quantize")
+def get_quantization_status() -> Dict[str, Any]:
+    """INT8 variant registry and the state of the last quantization run."""
+    return get_quantization_service().get_status()
+
+
+@router.post("/api/system/quantize", status_code=202)
+def run_quantization(request: QuantizeRequest) -> Dict[str, Any]:
+    """Calibrate on recorded frames and build INT8 variants in the background."""
+    formats = [fmt for fmt in request.formats if fmt in ("onnx", "openvino")]
+    if not formats:
+        raise HTTPException(status_code=400, detail={"error": True, "code": "VALIDATION_ERROR", "message": "formats must contain onnx and/or openvino"})
+    model_name = settings_service.load_config().detection.model.replace("-person", "")
+    if not get_quantization_service().run_async(model_name, formats):
+        raise HTTPException(status_code=409, detail={"error": True, "code": "QUANTIZE_RUNNING", "message": "Quantization is already running"})
+    return {"started": True, "model": model_name, "formats": formats}
+
+
+MAX_VIDEO_BATCH = 50
+
+
+def _event_video_path(event_id: str) -> Optional[str]:
+    media_path = media_service.get_media_path(event_id, "mp4")
+    if not media_path or not media_path.exists():
+        return None
+    return str(media_path)
+
+
 @router.post("/api/video/analyze")
-async def analyze_video_endpoint(request: VideoAnalyzeRequest) -> Dict[str, Any]:
+def analyze_video_endpoint(request: VideoAnalyzeRequest) -> Dict[str, Any]:
+    """
+    Validate event or file videos.
+
+    Fast mode (default) reads container metadata and samples frame pairs;
+    deep=true decodes every frame. event_ids/paths analyze a batch in
+    parallel and return {"results": [...]}.
+    """
+    if request.event_ids or request.paths:
+        return _analyze_video_batch(request)
     video_path = None
     if request.event_id:
-        media_path = media_service.get_media_path(request.event_id, "mp4")
-        if not media_path or not media_path.exists():
+        video_path = _event_video_path(request.event_id)
+        if not video_path:
             raise HTTPException(status_code=404, detail={"error": True, "code": "VIDEO_NOT_FOUND", "message": f"MP4 not found for event {request.event_id}"})
-        video_path = str(media_path)
     elif request.path:
         p = Path(request.path)
         if not p.exists() or not p.is_file():
@@ -125,12 +200,40 @@ async def analyze_video_endpoint(request: VideoAnalyzeRequest) -> Dict[str, Any]
         video_path = str(p)
     else:
         raise HTTPException(status_code=400, detail={"error": True, "code": "MISSING_PARAMS", "message": "Provide event_id or path"})
-    result = run_video_analysis(video_path)
+    result = run_video_analysis(video_path, deep=request.deep)
     if result is None:
         raise HTTPException(status_code=500, detail={"error": True, "code": "ANALYSIS_FAILED", "message": "Could not open or analyze video"})
     return result
 
 
+def _analyze_video_batch(request: VideoAnalyzeRequest) -> Dict[str, Any]:
+    items: List[Dict[str, Any]] = [{"event_id": event_id} for event_id in request.event_ids or []]
+    items += [{"path": path} for path in request.paths or []]
+    if len(items) > MAX_VIDEO_BATCH:
+        raise HTTPException(status_code=400, detail={"error": True, "code": "VALIDATION_ERROR", "message": f"At most {MAX_VIDEO_BATCH} videos per request"})
+
+    for item in items:
+        if "event_id" in item:
+            item["video_path"] = _event_video_path(item["event_id"])
+            if not item["video_path"]:
+                item["error"] = "VIDEO_NOT_FOUND"
+        elif Path(item["path"]).is_file():
+            item["video_path"] = item["path"]
+        else:
+            item["error"] = "INVALID_PATH"
+
+    results = analyze_videos([item["video_path"] for item in items if "error" not in item], deep=request.deep)
+    out = []
+    for item in items:
+        video_path = item.pop("video_path", None)
+        if "error" not in item:
+            item["result"] = results.get(video_path)
+            if item["result"] is None:
+                item["error"] = "ANALYSIS_FAILED"
+        out.append(item)
+    return {"results": out}
+
+
 @router.post("/api/ai/test")
 async def test_ai(request: Dict[str, Any]) -> Dict[str, Any]:
     try:
@@ -152,23 +255,30 @@ async def test_ai(request: Dict[str, Any]) -> Dict[str, Any]:
 @router.post("/api/ai/test-event")
 async def test_ai_event(request: AiEventTestRequest, db=Depends(get_session)) -> Dict[str, Any]:
     try:
-        config = settings_service.load_config()
+        config = await asyncio.to_thread(settings_service.load_config)
         if not config.ai.enabled:
             raise HTTPException(status_code=400, detail={"error": True, "code": "AI_DISABLED", "message": "AI is disabled"})
         if not config.ai.api_key or config.ai.api_key == "***REDACTED***":
             raise HTTPException(status_code=400, detail={"error": True, "code": "NO_API_KEY", "message": "API key is required"})
 
-        event = event_service.get_event_by_id(db=db, event_id=request.event_id)
+        event = await asyncio.to_thread(event_service.get_event_by_id, db=db, event_id=request.event_id)
         if not event:
             raise HTTPException(status_code=404, detail={"error": True, "code": "EVENT_NOT_FOUND", "message": f"Event with id {request.event_id} not found"})
 
-        camera = db.query(Camera).filter(Camera.id == event.camera_id).first()
+        camera = await asyncio.to_thread(lambda: db.query(Camera).filter(Camera.id == event.camera_id).first())
         if not camera:
             raise HTTPException(status_code=404, detail={"error": True, "code": "CAMERA_NOT_FOUND", "message": f"Camera with id {event.camera_id} not found"})
 
-        collage_path = media_service.get_media_path(event.id, "collage")
-        if not collage_path or not collage_path.exists():
-            raise HTTPException(status_code=400, detail={"error": True, "code": "COLLAGE_NOT_FOUND", "message": "Event collage not found"})
+        # Same input as the live pipeline: the AI collage, rendered in memory.
+        image_bytes = await asyncio.to_thread(
+            media_service.rebuild_collage_for_ai,
+            event.id,
+            camera.name,
+            event.timestamp,
+            event.confidence,
+        )
+        if not image_bytes:
+            raise HTTPException(status_code=400, detail={"error": True, "code": "COLLAGE_NOT_FOUND", "message": "Event media not found"})
 
         detection_source = get_detection_source(camera.detection_source.value)
         camera_payload = {
@@ -183,7 +293,7 @@ async def test_ai_event(request: AiEventTestRequest, db=Depends(get_session)) ->
             "confidence": event.confidence,
         }
         prompt = ai_service._get_prompt_for_event(event_payload, camera_payload)
-        summary = await ai_service.analyze_event(event_payload, collage_path, camera_payload)
+        summary = await ai_service.analyze_event(event_payload, None, camera_payload, image_bytes=image_bytes)
         return {
             "success": bool(summary), "event_id": event.id, "camera_id": event.camera_id,
             "camera_type": camera_payload["type"], "detection_source": detection_source,
@@ -202,7 +312,7 @@ async def test_telegram(request: TelegramTestRequest, db=Depends(get_session)) -
         bot_token = request.bot_token
         chat_ids = request.chat_ids
         if not bot_token or bot_token == "***REDACTED***":
-            config = settings_service.load_config()
+            config = await asyncio.to_thread(settings_service.load_config)
             bot_token = config.telegram.bot_token
         if not bot_token or bot_token == "***REDACTED***":
             raise HTTPException(status_code=400, detail={"error": True, "code": "VALIDATION_ERROR", "message": "bot_token is required"})
@@ -210,15 +320,19 @@ async def test_telegram(request: TelegramTestRequest, db=Depends(get_session)) -
             raise HTTPException(status_code=400, detail={"error": True, "code": "VALIDATION_ERROR", "message": "chat_ids is required"})
 
         from app.db.models import Event
-        event = None
-        if request.event_id:
-            event = event_service.get_event_by_id(db=db, event_id=request.event_id)
-        if not event:
-            event = db.query(Event).order_by(Event.timestamp.desc()).first()
 
+        def _load_test_event():
+            event = None
+            if request.event_id:
+                event = event_service.get_event_by_id(db=db, event_id=request.event_id)
+            if not event:
+                event = db.query(Event).order_by(Event.timestamp.desc()).first()
+            camera = db.query(Camera).filter(Camera.id == event.camera_id).first() if event else None
+            return event, camera
+
+        event, camera = await asyncio.to_thread(_load_test_event)
         if event:
             camera_name = "Test Camera"
-            camera = db.query(Camera).filter(Camera.id == event.camera_id).first()
             if camera and camera.name:
                 camera_name = camera.name
             message = f"🧪 Telegram test\n📹 {camera_name}"
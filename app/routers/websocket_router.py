@@ -18,7 +18,7 @@ async def websocket_endpoint(websocket: WebSocket):
                 data = await websocket.receive_text()
                 logger.debug(f"Received WebSocket message: {data}")
                 if data == "ping":
-                    await websocket.send_text("pong")
+                    websocket_manager.reply(websocket, "pong")
             except WebSocketDisconnect:
                 logger.info("WebSocket client disconnected")
                 break
@@ -3,18 +3,41 @@ AI service for Thermal Dual Vision.
 
 Handles OpenAI Vision API integration for event analysis.
 """
+import asyncio
 import base64
+import hashlib
 import logging
+import os
 import re
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, Optional
-from openai import AsyncOpenAI
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import cv2
+import numpy as np
 
 from app.services.settings import get_settings_service
 
 
 logger = logging.getLogger(__name__)
 
+# The openai package is imported on first client creation (it adds several
+# hundred ms to API startup); tests may patch this name with a fake class.
+AsyncOpenAI = None
+
+# Vision models rescale images to fit 2048px and then to a 768px short side
+# before tiling; anything larger is wasted upload and encode time.
+AI_MAX_INPUT_LONG_SIDE = 2048
+AI_MAX_INPUT_SHORT_SIDE = 768
+AI_INPUT_JPEG_QUALITY = 85
+# Concurrent OpenAI requests across all cameras.
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "2"))
+AI_SLOT_POLL_SECONDS = 0.05
+AI_RESULT_CACHE_SIZE = 128
+AI_RESULT_CACHE_TTL_SECONDS = 3600.0
+
 
 # Prompt templates
 def _build_thermal_prompt(confidence: float = 1.0) -> str:
@@ -148,22 +171,120 @@ class AIService:
     def __init__(self):
         """Initialize AI service."""
         self.settings_service = get_settings_service()
+        # Callers run on different event loops (asyncio.run per event in
+        # threading mode), so the concurrency cap is a thread semaphore.
+        self._semaphore = threading.BoundedSemaphore(max(1, AI_MAX_CONCURRENCY))
+        self._cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._client_factory: Optional[Callable[[str], Any]] = None
+        self.stats = {"requests": 0, "cache_hits": 0, "failures": 0}
         logger.info("AIService initialized")
+
+    def set_client_factory(self, factory: Optional[Callable[[str], Any]]) -> None:
+        """
+        Override how the OpenAI client is built (tests and local benchmarks).
+        
+        Args:
+            factory: Callable taking the API key and returning an object with
+                an async ``chat.completions.create`` and ``close``; None restores
+                the default AsyncOpenAI client (which honours OPENAI_BASE_URL).
+        """
+        self._client_factory = factory
+
+    def _create_client(self, api_key: str) -> Any:
+        if self._client_factory is not None:
+            return self._client_factory(api_key)
+        client_class = AsyncOpenAI
+        if client_class is None:
+            from openai import AsyncOpenAI as client_class
+        return client_class(api_key=api_key)
+
+    def clear_cache(self) -> None:
+        """Drop all cached analysis results."""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            stored_at, summary = entry
+            if time.monotonic() - stored_at > AI_RESULT_CACHE_TTL_SECONDS:
+                self._cache.pop(key, None)
+                return None
+            self._cache.move_to_end(key)
+            return summary
+
+    def _cache_put(self, key: str, summary: str) -> None:
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), summary)
+            self._cache.move_to_end(key)
+            while len(self._cache) > AI_RESULT_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    @staticmethod
+    def _fit_model_input(image_bytes: bytes) -> bytes:
+        """
+        Downscale an encoded image to the model's effective input size.
+        
+        Returns the original bytes when no resize is needed or decoding fails.
+        """
+        try:
+            image = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), cv2.IMREAD_COLOR)
+        except Exception:
+            return image_bytes
+        if image is None:
+            return image_bytes
+        height, width = image.shape[:2]
+        scale = min(
+            1.0,
+            AI_MAX_INPUT_LONG_SIDE / float(max(width, height)),
+            AI_MAX_INPUT_SHORT_SIDE / float(max(1, min(width, height))),
+        )
+        if scale >= 1.0:
+            return image_bytes
+        size = (max(1, int(width * scale)), max(1, int(height * scale)))
+        resized = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        ok, encoded = cv2.imencode(".jpg", resized, [cv2.IMWRITE_JPEG_QUALITY, AI_INPUT_JPEG_QUALITY])
+        if not ok:
+            return image_bytes
+        logger.debug("AI input downscaled %dx%d -> %dx%d", width, height, size[0], size[1])
+        return encoded.tobytes()
+
+    async def _acquire_slot(self, timeout: float) -> bool:
+        """
+        Wait up to timeout for a request slot.
+
+        Only non-blocking acquires are used, with the wait in asyncio.sleep:
+        a cancelled caller can never end up holding a slot it will not
+        release (a blocking acquire in a worker thread would still succeed
+        after the await was cancelled).
+        """
+        deadline = time.monotonic() + timeout
+        while not self._semaphore.acquire(blocking=False):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            await asyncio.sleep(min(AI_SLOT_POLL_SECONDS, remaining))
+        return True
     
     async def analyze_event(
         self,
         event: Dict[str, Any],
-        collage_path: Path,
+        collage_path: Optional[Path] = None,
         camera: Optional[Dict[str, Any]] = None,
         confidence: Optional[float] = None,
+        image_bytes: Optional[bytes] = None,
     ) -> Optional[str]:
         """
         Analyze event using OpenAI Vision API.
         
         Args:
             event: Event data (id, camera_id, timestamp, confidence)
-            collage_path: Path to collage image
+            collage_path: Path to collage image (used when image_bytes is None)
             camera: Camera data (optional, for prompt override)
+            image_bytes: Encoded collage straight from the media worker
             
         Returns:
             AI summary text or None if disabled/failed
@@ -188,49 +309,73 @@ class AIService:
             # Get prompt
             prompt = self._get_prompt_for_event(event, camera, confidence=conf)
             
-            # Load and encode image
-            image_base64 = self._encode_image(collage_path)
-            if not image_base64:
+            # Use in-memory collage when available, else read it once from disk
+            if image_bytes is None:
+                image_bytes = self._read_image(collage_path)
+            if not image_bytes:
                 logger.error("Failed to encode image")
                 return None
+            image_bytes = self._fit_model_input(image_bytes)
+
+            cache_key = hashlib.sha256(
+                b"\0".join((
+                    image_bytes,
+                    prompt.encode("utf-8"),
+                    str(config.ai.model).encode("utf-8"),
+                ))
+            ).hexdigest()
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                logger.info(f"AI analysis cache hit for event {event.get('id', 'unknown')}")
+                return cached
+            image_base64 = base64.b64encode(image_bytes).decode("utf-8")
             
-            # Call OpenAI API
-            logger.info(f"Calling OpenAI API for event {event.get('id', 'unknown')}")
-            
-            client = AsyncOpenAI(api_key=config.ai.api_key)
+            timeout = float(config.ai.timeout) if config.ai.timeout is not None else 30.0
+            if not await self._acquire_slot(timeout):
+                logger.warning("AI analysis skipped: no free request slot within %.0fs", timeout)
+                return None
             try:
-                response = await client.chat.completions.create(
-                    model=config.ai.model,
-                    messages=[
-                        {
-                            "role": "system",
-                            "content": (
-                                "Sadece verilen çıktı formatına uy. "
-                                "Kısa ve tek cümle yaz. Kişi sayısı üretme."
-                            )
-                        },
-                        {
-                            "role": "user",
-                            "content": [
-                                {
-                                    "type": "text",
-                                    "text": prompt
-                                },
-                                {
-                                    "type": "image_url",
-                                    "image_url": {
-                                        "url": f"data:image/jpeg;base64,{image_base64}"
+                # Call OpenAI API
+                logger.info(f"Calling OpenAI API for event {event.get('id', 'unknown')}")
+                self.stats["requests"] += 1
+                
+                client = self._create_client(config.ai.api_key)
+                try:
+                    response = await client.chat.completions.create(
+                        model=config.ai.model,
+                        messages=[
+                            {
+                                "role": "system",
+                                "content": (
+                                    "Sadece verilen çıktı formatına uy. "
+                                    "Kısa ve tek cümle yaz. Kişi sayısı üretme."
+                                )
+                            },
+                            {
+                                "role": "user",
+                                "content": [
+                                    {
+                                        "type": "text",
+                                        "text": prompt
+                                    },
+                                    {
+                                        "type": "image_url",
+                                        "image_url": {
+                                            "url": f"data:image/jpeg;base64,{image_base64}"
+                                        }
                                     }
-                                }
-                            ]
-                        }
-                    ],
-                    max_tokens=config.ai.max_tokens,
-                    temperature=config.ai.temperature if config.ai.temperature is not None else 0.3,
-                    timeout=float(config.ai.timeout) if config.ai.timeout is not None else 30.0,
-                )
+                                ]
+                            }
+                        ],
+                        max_tokens=config.ai.max_tokens,
+                        temperature=config.ai.temperature if config.ai.temperature is not None else 0.3,
+                        timeout=timeout,
+                    )
+                finally:
+                    await client.close()
             finally:
-                await client.close()
+                self._semaphore.release()
             
             # Extract summary
             summary = response.choices[0].message.content.strip()
@@ -238,10 +383,13 @@ class AIService:
             if re.search(r"\b(\d+|x)\s*ki(?:s|ş)i\s+tespit\s+edildi\b", summary, flags=re.IGNORECASE):
                 summary = "Kamerada insan tespit edildi."
             logger.info(f"AI analysis complete: {len(summary)} chars")
+            if summary:
+                self._cache_put(cache_key, summary)
             
             return summary
             
         except Exception as e:
+            self.stats["failures"] += 1
             logger.error(f"AI analysis failed: {e}")
             return None
     
@@ -303,28 +451,42 @@ class AIService:
         return base_prompt
 
     
-    def _encode_image(self, image_path) -> Optional[str]:
+    def _read_image(self, image_path) -> Optional[bytes]:
         """
-        Encode image to base64.
+        Read image bytes from disk.
         
         Args:
             image_path: Path or str to image file
             
         Returns:
-            Base64 encoded image or None if failed
+            Raw image bytes or None if missing/unreadable
         """
+        if image_path is None:
+            return None
         try:
             path = Path(image_path) if not isinstance(image_path, Path) else image_path
             if not path.exists():
                 logger.error(f"Image not found: {path}")
                 return None
-            
-            with open(path, "rb") as image_file:
-                return base64.b64encode(image_file.read()).decode('utf-8')
-                
+            return path.read_bytes()
         except Exception as e:
-            logger.error(f"Failed to encode image: {e}")
+            logger.error(f"Failed to read image: {e}")
+            return None
+
+    def _encode_image(self, image_path) -> Optional[str]:
+        """
+        Encode image to base64.
+        
+        Args:
+            image_path: Path or str to image file
+            
+        Returns:
+            Base64 encoded image or None if failed
+        """
+        data = self._read_image(image_path)
+        if data is None:
             return None
+        return base64.b64encode(data).decode('utf-8')
     
     def is_enabled(self) -> bool:
         """
@@ -4,7 +4,6 @@ AI test service for Thermal Dual Vision.
 Handles OpenAI connection testing.
 """
 import logging
-from openai import AsyncOpenAI
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +20,8 @@ async def test_openai_connection(api_key: str, model: str = "gpt-4o") -> dict:
         Dict with success status and message
     """
     try:
+        from openai import AsyncOpenAI
+
         client = AsyncOpenAI(api_key=api_key)
         
         try:
@@ -4,10 +4,12 @@ Camera CRUD service for Thermal Dual Vision.
 Handles camera database operations (Create, Read, Update, Delete).
 """
 import logging
+from datetime import datetime
 from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
 
 from app.db.models import Camera, CameraType, CameraStatus, DetectionSource
+from app.services.event_index import get_event_index
 
 
 logger = logging.getLogger(__name__)
@@ -216,6 +218,7 @@ class CameraCRUDService:
             
             db.delete(camera)
             db.commit()
+            get_event_index().forget(camera_id)
             
             logger.info(f"Camera deleted: {camera_id}")
             return True
@@ -225,6 +228,35 @@ class CameraCRUDService:
             logger.error(f"Failed to delete camera {camera_id}: {e}")
             raise
     
+    def set_status(
+        self,
+        db: Session,
+        camera_id: str,
+        status: CameraStatus,
+        last_frame_ts: Optional[datetime] = None,
+    ) -> bool:
+        """
+        Set camera connection status without committing.
+        
+        Meant to run as a DB writer job; the writer commits the batch.
+        
+        Args:
+            db: Database session
+            camera_id: Camera ID
+            status: New connection status
+            last_frame_ts: Last frame time (optional, unchanged if None)
+            
+        Returns:
+            True if updated, False if not found
+        """
+        camera = db.query(Camera).filter(Camera.id == camera_id).first()
+        if not camera:
+            return False
+        camera.status = status
+        if last_frame_ts is not None:
+            camera.last_frame_ts = last_frame_ts
+        return True
+    
     def mask_rtsp_urls(self, camera: Camera) -> Dict[str, Any]:
         """
         Convert camera to dict with RTSP URLs.
@@ -0,0 +1,489 @@
+"""
+Selector-based multiplexer for ffmpeg capture pipes.
+
+Each ffmpeg rawvideo capture used to need a thread blocked in
+``stdout.read(frame_size)`` (allocating a new bytes object per frame) and a
+second thread reading stderr lines. The multiplexer watches every
+registered stdout/stderr pipe from one thread with ``selectors``, reads
+stdout non-blocking straight into preallocated frame slots, and splits
+stderr into lines for a callback.
+
+Each pipe has two slots: ffmpeg fills one while the other holds the newest
+complete frame. Readers get a copy of the newest frame (latest frame wins),
+so a slow reader never backs up ffmpeg and frames it skips cost no
+allocation.
+
+Since the pipes never block, the per-camera read loops do not need a thread
+each either: ReaderPool runs their steps (read the newest frame, handle
+reconnects, feed the buffers) on a fixed set of worker threads. Only
+captures whose reads block in native code (OpenCV) keep a thread of their
+own. Opening, probing and stopping a capture can block for seconds, so
+steps hand that work to the pool's separate blocking executor and poll
+the returned future.
+"""
+import heapq
+import itertools
+import logging
+import os
+import selectors
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Reads per readiness event before moving on to other pipes.
+MAX_READS_PER_EVENT = 8
+STDERR_CHUNK = 4096
+MAX_STDERR_LINE = 4096
+# Shared threads running the camera reader steps.
+READER_POOL_WORKERS = 4
+# Threads for capture opens, probes and stops submitted by reader steps.
+READER_BLOCKING_WORKERS = 8
+
+StderrCallback = Callable[[str], None]
+# A reader step returns the delay before its next run, or None when done.
+ReaderStep = Callable[[], Optional[float]]
+
+
+class MuxedPipe:
+    """Frames from one registered ffmpeg stdout (plus its stderr lines)."""
+
+    def __init__(self, name: str, frame_shape: Tuple[int, int], on_stderr_line: Optional[StderrCallback] = None):
+        height, width = int(frame_shape[0]), int(frame_shape[1])
+        self.name = name
+        self.frame_shape = (height, width, 3)
+        self.frame_bytes = height * width * 3
+        self.on_stderr_line = on_stderr_line
+        self._slots = [np.empty(self.frame_shape, dtype=np.uint8) for _ in range(2)]
+        self._views = [memoryview(slot.reshape(-1)) for slot in self._slots]
+        self._write = 0
+        self._filled = 0
+        self._ready: Optional[int] = None
+        self._ready_ts = 0.0
+        self._seq = 0
+        self._consumer_seq = 0
+        self._stderr_tail = b""
+        self._cond = threading.Condition()
+        self.closed = False
+        self.frames = 0
+        self.bytes_read = 0
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+
+    def read(self, after_seq: int, timeout: float) -> Tuple[int, Optional[np.ndarray]]:
+        """Copy of the newest frame newer than after_seq, as (seq, frame or None)."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._seq <= after_seq and not self.closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return after_seq, None
+                self._cond.wait(remaining)
+            if self._seq <= after_seq or self._ready is None:
+                return after_seq, None
+            return self._seq, self._slots[self._ready].copy()
+
+    def next_frame(self, timeout: float) -> Optional[np.ndarray]:
+        """Single-consumer read: the newest frame not returned before."""
+        self._consumer_seq, frame = self.read(self._consumer_seq, timeout)
+        return frame
+
+    def latest(self, max_age: float) -> Optional[np.ndarray]:
+        with self._cond:
+            if self._ready is None or time.time() - self._ready_ts > max_age:
+                return None
+            return self._slots[self._ready].copy()
+
+    def last_frame_age(self) -> Optional[float]:
+        with self._cond:
+            return time.time() - self._ready_ts if self._ready_ts else None
+
+    def wait_closed(self, timeout: Optional[float] = None) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: self.closed, timeout)
+
+    # ------------------------------------------------------------------
+    # Multiplexer side (runs on the mux thread)
+    # ------------------------------------------------------------------
+
+    def _on_stdout(self, fd: int) -> bool:
+        """Read what is available; returns False at EOF."""
+        for _ in range(MAX_READS_PER_EVENT):
+            view = self._views[self._write][self._filled:]
+            try:
+                count = os.readv(fd, [view])
+            except BlockingIOError:
+                return True
+            except OSError:
+                return False
+            if count == 0:
+                return False
+            self.bytes_read += count
+            self._filled += count
+            if self._filled == self.frame_bytes:
+                self._publish()
+        return True
+
+    def _publish(self) -> None:
+        with self._cond:
+            self._ready = self._write
+            self._write = 1 - self._write
+            self._ready_ts = time.time()
+            self._seq += 1
+            self.frames += 1
+            self._cond.notify_all()
+        self._filled = 0
+
+    def _on_stderr(self, fd: int) -> bool:
+        try:
+            chunk = os.read(fd, STDERR_CHUNK)
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+        if not chunk:
+            self._emit_stderr(self._stderr_tail)
+            self._stderr_tail = b""
+            return False
+        lines = (self._stderr_tail + chunk).split(b"\n")
+        self._stderr_tail = lines.pop()[-MAX_STDERR_LINE:]
+        for line in lines:
+            self._emit_stderr(line)
+        return True
+
+    def _emit_stderr(self, raw: bytes) -> None:
+        text = raw.decode(errors="ignore").strip()
+        if text and self.on_stderr_line is not None:
+            try:
+                self.on_stderr_line(text)
+            except Exception:
+                pass
+
+    def _close(self) -> None:
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class CaptureMultiplexer:
+    """One thread serving the stdout/stderr pipes of every ffmpeg capture."""
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._pending: List[Callable[[], None]] = []
+        self._pipes: Dict[int, MuxedPipe] = {}
+        self._streams: Dict[int, List[Tuple[int, Any]]] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+
+    def register(
+        self,
+        stdout,
+        frame_shape: Tuple[int, int],
+        stderr=None,
+        on_stderr_line: Optional[StderrCallback] = None,
+        name: str = "",
+    ) -> MuxedPipe:
+        """
+        Start serving a process's pipes.
+
+        stdout/stderr are file objects (e.g. Popen.stdout); frame_shape is
+        (height, width) of the bgr24 frames on stdout. The multiplexer owns
+        them from here on: unregister closes them.
+        """
+        pipe = MuxedPipe(name, frame_shape, on_stderr_line)
+        streams = []
+        for stream, kind in ((stdout, "stdout"), (stderr, "stderr")):
+            if stream is None:
+                continue
+            fd = stream.fileno()
+            os.set_blocking(fd, False)
+            streams.append((fd, stream, kind))
+
+        def _add() -> None:
+            try:
+                for fd, _stream, kind in streams:
+                    self._selector.register(fd, selectors.EVENT_READ, (pipe, kind))
+            except (OSError, ValueError, KeyError) as exc:
+                # Readers would otherwise wait on a pipe nobody reads.
+                logger.warning("Capture multiplexer cannot watch %s: %s", pipe.name or "pipe", exc)
+                for fd, _stream, _kind in streams:
+                    try:
+                        self._selector.unregister(fd)
+                    except (KeyError, ValueError):
+                        pass
+                pipe._close()
+
+        with self._lock:
+            self._pipes[id(pipe)] = pipe
+            self._streams[id(pipe)] = [(fd, stream) for fd, stream, _kind in streams]
+        self._submit(_add)
+        self._ensure_thread()
+        return pipe
+
+    def unregister(self, pipe: Optional[MuxedPipe]) -> None:
+        """
+        Stop serving a pipe and close its stdout/stderr.
+
+        The files are closed on the mux thread right after they leave the
+        selector, so a descriptor is never closed (and possibly reused)
+        while still registered. Waits up to 2s for that to happen.
+        """
+        if pipe is None:
+            return
+        with self._lock:
+            streams = self._streams.pop(id(pipe), [])
+            self._pipes.pop(id(pipe), None)
+        if not streams:
+            return
+        done = threading.Event()
+
+        def _remove() -> None:
+            for fd, stream in streams:
+                try:
+                    self._selector.unregister(fd)
+                except (KeyError, ValueError):
+                    pass
+                try:
+                    stream.close()
+                except OSError:
+                    pass
+            pipe._close()
+            done.set()
+
+        self._submit(_remove)
+        if threading.current_thread() is not self._thread:
+            done.wait(timeout=2.0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pipes = list(self._pipes.values())
+        return {
+            "pipes": len(pipes),
+            "thread_alive": bool(self._thread and self._thread.is_alive()),
+            "frames": {pipe.name: pipe.frames for pipe in pipes},
+        }
+
+    # ------------------------------------------------------------------
+    # Mux thread
+    # ------------------------------------------------------------------
+
+    def _submit(self, action: Callable[[], None]) -> None:
+        with self._lock:
+            self._pending.append(action)
+        try:
+            os.write(self._wake_w, b"\0")
+        except BlockingIOError:
+            pass
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, daemon=True, name="capture-mux")
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                events = self._selector.select(timeout=1.0)
+            except Exception as exc:
+                logger.error("Capture multiplexer select failed: %s", exc)
+                time.sleep(0.5)
+                continue
+            for key, _mask in events:
+                if key.data is None:
+                    self._drain_wake()
+                    continue
+                pipe, kind = key.data
+                alive = pipe._on_stdout(key.fd) if kind == "stdout" else pipe._on_stderr(key.fd)
+                if not alive:
+                    self._selector.unregister(key.fd)
+                    if kind == "stdout":
+                        pipe._close()
+            self._run_pending()
+
+    def _drain_wake(self) -> None:
+        try:
+            while os.read(self._wake_r, 512):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _run_pending(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for action in pending:
+            try:
+                action()
+            except Exception as exc:
+                logger.warning("Capture multiplexer action failed: %s", exc)
+
+
+class ReaderTask:
+    """A reader step scheduled on a ReaderPool."""
+
+    def __init__(self, name: str, step: ReaderStep):
+        self.name = name
+        self.step = step
+        self.runs = 0
+        self._running = False
+        self._cancelled = False
+        self._done = threading.Event()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+
+class ReaderPool:
+    """
+    Runs reader steps on a fixed number of threads.
+
+    A task is in the schedule or on one worker, never both, so its step
+    never runs concurrently with itself. Steps must not block: work that
+    may (opening or stopping a capture, ffprobe) goes through submit().
+    """
+
+    def __init__(self, workers: int = READER_POOL_WORKERS, blocking_workers: int = READER_BLOCKING_WORKERS):
+        self.workers = max(1, int(workers))
+        self._blocking = ThreadPoolExecutor(
+            max_workers=max(1, int(blocking_workers)),
+            thread_name_prefix="capture-open",
+        )
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[float, int, ReaderTask]] = []
+        self._order = itertools.count()
+        self._threads: List[threading.Thread] = []
+        self._tasks: Dict[int, ReaderTask] = {}
+
+    def add(self, name: str, step: ReaderStep, delay: float = 0.0) -> ReaderTask:
+        """Schedule step to run after delay seconds."""
+        task = ReaderTask(name, step)
+        with self._cond:
+            self._tasks[id(task)] = task
+            self._push(task, delay)
+            self._ensure_threads()
+        return task
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Run blocking capture work off the reader threads; the step polls the future."""
+        return self._blocking.submit(fn, *args)
+
+    def cancel(self, task: Optional[ReaderTask], timeout: Optional[float] = None) -> bool:
+        """Stop scheduling task; waits for a step in progress. Returns False on timeout."""
+        if task is None:
+            return True
+        with self._cond:
+            task._cancelled = True
+            if not task._running:
+                self._finish(task)
+        return task.wait(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            tasks = list(self._tasks.values())
+            alive = sum(1 for thread in self._threads if thread.is_alive())
+        return {
+            "workers": alive,
+            "tasks": len(tasks),
+            "runs": {task.name: task.runs for task in tasks},
+        }
+
+    def _push(self, task: ReaderTask, delay: float) -> None:
+        heapq.heappush(self._heap, (time.monotonic() + max(0.0, delay), next(self._order), task))
+        self._cond.notify()
+
+    def _finish(self, task: ReaderTask) -> None:
+        self._tasks.pop(id(task), None)
+        task._done.set()
+
+    def _ensure_threads(self) -> None:
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(
+                target=self._run,
+                daemon=True,
+                name=f"capture-reader-{len(self._threads)}",
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _next_task(self) -> ReaderTask:
+        with self._cond:
+            while True:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                due, _order, task = self._heap[0]
+                if task.done:
+                    heapq.heappop(self._heap)
+                    continue
+                remaining = due - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                heapq.heappop(self._heap)
+                task._running = True
+                return task
+
+    def _run(self) -> None:
+        while True:
+            task = self._next_task()
+            try:
+                delay = task.step()
+            except Exception as exc:
+                logger.error("Reader step %s failed: %s", task.name, exc)
+                delay = 0.5
+            with self._cond:
+                task._running = False
+                task.runs += 1
+                if delay is None or task._cancelled:
+                    self._finish(task)
+                else:
+                    self._push(task, delay)
+
+
+# Global singleton instances
+_capture_mux: Optional[CaptureMultiplexer] = None
+_reader_pool: Optional[ReaderPool] = None
+
+
+def get_capture_mux() -> CaptureMultiplexer:
+    """
+    Get or create the global capture multiplexer.
+
+    Returns:
+        CaptureMultiplexer: Global multiplexer instance
+    """
+    global _capture_mux
+    if _capture_mux is None:
+        _capture_mux = CaptureMultiplexer()
+    return _capture_mux
+
+
+def get_reader_pool() -> ReaderPool:
+    """
+    Get or create the global reader pool.
+
+    Returns:
+        ReaderPool: Global pool instance
+    """
+    global _reader_pool
+    if _reader_pool is None:
+        _reader_pool = ReaderPool()
+    return _reader_pool
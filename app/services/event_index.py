@@ -0,0 +1,210 @@
+"""
+In-memory index of the last event per camera.
+
+Event cooldown used to be enforced by querying the newest Event row of the
+camera before every insert, and each detection thread ran the same query at
+start to survive restarts. Under a write burst those reads queued behind
+SQLite before a notification could go out.
+
+EventIndex keeps last event time and id per camera in process memory. It is
+loaded once with a single grouped query, reserves the cooldown slot before
+an insert and records the event after it. In multiprocessing mode the last
+event times are mirrored into a small shared-memory table (one float64 slot
+per camera) that the camera processes read for their own cooldown gate.
+"""
+import logging
+import multiprocessing as mp
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.db.models import Event
+from app.db.session import session_scope
+
+
+logger = logging.getLogger(__name__)
+
+# Camera slots in the shared table; one float64 each.
+SHARED_SLOTS = 256
+
+
+def _epoch(timestamp: datetime) -> float:
+    """Naive UTC datetime (as stored in events) to epoch seconds."""
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.timestamp()
+
+
+def read_shared_last_event(table: Any, slot: int) -> float:
+    """Last event time of a camera process's slot (0.0 when unknown)."""
+    if table is None or slot < 0:
+        return 0.0
+    try:
+        return float(table[slot])
+    except Exception:
+        return 0.0
+
+
+class EventIndex:
+    """Last event time, last event id and cooldown state per camera."""
+
+    def __init__(self, shared_slots: int = SHARED_SLOTS):
+        self.shared_slots = shared_slots
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._loaded = False
+        self._shared: Optional[Any] = None
+        self._slots: Dict[str, int] = {}
+
+    def load(self, db: Optional[Session] = None) -> int:
+        """
+        Load the newest event of every camera with one grouped query.
+
+        Entries recorded since the process started are kept when they are
+        newer than what the database returns.
+
+        Returns:
+            Number of cameras with a known last event
+        """
+        # SQLite returns the bare columns from the row holding MAX().
+        query = select(Event.camera_id, Event.id, func.max(Event.timestamp)).group_by(Event.camera_id)
+        if db is None:
+            with session_scope() as session:
+                rows = session.execute(query).all()
+        else:
+            rows = db.execute(query).all()
+
+        with self._lock:
+            for camera_id, event_id, timestamp in rows:
+                if timestamp is None:
+                    continue
+                epoch = _epoch(timestamp)
+                if epoch > self._entries.get(camera_id, (0.0, None))[0]:
+                    self._set(camera_id, epoch, event_id)
+            self._loaded = True
+            count = len(self._entries)
+        logger.info("Event index loaded: %d cameras", count)
+        return count
+
+    def ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        try:
+            self.load()
+        except Exception as e:
+            logger.warning("Event index load failed, cooldown starts empty: %s", e)
+            self._loaded = True
+
+    def last_event(self, camera_id: str) -> Optional[Tuple[float, Optional[str]]]:
+        """(epoch seconds, event id) of the camera's last event, or None."""
+        self.ensure_loaded()
+        with self._lock:
+            return self._entries.get(camera_id)
+
+    def last_event_time(self, camera_id: str) -> float:
+        """Epoch seconds of the camera's last event (0.0 when unknown)."""
+        entry = self.last_event(camera_id)
+        return entry[0] if entry else 0.0
+
+    def cooldown_remaining(self, camera_id: str, cooldown_seconds: float, now: Optional[float] = None) -> float:
+        """Seconds until the camera may create another event."""
+        if cooldown_seconds <= 0:
+            return 0.0
+        now = time.time() if now is None else now
+        return max(0.0, cooldown_seconds - (now - self.last_event_time(camera_id)))
+
+    def reserve(
+        self,
+        camera_id: str,
+        cooldown_seconds: float,
+        now: Optional[float] = None,
+    ) -> Optional[Tuple[float, Optional[str]]]:
+        """
+        Claim the cooldown window for a new event.
+
+        Check and claim are atomic, so two threads cannot both pass the
+        cooldown for the same camera. Pass the returned token to release()
+        if the insert fails.
+
+        Returns:
+            Release token, or None when the camera is still cooling down
+        """
+        self.ensure_loaded()
+        now = time.time() if now is None else now
+        with self._lock:
+            previous = self._entries.get(camera_id, (0.0, None))
+            if cooldown_seconds > 0 and now - previous[0] < cooldown_seconds:
+                return None
+            self._set(camera_id, now, previous[1])
+            return previous
+
+    def release(self, camera_id: str, token: Tuple[float, Optional[str]]) -> None:
+        """Undo a reservation whose event was not created."""
+        with self._lock:
+            self._set(camera_id, token[0], token[1])
+
+    def record(self, camera_id: str, event_id: str, timestamp: datetime) -> None:
+        """Record a created event."""
+        with self._lock:
+            current = self._entries.get(camera_id, (0.0, None))[0]
+            self._set(camera_id, max(current, _epoch(timestamp)), event_id)
+
+    def forget(self, camera_id: str) -> None:
+        """Drop a deleted camera."""
+        with self._lock:
+            self._entries.pop(camera_id, None)
+            slot = self._slots.pop(camera_id, None)
+            if slot is not None and self._shared is not None:
+                self._shared[slot] = 0.0
+
+    def shared_slot(self, camera_id: str) -> Tuple[Optional[Any], int]:
+        """
+        Shared-memory table and slot for a camera process.
+
+        Call in the parent before starting the process and pass both to it;
+        the child reads its slot with read_shared_last_event().
+
+        Returns:
+            (table, slot), or (None, -1) when all slots are taken
+        """
+        self.ensure_loaded()
+        with self._lock:
+            if self._shared is None:
+                self._shared = mp.Array("d", self.shared_slots)
+            slot = self._slots.get(camera_id)
+            if slot is None:
+                used = set(self._slots.values())
+                free = next((index for index in range(self.shared_slots) if index not in used), None)
+                if free is None:
+                    logger.warning("Event index shared table full; camera %s uses local cooldown only", camera_id)
+                    return None, -1
+                slot = self._slots[camera_id] = free
+            self._shared[slot] = self._entries.get(camera_id, (0.0, None))[0]
+            return self._shared, slot
+
+    def _set(self, camera_id: str, epoch: float, event_id: Optional[str]) -> None:
+        self._entries[camera_id] = (epoch, event_id)
+        slot = self._slots.get(camera_id)
+        if slot is not None and self._shared is not None:
+            self._shared[slot] = epoch
+
+
+# Global singleton instance
+_event_index: Optional[EventIndex] = None
+
+
+def get_event_index() -> EventIndex:
+    """
+    Get or create the global event index.
+
+    Returns:
+        EventIndex: Global index instance
+    """
+    global _event_index
+    if _event_index is None:
+        _event_index = EventIndex()
+    return _event_index
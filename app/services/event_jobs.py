@@ -0,0 +1,259 @@
+"""
+Background event deletion jobs.
+
+Bulk delete and "clear events" used to run inside the HTTP request: one ORM
+delete and one media directory walk per event, all under a single write
+transaction. Clearing a busy camera timed out the request and held the
+SQLite write lock long enough to stall detection-side inserts.
+
+EventJobService runs these as background jobs that the UI polls. Each job
+deletes in chunks with set-based DELETE ... WHERE id IN (...) statements,
+one DB writer job per chunk, and pauses between chunks so other writers
+get the lock. Media directories of each deleted chunk are removed
+concurrently on a small I/O pool.
+"""
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy import and_, delete, func, select
+
+from app.db.models import Event
+from app.db.session import session_scope
+from app.db.writer import get_db_writer
+from app.workers.retention import get_retention_worker
+
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 500
+# Gap between chunk transactions; long enough for a waiting detector insert
+# to take the write lock.
+CHUNK_PAUSE_SECONDS = 0.05
+MEDIA_WORKERS = 4
+# Finished jobs kept for polling.
+JOB_HISTORY = 20
+
+
+def _utc_now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def build_event_filters(
+    camera_id: Optional[str] = None,
+    date_filter: Optional[date] = None,
+    min_confidence: Optional[float] = None,
+) -> List[Any]:
+    """SQL filters for the events matched by a clear request."""
+    filters = []
+    if camera_id:
+        filters.append(Event.camera_id == camera_id)
+    if date_filter:
+        start_of_day = datetime.combine(date_filter, datetime.min.time())
+        end_of_day = datetime.combine(date_filter, datetime.max.time())
+        filters.append(and_(Event.timestamp >= start_of_day, Event.timestamp <= end_of_day))
+    if min_confidence is not None:
+        filters.append(Event.confidence >= float(min_confidence))
+    return filters
+
+
+class EventJobService:
+    """Runs bulk event deletions in the background, one job at a time."""
+
+    def __init__(
+        self,
+        delete_media: Optional[Callable[[str], None]] = None,
+        chunk_size: int = CHUNK_SIZE,
+        chunk_pause: float = CHUNK_PAUSE_SECONDS,
+        media_workers: int = MEDIA_WORKERS,
+    ):
+        self.delete_media = delete_media or get_retention_worker().delete_event_media
+        self.chunk_size = max(1, int(chunk_size))
+        self.chunk_pause = chunk_pause
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.media_workers = media_workers
+        self._stop = threading.Event()
+        self._runner: Optional[ThreadPoolExecutor] = None
+        self._media_pool: Optional[ThreadPoolExecutor] = None
+
+    # ------------------------------------------------------------------
+    # Submission and polling
+    # ------------------------------------------------------------------
+
+    def submit_delete(self, event_ids: Sequence[str]) -> Dict[str, Any]:
+        """Queue deletion of the given event ids."""
+        ids = list(dict.fromkeys(str(event_id) for event_id in event_ids))
+        job = self._new_job("bulk_delete", total=len(ids))
+        job["failed_ids"] = []
+        self._executor().submit(self._run, job, self._delete_ids, ids)
+        return self.get(job["job_id"])
+
+    def submit_clear(self, filters: List[Any]) -> Dict[str, Any]:
+        """Queue deletion of every event matching filters (all events if empty)."""
+        with session_scope() as db:
+            total = db.execute(select(func.count(Event.id)).where(*filters)).scalar() or 0
+        job = self._new_job("clear", total=int(total))
+        self._executor().submit(self._run, job, self._delete_matching, filters)
+        return self.get(job["job_id"])
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = dict(job)
+            if "failed_ids" in job:
+                snapshot["failed_ids"] = list(job["failed_ids"])
+            return snapshot
+
+    def shutdown(self) -> None:
+        """Stop running jobs after their current chunk."""
+        with self._lock:
+            runner, media_pool = self._runner, self._media_pool
+            self._runner = self._media_pool = None
+            self._stop.set()
+        if runner is not None:
+            runner.shutdown(wait=True, cancel_futures=True)
+        if media_pool is not None:
+            media_pool.shutdown(wait=True)
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._runner is None:
+                self._stop.clear()
+                # Jobs run one after another so two clears never compete for the lock.
+                self._runner = ThreadPoolExecutor(max_workers=1, thread_name_prefix="event-jobs")
+                self._media_pool = ThreadPoolExecutor(
+                    max_workers=self.media_workers, thread_name_prefix="event-media-delete"
+                )
+            return self._runner
+
+    def _new_job(self, kind: str, total: int) -> Dict[str, Any]:
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": "queued",
+            "total": total,
+            "deleted_count": 0,
+            "media_failed": 0,
+            "error": None,
+            "created_at": _utc_now_iso(),
+            "finished_at": None,
+        }
+        with self._lock:
+            self._jobs[job["job_id"]] = job
+            finished = [
+                job_id for job_id, existing in self._jobs.items()
+                if existing["status"] in ("completed", "failed", "cancelled")
+            ]
+            for job_id in finished[: max(0, len(finished) - JOB_HISTORY)]:
+                del self._jobs[job_id]
+        return job
+
+    def _update(self, job: Dict[str, Any], **changes: Any) -> None:
+        with self._lock:
+            job.update(changes)
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    def _run(self, job: Dict[str, Any], body: Callable[..., None], arg: Any) -> None:
+        self._update(job, status="running")
+        started = time.monotonic()
+        try:
+            body(job, arg)
+            status = "cancelled" if self._stop.is_set() else "completed"
+            self._update(job, status=status, finished_at=_utc_now_iso())
+            logger.info(
+                "Event %s job %s %s: %d deleted in %.1fs",
+                job["kind"], job["job_id"], status, job["deleted_count"], time.monotonic() - started,
+            )
+        except Exception as e:
+            logger.error("Event %s job %s failed: %s", job["kind"], job["job_id"], e)
+            self._update(job, status="failed", error=str(e), finished_at=_utc_now_iso())
+
+    def _delete_ids(self, job: Dict[str, Any], ids: List[str]) -> None:
+        for offset in range(0, len(ids), self.chunk_size):
+            if self._stop.is_set():
+                return
+            chunk = ids[offset: offset + self.chunk_size]
+            deleted = self._delete_chunk(job, chunk)
+            missing = set(chunk) - set(deleted)
+            if missing:
+                with self._lock:
+                    job["failed_ids"].extend(event_id for event_id in chunk if event_id in missing)
+            self._pause()
+
+    def _delete_matching(self, job: Dict[str, Any], filters: List[Any]) -> None:
+        def _delete(db) -> List[str]:
+            chunk = db.execute(select(Event.id).where(*filters).limit(self.chunk_size)).scalars().all()
+            if chunk:
+                db.execute(delete(Event).where(Event.id.in_(chunk)))
+            return list(chunk)
+
+        while not self._stop.is_set():
+            chunk = get_db_writer().run(_delete)
+            if not chunk:
+                return
+            self._after_chunk(job, chunk)
+            self._pause()
+
+    def _delete_chunk(self, job: Dict[str, Any], chunk: List[str]) -> List[str]:
+        """Delete one chunk of ids as one writer job; returns the ids that existed."""
+        def _delete(db) -> List[str]:
+            existing = db.execute(select(Event.id).where(Event.id.in_(chunk))).scalars().all()
+            if existing:
+                db.execute(delete(Event).where(Event.id.in_(existing)))
+            return list(existing)
+
+        existing = get_db_writer().run(_delete)
+        self._after_chunk(job, existing)
+        return existing
+
+    def _after_chunk(self, job: Dict[str, Any], deleted: List[str]) -> None:
+        # The rows are committed; media removal runs outside the transaction.
+        pool = self._media_pool
+        results = pool.map(self._remove_media, deleted) if pool is not None else map(self._remove_media, deleted)
+        media_failed = 0
+        for ok in results:
+            if not ok:
+                media_failed += 1
+        with self._lock:
+            job["deleted_count"] += len(deleted)
+            job["media_failed"] += media_failed
+
+    def _remove_media(self, event_id: str) -> bool:
+        try:
+            self.delete_media(event_id)
+            return True
+        except Exception as e:
+            logger.error("Failed to delete media for event %s: %s", event_id, e)
+            return False
+
+    def _pause(self) -> None:
+        if self.chunk_pause > 0:
+            self._stop.wait(self.chunk_pause)
+
+
+# Global singleton instance
+_event_job_service: Optional[EventJobService] = None
+
+
+def get_event_job_service() -> EventJobService:
+    """
+    Get or create the global event job service.
+
+    Returns:
+        EventJobService: Global job service instance
+    """
+    global _event_job_service
+    if _event_job_service is None:
+        _event_job_service = EventJobService()
+    return _event_job_service
@@ -0,0 +1,109 @@
+"""
+Event loop health for the API.
+
+Route handlers that touch SQLite, the filesystem or RTSP are plain ``def``
+functions, which FastAPI runs in a worker thread pool instead of on the
+event loop; the pool is sized from performance.api_threads. A blocking
+call left on the loop freezes every WebSocket and MJPEG stream, so
+EventLoopMonitor measures how late the loop wakes up from a short sleep
+and exports that as lag.
+"""
+import asyncio
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import anyio.to_thread
+
+from app.services.metrics import get_metrics_service
+
+
+logger = logging.getLogger(__name__)
+
+LAG_INTERVAL_SECONDS = 0.25
+LAG_WINDOW = 240
+LAG_WARN_SECONDS = 0.5
+
+
+def configure_api_thread_pool(threads: int) -> None:
+    """
+    Size the pools blocking API work runs in; call from the running loop.
+
+    Sync routes and dependencies use anyio's default limiter,
+    asyncio.to_thread uses the loop's default executor.
+    """
+    threads = max(1, int(threads))
+    anyio.to_thread.current_default_thread_limiter().total_tokens = threads
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=threads, thread_name_prefix="api-io")
+    )
+    logger.info("API thread pool sized to %s threads", threads)
+
+
+class EventLoopMonitor:
+    """Samples event loop scheduling lag in a background task."""
+
+    def __init__(self, interval: float = LAG_INTERVAL_SECONDS, window: int = LAG_WINDOW):
+        self.interval = interval
+        self._samples: deque = deque(maxlen=window)
+        self._max_lag = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self.metrics_service = get_metrics_service()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.record(loop.time() - started - self.interval)
+
+    def record(self, lag: float) -> None:
+        lag = max(0.0, lag)
+        self._samples.append(lag)
+        self._max_lag = max(self._max_lag, lag)
+        self.metrics_service.set_event_loop_lag(lag)
+        if lag >= LAG_WARN_SECONDS:
+            logger.warning("Event loop blocked for %.0f ms", lag * 1000.0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        samples = sorted(self._samples)
+        if not samples:
+            return {"lag_ms": None, "lag_p99_ms": None, "lag_max_ms": None}
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+        return {
+            "lag_ms": round(self._samples[-1] * 1000.0, 1),
+            "lag_p99_ms": round(p99 * 1000.0, 1),
+            "lag_max_ms": round(self._max_lag * 1000.0, 1),
+        }
+
+
+# Global singleton instance
+_event_loop_monitor: Optional[EventLoopMonitor] = None
+
+
+def get_event_loop_monitor() -> EventLoopMonitor:
+    """
+    Get or create the global event loop monitor.
+
+    Returns:
+        EventLoopMonitor: Global monitor instance
+    """
+    global _event_loop_monitor
+    if _event_loop_monitor is None:
+        _event_loop_monitor = EventLoopMonitor()
+    return _event_loop_monitor
@@ -4,18 +4,58 @@ Event service for Thermal Dual Vision.
 This service handles event CRUD operations, pagination, and filtering.
 """
 import logging
-from datetime import datetime, date
-from typing import Dict, List, Optional
+import re
+from collections import defaultdict
+from datetime import datetime, date, timedelta, timezone
+from typing import Any, Dict, List, Optional
 
-from sqlalchemy import and_, func
+from sqlalchemy import and_, column, func, literal_column, select, table
 from sqlalchemy.orm import Session
 
-from app.db.models import Event, Camera
+from app.db.models import Event, EventRollup, Camera
+from app.db.session import get_migration_status
 
 
 logger = logging.getLogger(__name__)
 
 
+# FTS5 index over events.summary (see app.db.session._migrate_event_search).
+_EVENTS_FTS = table("events_fts", column("rowid"))
+_SEARCH_TERM = re.compile(r"\w+", re.UNICODE)
+MAX_SEARCH_TERMS = 8
+
+
+def _search_terms(search: Optional[str]) -> List[str]:
+    """Words of a free-text query; FTS5 operators and quotes are dropped."""
+    if not search:
+        return []
+    return _SEARCH_TERM.findall(search)[:MAX_SEARCH_TERMS]
+
+
+def _utc_now_naive() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _epoch_hour(value: datetime, ceil: bool = False) -> int:
+    """Hours since the Unix epoch for a naive UTC datetime."""
+    seconds = (value - datetime(1970, 1, 1)).total_seconds()
+    return int(-(-seconds // 3600) if ceil else seconds // 3600)
+
+
+def _hour_iso(hour: int) -> str:
+    return (datetime(1970, 1, 1) + timedelta(hours=hour)).isoformat() + "Z"
+
+
+def _rollup_counts(row) -> Dict[str, Any]:
+    event_count, rejected_count, max_confidence, person_count = row
+    return {
+        "event_count": int(event_count or 0),
+        "rejected_count": int(rejected_count or 0),
+        "max_confidence": float(max_confidence) if max_confidence is not None else None,
+        "person_count": int(person_count or 0),
+    }
+
+
 class EventService:
     """Service for event operations."""
     
@@ -33,6 +73,7 @@ class EventService:
         ai_enabled: bool = False,
         ai_reason: Optional[str] = None,
         person_count: int = 1,
+        commit: bool = True,
     ) -> Event:
         """
         Create a new event.
@@ -49,6 +90,9 @@ class EventService:
             mp4_url: MP4 timelapse URL (optional)
             ai_enabled: Whether AI summary is enabled
             ai_reason: Reason if AI is disabled (optional)
+            person_count: Number of persons detected
+            commit: Commit the session; False only flushes (for DB writer jobs,
+                which commit in batches)
             
         Returns:
             Event: Created event
@@ -77,8 +121,11 @@ class EventService:
         )
         
         db.add(event)
-        db.commit()
-        db.refresh(event)
+        if commit:
+            db.commit()
+            db.refresh(event)
+        else:
+            db.flush()
         
         logger.info(f"Event created: {event.id} for camera {camera_id}")
         
@@ -93,6 +140,7 @@ class EventService:
         date_filter: Optional[date] = None,
         min_confidence: Optional[float] = None,
         rejected_only: Optional[bool] = None,
+        search: Optional[str] = None,
     ) -> Dict:
         """
         Get events with pagination and filtering.
@@ -104,6 +152,9 @@ class EventService:
             camera_id: Filter by camera ID (optional)
             date_filter: Filter by date (optional)
             min_confidence: Minimum confidence threshold (optional)
+            rejected_only: Filter by AI rejection (optional)
+            search: Full-text query over AI summaries (optional); results
+                are ranked by relevance instead of time
             
         Returns:
             Dict containing:
@@ -141,6 +192,17 @@ class EventService:
         
         if filters:
             query = query.filter(and_(*filters))
+
+        order_by = [Event.timestamp.desc()]
+        terms = _search_terms(search)
+        if terms:
+            if get_migration_status().get("event_search", {}).get("ok"):
+                query = query.join(_EVENTS_FTS, _EVENTS_FTS.c.rowid == literal_column("events.rowid")).filter(
+                    literal_column("events_fts").op("MATCH")(" ".join(f'"{term}"*' for term in terms))
+                )
+                order_by.insert(0, func.bm25(literal_column("events_fts")))
+            else:
+                query = query.filter(and_(*(Event.summary.ilike(f"%{term}%") for term in terms)))
         
         # Get total count
         total = query.count()
@@ -148,7 +210,7 @@ class EventService:
         # Apply pagination and ordering
         events = (
             query
-            .order_by(Event.timestamp.desc())
+            .order_by(*order_by)
             .offset((page - 1) * page_size)
             .limit(page_size)
             .all()
@@ -165,6 +227,131 @@ class EventService:
             "total": total,
             "events": events,
         }
+
+    def get_event_stats(
+        self,
+        db: Session,
+        start: datetime,
+        end: datetime,
+        camera_id: Optional[str] = None,
+        bucket_hours: int = 1,
+    ) -> Dict[str, Any]:
+        """
+        Get event counts per time bucket from the hourly rollup table.
+
+        Cost is proportional to the number of hour buckets in the range,
+        not to the number of events.
+
+        Args:
+            db: Database session
+            start: Range start (naive UTC, rounded down to the hour)
+            end: Range end (naive UTC, rounded up to the hour)
+            camera_id: Filter by camera ID (optional)
+            bucket_hours: Bucket width in hours (1 = hourly, 24 = daily UTC)
+
+        Returns:
+            Dict containing:
+                - start / end: Bucket-aligned range
+                - totals: Counts over the whole range
+                - cameras: Counts per camera
+                - buckets: One entry per bucket, zero-filled
+        """
+        first_bucket = _epoch_hour(start) // bucket_hours
+        last_bucket = -(-_epoch_hour(end, ceil=True) // bucket_hours)  # exclusive
+        filters = [
+            EventRollup.hour >= first_bucket * bucket_hours,
+            EventRollup.hour < last_bucket * bucket_hours,
+        ]
+        if camera_id:
+            filters.append(EventRollup.camera_id == camera_id)
+
+        bucket_col = (EventRollup.hour // bucket_hours).label("bucket")
+        aggregates = (
+            func.sum(EventRollup.event_count),
+            func.sum(EventRollup.rejected_count),
+            func.max(EventRollup.max_confidence),
+            func.sum(EventRollup.person_count_sum),
+        )
+        bucket_rows = db.execute(
+            select(bucket_col, *aggregates).where(*filters).group_by(bucket_col)
+        ).all()
+        camera_rows = db.execute(
+            select(EventRollup.camera_id, *aggregates).where(*filters).group_by(EventRollup.camera_id)
+        ).all()
+
+        by_bucket = {int(row[0]): _rollup_counts(row[1:]) for row in bucket_rows}
+        buckets = []
+        for bucket in range(first_bucket, last_bucket):
+            counts = by_bucket.get(bucket) or _rollup_counts((0, 0, None, 0))
+            buckets.append({"start": _hour_iso(bucket * bucket_hours), **counts})
+        cameras = [
+            {"camera_id": row[0], **_rollup_counts(row[1:])}
+            for row in sorted(camera_rows, key=lambda row: -(row[1] or 0))
+        ]
+        totals = _rollup_counts((
+            sum(item["event_count"] for item in cameras),
+            sum(item["rejected_count"] for item in cameras),
+            max((item["max_confidence"] for item in cameras if item["max_confidence"] is not None), default=None),
+            sum(item["person_count"] for item in cameras),
+        ))
+        return {
+            "start": _hour_iso(first_bucket * bucket_hours),
+            "end": _hour_iso(last_bucket * bucket_hours),
+            "bucket_hours": bucket_hours,
+            "totals": totals,
+            "cameras": cameras,
+            "buckets": buckets,
+        }
+
+    def get_recent_activity(
+        self,
+        db: Session,
+        hours: int = 24,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-camera event count over the last hours and last event time.
+
+        Whole hours come from the rollup table; the partial hour at the
+        start of the window is counted from the events index, so the count
+        covers exactly the last hours. The last event time is one index
+        lookup per camera and is returned even when it is older than the
+        window.
+
+        Args:
+            db: Database session
+            hours: Window size in hours
+
+        Returns:
+            Dict mapping camera_id to {"count", "last_ts"}
+        """
+        since = _utc_now_naive() - timedelta(hours=hours)
+        first_full_hour = _epoch_hour(since, ceil=True)
+        counts: Dict[str, int] = defaultdict(int)
+        for camera_id, count in db.execute(
+            select(EventRollup.camera_id, func.sum(EventRollup.event_count))
+            .where(EventRollup.hour >= first_full_hour)
+            .group_by(EventRollup.camera_id)
+        ).all():
+            counts[camera_id] += int(count or 0)
+        for camera_id, count in db.execute(
+            select(Event.camera_id, func.count(Event.id))
+            .where(
+                Event.timestamp >= since,
+                Event.timestamp < datetime(1970, 1, 1) + timedelta(hours=first_full_hour),
+            )
+            .group_by(Event.camera_id)
+        ).all():
+            counts[camera_id] += int(count or 0)
+        last_event = (
+            select(func.max(Event.timestamp))
+            .where(Event.camera_id == Camera.id)
+            .correlate(Camera)
+            .scalar_subquery()
+        )
+        activity = {}
+        for camera_id, last_ts in db.execute(select(Camera.id, last_event)).all():
+            activity[camera_id] = {"count": counts.get(camera_id, 0), "last_ts": last_ts}
+        return activity
     
     def get_event_by_id(
         self,
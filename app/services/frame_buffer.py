@@ -0,0 +1,104 @@
+"""
+Compressed frames for the pre/post event buffers.
+
+The detector keeps several seconds of frames per camera for event media.
+Held as BGR arrays a 1280x720 frame costs 2.7 MB; JPEG-encoded it is
+roughly 10-30x smaller. Frames are encoded once when buffered and decoded
+only for the window an event actually uses.
+
+The multiprocessing detector shares fixed-size raw slots with the main
+process; write_slot stores the JPEG bytes at the start of a slot instead,
+so only the pages the encoded frame covers are ever touched.
+"""
+import logging
+from typing import Iterable, List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+class EncodedFrame:
+    """A JPEG-encoded BGR frame."""
+
+    __slots__ = ("data", "shape")
+
+    def __init__(self, data: bytes, shape: Tuple[int, ...]):
+        self.data = data
+        self.shape = shape
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.data)
+
+    def decode(self) -> Optional[np.ndarray]:
+        frame = cv2.imdecode(np.frombuffer(self.data, dtype=np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            logger.debug("Failed to decode buffered frame (%s bytes)", len(self.data))
+        return frame
+
+
+BufferedFrame = Union[np.ndarray, EncodedFrame]
+
+
+def pack_frame(frame: np.ndarray, jpeg_quality: int = 0) -> BufferedFrame:
+    """
+    Prepare a frame for a long-lived buffer.
+
+    jpeg_quality 0 keeps a raw copy; otherwise the frame is JPEG-encoded at
+    that quality, falling back to a raw copy if encoding fails.
+    """
+    if jpeg_quality > 0:
+        ok, encoded = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), int(jpeg_quality)])
+        if ok:
+            return EncodedFrame(encoded.tobytes(), frame.shape)
+    return frame.copy()
+
+
+def buffer_jpeg_quality(config) -> int:
+    """JPEG quality for buffered event frames; 0 keeps raw BGR frames."""
+    event_config = getattr(config, "event", None)
+    if getattr(event_config, "buffer_mode", "raw") != "jpeg":
+        return 0
+    return int(getattr(event_config, "buffer_jpeg_quality", 90))
+
+
+def unpack_frame(item: BufferedFrame) -> Optional[np.ndarray]:
+    if isinstance(item, EncodedFrame):
+        return item.decode()
+    return item
+
+
+def unpack_frames(items: Iterable[BufferedFrame]) -> List[Optional[np.ndarray]]:
+    """Decode buffered frames; entries that fail to decode are None."""
+    return [unpack_frame(item) for item in items]
+
+
+def buffered_nbytes(items: Iterable[BufferedFrame]) -> int:
+    """Memory held by the frame payloads of a buffer."""
+    return sum(int(item.nbytes) for item in items)
+
+
+def write_slot(slot: np.ndarray, frame: np.ndarray, jpeg_quality: int = 0) -> int:
+    """
+    Store frame in a raw frame-sized slot (e.g. shared memory).
+
+    Returns the encoded length held at the start of the slot, or 0 when the
+    frame was stored raw (raw mode, or the JPEG would not fit).
+    """
+    if jpeg_quality > 0:
+        packed = pack_frame(frame, jpeg_quality)
+        if isinstance(packed, EncodedFrame) and packed.nbytes <= slot.nbytes:
+            slot.reshape(-1)[:packed.nbytes] = np.frombuffer(packed.data, dtype=np.uint8)
+            return packed.nbytes
+    slot[...] = frame
+    return 0
+
+
+def read_slot(slot: np.ndarray, length: int) -> Optional[np.ndarray]:
+    """Copy a frame out of a slot written by write_slot; None if it fails to decode."""
+    if length > 0:
+        return unpack_frame(EncodedFrame(slot.reshape(-1)[:length].tobytes(), slot.shape))
+    return slot.copy()
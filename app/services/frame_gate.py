@@ -0,0 +1,193 @@
+"""
+Frame-change gate for detector workers.
+
+Computes a cheap fingerprint (small downsampled grayscale image) for each
+captured frame. Frames that are near-identical to the last inferred frame
+reuse its detections instead of running inference again, and a stream that
+keeps delivering byte-identical frames (stalled encoder, restreamer repeating
+its last frame) is reported as frozen so the reader can reconnect.
+"""
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Same working size as the phantom-event duplicate estimate.
+FINGERPRINT_SIZE = (96, 72)
+# Coarse grid used to catch small localized changes that a global mean hides.
+BLOCK_GRID = (12, 9)
+
+
+def frame_fingerprint(frame: np.ndarray) -> np.ndarray:
+    """
+    Downsampled grayscale fingerprint of a frame.
+
+    Args:
+        frame: BGR or grayscale frame
+
+    Returns:
+        uint8 array of shape (72, 96)
+    """
+    if len(frame.shape) == 3 and frame.shape[2] == 3:
+        small = cv2.resize(frame, FINGERPRINT_SIZE, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    gray = frame if len(frame.shape) == 2 else frame[:, :, 0]
+    return cv2.resize(gray, FINGERPRINT_SIZE, interpolation=cv2.INTER_AREA)
+
+
+def fingerprint_diff(a: np.ndarray, b: np.ndarray) -> tuple:
+    """
+    Difference between two fingerprints.
+
+    Returns:
+        (mean absolute difference, largest block-mean difference)
+    """
+    diff = cv2.absdiff(a, b)
+    blocks = cv2.resize(diff, BLOCK_GRID, interpolation=cv2.INTER_AREA)
+    return float(diff.mean()), float(blocks.max())
+
+
+class FrameChangeGate:
+    """
+    Per-camera detection result cache keyed by frame fingerprint.
+
+    A cached result is reused only while frames stay within the thresholds
+    of the frame that was actually inferred (so slow drift accumulates and
+    eventually forces inference), for at most max_reuse frames in a row and
+    max_age_seconds overall.
+    """
+
+    def __init__(
+        self,
+        mean_threshold: float = 1.0,
+        block_threshold: float = 6.0,
+        max_reuse: int = 5,
+        max_age_seconds: float = 3.0,
+        frozen_mean_threshold: float = 0.02,
+    ):
+        self.mean_threshold = float(mean_threshold)
+        self.block_threshold = float(block_threshold)
+        self.max_reuse = max(0, int(max_reuse))
+        self.max_age_seconds = float(max_age_seconds)
+        self.frozen_mean_threshold = float(frozen_mean_threshold)
+        self._cached_fingerprint: Optional[np.ndarray] = None
+        self._cached_detections: List[Dict[str, Any]] = []
+        self._cached_key: Any = None
+        self._cached_at = 0.0
+        self._reuse_count = 0
+        self._last_fingerprint: Optional[np.ndarray] = None
+        self._last_frame: Optional[np.ndarray] = None
+        self._unchanged_since: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(
+        self,
+        fingerprint: Optional[np.ndarray],
+        key: Any = None,
+        now: Optional[float] = None,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Return cached detections if this frame is near-identical to the last
+        inferred one, else None (caller runs inference and calls store()).
+
+        Args:
+            fingerprint: Fingerprint of the frame about to be inferred
+            key: Anything that changes the result besides the frame (e.g. thresholds)
+            now: Current time (defaults to time.time())
+        """
+        now = time.time() if now is None else now
+        cached = self._cached_fingerprint
+        if (
+            fingerprint is None
+            or cached is None
+            or key != self._cached_key
+            or cached.shape != fingerprint.shape
+            or self._reuse_count >= self.max_reuse
+            or now - self._cached_at > self.max_age_seconds
+        ):
+            self.misses += 1
+            return None
+        mean_diff, block_diff = fingerprint_diff(cached, fingerprint)
+        if mean_diff > self.mean_threshold or block_diff > self.block_threshold:
+            self.misses += 1
+            return None
+        self._reuse_count += 1
+        self.hits += 1
+        return [dict(det) for det in self._cached_detections]
+
+    def store(
+        self,
+        fingerprint: Optional[np.ndarray],
+        detections: List[Dict[str, Any]],
+        key: Any = None,
+        now: Optional[float] = None,
+    ) -> None:
+        """Remember the result of an actual inference."""
+        if fingerprint is None:
+            return
+        self._cached_fingerprint = fingerprint
+        self._cached_detections = [dict(det) for det in detections]
+        self._cached_key = key
+        self._cached_at = time.time() if now is None else now
+        self._reuse_count = 0
+
+    def observe(
+        self,
+        fingerprint: np.ndarray,
+        now: Optional[float] = None,
+        frame: Optional[np.ndarray] = None,
+    ) -> float:
+        """
+        Track consecutive unchanged frames from the reader.
+
+        With frame given, only byte-identical frames count: a live static
+        scene (H.264 skip blocks, quiet thermal core) can pass the
+        fingerprint threshold yet still changes with noise and at every
+        keyframe. The fingerprint check runs first, so the full comparison
+        only happens for frames that look unchanged.
+
+        Returns:
+            Seconds the stream has delivered identical frames
+        """
+        now = time.time() if now is None else now
+        previous = self._last_fingerprint
+        previous_frame = self._last_frame
+        self._last_fingerprint = fingerprint
+        self._last_frame = frame
+        if previous is None or previous.shape != fingerprint.shape:
+            self._unchanged_since = None
+            return 0.0
+        mean_diff, _ = fingerprint_diff(previous, fingerprint)
+        unchanged = mean_diff <= self.frozen_mean_threshold
+        if unchanged and frame is not None:
+            unchanged = previous_frame is not None and np.array_equal(previous_frame, frame)
+        if not unchanged:
+            self._unchanged_since = None
+            return 0.0
+        if self._unchanged_since is None:
+            self._unchanged_since = now
+        return now - self._unchanged_since
+
+    def reset_frozen(self) -> None:
+        """Forget the unchanged-frame streak (e.g. after a reconnect)."""
+        self._last_fingerprint = None
+        self._last_frame = None
+        self._unchanged_since = None
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return (self.hits / total) if total else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 3),
+        }
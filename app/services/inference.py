@@ -6,16 +6,25 @@ This service handles YOLOv8 model loading, preprocessing, and inference.
 import logging
 import shutil
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 import cv2
 import numpy as np
-from ultralytics import YOLO
+
+if TYPE_CHECKING:
+    from ultralytics import YOLO
 
 
 logger = logging.getLogger(__name__)
 
 
+def _load_yolo(source: str, task: str = "detect") -> "YOLO":
+    """Construct a YOLO model, importing ultralytics (and torch) on first use."""
+    from ultralytics import YOLO
+
+    return YOLO(source, task=task)
+
+
 class InferenceService:
     """Service for YOLOv8 inference and preprocessing."""
     
@@ -24,6 +33,9 @@ class InferenceService:
     from app.utils.paths import DATA_DIR
     MODELS_DIR = DATA_DIR / "models"
     PERSON_CLASS_ID = 0  # COCO class ID for person
+    # ROI inference: model stride and smallest input size worth running
+    ROI_STRIDE = 32
+    ROI_MIN_INPUT = 160
     PERSON_CLASS_ALIASES = {"person", "human", "people"}
 
     # Models hosted on HuggingFace that are downloaded on first use.
@@ -49,10 +61,15 @@ class InferenceService:
     
     def __init__(self):
         """Initialize inference service."""
-        self.model: Optional[YOLO] = None
+        self.model: Optional["YOLO"] = None
         self.model_name: Optional[str] = None
         self._inference_device: Optional[str] = None  # e.g. "intel:gpu" for OpenVINO iGPU
         self.active_backend: str = "unknown"
+        # Only PyTorch models accept a different input size per call; exported
+        # engines (ONNX/OpenVINO/TensorRT) are built for a fixed input shape.
+        self.dynamic_input: bool = False
+        # Benchmark profile in use when performance.auto_tune is on
+        self.perf_profile: Optional[Dict] = None
 
         # Ensure models directory exists
         self.MODELS_DIR.mkdir(parents=True, exist_ok=True)
@@ -83,10 +100,11 @@ class InferenceService:
         self,
         tensorrt_path: Path,
         onnx_path: Path,
+        model_name: Optional[str] = None,
     ) -> str:
         """
         Auto-select best backend based on available assets and hardware.
-        Priority: TensorRT > OpenVINO (GPU) > ONNX > PyTorch.
+        Priority: TensorRT > OpenVINO (GPU) > registered INT8 variant > ONNX > PyTorch.
         """
         if tensorrt_path.exists():
             return "tensorrt"
@@ -98,12 +116,66 @@ class InferenceService:
                 return "openvino"
             # If only CPU is available, prefer ONNX for stability
 
+        # CPU-only host: an accuracy-checked INT8 variant beats FP32 ONNX
+        if model_name:
+            from app.services.quantization import registered_variant
+
+            for variant in ("openvino_int8", "onnx_int8"):
+                if registered_variant(self.MODELS_DIR, model_name, variant) is not None:
+                    return variant
+
         if onnx_path.exists():
             return "onnx"
 
         # Fallback to PyTorch CPU
         return "cpu"
 
+    def _auto_tuned_backend(self, model_name: str) -> Optional[str]:
+        """
+        Backend chosen by the benchmark profile (performance.auto_tune).
+
+        Benchmarks on first use or when the model/input size changed, applies
+        the tuned PyTorch thread count and returns None when auto-tune is off.
+        """
+        try:
+            from app.services.settings import get_settings_service
+            config = get_settings_service().load_config()
+            if not getattr(getattr(config, "performance", None), "auto_tune", False):
+                self.perf_profile = None
+                return None
+            input_size = int(max(config.detection.inference_resolution))
+        except Exception:
+            return None
+
+        from app.services.perf_profile import _set_torch_threads, get_perf_tuner
+
+        tuner = get_perf_tuner()
+        profile = tuner.profile
+        if not profile or profile.get("model") != model_name or profile.get("input_size") != input_size:
+            logger.info("Benchmarking inference backends for %s (first start or model change)", model_name)
+            profile = tuner.run(model_name, input_size) or tuner.profile
+        best = (profile or {}).get("best")
+        if not best or best.get("backend") not in tuner.available_backends(model_name):
+            return None
+        self.perf_profile = profile
+        if best["backend"] == "cpu" and best.get("threads"):
+            _set_torch_threads(int(best["threads"]))
+        logger.info(
+            "Perf profile selects backend=%s threads=%s (%.1f fps)",
+            best["backend"],
+            best.get("threads"),
+            float(best.get("fps") or 0.0),
+        )
+        return best["backend"]
+
+    def camera_fps_cap(self, camera_count: int) -> Optional[float]:
+        """Per-camera inference FPS the perf profile says is sustainable, if tuned."""
+        if self.perf_profile is None:
+            return None
+        from app.services.perf_profile import fps_cap
+
+        return fps_cap(self.perf_profile, camera_count)
+
     def _ensure_huggingface_model(self, model_name: str) -> None:
         """Download a HuggingFace-hosted model if not already cached locally."""
         if model_name not in self.HUGGINGFACE_MODELS:
@@ -144,6 +216,7 @@ class InferenceService:
             backend = self._get_backend()
             self._inference_device = None
             self.active_backend = "unknown"
+            self.dynamic_input = False
             logger.info("Loading YOLO model: %s (backend=%s)", model_name, backend)
 
             # Download from HuggingFace if needed (e.g. yolov8s-thermal)
@@ -156,15 +229,40 @@ class InferenceService:
             openvino_dir = self.MODELS_DIR / f"{model_name}_openvino_model"
 
             if backend == "auto":
-                backend = self._resolve_auto_backend(tensorrt_path, onnx_path)
+                backend = self._auto_tuned_backend(model_name) or self._resolve_auto_backend(
+                    tensorrt_path, onnx_path, model_name
+                )
                 logger.info("Auto-selected inference backend: %s", backend)
             self.active_backend = backend
 
+            # INT8 variants (quantized on our own event frames)
+            int8_loaded = False
+            if backend in ("onnx_int8", "openvino_int8"):
+                from app.services.quantization import registered_variant
+
+                variant_path = registered_variant(self.MODELS_DIR, model_name, backend)
+                if variant_path is not None:
+                    logger.info("Loading INT8 model: %s", variant_path)
+                    self.model = _load_yolo(str(variant_path))
+                    self.model_name = model_name
+                    int8_loaded = True
+                    logger.info("INT8 %s model loaded", backend.split("_")[0])
+                else:
+                    logger.warning(
+                        "No accuracy-checked %s variant for %s; run INT8 quantization first. Using FP32.",
+                        backend,
+                        model_name,
+                    )
+                    backend = backend.split("_")[0]
+                    self.active_backend = backend
+
             # OpenVINO (Intel iGPU / NPU / CPU) - Scrypted tarzı parametrik
-            if backend == "openvino":
+            if int8_loaded:
+                pass
+            elif backend == "openvino":
                 if openvino_dir.exists():
                     logger.info("Loading OpenVINO model: %s (Intel iGPU/NPU/CPU)", openvino_dir)
-                    self.model = YOLO(str(openvino_dir), task='detect')
+                    self.model = _load_yolo(str(openvino_dir))
                     self.model_name = model_name
                     # OpenVINO models auto-select best device (GPU/CPU) internally.
                     # Don't pass device= on inference calls; it causes GPU-not-available
@@ -178,7 +276,7 @@ class InferenceService:
             elif backend == "tensorrt" or (backend == "auto" and tensorrt_path.exists()):
                 if tensorrt_path.exists():
                     logger.info("Loading TensorRT model: %s", tensorrt_path)
-                    self.model = YOLO(str(tensorrt_path), task='detect')
+                    self.model = _load_yolo(str(tensorrt_path))
                     self.model_name = model_name
                     logger.info("TensorRT model loaded")
                 elif backend == "tensorrt":
@@ -189,7 +287,7 @@ class InferenceService:
             elif backend == "onnx" or (backend == "auto" and onnx_path.exists()):
                 if onnx_path.exists():
                     logger.info("Loading ONNX model: %s", onnx_path)
-                    self.model = YOLO(str(onnx_path), task='detect')
+                    self.model = _load_yolo(str(onnx_path))
                     self.model_name = model_name
                     logger.info("ONNX model loaded")
                 elif backend == "onnx":
@@ -220,8 +318,9 @@ class InferenceService:
                     source = f"{model_name}.pt"
                 
                 logger.info(f"Loading PyTorch model: {source}")
-                self.model = YOLO(source, task='detect')
+                self.model = _load_yolo(source)
                 self.model_name = model_name
+                self.dynamic_input = True
                 logger.info("PyTorch model loaded")
                 
                 # Auto-export to optimized format (async, non-blocking)
@@ -338,12 +437,12 @@ class InferenceService:
     ) -> None:
         """Load PyTorch model then export and load ONNX (sync)."""
         source = str(pytorch_path) if pytorch_path.exists() else (str(root_pytorch_path) if root_pytorch_path.exists() else f"{model_name}.pt")
-        pt = YOLO(source, task='detect')
+        pt = _load_yolo(source)
         pt.export(format="onnx", simplify=True, dynamic=False)
         exported = Path.cwd() / f"{model_name}.onnx"
         if exported.exists():
             shutil.move(str(exported), str(onnx_path))
-        self.model = YOLO(str(onnx_path), task='detect')
+        self.model = _load_yolo(str(onnx_path))
         self.model_name = model_name
         logger.info("ONNX model exported and loaded")
 
@@ -357,7 +456,7 @@ class InferenceService:
         """Load PyTorch model, export to OpenVINO (Intel iGPU), then load. İlk çalıştırma 1-2 dk sürebilir."""
         source = str(pytorch_path) if pytorch_path.exists() else (str(root_pytorch_path) if root_pytorch_path.exists() else f"{model_name}.pt")
         logger.info("Exporting to OpenVINO (Intel iGPU/NPU/CPU)...")
-        pt = YOLO(source, task='detect')
+        pt = _load_yolo(source)
         pt.export(format="openvino")
         # Ultralytics creates ./{model_name}_openvino_model/
         cwd_ov = Path.cwd() / f"{model_name}_openvino_model"
@@ -365,7 +464,7 @@ class InferenceService:
             if openvino_dir.exists():
                 shutil.rmtree(openvino_dir, ignore_errors=True)
             shutil.move(str(cwd_ov), str(openvino_dir))
-        self.model = YOLO(str(openvino_dir), task='detect')
+        self.model = _load_yolo(str(openvino_dir))
         self.model_name = model_name
         self._inference_device = None
         logger.info("OpenVINO model exported and loaded (device=AUTO)")
@@ -511,6 +610,79 @@ class InferenceService:
         pseudo = cv2.applyColorMap(normalized, cv2.COLORMAP_TURBO)
         return cv2.GaussianBlur(pseudo, self.GAUSSIAN_KERNEL, 0)
     
+    def plan_roi(
+        self,
+        frame_shape: Tuple[int, ...],
+        motion_bbox: Optional[Tuple[int, int, int, int]],
+        inference_resolution: Tuple[int, int],
+        padding_ratio: float = 0.5,
+        min_padding: int = 48,
+        max_area_ratio: float = 0.6,
+    ) -> Optional[Tuple[Tuple[int, int, int, int], Tuple[int, int]]]:
+        """
+        Plan an inference crop around the motion region.
+
+        The crop is the motion bbox plus padding, and the input size is the
+        smallest stride multiple that keeps people at least as large as in
+        full-frame inference. Models exported with a fixed input shape get
+        no plan: the crop would be upscaled to the full input size, costing
+        the same compute while changing person scale.
+
+        Args:
+            frame_shape: Full frame shape (h, w, ...)
+            motion_bbox: Motion union bbox (x, y, w, h) in frame coordinates
+            inference_resolution: Configured full-frame resolution [width, height]
+            padding_ratio: Padding per side as a fraction of the bbox size
+            min_padding: Minimum padding per side in pixels
+            max_area_ratio: Crops larger than this share of the frame fall back to full frame
+
+        Returns:
+            ((x1, y1, x2, y2), inference_resolution) or None for full-frame inference
+        """
+        if motion_bbox is None or not self.dynamic_input:
+            return None
+        frame_h, frame_w = frame_shape[:2]
+        bx, by, bw, bh = (int(v) for v in motion_bbox)
+        if bw <= 0 or bh <= 0 or frame_w <= 0 or frame_h <= 0:
+            return None
+        pad_x = max(int(min_padding), int(bw * padding_ratio))
+        pad_y = max(int(min_padding), int(bh * padding_ratio))
+        x1 = max(0, bx - pad_x)
+        y1 = max(0, by - pad_y)
+        x2 = min(frame_w, bx + bw + pad_x)
+        y2 = min(frame_h, by + bh + pad_y)
+        crop_w = x2 - x1
+        crop_h = y2 - y1
+        if crop_w < self.ROI_MIN_INPUT // 2 or crop_h < self.ROI_MIN_INPUT // 2:
+            return None
+        if crop_w * crop_h > max_area_ratio * frame_w * frame_h:
+            return None
+
+        inf_w, inf_h = (int(v) for v in inference_resolution)
+        # Scale at which the full frame would be letterboxed into the model
+        full_scale = min(inf_w / float(frame_w), inf_h / float(frame_h))
+        stride = self.ROI_STRIDE
+
+        def _fit(size: int, limit: int) -> int:
+            target = int(np.ceil(size * full_scale / stride) * stride)
+            return max(min(self.ROI_MIN_INPUT, limit), min(limit, target))
+
+        return (x1, y1, x2, y2), (_fit(crop_w, inf_w), _fit(crop_h, inf_h))
+
+    @staticmethod
+    def offset_detections(detections: List[Dict], offset_x: int, offset_y: int) -> List[Dict]:
+        """Shift detection boxes from crop coordinates back to full-frame coordinates."""
+        if not detections or (offset_x == 0 and offset_y == 0):
+            return detections
+        shifted = []
+        for det in detections:
+            d = dict(det)
+            if "bbox" in d:
+                bx1, by1, bx2, by2 = d["bbox"]
+                d["bbox"] = [bx1 + offset_x, by1 + offset_y, bx2 + offset_x, by2 + offset_y]
+            shifted.append(d)
+        return shifted
+
     def infer(
         self,
         frame: np.ndarray,
@@ -535,7 +707,8 @@ class InferenceService:
         # Run inference (OpenVINO: device=intel:gpu)
         inference_args = {"conf": confidence_threshold, "verbose": False}
         if inference_resolution and len(inference_resolution) == 2:
-            inference_args["imgsz"] = list(inference_resolution)
+            # Config is [width, height]; Ultralytics expects (height, width)
+            inference_args["imgsz"] = [int(inference_resolution[1]), int(inference_resolution[0])]
         if self._inference_device:
             inference_args["device"] = self._inference_device
 
@@ -613,7 +786,8 @@ class InferenceService:
 
         inference_args = {"conf": confidence_threshold, "verbose": False}
         if inference_resolution and len(inference_resolution) == 2:
-            inference_args["imgsz"] = list(inference_resolution)
+            # Config is [width, height]; Ultralytics expects (height, width)
+            inference_args["imgsz"] = [int(inference_resolution[1]), int(inference_resolution[0])]
         if self._inference_device:
             inference_args["device"] = self._inference_device
 
@@ -0,0 +1,283 @@
+"""
+Global fair-share inference scheduler.
+
+Camera detection loops used to throttle themselves from psutil CPU readings,
+so every camera backed off (or sped up) at the same moment. The scheduler
+instead owns one inference budget for the whole process and splits it by
+weighted fair share: cameras with an event in progress, recent detections or
+motion get a larger share, idle cameras keep a guaranteed minimum. Each
+camera spends its grant through a token bucket; frames that arrive without a
+token are deferred (skipped) and counted.
+
+Budget, in inferences per second:
+- the perf profile capacity when the host has been benchmarked
+  (performance.auto_tune), else
+- a live estimate from observed inference latency and concurrency, else
+- unlimited (every camera gets its requested FPS) until enough samples exist.
+"""
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from app.services.inference import get_inference_service
+
+logger = logging.getLogger(__name__)
+
+# Share weights by camera activity.
+PRIORITY_WEIGHTS = {
+    "event": 4.0,
+    "detection": 3.0,
+    "motion": 2.0,
+    "idle": 1.0,
+}
+RECENT_DETECTION_SECONDS = 10.0
+# Fraction of measured capacity handed out, leaving headroom for decode,
+# motion detection and media encoding.
+TARGET_UTILIZATION = 0.8
+MIN_LATENCY_SAMPLES = 20
+EWMA_ALPHA = 0.1
+REALLOCATE_INTERVAL_SECONDS = 1.0
+
+
+def fair_share(budget: Optional[float], requests: Dict[str, Dict[str, float]]) -> Dict[str, float]:
+    """
+    Weighted max-min fair split of budget.
+
+    requests maps camera id to {"demand", "floor", "weight"}. Every camera
+    first gets min(floor, demand) -- the floor is guaranteed even when the
+    budget is exhausted -- and the remainder is water-filled by weight,
+    never beyond a camera's demand. A None budget grants every demand.
+    """
+    grants = {
+        camera_id: min(float(req["floor"]), float(req["demand"]))
+        for camera_id, req in requests.items()
+    }
+    if budget is None:
+        return {camera_id: float(req["demand"]) for camera_id, req in requests.items()}
+
+    remaining = float(budget) - sum(grants.values())
+    open_ids = {cid for cid, req in requests.items() if float(req["demand"]) > grants[cid]}
+    while remaining > 1e-9 and open_ids:
+        total_weight = sum(max(float(requests[cid]["weight"]), 1e-6) for cid in open_ids)
+        saturated = set()
+        handed_out = 0.0
+        for cid in open_ids:
+            share = remaining * max(float(requests[cid]["weight"]), 1e-6) / total_weight
+            room = float(requests[cid]["demand"]) - grants[cid]
+            given = min(share, room)
+            grants[cid] += given
+            handed_out += given
+            if given >= room - 1e-9:
+                saturated.add(cid)
+        remaining -= handed_out
+        if not saturated:
+            break
+        open_ids -= saturated
+    return grants
+
+
+class _CameraSlot:
+    def __init__(self) -> None:
+        self.demand = 1.0
+        self.floor = 1.0
+        self.motion = False
+        self.event = False
+        self.last_detection = float("-inf")
+        self.granted_fps = 1.0
+        self.tokens = 1.0
+        self.last_refill: Optional[float] = None
+        self.granted = 0
+        self.deferred = 0
+
+    def priority(self, now: float) -> str:
+        if self.event:
+            return "event"
+        if now - self.last_detection <= RECENT_DETECTION_SECONDS:
+            return "detection"
+        if self.motion:
+            return "motion"
+        return "idle"
+
+
+class InferenceScheduler:
+    """Hands out inference slots to cameras from one global budget."""
+
+    def __init__(self, profile_capacity: Optional[Callable[[], Optional[float]]] = None):
+        self.profile_capacity = profile_capacity
+        self._slots: Dict[str, _CameraSlot] = {}
+        self._lock = threading.Lock()
+        self._latency_ewma: Optional[float] = None
+        self._concurrency_ewma: Optional[float] = None
+        self._latency_samples = 0
+        self._in_flight = 0
+        self._budget: Optional[float] = None
+        self._budget_source = "unlimited"
+        self._last_allocation = 0.0
+
+    # ------------------------------------------------------------------
+    # Camera state
+    # ------------------------------------------------------------------
+
+    def update_camera(
+        self,
+        camera_id: str,
+        max_fps: float,
+        min_fps: float = 1.0,
+        motion: bool = False,
+        event: bool = False,
+    ) -> None:
+        """Refresh a camera's requested FPS and activity (called every loop)."""
+        with self._lock:
+            slot = self._slots.get(camera_id)
+            if slot is None:
+                slot = _CameraSlot()
+                self._slots[camera_id] = slot
+                self._last_allocation = 0.0
+            slot.demand = max(float(max_fps), 0.1)
+            slot.floor = max(float(min_fps), 0.0)
+            slot.motion = bool(motion)
+            slot.event = bool(event)
+
+    def remove_camera(self, camera_id: str) -> None:
+        with self._lock:
+            if self._slots.pop(camera_id, None) is not None:
+                self._last_allocation = 0.0
+
+    # ------------------------------------------------------------------
+    # Slots
+    # ------------------------------------------------------------------
+
+    def acquire(self, camera_id: str, now: Optional[float] = None) -> bool:
+        """
+        Take one inference slot for camera_id.
+
+        Returns False (and counts a deferred frame) when the camera has used
+        up its grant; the caller skips inference for that frame.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            slot = self._slots.get(camera_id)
+            if slot is None:
+                return True
+            if now - self._last_allocation >= REALLOCATE_INTERVAL_SECONDS:
+                self._allocate_locked(now)
+            if slot.last_refill is not None:
+                elapsed = max(0.0, now - slot.last_refill)
+                slot.tokens = min(1.0, slot.tokens + elapsed * slot.granted_fps)
+            slot.last_refill = now
+            if slot.tokens < 1.0:
+                slot.deferred += 1
+                return False
+            slot.tokens -= 1.0
+            slot.granted += 1
+            self._in_flight += 1
+            self._concurrency_ewma = self._ewma(self._concurrency_ewma, float(self._in_flight))
+            return True
+
+    def release(
+        self,
+        camera_id: str,
+        latency_seconds: float,
+        detected: bool = False,
+        now: Optional[float] = None,
+    ) -> None:
+        """Report a finished inference granted by acquire()."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            if latency_seconds > 0:
+                self._latency_ewma = self._ewma(self._latency_ewma, float(latency_seconds))
+                self._latency_samples += 1
+            slot = self._slots.get(camera_id)
+            if slot is not None and detected:
+                slot.last_detection = now
+
+    def granted_fps(self, camera_id: str) -> Optional[float]:
+        with self._lock:
+            slot = self._slots.get(camera_id)
+            return slot.granted_fps if slot is not None else None
+
+    # ------------------------------------------------------------------
+    # Budget
+    # ------------------------------------------------------------------
+
+    def capacity(self) -> Optional[float]:
+        """Inferences per second the process can sustain, if known."""
+        with self._lock:
+            return self._capacity_locked()[0]
+
+    def _capacity_locked(self):
+        if self.profile_capacity is not None:
+            try:
+                profiled = self.profile_capacity()
+            except Exception:
+                profiled = None
+            if profiled:
+                return float(profiled), "profile"
+        if self._latency_samples >= MIN_LATENCY_SAMPLES and self._latency_ewma:
+            concurrency = max(1.0, self._concurrency_ewma or 1.0)
+            return TARGET_UTILIZATION * concurrency / self._latency_ewma, "measured"
+        return None, "unlimited"
+
+    def _allocate_locked(self, now: float) -> None:
+        self._budget, self._budget_source = self._capacity_locked()
+        requests = {}
+        for camera_id, slot in self._slots.items():
+            priority = slot.priority(now)
+            requests[camera_id] = {
+                # Idle cameras only ask for their guaranteed minimum.
+                "demand": min(slot.demand, slot.floor) if priority == "idle" else slot.demand,
+                "floor": slot.floor,
+                "weight": PRIORITY_WEIGHTS[priority],
+            }
+        for camera_id, fps in fair_share(self._budget, requests).items():
+            self._slots[camera_id].granted_fps = max(fps, 0.01)
+        self._last_allocation = now
+
+    @staticmethod
+    def _ewma(current: Optional[float], sample: float) -> float:
+        if current is None:
+            return sample
+        return current + EWMA_ALPHA * (sample - current)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            cameras = {
+                camera_id: {
+                    "priority": slot.priority(now),
+                    "requested_fps": round(slot.demand, 2),
+                    "granted_fps": round(slot.granted_fps, 2),
+                    "granted": slot.granted,
+                    "deferred": slot.deferred,
+                }
+                for camera_id, slot in self._slots.items()
+            }
+            return {
+                "budget_fps": round(self._budget, 2) if self._budget is not None else None,
+                "budget_source": self._budget_source,
+                "latency_ms": round(self._latency_ewma * 1000.0, 1) if self._latency_ewma else None,
+                "in_flight": self._in_flight,
+                "cameras": cameras,
+            }
+
+
+# Global singleton instance
+_inference_scheduler: Optional[InferenceScheduler] = None
+
+
+def get_inference_scheduler() -> InferenceScheduler:
+    """
+    Get or create the global inference scheduler.
+
+    Returns:
+        InferenceScheduler: Global scheduler instance
+    """
+    global _inference_scheduler
+    if _inference_scheduler is None:
+        inference_service = get_inference_service()
+        _inference_scheduler = InferenceScheduler(
+            profile_capacity=lambda: inference_service.camera_fps_cap(1),
+        )
+    return _inference_scheduler
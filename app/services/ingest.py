@@ -0,0 +1,642 @@
+"""
+Shared RTSP ingest: one ffmpeg per camera stream.
+
+The recorder and the detector used to open the same go2rtc restream with
+two processes: a ``-c copy`` segmenter for the rolling buffer and a
+rawvideo decoder for inference, while snapshots opened a third
+connection. An IngestStream opens the restream once: its source ffmpeg
+writes the recording segments and also copies the video as MPEG-TS to a
+pipe from its first start, so a reader attaching later never restarts it.
+A relay thread feeds that pipe to a separate decoder ffmpeg whose frames
+go to IngestCapture readers (latest frame wins) and snapshots. Readers coming and going, a reader asking for a
+restart and decoder crashes only touch the decoder, so the recording
+segment is never cut for them; the decoder stops after DECODE_IDLE_SECONDS
+without readers.
+
+A stream is created by the recorder. The detector attaches only when its
+detection stream is the recorded one; otherwise it keeps its own capture.
+"""
+import logging
+import os
+import shutil
+import subprocess
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.utils.rtsp import redact_rtsp_url
+
+
+logger = logging.getLogger(__name__)
+
+# Consumers registering together (recorder + detector at startup) are
+# coalesced into one ffmpeg start instead of a start and a restart.
+SETTLE_SECONDS = 1.0
+RESTART_BACKOFF_MIN = 2.0
+RESTART_BACKOFF_MAX = 30.0
+# A process that ran this long before exiting resets the backoff.
+STABLE_RUN_SECONDS = 30.0
+READ_TIMEOUT_SECONDS = 5.0
+# The decoder keeps running this long after the last reader detaches, so a
+# detector reconnect does not restart it.
+DECODE_IDLE_SECONDS = 30.0
+RELAY_CHUNK_BYTES = 64 * 1024
+
+# spawn(cmd, stdout_bufsize, with_stdin); bufsize 0 discards stdout.
+Spawner = Callable[[List[str], int, bool], subprocess.Popen]
+
+
+def build_ingest_command(
+    ffmpeg: str,
+    rtsp_url: str,
+    transport: str = "tcp",
+    output_pattern: Optional[str] = None,
+    segment_time: int = 60,
+    relay: bool = False,
+) -> List[str]:
+    """
+    Build the source ffmpeg command: a segment output and/or a relay pipe.
+
+    The segment output matches the recorder's standalone command (video and
+    optional audio copied, UTC strftime names); the relay pipe carries the
+    copied video as MPEG-TS on stdout for the decoder.
+    """
+    cmd = [
+        ffmpeg,
+        "-hide_banner",
+        "-loglevel", "error",
+        "-fflags", "+discardcorrupt",
+        "-err_detect", "ignore_err",
+        "-rtsp_transport", transport,
+        "-i", rtsp_url,
+    ]
+    if output_pattern:
+        cmd.extend([
+            "-map", "0:v:0",
+            "-map", "0:a:0?",
+            "-c", "copy",
+            "-f", "segment",
+            "-segment_time", str(segment_time),
+            "-segment_format", "mp4",
+            "-reset_timestamps", "1",
+            "-strftime", "1",
+            output_pattern,
+        ])
+    if relay:
+        cmd.extend([
+            "-map", "0:v:0",
+            "-c", "copy",
+            "-f", "mpegts",
+            "pipe:1",
+        ])
+    return cmd
+
+
+def build_decode_command(ffmpeg: str) -> List[str]:
+    """Decoder reading the relayed MPEG-TS on stdin; native-size bgr24 frames on stdout."""
+    return [
+        ffmpeg,
+        "-hide_banner",
+        "-loglevel", "error",
+        "-fflags", "+discardcorrupt",
+        "-f", "mpegts",
+        "-i", "pipe:0",
+        "-map", "0:v:0",
+        "-f", "rawvideo",
+        "-pix_fmt", "bgr24",
+        "pipe:1",
+    ]
+
+
+def _default_spawn(cmd: List[str], bufsize: int, stdin: bool = False) -> subprocess.Popen:
+    env = os.environ.copy()
+    # Segment filenames are UTC, like the standalone recorder.
+    env["TZ"] = "UTC"
+    return subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE if bufsize else subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        stdin=subprocess.PIPE if stdin else subprocess.DEVNULL,
+        bufsize=bufsize or -1,
+        env=env,
+    )
+
+
+class IngestStream:
+    """
+    One camera stream read once and fanned out to recording and readers.
+
+    A supervisor thread owns the source ffmpeg: it (re)starts it when the
+    recording output changes and restarts it with backoff when it exits. The
+    same thread forwards the relay pipe to the decoder with
+    non-blocking writes (a slow decoder drops data instead of stalling the
+    recording) and starts, restarts or idles the decoder as readers need.
+    """
+
+    def __init__(
+        self,
+        camera_id: str,
+        rtsp_url: str,
+        transport: str = "tcp",
+        segment_time: int = 60,
+        spawn: Optional[Spawner] = None,
+    ):
+        self.camera_id = camera_id
+        self.rtsp_url = rtsp_url
+        self.transport = transport
+        self.segment_time = segment_time
+        self.output_pattern: Optional[str] = None
+        # Decoded output size (width, height); None = record only.
+        self.frame_size: Optional[Tuple[int, int]] = None
+        self.readers = 0
+        self.restarts = 0
+        self.decoder_starts = 0
+        self.relay_dropped = 0
+        self.frames = 0
+        self._spawn = spawn or _default_spawn
+        self._process: Optional[subprocess.Popen] = None
+        self._decoder: Optional[subprocess.Popen] = None
+        self._decoder_dirty = False
+        self._idle_since: Optional[float] = None
+        self._cond = threading.Condition()
+        self._frame: Optional[np.ndarray] = None
+        self._frame_ts = 0.0
+        self._seq = 0
+        self._dirty = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Consumers
+    # ------------------------------------------------------------------
+
+    def set_recording(self, output_pattern: Optional[str]) -> None:
+        with self._cond:
+            if output_pattern == self.output_pattern:
+                return
+            self.output_pattern = output_pattern
+        self._reconfigure()
+
+    def add_reader(self, frame_size: Tuple[int, int]) -> None:
+        size = (int(frame_size[0]), int(frame_size[1]))
+        with self._cond:
+            self.readers += 1
+            self._idle_since = None
+            if size != self.frame_size:
+                self.frame_size = size
+                self._decoder_dirty = True
+
+    def remove_reader(self) -> None:
+        with self._cond:
+            self.readers = max(0, self.readers - 1)
+            if self.readers == 0:
+                self._idle_since = time.monotonic()
+
+    def read(self, after_seq: int, timeout: float = READ_TIMEOUT_SECONDS) -> Tuple[int, Optional[np.ndarray]]:
+        """Wait for a frame newer than after_seq; returns (seq, frame or None)."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._seq <= after_seq and not self._stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return after_seq, None
+                self._cond.wait(remaining)
+            if self._seq <= after_seq:
+                return after_seq, None
+            return self._seq, self._frame
+
+    @property
+    def seq(self) -> int:
+        with self._cond:
+            return self._seq
+
+    def latest_frame(self, max_age: float = READ_TIMEOUT_SECONDS) -> Optional[np.ndarray]:
+        with self._cond:
+            if self._frame is None or time.time() - self._frame_ts > max_age:
+                return None
+            return self._frame
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run,
+            daemon=True,
+            name=f"ingest-{self.camera_id}",
+        )
+        self._thread.start()
+
+    def restart(self) -> None:
+        """Restart decoding (e.g. the detector saw a frozen stream); recording keeps running."""
+        with self._cond:
+            self._decoder_dirty = True
+            decoder = self._decoder
+        self._terminate(decoder)
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        self._terminate(self._process)
+        self._terminate(self._decoder)
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._cond:
+            frame_age = time.time() - self._frame_ts if self._frame_ts else None
+            return {
+                "url": redact_rtsp_url(self.rtsp_url),
+                "running": self.is_running(),
+                "recording": bool(self.output_pattern),
+                "decoding": self._decoder is not None and self._decoder.poll() is None,
+                "readers": self.readers,
+                "frames": self.frames,
+                "restarts": self.restarts,
+                "decoder_starts": self.decoder_starts,
+                "relay_dropped": self.relay_dropped,
+                "last_frame_age_s": round(frame_age, 2) if frame_age is not None else None,
+            }
+
+    def _reconfigure(self) -> None:
+        with self._cond:
+            self._dirty = True
+            process = self._process
+        self._terminate(process)
+
+    # ------------------------------------------------------------------
+    # Supervisor
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        backoff = RESTART_BACKOFF_MIN
+        if self._stop.wait(SETTLE_SECONDS):
+            return
+        while not self._stop.is_set():
+            with self._cond:
+                self._dirty = False
+                pattern = self.output_pattern
+            process = self._start_process(pattern)
+            if process is None:
+                if self._stop.wait(backoff):
+                    return
+                backoff = min(backoff * 2, RESTART_BACKOFF_MAX)
+                continue
+
+            started = time.monotonic()
+            try:
+                self._relay(process)
+                process.wait()
+            except Exception as exc:
+                logger.debug("Ingest %s read error: %s", self.camera_id, exc)
+            finally:
+                self._terminate(process)
+                with self._cond:
+                    self._process = None
+
+            with self._cond:
+                reconfigured = self._dirty
+            if self._stop.is_set():
+                return
+            if reconfigured:
+                backoff = RESTART_BACKOFF_MIN
+                continue
+            self.restarts += 1
+            if time.monotonic() - started >= STABLE_RUN_SECONDS:
+                backoff = RESTART_BACKOFF_MIN
+            logger.warning(
+                "Ingest ffmpeg exited for camera %s (rc=%s); restarting in %.0fs",
+                self.camera_id,
+                process.returncode,
+                backoff,
+            )
+            if self._stop.wait(backoff):
+                return
+            backoff = min(backoff * 2, RESTART_BACKOFF_MAX)
+
+    def _start_process(self, output_pattern: Optional[str]) -> Optional[subprocess.Popen]:
+        if not output_pattern:
+            return None
+        ffmpeg = shutil.which("ffmpeg") or "ffmpeg"
+        cmd = build_ingest_command(
+            ffmpeg,
+            self.rtsp_url,
+            transport=self.transport,
+            output_pattern=output_pattern,
+            segment_time=self.segment_time,
+            relay=True,
+        )
+        try:
+            process = self._spawn(cmd, RELAY_CHUNK_BYTES * 4, False)
+        except Exception as exc:
+            logger.error("Failed to start ingest for camera %s: %s", self.camera_id, exc)
+            return None
+        with self._cond:
+            self._process = process
+            reconfigured = self._dirty
+        if self._stop.is_set():
+            self._terminate(process)
+            return None
+        if reconfigured:
+            # Outputs changed while spawning; the loop restarts right away.
+            self._terminate(process)
+        logger.info(
+            "Ingest started for camera %s (PID: %s)",
+            self.camera_id,
+            process.pid,
+        )
+        return process
+
+    # ------------------------------------------------------------------
+    # Relay and decoder
+    # ------------------------------------------------------------------
+
+    def _relay(self, process: subprocess.Popen) -> None:
+        """Forward the source's MPEG-TS pipe to the decoder until the source exits."""
+        stdout = process.stdout
+        if stdout is None:
+            return
+        fd = stdout.fileno()
+        decoder: Optional[subprocess.Popen] = None
+        next_start = 0.0
+        try:
+            while not self._stop.is_set():
+                chunk = os.read(fd, RELAY_CHUNK_BYTES)
+                if not chunk:
+                    return
+                decoder, next_start = self._sync_decoder(decoder, next_start)
+                if decoder is not None:
+                    self._feed(decoder, chunk)
+        finally:
+            # A new source connection starts a new TS stream; decode it afresh.
+            self._stop_decoder(decoder)
+
+    def _sync_decoder(
+        self,
+        decoder: Optional[subprocess.Popen],
+        next_start: float,
+    ) -> Tuple[Optional[subprocess.Popen], float]:
+        """Start, restart or stop the decoder to match the readers."""
+        now = time.monotonic()
+        with self._cond:
+            frame_size = self.frame_size
+            idle = self.readers == 0 and (
+                self._idle_since is None or now - self._idle_since >= DECODE_IDLE_SECONDS
+            )
+            wanted = frame_size is not None and not idle
+            dirty = self._decoder_dirty
+            self._decoder_dirty = False
+        if decoder is not None and (not wanted or dirty or decoder.poll() is not None):
+            if not wanted:
+                logger.info("Ingest decoder for camera %s idle; stopping", self.camera_id)
+            self._stop_decoder(decoder)
+            decoder = None
+        if decoder is None and wanted and now >= next_start:
+            decoder = self._start_decoder(frame_size)
+            next_start = now + RESTART_BACKOFF_MIN
+        return decoder, next_start
+
+    def _start_decoder(self, frame_size: Tuple[int, int]) -> Optional[subprocess.Popen]:
+        ffmpeg = shutil.which("ffmpeg") or "ffmpeg"
+        try:
+            decoder = self._spawn(build_decode_command(ffmpeg), frame_size[0] * frame_size[1] * 3 * 2, True)
+            os.set_blocking(decoder.stdin.fileno(), False)
+        except Exception as exc:
+            logger.error("Failed to start ingest decoder for camera %s: %s", self.camera_id, exc)
+            return None
+        with self._cond:
+            self._decoder = decoder
+            self.decoder_starts += 1
+        threading.Thread(
+            target=self._pump_frames,
+            args=(decoder, frame_size),
+            daemon=True,
+            name=f"ingest-decode-{self.camera_id}",
+        ).start()
+        logger.info(
+            "Ingest decoder started for camera %s (PID: %s, %sx%s)",
+            self.camera_id,
+            decoder.pid,
+            frame_size[0],
+            frame_size[1],
+        )
+        return decoder
+
+    def _feed(self, decoder: subprocess.Popen, chunk: bytes) -> None:
+        try:
+            written = os.write(decoder.stdin.fileno(), chunk)
+        except BlockingIOError:
+            written = 0
+        except (OSError, ValueError):
+            # Decoder exited; _sync_decoder restarts it on the next chunk.
+            return
+        if written < len(chunk):
+            # Decoder behind: drop the rest (it resyncs on the next TS packet).
+            self.relay_dropped += 1
+
+    def _stop_decoder(self, decoder: Optional[subprocess.Popen]) -> None:
+        if decoder is None:
+            return
+        with self._cond:
+            if self._decoder is decoder:
+                self._decoder = None
+        try:
+            decoder.stdin.close()
+        except Exception:
+            pass
+        self._terminate(decoder)
+
+    def _pump_frames(self, process: subprocess.Popen, frame_size: Tuple[int, int]) -> None:
+        width, height = frame_size
+        frame_bytes = width * height * 3
+        stdout = process.stdout
+        if stdout is None:
+            return
+        while not self._stop.is_set():
+            raw = stdout.read(frame_bytes)
+            if not raw or len(raw) < frame_bytes:
+                return
+            frame = np.frombuffer(raw, dtype=np.uint8).reshape((height, width, 3))
+            with self._cond:
+                self._frame = frame
+                self._frame_ts = time.time()
+                self._seq += 1
+                self.frames += 1
+                self._cond.notify_all()
+
+    @staticmethod
+    def _terminate(process: Optional[subprocess.Popen]) -> None:
+        if process is None:
+            return
+        try:
+            if process.poll() is None:
+                process.terminate()
+                try:
+                    process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+        except Exception:
+            pass
+
+
+class IngestCapture:
+    """
+    cv2.VideoCapture-like reader over an IngestStream.
+
+    Each read returns a frame newer than the previous one; frames the
+    reader was too slow for are skipped rather than queued.
+    """
+
+    def __init__(self, manager: "IngestManager", stream: IngestStream, timeout: float = READ_TIMEOUT_SECONDS):
+        self._manager = manager
+        self.stream = stream
+        self.timeout = timeout
+        # Start from the next frame: the last one may predate an idle decoder.
+        self._seq = stream.seq
+        self._released = False
+
+    def isOpened(self) -> bool:
+        return not self._released and self.stream.is_running()
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self.isOpened():
+            return False, None
+        self._seq, frame = self.stream.read(self._seq, self.timeout)
+        return frame is not None, frame
+
+    def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        self._manager.release_capture(self.stream)
+
+    def set(self, prop_id: int, value: float) -> bool:
+        return False
+
+    def get(self, prop_id: int) -> float:
+        return 0.0
+
+
+class IngestManager:
+    """Owns the shared ingest streams, one per recorded camera."""
+
+    def __init__(self, spawn: Optional[Spawner] = None):
+        self.streams: Dict[str, IngestStream] = {}
+        self._lock = threading.Lock()
+        self._spawn = spawn
+
+    def start_recording(
+        self,
+        camera_id: str,
+        rtsp_url: str,
+        output_pattern: str,
+        transport: str = "tcp",
+        segment_time: int = 60,
+    ) -> IngestStream:
+        """Record camera_id through its shared stream, creating it if needed."""
+        stale = None
+        with self._lock:
+            stream = self.streams.get(camera_id)
+            if stream is not None and (stream.rtsp_url != rtsp_url or not stream.is_running()):
+                stale = self.streams.pop(camera_id)
+                stream = None
+            if stream is None:
+                stream = IngestStream(
+                    camera_id,
+                    rtsp_url,
+                    transport=transport,
+                    segment_time=segment_time,
+                    spawn=self._spawn,
+                )
+                self.streams[camera_id] = stream
+        if stale is not None:
+            stale.stop()
+        stream.set_recording(output_pattern)
+        stream.start()
+        return stream
+
+    def stop_recording(self, camera_id: str) -> None:
+        """Stop the camera's stream; attached readers fall back to their own capture."""
+        with self._lock:
+            stream = self.streams.pop(camera_id, None)
+        if stream is not None:
+            stream.stop()
+
+    def is_recording(self, camera_id: str, rtsp_url: Optional[str] = None) -> bool:
+        with self._lock:
+            stream = self.streams.get(camera_id)
+        if stream is None or not stream.is_running() or not stream.output_pattern:
+            return False
+        return rtsp_url is None or stream.rtsp_url == rtsp_url
+
+    def open_capture(
+        self,
+        camera_id: str,
+        rtsp_url: str,
+        frame_size: Tuple[int, int],
+        restart: bool = False,
+    ) -> Optional[IngestCapture]:
+        """
+        Attach a frame reader to the camera's recorded stream.
+
+        Returns None when that exact stream is not being recorded, in which
+        case the caller opens its own capture. ``restart`` restarts the
+        decoder only; the recording keeps running.
+        """
+        if not self.is_recording(camera_id, rtsp_url):
+            return None
+        with self._lock:
+            stream = self.streams.get(camera_id)
+        if stream is None:
+            return None
+        if restart:
+            stream.restart()
+        stream.add_reader(frame_size)
+        return IngestCapture(self, stream)
+
+    def release_capture(self, stream: IngestStream) -> None:
+        stream.remove_reader()
+
+    def latest_frame(self, camera_id: str, max_age: float = READ_TIMEOUT_SECONDS) -> Optional[np.ndarray]:
+        with self._lock:
+            stream = self.streams.get(camera_id)
+        return stream.latest_frame(max_age) if stream is not None else None
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            streams = dict(self.streams)
+        return {camera_id: stream.get_stats() for camera_id, stream in streams.items()}
+
+    def stop(self) -> None:
+        with self._lock:
+            streams = list(self.streams.values())
+            self.streams.clear()
+        for stream in streams:
+            stream.stop()
+
+
+# Global singleton instance
+_ingest_manager: Optional[IngestManager] = None
+
+
+def get_ingest_manager() -> IngestManager:
+    """
+    Get or create the global ingest manager.
+
+    Returns:
+        IngestManager: Global manager instance
+    """
+    global _ingest_manager
+    if _ingest_manager is None:
+        _ingest_manager = IngestManager()
+    return _ingest_manager
@@ -0,0 +1,299 @@
+"""
+Live frame publisher for MJPEG viewers.
+
+Encodes each new frame once per JPEG quality level and fans the bytes out
+to every subscriber, instead of encoding (or opening an RTSP connection)
+per viewer. A publisher only runs while it has subscribers.
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from typing import AsyncIterator, Callable, Dict, Optional, Set, Tuple
+
+import cv2
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+# Publishers with no subscribers linger briefly so quick reconnects (page
+# reloads) do not reopen the source.
+IDLE_LINGER_SECONDS = 2.0
+
+FrameReader = Callable[[], Optional[np.ndarray]]
+
+
+def _frame_fingerprint(frame: np.ndarray) -> bytes:
+    """Cheap fingerprint used to detect that the source produced a new frame."""
+    sample = frame[::16, ::16]
+    return hashlib.blake2b(sample.tobytes(), digest_size=16).digest()
+
+
+class _Subscriber:
+    """One viewer: a latest-frame-wins queue on the viewer's event loop."""
+
+    def __init__(self, quality: int, loop: asyncio.AbstractEventLoop):
+        self.quality = quality
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+
+    def offer(self, payload: bytes) -> None:
+        """Replace any undelivered frame with the newest one. Runs on loop."""
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+        self.queue.put_nowait(payload)
+
+
+class LiveFramePublisher:
+    """
+    Per-source frame producer shared by all viewers of that source.
+
+    A single thread pulls frames from the reader, encodes each new frame
+    once per requested quality and hands the bytes to all subscribers.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        reader: FrameReader,
+        fps: float,
+        dedupe: bool = True,
+        on_close: Optional[Callable[[], None]] = None,
+    ):
+        self.key = key
+        self.reader = reader
+        self.interval = 1.0 / max(float(fps), 1.0)
+        self.dedupe = dedupe
+        self.on_close = on_close
+        self._subscribers: Set[_Subscriber] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._closed = False
+        self._idle_since: Optional[float] = None
+        self._latest: Dict[int, bytes] = {}
+        self._latest_ts: float = 0.0
+        self.frames_encoded = 0
+        self.frames_skipped = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    @property
+    def closed(self) -> bool:
+        """True once the thread has exited (or is exiting) and released the source."""
+        with self._lock:
+            return self._closed
+
+    def add(self, subscriber: _Subscriber) -> bool:
+        """
+        Attach a subscriber, starting the thread on first use.
+
+        Returns:
+            False if the publisher has shut down; the caller needs a new one
+        """
+        with self._lock:
+            if self._closed:
+                return False
+            self._subscribers.add(subscriber)
+            self._idle_since = None
+            cached = self._latest.get(subscriber.quality)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run,
+                    daemon=True,
+                    name=f"live-{self.key}",
+                )
+                self._thread.start()
+        if cached is not None:
+            subscriber.offer(cached)
+        return True
+
+    def remove(self, subscriber: _Subscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+            if not self._subscribers:
+                self._idle_since = time.monotonic()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._closed = True
+        self._stop.set()
+        thread = self._thread
+        if thread and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=2.0)
+
+    def latest_jpeg(self, quality: int, max_age: float) -> Optional[bytes]:
+        """Most recent encoded frame at quality, if fresh enough."""
+        if time.monotonic() - self._latest_ts > max_age:
+            return None
+        return self._latest.get(quality)
+
+    def _run(self) -> None:
+        last_fingerprint: Optional[bytes] = None
+        try:
+            while not self._stop.is_set():
+                started = time.monotonic()
+                with self._lock:
+                    subscribers = list(self._subscribers)
+                    # Decide to exit under the lock add() takes, so a viewer
+                    # joining now either keeps us running or sees closed.
+                    if (
+                        not subscribers
+                        and self._idle_since is not None
+                        and started - self._idle_since >= IDLE_LINGER_SECONDS
+                    ):
+                        self._closed = True
+                        break
+                if not subscribers:
+                    # Paused: no encoding while nobody watches.
+                    self._stop.wait(0.2)
+                    continue
+
+                frame = self.reader()
+                if frame is None:
+                    self._stop.wait(0.2)
+                    continue
+                if self.dedupe:
+                    fingerprint = _frame_fingerprint(frame)
+                    if fingerprint == last_fingerprint:
+                        self.frames_skipped += 1
+                        self._stop.wait(self.interval)
+                        continue
+                    last_fingerprint = fingerprint
+
+                encoded: Dict[int, bytes] = {}
+                for quality in {sub.quality for sub in subscribers}:
+                    ok, buffer = cv2.imencode(".jpg", frame, [int(cv2.IMWRITE_JPEG_QUALITY), quality])
+                    if ok:
+                        encoded[quality] = buffer.tobytes()
+                        self.frames_encoded += 1
+                if encoded:
+                    self._latest = encoded
+                    self._latest_ts = time.monotonic()
+                for sub in subscribers:
+                    payload = encoded.get(sub.quality)
+                    if payload is None:
+                        continue
+                    try:
+                        sub.loop.call_soon_threadsafe(sub.offer, payload)
+                    except RuntimeError:
+                        self.remove(sub)
+
+                elapsed = time.monotonic() - started
+                if elapsed < self.interval:
+                    self._stop.wait(self.interval - elapsed)
+        except Exception as e:
+            logger.warning("Live publisher %s stopped: %s", self.key, e)
+        finally:
+            with self._lock:
+                self._closed = True
+            if self.on_close:
+                try:
+                    self.on_close()
+                except Exception:
+                    pass
+
+
+class LiveFrameHub:
+    """Registry of live frame publishers keyed by source."""
+
+    def __init__(self):
+        self._publishers: Dict[str, LiveFramePublisher] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(
+        self,
+        key: str,
+        reader_factory: Callable[[], Tuple[FrameReader, Optional[Callable[[], None]]]],
+        fps: float,
+        dedupe: bool,
+    ) -> LiveFramePublisher:
+        with self._lock:
+            publisher = self._publishers.get(key)
+            if publisher is None or publisher.closed:
+                reader, on_close = reader_factory()
+                publisher = LiveFramePublisher(key, reader, fps, dedupe=dedupe, on_close=on_close)
+                self._publishers[key] = publisher
+            return publisher
+
+    async def subscribe(
+        self,
+        key: str,
+        reader_factory: Callable[[], Tuple[FrameReader, Optional[Callable[[], None]]]],
+        fps: float,
+        quality: int,
+        dedupe: bool = True,
+    ) -> AsyncIterator[bytes]:
+        """
+        Yield JPEG frames for a source until the consumer stops iterating.
+
+        Args:
+            key: Source identity shared by viewers (e.g. "worker:<camera_id>")
+            reader_factory: Returns (frame reader, optional close callback);
+                only called when a new publisher is needed
+            fps: Upper bound on frames produced per second
+            quality: JPEG quality for this viewer
+            dedupe: Skip frames identical to the previous one
+        """
+        subscriber = _Subscriber(int(quality), asyncio.get_running_loop())
+        publisher = self._get_or_create(key, reader_factory, fps, dedupe)
+        # A publisher may shut down between lookup and add; take a fresh one.
+        while not publisher.add(subscriber):
+            publisher = self._get_or_create(key, reader_factory, fps, dedupe)
+        try:
+            while True:
+                yield await subscriber.queue.get()
+        finally:
+            publisher.remove(subscriber)
+
+    def latest_jpeg(self, key: str, quality: int, max_age: float = 1.0) -> Optional[bytes]:
+        """Reuse a freshly published frame (e.g. for snapshots) if one exists."""
+        with self._lock:
+            publisher = self._publishers.get(key)
+        if publisher is None:
+            return None
+        return publisher.latest_jpeg(int(quality), max_age)
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            publishers = dict(self._publishers)
+        return {
+            key: {
+                "subscribers": pub.subscriber_count,
+                "frames_encoded": pub.frames_encoded,
+                "frames_skipped": pub.frames_skipped,
+            }
+            for key, pub in publishers.items()
+        }
+
+    def stop(self) -> None:
+        with self._lock:
+            publishers = list(self._publishers.values())
+            self._publishers.clear()
+        for publisher in publishers:
+            publisher.stop()
+
+
+# Global singleton instance
+_live_frame_hub: Optional[LiveFrameHub] = None
+
+
+def get_live_frame_hub() -> LiveFrameHub:
+    """
+    Get or create the global live frame hub.
+
+    Returns:
+        LiveFrameHub: Global hub instance
+    """
+    global _live_frame_hub
+    if _live_frame_hub is None:
+        _live_frame_hub = LiveFrameHub()
+    return _live_frame_hub
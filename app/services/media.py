@@ -12,7 +12,7 @@ from contextlib import contextmanager
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 # Delay before trying to replace event MP4 from recording (segment must be closed: 60s + margin)
 RECORDING_MP4_DELAY_SEC = 65  # > 60s segment duration to ensure segment is fully written
@@ -22,8 +22,10 @@ import numpy as np
 from sqlalchemy.orm import Session
 
 from app.db.models import Event
+from app.db.writer import get_db_writer
 from app.services.recorder import get_continuous_recorder
 from app.services.settings import get_settings_service
+from app.services.system_stats import get_data_usage
 from app.services.video_analyzer import analyze_video
 from app.workers.media import get_media_worker
 from app.utils.paths import DATA_DIR
@@ -35,6 +37,8 @@ MEDIA_MAX_CONCURRENCY = max(1, int(os.getenv("MEDIA_MAX_CONCURRENCY", "2")))
 _MEDIA_SEMAPHORE = threading.BoundedSemaphore(MEDIA_MAX_CONCURRENCY)
 MIN_VALID_MP4_DURATION_SEC = 2.0
 MAX_VALID_DUPLICATE_PERCENT = 85.0
+# Event preview files, in lookup order (one per event, format per media.preview_format).
+PREVIEW_FILES = ("preview.webp", "preview.mp4", "preview.gif")
 
 
 @contextmanager
@@ -91,7 +95,9 @@ def _replace_mp4_from_recording(
                 # If stat fails, continue and allow recorder extraction attempt.
                 pass
         recorder = get_continuous_recorder()
-        if recorder.extract_clip(camera_id, start_utc, end_utc, mp4_path, speed_factor=speed_factor):
+        with get_data_usage().track(mp4_path):
+            extracted = recorder.extract_clip(camera_id, start_utc, end_utc, mp4_path, speed_factor=speed_factor)
+        if extracted:
             logger.info(
                 "Event MP4 replaced from recording (delayed extract) camera=%s %s–%s",
                 camera_id,
@@ -117,9 +123,10 @@ class MediaService:
     def __init__(self):
         """Initialize media service."""
         self.media_worker = get_media_worker()
+        self.data_usage = get_data_usage()
         self.MEDIA_DIR.mkdir(parents=True, exist_ok=True)
 
-    def generate_collage_for_ai(
+    def render_collage_for_ai(
         self,
         db: Session,
         event_id: str,
@@ -127,25 +134,32 @@ class MediaService:
         detections: List[Optional[Dict]],
         timestamps: Optional[List[float]] = None,
         camera_name: str = "Camera",
-    ) -> Optional[Path]:
-        """Create a person-focused, lightweight collage for faster AI pre-check."""
+    ) -> Optional[Tuple[Path, bytes]]:
+        """
+        Create the AI collage and return both its path and encoded bytes.
+        
+        The bytes can be handed straight to AIService.analyze_event so the
+        collage is never read back from disk.
+        """
         event = db.query(Event).filter(Event.id == event_id).first()
         if not event or len(frames) == 0:
             return None
         event_dir = self.MEDIA_DIR / event_id
         event_dir.mkdir(parents=True, exist_ok=True)
-        collage_path = str(event_dir / "collage_ai.jpg")
+        collage_path = event_dir / "collage_ai.jpg"
         try:
-            self.media_worker.create_ai_collage(
+            data = self.media_worker.encode_ai_collage(
                 frames,
                 detections,
                 timestamps,
-                collage_path,
                 camera_name,
                 event.timestamp,
                 event.confidence,
             )
-            return Path(collage_path) if os.path.exists(collage_path) else None
+            with self.data_usage.track(collage_path):
+                collage_path.write_bytes(data)
+            logger.info("AI collage created: %s (%.1fKB)", collage_path, len(data) / 1024.0)
+            return collage_path, data
         except Exception as e:
             logger.warning("Collage for AI failed: %s", e)
             return None
@@ -167,15 +181,16 @@ class MediaService:
         event_dir.mkdir(parents=True, exist_ok=True)
         collage_path = str(event_dir / "collage.jpg")
         try:
-            self.media_worker.create_collage(
-                frames,
-                detections,
-                timestamps,
-                collage_path,
-                camera_name,
-                event.timestamp,
-                event.confidence,
-            )
+            with self.data_usage.track(collage_path):
+                self.media_worker.create_collage(
+                    frames,
+                    detections,
+                    timestamps,
+                    collage_path,
+                    camera_name,
+                    event.timestamp,
+                    event.confidence,
+                )
             return Path(collage_path) if os.path.exists(collage_path) else None
         except Exception as e:
             logger.warning("Collage for review failed: %s", e)
@@ -229,7 +244,6 @@ class MediaService:
         
         # Output paths
         collage_path = str(event_dir / "collage.jpg")
-        gif_path = str(event_dir / "preview.gif")
         mp4_path = str(event_dir / "timelapse.mp4")
 
         def _mp4_is_usable(path: str) -> tuple[bool, str]:
@@ -263,7 +277,7 @@ class MediaService:
                 logger.warning("Recording regen failed for %s: %s", event_id, exc)
                 return False
         
-        with _media_slot(event_id):
+        with _media_slot(event_id), self.data_usage.track(event_dir):
             # MP4: prefer continuous recording, fallback to frames when recording unavailable
             mp4_from_recording = False
             speed_factor = 4.0
@@ -305,8 +319,10 @@ class MediaService:
             try:
                 _config = get_settings_service().load_config()
                 overlay_use_utc = getattr(_config.live, "overlay_timezone", "local") == "utc"
+                preview_format = getattr(_config.media, "preview_format", "webp")
             except Exception:
                 overlay_use_utc = False
+                preview_format = "webp"
             worker_count = 1 + (0 if mp4_from_recording else 1) + (1 if include_gif else 0)
             errors: List[Exception] = []
             with ThreadPoolExecutor(max_workers=max(1, worker_count)) as executor:
@@ -340,13 +356,14 @@ class MediaService:
                     ))
                 if include_gif:
                     tasks.append((
-                        "gif",
+                        "preview",
                         executor.submit(
-                            self.media_worker.create_timeline_gif,
+                            self.media_worker.create_preview,
                             frames,
-                            gif_path,
+                            str(event_dir / f"preview.{preview_format}"),
                             camera_name,
                             event.timestamp,
+                            preview_format,
                         ),
                     ))
                 for label, future in tasks:
@@ -383,10 +400,21 @@ class MediaService:
                             dup_val = float(reason.split("duplicate:")[1].rstrip("%"))
                             # Conservative cleanup: only delete when duplicate ratio
                             # is near-total and detector confidence is very low.
-                            if dup_val >= 99.5 and float(getattr(event, "confidence", 0.0) or 0.0) < 0.50:
-                                db.delete(event)
-                                db.commit()
+                            # The fast gate samples pairs; confirm over every frame
+                            # before deleting anything.
+                            low_confidence = float(getattr(event, "confidence", 0.0) or 0.0) < 0.50
+                            if dup_val >= 99.5 and low_confidence:
+                                deep = analyze_video(mp4_path, deep=True) or {}
+                                dup_val = float(deep.get("analysis", {}).get("duplicate_percentage", 0.0) or 0.0)
+                            if dup_val >= 99.5 and low_confidence:
+                                get_db_writer().apply(
+                                    db,
+                                    lambda session: session.query(Event).filter(Event.id == event_id).delete(
+                                        synchronize_session=False
+                                    ),
+                                )
                                 import shutil
+                                # Accounted by the track(event_dir) around this block.
                                 if os.path.exists(str(event_dir)):
                                     shutil.rmtree(str(event_dir), ignore_errors=True)
                                 logger.info(
@@ -427,22 +455,26 @@ class MediaService:
                 timer.start()
             
             # Save URLs to database WITHOUT prefix (prefix added at runtime in main.py)
-            event.collage_url = f"/api/events/{event_id}/collage" if os.path.exists(collage_path) else None
-            event.gif_url = f"/api/events/{event_id}/preview.gif" if os.path.exists(gif_path) else None
-            # MP4: dosya varsa URL ver (.legacy = OpenCV fallback kullanıldı, yine de oynatılabilir)
-            mp4_ok = os.path.exists(mp4_path)
-            event.mp4_url = f"/api/events/{event_id}/timelapse.mp4" if mp4_ok else None
-            if not mp4_ok and event.collage_url:
+            preview_path = self.get_media_path(event_id, "preview")
+            urls = {
+                "collage_url": f"/api/events/{event_id}/collage" if os.path.exists(collage_path) else None,
+                "gif_url": f"/api/events/{event_id}/preview.gif" if preview_path and preview_path.suffix == ".gif" else None,
+                # MP4: dosya varsa URL ver (.legacy = OpenCV fallback kullanıldı, yine de oynatılabilir)
+                "mp4_url": f"/api/events/{event_id}/timelapse.mp4" if os.path.exists(mp4_path) else None,
+            }
+            if not urls["mp4_url"] and urls["collage_url"]:
                 logger.warning("Event %s: collage exists but MP4 missing (create_timelapse_mp4 or fallback failed)", event_id)
-            db.commit()
+            get_db_writer().apply(
+                db,
+                lambda session: session.query(Event).filter(Event.id == event_id).update(
+                    urls, synchronize_session=False
+                ),
+            )
+            db.refresh(event)
             
             logger.info(f"Event media generated: {event_id}")
             
-            return {
-                "collage_url": event.collage_url,
-                "gif_url": event.gif_url,
-                "mp4_url": event.mp4_url,
-            }
+            return dict(urls)
     
     def validate_id(self, id_str: str) -> bool:
         """Validate ID to prevent path traversal."""
@@ -531,6 +563,40 @@ class MediaService:
             logger.debug("Recording frame fallback failed for event %s: %s", event_id, exc)
             return []
 
+    def rebuild_collage_for_ai(
+        self,
+        event_id: str,
+        camera_name: str = "Camera",
+        timestamp: Optional[datetime] = None,
+        confidence: float = 0.0,
+    ) -> Optional[bytes]:
+        """
+        Render the AI collage of a stored event in memory.
+
+        Frames come from the event MP4 (or the continuous recording); the
+        bytes are handed to AIService.analyze_event like the live pipeline
+        does, nothing is written.
+        """
+        if not self.validate_id(event_id):
+            return None
+        frames = self._extract_frames_from_mp4(self.MEDIA_DIR / event_id / "timelapse.mp4", max_frames=18)
+        if not frames:
+            frames = self._extract_frames_from_recording(event_id, max_frames=18)
+        if not frames:
+            return None
+        try:
+            return self.media_worker.encode_ai_collage(
+                frames,
+                [None] * len(frames),
+                None,
+                camera_name,
+                timestamp,
+                confidence,
+            )
+        except Exception as e:
+            logger.warning("AI collage rebuild failed for event %s: %s", event_id, e)
+            return None
+
     def _is_ai_collage_shape(self, collage_path: Path) -> bool:
         """Detect old AI collage accidentally saved as user collage."""
         try:
@@ -572,15 +638,16 @@ class MediaService:
             return collage_path
 
         try:
-            self.media_worker.create_collage(
-                frames=frames,
-                detections=[None] * len(frames),
-                timestamps=None,
-                output_path=str(collage_path),
-                camera_name=camera_name,
-                timestamp=None,
-                confidence=0.0,
-            )
+            with self.data_usage.track(collage_path):
+                self.media_worker.create_collage(
+                    frames=frames,
+                    detections=[None] * len(frames),
+                    timestamps=None,
+                    output_path=str(collage_path),
+                    camera_name=camera_name,
+                    timestamp=None,
+                    confidence=0.0,
+                )
             logger.info("Rebuilt user collage from MP4 for event %s", event_id)
         except Exception as e:
             logger.warning("Failed to rebuild user collage for event %s: %s", event_id, e)
@@ -592,7 +659,8 @@ class MediaService:
         
         Args:
             event_id: Event ID
-            media_type: Media type (collage, gif, mp4)
+            media_type: Media type (collage, gif, webp, mp4, preview).
+                "preview" is the event preview in whichever format was written.
             
         Returns:
             Path to media file if exists, None otherwise
@@ -605,8 +673,13 @@ class MediaService:
         
         if media_type == "collage":
             path = event_dir / "collage.jpg"
-        elif media_type == "gif":
-            path = event_dir / "preview.gif"
+        elif media_type == "preview":
+            for name in PREVIEW_FILES:
+                if (event_dir / name).exists():
+                    return event_dir / name
+            return None
+        elif media_type in ("gif", "webp"):
+            path = event_dir / f"preview.{media_type}"
         elif media_type == "mp4":
             path = event_dir / "timelapse.mp4"
         else:
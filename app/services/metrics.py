@@ -4,7 +4,7 @@ Prometheus metrics service for Thermal Dual Vision.
 Exports performance metrics for monitoring and alerting.
 """
 import logging
-from typing import Optional
+from typing import Iterable, Optional
 
 try:
     from prometheus_client import Counter, Gauge, Histogram, start_http_server, REGISTRY
@@ -93,6 +93,26 @@ class MetricsService:
             ['camera_id']
         )
         
+        self.system_cpu = Gauge(
+            'thermal_vision_system_cpu_percent',
+            'Host CPU usage percentage (system stats collector)'
+        )
+        
+        self.system_memory = Gauge(
+            'thermal_vision_system_memory_used_bytes',
+            'Host memory in use'
+        )
+        
+        self.process_cpu = Gauge(
+            'thermal_vision_process_cpu_percent',
+            'CPU usage of this process (100 = one core)'
+        )
+        
+        self.data_dir_size = Gauge(
+            'thermal_vision_data_dir_bytes',
+            'Size of the data directory (media, recordings, database)'
+        )
+        
         # Stream metrics
         self.stream_frames_read = Counter(
             'thermal_vision_stream_frames_read_total',
@@ -118,6 +138,47 @@ class MetricsService:
             ['camera_id']
         )
         
+        # WebSocket broadcaster metrics
+        self.websocket_connections = Gauge(
+            'thermal_vision_websocket_connections',
+            'Connected WebSocket clients'
+        )
+        
+        self.websocket_queue_depth = Gauge(
+            'thermal_vision_websocket_queue_depth',
+            'Deepest per-client WebSocket send queue'
+        )
+        
+        self.websocket_dropped_total = Counter(
+            'thermal_vision_websocket_dropped_total',
+            'WebSocket messages dropped due to backpressure'
+        )
+        
+        # MQTT outbound pipeline metrics
+        self.mqtt_queue_depth = Gauge(
+            'thermal_vision_mqtt_queue_depth',
+            'Messages waiting in the MQTT outbound queue'
+        )
+        
+        self.mqtt_publish_latency = Histogram(
+            'thermal_vision_mqtt_publish_latency_seconds',
+            'Time from enqueue to broker publish',
+            buckets=[0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0]
+        )
+        
+        # Frame-change gate metrics
+        self.frame_gate_total = Counter(
+            'thermal_vision_frame_gate_total',
+            'Inference requests answered by the frame-change gate (hit) or by the model (miss)',
+            ['camera_id', 'result']
+        )
+        
+        # API event loop health
+        self.event_loop_lag = Gauge(
+            'thermal_vision_event_loop_lag_seconds',
+            'How late the API event loop woke from its last scheduled sleep'
+        )
+        
         logger.info("MetricsService initialized (Prometheus available)")
     
     def start_server(self, port: int = 9090) -> None:
@@ -227,6 +288,47 @@ class MetricsService:
         """Set camera connection status."""
         if self.enabled:
             self.camera_status.labels(camera_id=camera_id).set(1 if connected else 0)
+    
+    def record_frame_gate(self, camera_id: str, hit: bool, count: int = 1) -> None:
+        """Record frame-change gate lookups (count of them, for batched reports)."""
+        if self.enabled and count > 0:
+            self.frame_gate_total.labels(camera_id=camera_id, result="hit" if hit else "miss").inc(count)
+    
+    def set_websocket_stats(self, connections: int, queue_depth: int, dropped: int = 0) -> None:
+        """Set WebSocket broadcaster backpressure metrics."""
+        if self.enabled:
+            self.websocket_connections.set(connections)
+            self.websocket_queue_depth.set(queue_depth)
+            if dropped:
+                self.websocket_dropped_total.inc(dropped)
+    
+    def set_mqtt_stats(self, queue_depth: int, latencies_ms: Iterable[float] = ()) -> None:
+        """Set MQTT outbound queue depth and record publish latencies."""
+        if self.enabled:
+            self.mqtt_queue_depth.set(queue_depth)
+            for latency_ms in latencies_ms:
+                self.mqtt_publish_latency.observe(latency_ms / 1000.0)
+
+    
+    def set_system_stats(
+        self,
+        cpu_percent: float,
+        memory_bytes: int,
+        process_cpu_percent: float,
+        data_dir_bytes: Optional[int] = None,
+    ) -> None:
+        """Set host and process gauges from a system stats sample."""
+        if self.enabled:
+            self.system_cpu.set(cpu_percent)
+            self.system_memory.set(memory_bytes)
+            self.process_cpu.set(process_cpu_percent)
+            if data_dir_bytes is not None:
+                self.data_dir_size.set(data_dir_bytes)
+    
+    def set_event_loop_lag(self, lag_seconds: float) -> None:
+        """Set the latest API event loop lag sample."""
+        if self.enabled:
+            self.event_loop_lag.set(lag_seconds)
 
 
 # Global singleton instance
@@ -17,6 +17,43 @@ import numpy as np
 logger = logging.getLogger(__name__)
 
 
+def union_motion_bbox(
+    mask: Optional[np.ndarray],
+    min_blob_area: int = 8,
+    scale: float = 1.0,
+) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Union bounding box of motion blobs in a binary mask.
+
+    Args:
+        mask: uint8 foreground mask (non-zero = motion)
+        min_blob_area: Blobs smaller than this (mask pixels) are ignored
+        scale: Factor from mask coordinates to frame coordinates
+
+    Returns:
+        (x, y, w, h) in frame coordinates, or None when there is no motion
+    """
+    if mask is None or mask.size == 0:
+        return None
+    num_labels, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+    if num_labels <= 1:
+        return None
+    blobs = stats[1:]
+    blobs = blobs[blobs[:, cv2.CC_STAT_AREA] >= max(1, int(min_blob_area))]
+    if blobs.shape[0] == 0:
+        return None
+    x1 = int(blobs[:, cv2.CC_STAT_LEFT].min())
+    y1 = int(blobs[:, cv2.CC_STAT_TOP].min())
+    x2 = int((blobs[:, cv2.CC_STAT_LEFT] + blobs[:, cv2.CC_STAT_WIDTH]).max())
+    y2 = int((blobs[:, cv2.CC_STAT_TOP] + blobs[:, cv2.CC_STAT_HEIGHT]).max())
+    return (
+        int(x1 * scale),
+        int(y1 * scale),
+        int(np.ceil((x2 - x1) * scale)),
+        int(np.ceil((y2 - y1) * scale)),
+    )
+
+
 class MotionDetectionService:
     """
     Advanced motion detection service with background subtraction.
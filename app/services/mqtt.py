@@ -1,25 +1,48 @@
 """
 MQTT Service for Home Assistant Integration.
 Handles connection, discovery, and event publishing.
+
+All publishes go through an outbound queue drained by a dedicated
+publisher thread, so detection threads never block on broker I/O.
 """
 import json
 import logging
+import queue
 import threading
 import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Deque, Dict, List, Optional
 
 import paho.mqtt.client as mqtt
 from app.models.config import MqttConfig
 from app.db.session import session_scope
+from app.services.metrics import get_metrics_service
 from app.services.settings import get_settings_service
 
 logger = logging.getLogger(__name__)
 
+OUTBOUND_QUEUE_SIZE = 1000
+PUBLISH_BATCH_SIZE = 50
+QOS_ACK_TIMEOUT_SECONDS = 2.0
+LAST_MESSAGES_LIMIT = 50
+
 
 def _utc_now_naive() -> datetime:
     return datetime.now(timezone.utc).replace(tzinfo=None)
 
+
+@dataclass
+class _OutboundMessage:
+    topic: str
+    payload: str
+    qos: int = 0
+    retain: bool = False
+    track: Any = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
 class MqttService:
     """
     MQTT Service for Home Assistant Integration.
@@ -45,10 +68,19 @@ class MqttService:
         self._reconnect_lock = threading.Lock()
         self._reconnecting = False
         
+        # Outbound pipeline
+        self._outbound: "queue.Queue[_OutboundMessage]" = queue.Queue(maxsize=OUTBOUND_QUEUE_SIZE)
+        self._publisher_thread: Optional[threading.Thread] = None
+        self._retained_payloads: Dict[str, str] = {}
+        self._topic_prefix: Optional[str] = None
+        self._latencies_ms: Deque[float] = deque(maxlen=200)
+        self.dropped_count: int = 0
+        self.skipped_retained_count: int = 0
+        
         # Monitoring state (NEW)
         self.active_topics: set = set()
         self.publish_count: int = 0
-        self.last_messages: Dict[str, Dict[str, Any]] = {}  # topic → {payload, timestamp}
+        self.last_messages: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()  # topic → {payload, timestamp}
         self.connected_at: Optional[datetime] = None
         self.last_error: Optional[str] = None
         
@@ -66,6 +98,8 @@ class MqttService:
                 return
 
             self._stop_event.clear()
+            self._topic_prefix = config.topic_prefix
+            self._start_publisher()
             self._connect(config)
 
     def stop(self):
@@ -74,10 +108,20 @@ class MqttService:
             if self.client:
                 logger.info("Stopping MQTT client...")
                 self._stop_event.set()
+                if self._publisher_thread and self._publisher_thread.is_alive():
+                    self._publisher_thread.join(timeout=QOS_ACK_TIMEOUT_SECONDS + 1)
+                self._publisher_thread = None
                 self.client.loop_stop()
                 self.client.disconnect()
                 self.client = None
                 self.connected = False
+                self._retained_payloads.clear()
+            # Queued messages belong to the old connection; start() re-publishes state.
+            while True:
+                try:
+                    self._outbound.get_nowait()
+                except queue.Empty:
+                    break
 
     def restart(self):
         """Restart MQTT client (e.g. after config change)."""
@@ -120,9 +164,10 @@ class MqttService:
             logger.info("Connected to MQTT broker")
             self.connected = True
             self.connected_at = _utc_now_naive()
+            # The broker may have lost retained state while we were away.
+            self._retained_payloads.clear()
             if self.availability_topic:
-                self.client.publish(self.availability_topic, "online", retain=True)
-                self._track_publish(self.availability_topic, "online")
+                self._enqueue(self.availability_topic, "online", retain=True, track="online")
             # Publish discovery config on connect
             self.publish_discovery()
         else:
@@ -215,19 +260,19 @@ class MqttService:
                     self._publish_camera_state(cam=cam, latest=latest, prefix=prefix)
 
                 # Publish initial system status
-                self.client.publish(f"{prefix}/status", "ON", retain=True)
+                self._enqueue(f"{prefix}/status", "ON", retain=True)
         except Exception as e:
             logger.error(f"Failed to publish discovery: {e}")
 
     def _publish_ha_config(self, component: str, object_id: str, config: Dict[str, Any]):
         """Helper to publish HA discovery config."""
         discovery_topic = f"homeassistant/{component}/tdv/{object_id}/config"
-        self.client.publish(discovery_topic, json.dumps(config), retain=True)
+        self._enqueue(discovery_topic, json.dumps(config, sort_keys=True), qos=1, retain=True)
 
     def _clear_ha_config(self, component: str, object_id: str) -> None:
         """Clear HA discovery config (removes entity)."""
         discovery_topic = f"homeassistant/{component}/tdv/{object_id}/config"
-        self.client.publish(discovery_topic, "", retain=True)
+        self._enqueue(discovery_topic, "", qos=1, retain=True)
 
     def _get_device_info(self) -> Dict[str, str]:
         from app.version import __version__
@@ -317,7 +362,7 @@ class MqttService:
         )
 
     def _publish_camera_state(self, cam: Any, latest: Optional[Any], prefix: str) -> None:
-        self.client.publish(
+        self._enqueue(
             f"{prefix}/camera/{cam.id}/person",
             "OFF",
             retain=True,
@@ -346,7 +391,7 @@ class MqttService:
                     "summary": "No events yet",
                 }
             )
-        self.client.publish(
+        self._enqueue(
             f"{prefix}/camera/{cam.id}/event",
             payload,
             retain=True,
@@ -359,8 +404,7 @@ class MqttService:
         from app.db.models import Event
         from app.services.camera_crud import get_camera_crud_service
 
-        config = self.settings_service.load_config()
-        prefix = config.mqtt.topic_prefix
+        prefix = self._get_topic_prefix()
         availability_topic = self.availability_topic or f"{prefix}/availability"
         availability_fields = {
             "availability_topic": availability_topic,
@@ -392,18 +436,19 @@ class MqttService:
         """Remove a camera from HA discovery."""
         if not self.client or not self.connected:
             return
-        config = self.settings_service.load_config()
-        prefix = config.mqtt.topic_prefix
+        prefix = self._get_topic_prefix()
         safe_id = camera_id.replace("-", "_")
         self._clear_ha_config("binary_sensor", f"person_detected_{safe_id}")
         self._clear_ha_config("sensor", f"last_event_{safe_id}")
-        self.client.publish(f"{prefix}/camera/{camera_id}/person", "OFF", retain=True)
-        self.client.publish(f"{prefix}/camera/{camera_id}/event", "", retain=True)
+        self._enqueue(f"{prefix}/camera/{camera_id}/person", "OFF", retain=True)
+        self._enqueue(f"{prefix}/camera/{camera_id}/event", "", retain=True)
 
     def publish_event(self, event_data: Dict[str, Any], person_detected: bool = True):
         """
         Publish detection event.
         
+        Only enqueues the messages; the publisher thread does the broker I/O.
+        
         Args:
             event_data: Dict with event details (id, camera_id, summary, etc.)
             person_detected: Whether to set person binary sensor ON
@@ -412,8 +457,7 @@ class MqttService:
             return
 
         try:
-            config = self.settings_service.load_config().mqtt
-            prefix = config.topic_prefix
+            prefix = self._get_topic_prefix()
             camera_id = event_data.get("camera_id")
             if not camera_id:
                 return
@@ -434,25 +478,21 @@ class MqttService:
             # 1. Publish binary sensor state ON
             if person_detected:
                 person_topic = f"{prefix}/camera/{camera_id}/person"
-                self.client.publish(person_topic, "ON")
-                self._track_publish(person_topic, "ON")
+                self._enqueue(person_topic, "ON", track="ON")
             
             # 1b. Publish person count
             person_count = event_data.get("person_count", 1)
             count_topic = f"{prefix}/camera/{camera_id}/person_count"
-            self.client.publish(count_topic, str(person_count), retain=True)
-            self._track_publish(count_topic, person_count)
+            self._enqueue(count_topic, str(person_count), retain=True, track=person_count)
 
-            # 2. Publish event details (JSON)
+            # 2. Publish event details (JSON), serialized once for both topics
             payload = json.dumps(event_data, default=str)
             event_topic = f"{prefix}/camera/{camera_id}/event"
-            self.client.publish(event_topic, payload, retain=True)
-            self._track_publish(event_topic, event_data)
+            self._enqueue(event_topic, payload, retain=True, track=payload[:200])
             
             # 3. Publish global event feed
             events_topic = f"{prefix}/events"
-            self.client.publish(events_topic, payload)
-            self._track_publish(events_topic, event_data)
+            self._enqueue(events_topic, payload, track=payload[:200])
 
             # Note: The binary sensor will stay ON until expire_after (configured in discovery)
             # or we can explicitly turn it off after some time if we want logic here.
@@ -462,6 +502,131 @@ class MqttService:
             logger.error(f"Failed to publish event: {e}")
             self.last_error = str(e)
     
+    def _get_topic_prefix(self) -> str:
+        """Topic prefix cached at start; restart() picks up config changes."""
+        if self._topic_prefix is None:
+            self._topic_prefix = self.settings_service.load_config().mqtt.topic_prefix
+        return self._topic_prefix
+
+    def _enqueue(
+        self,
+        topic: str,
+        payload: str,
+        qos: int = 0,
+        retain: bool = False,
+        track: Any = None,
+    ) -> None:
+        """Queue a message for the publisher thread without blocking."""
+        message = _OutboundMessage(topic=topic, payload=payload, qos=qos, retain=retain, track=track)
+        try:
+            self._outbound.put_nowait(message)
+        except queue.Full:
+            # Drop the oldest message; fresh state is more useful than stale.
+            try:
+                self._outbound.get_nowait()
+                self.dropped_count += 1
+            except queue.Empty:
+                pass
+            try:
+                self._outbound.put_nowait(message)
+            except queue.Full:
+                self.dropped_count += 1
+
+    def _start_publisher(self) -> None:
+        if self._publisher_thread and self._publisher_thread.is_alive():
+            return
+        self._publisher_thread = threading.Thread(
+            target=self._publisher_loop,
+            daemon=True,
+            name="mqtt-publisher",
+        )
+        self._publisher_thread.start()
+
+    def _publisher_loop(self) -> None:
+        """Drain the outbound queue in batches until stopped."""
+        while not self._stop_event.is_set():
+            try:
+                first = self._outbound.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            batch = [first]
+            while len(batch) < PUBLISH_BATCH_SIZE:
+                try:
+                    batch.append(self._outbound.get_nowait())
+                except queue.Empty:
+                    break
+            self._publish_batch(batch)
+
+    def _publish_batch(self, batch: List[_OutboundMessage]) -> None:
+        """
+        Publish a batch of messages.
+        
+        QoS 0 messages are fire-and-forget; acknowledgements for QoS 1/2
+        messages are awaited once per batch instead of per message.
+        """
+        client = self.client
+        if client is None:
+            self.dropped_count += len(batch)
+            return
+        pending_acks = []
+        latencies_ms: List[float] = []
+        for message in batch:
+            if message.retain and self._retained_payloads.get(message.topic) == message.payload:
+                self.skipped_retained_count += 1
+                continue
+            # Any publish replaces what subscribers hold for the topic; a later
+            # retained copy of the old payload must go out again.
+            self._retained_payloads.pop(message.topic, None)
+            try:
+                info = client.publish(message.topic, message.payload, qos=message.qos, retain=message.retain)
+            except Exception as e:
+                logger.error(f"Failed to publish to {message.topic}: {e}")
+                self.last_error = str(e)
+                continue
+            if info is not None and info.rc != mqtt.MQTT_ERR_SUCCESS:
+                logger.warning(f"Failed to publish to {message.topic}: {mqtt.error_string(info.rc)}")
+                self.last_error = mqtt.error_string(info.rc)
+                continue
+            if message.qos > 0 and info is not None:
+                pending_acks.append((message, info))
+            elif message.retain:
+                self._retained_payloads[message.topic] = message.payload
+            latency_ms = (time.monotonic() - message.enqueued_at) * 1000.0
+            self._latencies_ms.append(latency_ms)
+            latencies_ms.append(latency_ms)
+            self._track_publish(message.topic, message.track if message.track is not None else message.payload)
+        deadline = time.monotonic() + QOS_ACK_TIMEOUT_SECONDS
+        for message, info in pending_acks:
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                try:
+                    info.wait_for_publish(timeout=remaining)
+                except Exception:
+                    pass
+            # Remember retained state only once the broker acknowledged it.
+            if message.retain and info.is_published():
+                self._retained_payloads[message.topic] = message.payload
+        try:
+            get_metrics_service().set_mqtt_stats(self._outbound.qsize(), latencies_ms)
+        except Exception:
+            pass
+
+    def get_pipeline_stats(self) -> Dict[str, Any]:
+        """Outbound queue depth, publish latency and dedup counters."""
+        latencies = sorted(self._latencies_ms)
+        if latencies:
+            avg_ms = sum(latencies) / len(latencies)
+            p95_ms = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        else:
+            avg_ms = p95_ms = 0.0
+        return {
+            "queue_depth": self._outbound.qsize(),
+            "queue_limit": OUTBOUND_QUEUE_SIZE,
+            "publish_latency_ms": {"avg": round(avg_ms, 2), "p95": round(p95_ms, 2)},
+            "dropped": self.dropped_count,
+            "skipped_retained": self.skipped_retained_count,
+        }
+    
     def _track_publish(self, topic: str, payload: Any) -> None:
         """Track published messages for monitoring."""
         try:
@@ -471,10 +636,10 @@ class MqttService:
                 "payload": payload if isinstance(payload, (str, int, float, bool)) else str(payload)[:200],
                 "timestamp": _utc_now_naive().isoformat() + "Z",
             }
+            self.last_messages.move_to_end(topic)
             # Keep only last 50 topics
-            if len(self.last_messages) > 50:
-                oldest_topic = min(self.last_messages.keys(), key=lambda k: self.last_messages[k]["timestamp"])
-                self.last_messages.pop(oldest_topic, None)
+            if len(self.last_messages) > LAST_MESSAGES_LIMIT:
+                self.last_messages.popitem(last=False)
         except Exception:
             pass
     
@@ -496,12 +661,9 @@ class MqttService:
             "connected_at": self.connected_at.isoformat() + "Z" if self.connected_at else None,
             "active_topics": sorted(list(self.active_topics)),
             "publish_count": self.publish_count,
-            "last_messages": dict(sorted(
-                self.last_messages.items(),
-                key=lambda x: x[1]["timestamp"],
-                reverse=True
-            )[:10]),  # Last 10 messages
+            "last_messages": dict(list(reversed(self.last_messages.items()))[:10]),  # Last 10 messages
             "last_error": self.last_error,
+            "pipeline": self.get_pipeline_stats(),
         }
 
 # Singleton
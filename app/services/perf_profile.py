@@ -0,0 +1,410 @@
+"""
+Inference performance profile for Thermal Dual Vision.
+
+Benchmarks the locally available inference backends (TensorRT, OpenVINO,
+ONNX, PyTorch CPU) over input sizes, intra-op thread counts and batch sizes
+on a fixed synthetic image set, and persists the result as a profile. The
+profile picks the backend when performance.auto_tune is on and sizes the
+global inference budget the scheduler shares across cameras.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from app.utils.paths import DATA_DIR
+
+
+logger = logging.getLogger(__name__)
+
+PROFILE_PATH = DATA_DIR / "perf_profile.json"
+PROFILE_VERSION = 1
+
+BENCH_IMAGE_COUNT = 8
+BENCH_IMAGE_SIZE = (1280, 720)
+# PyTorch accepts any stride-aligned input size; exported engines are fixed.
+CPU_INPUT_SIZES = (640, 512, 416, 320)
+BATCH_SIZES = (1, 4)
+WARMUP_RUNS = 2
+MEASURE_RUNS = 6
+# Leave room for motion detection, encoding and recording on the same host.
+FPS_HEADROOM = 0.8
+MAX_PROFILED_CAMERAS = 16
+
+# runner(frames, imgsz) -> None; one call processes len(frames) images.
+Runner = Callable[[List[np.ndarray], int], Any]
+
+
+def benchmark_frames(count: Optional[int] = None, size: tuple = BENCH_IMAGE_SIZE) -> List[np.ndarray]:
+    """
+    Deterministic benchmark scenes: textured background with person-sized blobs.
+
+    Generated rather than shipped so every host benchmarks identical input.
+    """
+    count = BENCH_IMAGE_COUNT if count is None else count
+    rng = np.random.default_rng(1234)
+    width, height = size
+    frames = []
+    for index in range(count):
+        gradient = np.linspace(40, 160, width, dtype=np.float32)[None, :].repeat(height, axis=0)
+        noise = rng.normal(0, 12, (height, width)).astype(np.float32)
+        gray = np.clip(gradient + noise, 0, 255).astype(np.uint8)
+        frame = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+        for _ in range(1 + index % 3):
+            bw = int(rng.integers(width // 24, width // 12))
+            bh = int(bw * rng.uniform(2.0, 3.0))
+            x = int(rng.integers(0, width - bw))
+            y = int(rng.integers(0, max(1, height - bh)))
+            cv2.rectangle(frame, (x, y), (x + bw, y + bh), (220, 220, 220), -1)
+        frames.append(frame)
+    return frames
+
+
+def thread_candidates(cpu_count: Optional[int] = None) -> List[int]:
+    """Intra-op thread counts worth trying on this host."""
+    cpus = max(1, int(cpu_count or os.cpu_count() or 1))
+    return sorted({n for n in (1, 2, 4, cpus // 2, cpus) if 1 <= n <= cpus})
+
+
+def measure(
+    runner: Runner,
+    frames: Sequence[np.ndarray],
+    imgsz: int,
+    batch: int = 1,
+    warmup: Optional[int] = None,
+    runs: Optional[int] = None,
+    clock: Optional[Callable[[], float]] = None,
+) -> Dict[str, float]:
+    """
+    Time a runner over the image set.
+
+    Returns:
+        Dict with per-image latency_ms and images-per-second fps
+    """
+    warmup = WARMUP_RUNS if warmup is None else warmup
+    runs = MEASURE_RUNS if runs is None else runs
+    clock = clock or time.perf_counter
+    batches = [
+        [frames[(start + offset) % len(frames)] for offset in range(batch)]
+        for start in range(0, len(frames), batch)
+    ]
+    for i in range(warmup):
+        runner(batches[i % len(batches)], imgsz)
+    images = 0
+    started = clock()
+    for i in range(runs):
+        chunk = batches[i % len(batches)]
+        runner(chunk, imgsz)
+        images += len(chunk)
+    elapsed = max(clock() - started, 1e-9)
+    return {
+        "latency_ms": round(elapsed * 1000.0 / images, 2),
+        "fps": round(images / elapsed, 2),
+    }
+
+
+def build_profile(
+    results: List[Dict[str, Any]],
+    model_name: str,
+    input_size: int,
+    cpu_count: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Summarize benchmark results into a profile.
+
+    The best configuration is the fastest single-image one at the configured
+    input size (input size changes accuracy, so smaller sizes are reported but
+    never chosen automatically). Batched results are reported only: inference
+    runs one frame at a time, so their throughput is not a usable budget.
+    """
+    ok = [r for r in results if r.get("fps") and r.get("batch", 1) == 1]
+    at_size = [r for r in ok if r["imgsz"] == input_size] or ok
+    best = max(at_size, key=lambda r: r["fps"]) if at_size else None
+    fps_per_camera: Dict[str, float] = {}
+    if best is not None:
+        budget = best["fps"] * FPS_HEADROOM
+        fps_per_camera = {
+            str(n): round(budget / n, 2) for n in range(1, MAX_PROFILED_CAMERAS + 1)
+        }
+    return {
+        "version": PROFILE_VERSION,
+        "created_at": time.time(),
+        "model": model_name,
+        "input_size": input_size,
+        "cpu_count": int(cpu_count or os.cpu_count() or 1),
+        "best": (
+            {key: best[key] for key in ("backend", "threads", "imgsz", "batch", "fps", "latency_ms")}
+            if best is not None
+            else None
+        ),
+        "fps_per_camera": fps_per_camera,
+        "results": results,
+    }
+
+
+def fps_cap(profile: Optional[Dict[str, Any]], camera_count: int) -> Optional[float]:
+    """Sustainable inference FPS per camera for camera_count active cameras."""
+    if not profile or not profile.get("fps_per_camera"):
+        return None
+    table = profile["fps_per_camera"]
+    count = max(1, int(camera_count))
+    if str(count) in table:
+        return float(table[str(count)])
+    best = profile.get("best") or {}
+    if not best.get("fps"):
+        return None
+    return round(float(best["fps"]) * FPS_HEADROOM / count, 2)
+
+
+def load_profile(path: Path = PROFILE_PATH) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            profile = json.load(handle)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Ignoring unreadable perf profile %s: %s", path, e)
+        return None
+    if profile.get("version") != PROFILE_VERSION:
+        return None
+    return profile
+
+
+def save_profile(profile: Dict[str, Any], path: Path = PROFILE_PATH) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(profile, handle, indent=2)
+    os.replace(tmp_path, path)
+
+
+class PerfTuner:
+    """Runs backend benchmarks and owns the persisted profile."""
+
+    def __init__(self, models_dir: Path, path: Path = PROFILE_PATH):
+        self.models_dir = Path(models_dir)
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.status = "idle"
+        self.error: Optional[str] = None
+        self.profile = load_profile(self.path)
+
+    @property
+    def running(self) -> bool:
+        return self.status == "running"
+
+    def available_backends(self, model_name: str) -> List[str]:
+        """Backends with a usable model on disk; PyTorch CPU is always tried."""
+        backends = []
+        if (self.models_dir / f"{model_name}.engine").exists():
+            backends.append("tensorrt")
+        if (self.models_dir / f"{model_name}_openvino_model").exists():
+            backends.append("openvino")
+        if (self.models_dir / f"{model_name}.onnx").exists():
+            backends.append("onnx")
+        from app.services.quantization import registered_variant
+
+        for variant in ("openvino_int8", "onnx_int8"):
+            if registered_variant(self.models_dir, model_name, variant) is not None:
+                backends.append(variant)
+        backends.append("cpu")
+        return backends
+
+    def _model_source(self, backend: str, model_name: str) -> str:
+        if backend == "tensorrt":
+            return str(self.models_dir / f"{model_name}.engine")
+        if backend == "openvino":
+            return str(self.models_dir / f"{model_name}_openvino_model")
+        if backend == "onnx":
+            return str(self.models_dir / f"{model_name}.onnx")
+        if backend in ("onnx_int8", "openvino_int8"):
+            from app.services.quantization import registered_variant
+
+            return str(registered_variant(self.models_dir, model_name, backend))
+        pytorch_path = self.models_dir / f"{model_name}.pt"
+        return str(pytorch_path) if pytorch_path.exists() else f"{model_name}.pt"
+
+    def _make_runner(self, backend: str, model_name: str) -> Runner:
+        from app.services.inference import _load_yolo
+
+        model = _load_yolo(self._model_source(backend, model_name))
+
+        def run(frames: List[np.ndarray], imgsz: int) -> Any:
+            source = frames[0] if len(frames) == 1 else frames
+            return model(source, imgsz=imgsz, verbose=False)
+
+        return run
+
+    def benchmark(
+        self,
+        model_name: str,
+        input_size: int,
+        runner_factory: Optional[Callable[[str, str], Runner]] = None,
+        cpu_count: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Benchmark every available backend and persist the resulting profile.
+
+        Args:
+            model_name: Model stem (e.g. "yolov8s")
+            input_size: Configured inference size (long side)
+            runner_factory: (backend, model_name) -> runner; defaults to YOLO
+            cpu_count: Override for the host CPU count
+        """
+        factory = runner_factory or self._make_runner
+        frames = benchmark_frames()
+        results: List[Dict[str, Any]] = []
+        # The thread sweep changes a process-wide setting; put it back afterwards.
+        saved_threads = _torch_threads()
+        try:
+            for backend in self.available_backends(model_name):
+                try:
+                    runner = factory(backend, model_name)
+                except Exception as e:
+                    logger.warning("Perf tune: cannot load %s backend: %s", backend, e)
+                    results.append({"backend": backend, "error": str(e)})
+                    continue
+                if backend == "cpu":
+                    sizes = sorted({input_size, *CPU_INPUT_SIZES}, reverse=True)
+                    threads = thread_candidates(cpu_count)
+                else:
+                    # Exported engines have a fixed input shape and manage their own threads.
+                    sizes = [input_size]
+                    threads = [None]
+                for thread_count in threads:
+                    for imgsz in sizes:
+                        results.append(
+                            self._measure_config(runner, frames, backend, thread_count, imgsz, 1)
+                        )
+                # Batching only matters for the fastest single-image configuration.
+                single = [r for r in results if r.get("backend") == backend and r.get("fps") and r["imgsz"] == input_size]
+                if single:
+                    best_single = max(single, key=lambda r: r["fps"])
+                    for batch in BATCH_SIZES[1:]:
+                        results.append(
+                            self._measure_config(
+                                runner, frames, backend, best_single["threads"], input_size, batch
+                            )
+                        )
+        finally:
+            if saved_threads is not None:
+                _set_torch_threads(saved_threads)
+
+        profile = build_profile(results, model_name, input_size, cpu_count=cpu_count)
+        save_profile(profile, self.path)
+        self.profile = profile
+        best = profile.get("best") or {}
+        logger.info(
+            "Perf profile saved: backend=%s threads=%s batch=%s fps=%s",
+            best.get("backend"),
+            best.get("threads"),
+            best.get("batch"),
+            best.get("fps"),
+        )
+        return profile
+
+    def _measure_config(
+        self,
+        runner: Runner,
+        frames: List[np.ndarray],
+        backend: str,
+        threads: Optional[int],
+        imgsz: int,
+        batch: int,
+    ) -> Dict[str, Any]:
+        entry: Dict[str, Any] = {"backend": backend, "threads": threads, "imgsz": imgsz, "batch": batch}
+        try:
+            if threads is not None:
+                _set_torch_threads(threads)
+            entry.update(measure(runner, frames, imgsz, batch=batch))
+        except Exception as e:
+            entry["error"] = str(e)
+        return entry
+
+    def _claim(self) -> bool:
+        """Mark a run as started; False if one is already in progress."""
+        with self._lock:
+            if self.running:
+                return False
+            self.status = "running"
+            self.error = None
+            return True
+
+    def run(self, model_name: str, input_size: int, **kwargs: Any) -> Optional[Dict[str, Any]]:
+        """Benchmark synchronously unless a run is already in progress."""
+        if not self._claim():
+            return None
+        return self._run_claimed(model_name, input_size, **kwargs)
+
+    def _run_claimed(self, model_name: str, input_size: int, **kwargs: Any) -> Optional[Dict[str, Any]]:
+        try:
+            profile = self.benchmark(model_name, input_size, **kwargs)
+            self.status = "done"
+            return profile
+        except Exception as e:
+            logger.error("Perf tune failed: %s", e)
+            self.status = "failed"
+            self.error = str(e)
+            return None
+
+    def run_async(self, model_name: str, input_size: int) -> bool:
+        """Start a background benchmark; False if one is already running."""
+        if not self._claim():
+            return False
+        self._thread = threading.Thread(
+            target=self._run_claimed,
+            args=(model_name, input_size),
+            daemon=True,
+            name="perf-tuner",
+        )
+        self._thread.start()
+        return True
+
+    def get_status(self) -> Dict[str, Any]:
+        return {"status": self.status, "error": self.error, "profile": self.profile}
+
+
+def _torch_threads() -> Optional[int]:
+    """Current PyTorch intra-op thread count (None if torch is absent)."""
+    try:
+        import torch
+    except Exception:
+        return None
+    return torch.get_num_threads()
+
+
+def _set_torch_threads(threads: int) -> Optional[int]:
+    """Set PyTorch intra-op threads; returns the previous value (None if torch is absent)."""
+    try:
+        import torch
+    except Exception:
+        return None
+    previous = torch.get_num_threads()
+    torch.set_num_threads(max(1, int(threads)))
+    return previous
+
+
+# Global singleton instance
+_perf_tuner: Optional[PerfTuner] = None
+
+
+def get_perf_tuner() -> PerfTuner:
+    """
+    Get or create the global perf tuner.
+
+    Returns:
+        PerfTuner: Global tuner instance
+    """
+    global _perf_tuner
+    if _perf_tuner is None:
+        from app.services.inference import InferenceService
+
+        _perf_tuner = PerfTuner(InferenceService.MODELS_DIR)
+    return _perf_tuner
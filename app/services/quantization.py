@@ -0,0 +1,496 @@
+"""
+INT8 model quantization for Thermal Dual Vision.
+
+Builds INT8 ONNX (onnxruntime static quantization) and OpenVINO (NNCF via
+the Ultralytics exporter) variants of the active model, calibrated on raw
+frames sampled from our own continuous recordings. Thermal and color frames
+(by the type of stream each camera records) are collected as separate sets: calibration uses a balanced mix, and the accuracy-regression
+check against the FP32 model is evaluated per set. Variants that pass are
+registered in MODELS_DIR/quantized_models.json and become selectable as the
+onnx_int8 / openvino_int8 inference backends.
+"""
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from itertools import zip_longest
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from app.utils.paths import DATA_DIR
+
+
+logger = logging.getLogger(__name__)
+
+INT8_BACKENDS = {"onnx_int8": "onnx", "openvino_int8": "openvino"}
+REGISTRY_FILENAME = "quantized_models.json"
+
+CALIBRATION_FRAMES_PER_DOMAIN = 96
+CALIBRATION_FRAMES_PER_SEGMENT = 4
+# A set with fewer frames is not representative enough to calibrate on.
+MIN_DOMAIN_FRAMES = 8
+# INT8 detections must agree with FP32 on the same frames (per domain).
+MIN_AGREEMENT_F1 = 0.90
+MATCH_IOU = 0.5
+EVAL_CONFIDENCE = 0.25
+
+
+def _sample_video_frames(path: Path, count: int) -> List[np.ndarray]:
+    cap = cv2.VideoCapture(str(path))
+    if not cap.isOpened():
+        return []
+    try:
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        frames: List[np.ndarray] = []
+        if total <= 0:
+            return frames
+        count = min(count, total)
+        for i in range(count):
+            index = int(round((i + 0.5) * total / count))
+            cap.set(cv2.CAP_PROP_POS_FRAMES, float(min(index, total - 1)))
+            ok, frame = cap.read()
+            if ok and frame is not None:
+                frames.append(frame)
+        return frames
+    finally:
+        cap.release()
+
+
+def _finished_segments(recording_dir: Path, camera_ids: Iterable[str]) -> List[Path]:
+    """Closed recording segments of camera_ids, newest first, interleaved across cameras."""
+    per_camera: List[List[Path]] = []
+    for camera_id in sorted(camera_ids):
+        camera_dir = recording_dir / camera_id
+        if not camera_dir.is_dir():
+            continue
+        # The newest segment is still being written and has no index yet.
+        segments = sorted(camera_dir.glob("*.mp4"))[:-1]
+        if segments:
+            per_camera.append(segments[::-1])
+    return [segment for batch in zip_longest(*per_camera) for segment in batch if segment is not None]
+
+
+def collect_calibration_frames(
+    recording_dir: Path,
+    camera_domains: Dict[str, str],
+    per_domain: int = CALIBRATION_FRAMES_PER_DOMAIN,
+    frames_per_segment: int = CALIBRATION_FRAMES_PER_SEGMENT,
+) -> Dict[str, List[np.ndarray]]:
+    """
+    Sample raw camera frames from the continuous recording segments.
+
+    Event MP4s and collages have boxes and timestamps burned in, which the
+    model never sees at inference time, so calibration reads the stream
+    copies the recorder keeps instead. Each camera's frames go to the set of
+    the stream type it records (camera_domains: camera id -> "thermal" or
+    "color"); pixel statistics would file night-IR color footage as thermal.
+
+    Returns:
+        {"thermal": [...], "color": [...]} with at most per_domain frames each
+    """
+    sets: Dict[str, List[np.ndarray]] = {"thermal": [], "color": []}
+    recording_dir = Path(recording_dir)
+    if not recording_dir.exists():
+        return sets
+    for segment in _finished_segments(recording_dir, camera_domains):
+        if all(len(frames) >= per_domain for frames in sets.values()):
+            break
+        domain = camera_domains[segment.parent.name]
+        if domain not in sets or len(sets[domain]) >= per_domain:
+            continue
+        for frame in _sample_video_frames(segment, frames_per_segment):
+            if len(sets[domain]) < per_domain:
+                sets[domain].append(frame)
+    return sets
+
+
+def letterbox(frame: np.ndarray, size: int) -> np.ndarray:
+    """Resize with aspect ratio preserved and pad to size x size (YOLO input)."""
+    h, w = frame.shape[:2]
+    scale = min(size / h, size / w)
+    nh, nw = max(1, int(round(h * scale))), max(1, int(round(w * scale)))
+    resized = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    canvas = np.full((size, size, 3), 114, dtype=np.uint8)
+    top, left = (size - nh) // 2, (size - nw) // 2
+    canvas[top:top + nh, left:left + nw] = resized if resized.ndim == 3 else resized[:, :, None]
+    return canvas
+
+
+def to_input_tensor(frame: np.ndarray, size: int) -> np.ndarray:
+    """BGR frame -> normalized 1x3xSxS RGB float tensor."""
+    image = letterbox(frame, size)[:, :, ::-1]
+    return np.ascontiguousarray(image.transpose(2, 0, 1)[None], dtype=np.float32) / 255.0
+
+
+def balanced_calibration_set(sets: Dict[str, List[np.ndarray]]) -> List[np.ndarray]:
+    """Interleave domains so neither dominates activation ranges."""
+    domains = [frames for frames in sets.values() if frames]
+    if not domains:
+        return []
+    count = min(len(frames) for frames in domains)
+    mixed: List[np.ndarray] = []
+    for i in range(count):
+        for frames in domains:
+            mixed.append(frames[i])
+    return mixed
+
+
+def _box_iou(a: Sequence[float], b: Sequence[float]) -> float:
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0.0, ix2 - ix1) * max(0.0, iy2 - iy1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def compare_detections(
+    reference: Sequence[List[Dict[str, Any]]],
+    candidate: Sequence[List[Dict[str, Any]]],
+    iou_threshold: float = MATCH_IOU,
+) -> Dict[str, float]:
+    """
+    Agreement of candidate (INT8) detections with reference (FP32) per frame.
+
+    Returns:
+        precision/recall/f1 of candidate boxes against reference boxes and
+        the mean confidence shift of matched boxes
+    """
+    tp = fp = fn = 0
+    conf_deltas: List[float] = []
+    for ref_dets, cand_dets in zip(reference, candidate):
+        unmatched = list(range(len(cand_dets)))
+        for ref in ref_dets:
+            best_j, best_iou = None, iou_threshold
+            for j in unmatched:
+                iou = _box_iou(ref["bbox"], cand_dets[j]["bbox"])
+                if iou >= best_iou:
+                    best_j, best_iou = j, iou
+            if best_j is None:
+                fn += 1
+            else:
+                tp += 1
+                unmatched.remove(best_j)
+                conf_deltas.append(float(cand_dets[best_j]["confidence"]) - float(ref["confidence"]))
+        fp += len(unmatched)
+    if tp + fp + fn == 0:
+        # Both models agree there is nothing to detect.
+        precision = recall = f1 = 1.0
+    else:
+        precision = tp / (tp + fp) if tp + fp else 0.0
+        recall = tp / (tp + fn) if tp + fn else 0.0
+        f1 = 2 * tp / (2 * tp + fp + fn)
+    return {
+        "frames": len(reference),
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(f1, 4),
+        "confidence_shift": round(float(np.mean(conf_deltas)) if conf_deltas else 0.0, 4),
+    }
+
+
+def load_registry(models_dir: Path) -> Dict[str, Dict[str, Any]]:
+    path = Path(models_dir) / REGISTRY_FILENAME
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning("Ignoring unreadable quantization registry %s: %s", path, e)
+        return {}
+
+
+def save_registry(models_dir: Path, registry: Dict[str, Dict[str, Any]]) -> None:
+    path = Path(models_dir) / REGISTRY_FILENAME
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        json.dump(registry, handle, indent=2)
+    os.replace(tmp_path, path)
+
+
+def registered_variant(models_dir: Path, model_name: str, backend: str) -> Optional[Path]:
+    """Path of a registered, accuracy-checked INT8 variant, if it exists on disk."""
+    entry = load_registry(models_dir).get(model_name, {}).get(backend)
+    if not entry or not entry.get("passed"):
+        return None
+    path = Path(models_dir) / entry["path"]
+    return path if path.exists() else None
+
+
+class _FrameCalibrationReader:
+    """onnxruntime CalibrationDataReader over preprocessed frames."""
+
+    def __init__(self, input_name: str, frames: Iterable[np.ndarray], size: int):
+        self._batches = iter([{input_name: to_input_tensor(frame, size)} for frame in frames])
+
+    def get_next(self) -> Optional[Dict[str, np.ndarray]]:
+        return next(self._batches, None)
+
+
+class QuantizationService:
+    """Runs calibration, INT8 export and the FP32 accuracy check."""
+
+    def __init__(self, models_dir: Path, recording_dir: Path):
+        self.models_dir = Path(models_dir)
+        self.recording_dir = Path(recording_dir)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.status = "idle"
+        self.error: Optional[str] = None
+        self.last_result: Optional[Dict[str, Any]] = None
+
+    @property
+    def running(self) -> bool:
+        return self.status == "running"
+
+    def _camera_domains(self) -> Dict[str, str]:
+        """Camera id -> "thermal"/"color" for the stream each camera records."""
+        from app.db.session import session_scope
+        from app.services.camera_crud import get_camera_crud_service
+        from app.utils.stream_helpers import resolve_default_stream_source
+
+        with session_scope() as db:
+            cameras = get_camera_crud_service().get_cameras(db)
+            domains = {camera.id: resolve_default_stream_source(camera) for camera in cameras}
+        return {camera_id: domain for camera_id, domain in domains.items() if domain}
+
+    # -- export ------------------------------------------------------------
+
+    def _pytorch_source(self, model_name: str) -> str:
+        pytorch_path = self.models_dir / f"{model_name}.pt"
+        if pytorch_path.exists():
+            return str(pytorch_path)
+        root_path = Path.cwd() / f"{model_name}.pt"
+        return str(root_path) if root_path.exists() else f"{model_name}.pt"
+
+    def _ensure_fp32_onnx(self, model_name: str) -> Path:
+        from app.services.inference import _load_yolo
+
+        onnx_path = self.models_dir / f"{model_name}.onnx"
+        if not onnx_path.exists():
+            logger.info("Exporting FP32 ONNX for quantization: %s", onnx_path)
+            exported = Path(_load_yolo(self._pytorch_source(model_name)).export(
+                format="onnx", simplify=True, dynamic=False
+            ))
+            shutil.move(str(exported), str(onnx_path))
+        return onnx_path
+
+    def _export_onnx_int8(self, model_name: str, calibration: List[np.ndarray]) -> Path:
+        import onnx
+        from onnxruntime.quantization import CalibrationMethod, QuantFormat, QuantType, quantize_static
+
+        fp32_path = self._ensure_fp32_onnx(model_name)
+        int8_path = self.models_dir / f"{model_name}_int8.onnx"
+        fp32_model = onnx.load(str(fp32_path))
+        graph_input = fp32_model.graph.input[0]
+        size = int(graph_input.type.tensor_type.shape.dim[2].dim_value or 640)
+        reader = _FrameCalibrationReader(graph_input.name, calibration, size)
+        quantize_static(
+            str(fp32_path),
+            str(int8_path),
+            reader,
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            per_channel=True,
+            calibrate_method=CalibrationMethod.MinMax,
+        )
+        # Ultralytics reads class names/stride/imgsz from the model metadata.
+        int8_model = onnx.load(str(int8_path))
+        if not int8_model.metadata_props:
+            int8_model.metadata_props.extend(fp32_model.metadata_props)
+            onnx.save(int8_model, str(int8_path))
+        return int8_path
+
+    def _export_openvino_int8(self, model_name: str, calibration: List[np.ndarray]) -> Path:
+        from app.services.inference import _load_yolo
+
+        target = self.models_dir / f"{model_name}_int8_openvino_model"
+        with tempfile.TemporaryDirectory(prefix="tdv-calib-") as tmp:
+            images_dir = Path(tmp) / "images" / "val"
+            images_dir.mkdir(parents=True)
+            for i, frame in enumerate(calibration):
+                cv2.imwrite(str(images_dir / f"{i:04d}.jpg"), frame)
+            data_yaml = Path(tmp) / "calibration.yaml"
+            data_yaml.write_text(
+                f"path: {tmp}\ntrain: images/val\nval: images/val\nnames:\n  0: person\n",
+                encoding="utf-8",
+            )
+            exported = Path(_load_yolo(self._pytorch_source(model_name)).export(
+                format="openvino", int8=True, data=str(data_yaml)
+            ))
+        if target.exists():
+            shutil.rmtree(target, ignore_errors=True)
+        shutil.move(str(exported), str(target))
+        return target
+
+    # -- accuracy check ----------------------------------------------------
+
+    def _predict(self, model: Any, frames: List[np.ndarray]) -> List[List[Dict[str, Any]]]:
+        outputs: List[List[Dict[str, Any]]] = []
+        for frame in frames:
+            result = model(frame, conf=EVAL_CONFIDENCE, classes=[0], verbose=False)[0]
+            dets = []
+            for box in result.boxes:
+                dets.append({
+                    "bbox": [float(v) for v in box.xyxy[0].tolist()],
+                    "confidence": float(box.conf[0]),
+                })
+            outputs.append(dets)
+        return outputs
+
+    def evaluate(
+        self,
+        reference_model: Any,
+        candidate_model: Any,
+        sets: Dict[str, List[np.ndarray]],
+        predict: Optional[Callable[[Any, List[np.ndarray]], List[List[Dict[str, Any]]]]] = None,
+    ) -> Dict[str, Any]:
+        """Compare candidate against reference on each calibration set."""
+        predict = predict or self._predict
+        domains: Dict[str, Any] = {}
+        for domain, frames in sets.items():
+            if len(frames) < MIN_DOMAIN_FRAMES:
+                continue
+            domains[domain] = compare_detections(predict(reference_model, frames), predict(candidate_model, frames))
+        passed = bool(domains) and all(m["f1"] >= MIN_AGREEMENT_F1 for m in domains.values())
+        return {"passed": passed, "min_f1": MIN_AGREEMENT_F1, "domains": domains}
+
+    # -- pipeline ----------------------------------------------------------
+
+    def quantize(
+        self,
+        model_name: str,
+        formats: Sequence[str] = ("onnx", "openvino"),
+        sets: Optional[Dict[str, List[np.ndarray]]] = None,
+        exporters: Optional[Dict[str, Callable[[str, List[np.ndarray]], Path]]] = None,
+        loader: Optional[Callable[[str], Any]] = None,
+        predict: Optional[Callable[[Any, List[np.ndarray]], List[List[Dict[str, Any]]]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Calibrate, export, check and register INT8 variants.
+
+        Args:
+            model_name: Model stem (e.g. "yolov8s")
+            formats: Subset of ("onnx", "openvino")
+            sets: Calibration sets; sampled from the recordings when omitted
+            exporters/loader/predict: Overrides for tests
+        """
+        if sets is None:
+            sets = collect_calibration_frames(self.recording_dir, self._camera_domains())
+        sets = {domain: frames for domain, frames in sets.items() if len(frames) >= MIN_DOMAIN_FRAMES}
+        if not sets:
+            raise RuntimeError(
+                f"Not enough recorded frames to calibrate (need {MIN_DOMAIN_FRAMES} per thermal/color set)"
+            )
+        calibration = balanced_calibration_set(sets)
+        if loader is None:
+            from app.services.inference import _load_yolo as loader
+        exporters = exporters or {
+            "onnx": self._export_onnx_int8,
+            "openvino": self._export_openvino_int8,
+        }
+        reference = loader(self._pytorch_source(model_name))
+
+        registry = load_registry(self.models_dir)
+        entries = registry.setdefault(model_name, {})
+        result: Dict[str, Any] = {"model": model_name, "calibration": {d: len(f) for d, f in sets.items()}}
+        for fmt in formats:
+            backend = f"{fmt}_int8"
+            started = time.time()
+            try:
+                path = exporters[fmt](model_name, calibration)
+                report = self.evaluate(reference, loader(str(path)), sets, predict=predict)
+            except Exception as e:
+                logger.warning("INT8 %s export failed for %s: %s", fmt, model_name, e)
+                result[backend] = {"passed": False, "error": str(e)}
+                continue
+            entry = {
+                "path": Path(path).name,
+                "format": fmt,
+                "created_at": time.time(),
+                "export_seconds": round(time.time() - started, 1),
+                "calibration": result["calibration"],
+                **report,
+            }
+            entries[backend] = entry
+            result[backend] = entry
+            logger.info(
+                "INT8 %s variant for %s: passed=%s %s",
+                fmt,
+                model_name,
+                report["passed"],
+                {d: m["f1"] for d, m in report["domains"].items()},
+            )
+        save_registry(self.models_dir, registry)
+        return result
+
+    def _claim(self) -> bool:
+        """Mark a run as started; False if one is already in progress."""
+        with self._lock:
+            if self.running:
+                return False
+            self.status = "running"
+            self.error = None
+            return True
+
+    def run(self, model_name: str, formats: Sequence[str] = ("onnx", "openvino")) -> Optional[Dict[str, Any]]:
+        if not self._claim():
+            return None
+        return self._run_claimed(model_name, formats)
+
+    def _run_claimed(self, model_name: str, formats: Sequence[str]) -> Optional[Dict[str, Any]]:
+        try:
+            self.last_result = self.quantize(model_name, formats)
+            self.status = "done"
+            return self.last_result
+        except Exception as e:
+            logger.error("Quantization failed: %s", e)
+            self.status = "failed"
+            self.error = str(e)
+            return None
+
+    def run_async(self, model_name: str, formats: Sequence[str] = ("onnx", "openvino")) -> bool:
+        if not self._claim():
+            return False
+        self._thread = threading.Thread(
+            target=self._run_claimed,
+            args=(model_name, tuple(formats)),
+            daemon=True,
+            name="int8-quantize",
+        )
+        self._thread.start()
+        return True
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "error": self.error,
+            "last_result": self.last_result,
+            "registry": load_registry(self.models_dir),
+        }
+
+
+# Global singleton instance
+_quantization_service: Optional[QuantizationService] = None
+
+
+def get_quantization_service() -> QuantizationService:
+    """
+    Get or create the global quantization service.
+
+    Returns:
+        QuantizationService: Global service instance
+    """
+    global _quantization_service
+    if _quantization_service is None:
+        from app.services.inference import InferenceService
+
+        _quantization_service = QuantizationService(InferenceService.MODELS_DIR, DATA_DIR / "recordings")
+    return _quantization_service
@@ -18,6 +18,9 @@ from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+from app.services.ingest import IngestStream, get_ingest_manager
+from app.services.settings import get_settings_service
+from app.services.system_stats import get_data_usage
 from app.utils.paths import DATA_DIR
 
 try:
@@ -40,6 +43,8 @@ class ContinuousRecorder:
 
     Uses FFmpeg to record camera streams directly to disk without re-encoding.
     Segments recordings into 60-second chunks for efficient storage and retrieval.
+    With stream.shared_ingest the segmenter runs inside the camera's shared
+    ingest process (see app.services.ingest), which the detector also reads.
     """
 
     def __init__(self):
@@ -48,6 +53,11 @@ class ContinuousRecorder:
 
         self.processes: Dict[str, subprocess.Popen] = {}
         self.rtsp_urls: Dict[str, str] = {}
+        self.shared_streams: Dict[str, IngestStream] = {}
+        self.ingest = get_ingest_manager()
+        self.data_usage = get_data_usage()
+        # camera_id -> newest finished segment already counted in data_usage
+        self._accounted_segments: Dict[str, str] = {}
         self._processes_lock = threading.Lock()
         self.running = False
         self._monitor_thread: Optional[threading.Thread] = None
@@ -74,7 +84,7 @@ class ContinuousRecorder:
     def stop(self) -> None:
         """Stop all recordings and the monitor thread."""
         self.running = False
-        for camera_id in list(self.processes.keys()):
+        for camera_id in list(self.processes.keys()) + list(self.shared_streams.keys()):
             self.stop_recording(camera_id)
         if self._monitor_thread:
             self._monitor_thread.join(timeout=5)
@@ -86,6 +96,10 @@ class ContinuousRecorder:
 
     def start_recording(self, camera_id: str, rtsp_url: str) -> bool:
         with self._processes_lock:
+            stream = self.shared_streams.get(camera_id)
+            if stream is not None and stream.is_running() and stream.rtsp_url == rtsp_url:
+                logger.debug("Recording already running for camera %s", camera_id)
+                return True
             if camera_id in self.processes:
                 proc = self.processes[camera_id]
                 if proc.poll() is None:
@@ -99,6 +113,9 @@ class ContinuousRecorder:
 
         output_pattern = str(camera_dir / "%Y%m%d_%H%M%S.mp4")
 
+        if self._shared_ingest_enabled():
+            return self._start_shared_recording(camera_id, rtsp_url, output_pattern)
+
         ffmpeg = shutil.which("ffmpeg")
         if not ffmpeg:
             logger.error("ffmpeg not found on PATH")
@@ -146,6 +163,10 @@ class ContinuousRecorder:
         with self._processes_lock:
             process = self.processes.pop(camera_id, None)
             self.rtsp_urls.pop(camera_id, None)
+            stream = self.shared_streams.pop(camera_id, None)
+        if stream is not None:
+            self.ingest.stop_recording(camera_id)
+            logger.info("Stopped continuous recording for camera %s", camera_id)
         if not process:
             return
         try:
@@ -163,8 +184,38 @@ class ContinuousRecorder:
     def is_recording(self, camera_id: str) -> bool:
         with self._processes_lock:
             proc = self.processes.get(camera_id)
+            stream = self.shared_streams.get(camera_id)
+        if stream is not None:
+            return stream.is_running()
         return proc is not None and proc.poll() is None
 
+    def _shared_ingest_enabled(self) -> bool:
+        try:
+            config = get_settings_service().load_config()
+            return bool(getattr(config.stream, "shared_ingest", False))
+        except Exception:
+            return False
+
+    def _start_shared_recording(self, camera_id: str, rtsp_url: str, output_pattern: str) -> bool:
+        """Record through the camera's shared ingest stream instead of a separate ffmpeg."""
+        # A standalone segmenter from before the setting changed must not
+        # write the same files.
+        self._cleanup_process(camera_id)
+        try:
+            stream = self.ingest.start_recording(
+                camera_id,
+                rtsp_url,
+                output_pattern,
+                segment_time=SEGMENT_DURATION,
+            )
+        except Exception as e:
+            logger.error("Failed to start recording for camera %s: %s", camera_id, e)
+            return False
+        with self._processes_lock:
+            self.shared_streams[camera_id] = stream
+        logger.info("Started continuous recording for camera %s (shared ingest)", camera_id)
+        return True
+
     # ------------------------------------------------------------------
     # Health monitor — restart crashed FFmpeg processes
     # ------------------------------------------------------------------
@@ -190,6 +241,8 @@ class ContinuousRecorder:
                         else:
                             self._cleanup_process(camera_id)
 
+                self._account_new_segments()
+
                 now = time.time()
                 if now - last_buffer_cleanup >= CLEANUP_INTERVAL_SEC:
                     last_buffer_cleanup = now
@@ -624,6 +677,35 @@ class ContinuousRecorder:
     # Cleanup
     # ------------------------------------------------------------------
 
+    def _account_new_segments(self) -> None:
+        """
+        Add finished segments to the data directory size.
+
+        ffmpeg writes segments outside Python, so the monitor counts each
+        one once it is closed (a newer segment exists). Segments present
+        when a camera is first seen were covered by the startup scan.
+        """
+        with self._processes_lock:
+            camera_ids = list(self.processes.keys()) + list(self.shared_streams.keys())
+        for camera_id in camera_ids:
+            camera_dir = self.recording_dir / camera_id
+            try:
+                names = sorted(entry.name for entry in os.scandir(camera_dir) if entry.name.endswith(".mp4"))
+            except OSError:
+                continue
+            if len(names) < 2:
+                continue
+            finished = names[:-1]
+            last = self._accounted_segments.get(camera_id)
+            if last is not None:
+                for name in finished:
+                    if name > last:
+                        try:
+                            self.data_usage.add((camera_dir / name).stat().st_size)
+                        except OSError:
+                            pass
+            self._accounted_segments[camera_id] = finished[-1]
+
     def cleanup_old_recordings(self, max_age_seconds: int) -> None:
         cutoff_time = time.time() - max_age_seconds
         deleted_count = 0
@@ -632,9 +714,11 @@ class ContinuousRecorder:
             if not camera_dir.is_dir():
                 continue
             for recording_file in camera_dir.glob("*.mp4"):
-                if recording_file.stat().st_mtime < cutoff_time:
+                stat = recording_file.stat()
+                if stat.st_mtime < cutoff_time:
                     try:
                         recording_file.unlink()
+                        self.data_usage.add(-stat.st_size)
                         deleted_count += 1
                     except Exception as e:
                         logger.error("Failed to delete %s: %s", recording_file, e)
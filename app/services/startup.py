@@ -0,0 +1,110 @@
+"""
+Startup progress tracking for Thermal Dual Vision.
+
+The API starts serving immediately; slow startup work (dependency checks,
+model load and backend export, camera threads, recorders) runs in the
+background as named stages whose progress is reported by /ready.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+STARTUP_STAGES = (
+    "dependencies",
+    "go2rtc_sync",
+    "metrics",
+    "recorder",
+    "model",
+    "detector",
+    "mqtt",
+)
+
+
+class StartupProgress:
+    """Thread-safe record of background startup stages."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._started_at = time.time()
+            self._finished_at: Optional[float] = None
+            self._stages: Dict[str, Dict[str, Any]] = {
+                name: {"status": "pending"} for name in STARTUP_STAGES
+            }
+
+    def begin(self, name: str) -> None:
+        with self._lock:
+            self._stages[name] = {"status": "running", "started_at": time.time()}
+
+    def complete(self, name: str, status: str = "done", error: Optional[str] = None) -> None:
+        with self._lock:
+            stage = self._stages.setdefault(name, {})
+            started = stage.get("started_at")
+            stage["status"] = status
+            if started is not None:
+                stage["duration_ms"] = int((time.time() - started) * 1000)
+            if error:
+                stage["error"] = error
+
+    def skip(self, name: str) -> None:
+        self.complete(name, status="skipped")
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Run a block as a stage; failures are recorded and re-raised."""
+        self.begin(name)
+        try:
+            yield
+        except Exception as e:
+            self.complete(name, status="failed", error=str(e))
+            raise
+        self.complete(name)
+
+    def finish(self) -> None:
+        with self._lock:
+            self._finished_at = time.time()
+
+    @property
+    def is_complete(self) -> bool:
+        with self._lock:
+            return self._finished_at is not None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {name: dict(stage) for name, stage in self._stages.items()}
+            finished_at = self._finished_at
+            started_at = self._started_at
+        for stage in stages.values():
+            stage.pop("started_at", None)
+        failed = [name for name, stage in stages.items() if stage["status"] == "failed"]
+        if finished_at is None:
+            status = "starting"
+        elif failed:
+            status = "degraded"
+        else:
+            status = "ok"
+        end = finished_at if finished_at is not None else time.time()
+        return {
+            "status": status,
+            "complete": finished_at is not None,
+            "elapsed_s": round(end - started_at, 2),
+            "failed": failed,
+            "stages": stages,
+        }
+
+
+_startup_progress: Optional[StartupProgress] = None
+
+
+def get_startup_progress() -> StartupProgress:
+    global _startup_progress
+    if _startup_progress is None:
+        _startup_progress = StartupProgress()
+    return _startup_progress
@@ -0,0 +1,293 @@
+"""
+Background system telemetry.
+
+/api/system/info used to block for a second in psutil.cpu_percent(interval=1)
+and walk the whole data directory on every UI refresh. SystemStatsCollector
+samples CPU, memory, disk, this process and its busiest threads on a
+background thread at performance.stats_interval_seconds and keeps a ring of
+samples; the API, the Prometheus exporter and the detector read the latest
+sample in O(1).
+
+The data directory size comes from DataUsage: one walk at startup (and a
+slow periodic reconcile), kept current in between by the media, recording
+and retention write paths reporting what they add or remove.
+"""
+import logging
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import psutil
+
+from app.services.metrics import get_metrics_service
+from app.utils.paths import DATA_DIR
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL_SECONDS = 5.0
+HISTORY_SIZE = 120
+TOP_THREADS = 10
+# Full walk of the data directory to correct drift from files written
+# outside the tracked paths (database, logs, models).
+DATA_RESCAN_SECONDS = 3600.0
+
+PathLike = Union[str, Path]
+
+
+def _path_size(path: PathLike) -> int:
+    """Size of a file, or of all files under a (small) directory."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return 0
+    if not os.path.isdir(path):
+        return st.st_size
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.stat(os.path.join(root, name)).st_size
+            except OSError:
+                pass
+    return total
+
+
+class DataUsage:
+    """Running total of the bytes under the data directory."""
+
+    def __init__(self, root: PathLike = DATA_DIR):
+        self.root = Path(root)
+        self._bytes = 0
+        self._scanned_at: Optional[float] = None
+        # Deltas reported while a walk is running, applied on top of its result.
+        self._scan_delta: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def rescan(self) -> int:
+        """
+        Walk the whole tree once and reset the total.
+
+        Changes reported during the walk are added to its result. A file the
+        walk already saw is then counted twice until the next rescan, which
+        is the smaller error than dropping every write made during the walk.
+        """
+        with self._lock:
+            self._scan_delta = 0
+        try:
+            total = _path_size(self.root)
+        except BaseException:
+            with self._lock:
+                self._scan_delta = None
+            raise
+        with self._lock:
+            self._bytes = max(0, total + (self._scan_delta or 0))
+            self._scan_delta = None
+            self._scanned_at = time.time()
+            return self._bytes
+
+    def add(self, delta: int) -> None:
+        if not delta:
+            return
+        with self._lock:
+            self._bytes = max(0, self._bytes + int(delta))
+            if self._scan_delta is not None:
+                self._scan_delta += int(delta)
+
+    def contains(self, path: PathLike) -> bool:
+        """Whether path lies under the tracked root."""
+        try:
+            Path(path).resolve().relative_to(self.root.resolve())
+        except ValueError:
+            return False
+        return True
+
+    @contextmanager
+    def track(self, path: PathLike) -> Iterator[None]:
+        """Account whatever the block writes to or deletes from path."""
+        if not self.contains(path):
+            yield
+            return
+        before = _path_size(path)
+        try:
+            yield
+        finally:
+            self.add(_path_size(path) - before)
+
+    def remove(self, path: PathLike) -> None:
+        """Delete a file or directory tree and account the bytes it held."""
+        with self.track(path):
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            elif os.path.lexists(path):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+    def total(self) -> Optional[int]:
+        """Tracked size in bytes, None before the first scan."""
+        with self._lock:
+            return self._bytes if self._scanned_at is not None else None
+
+    def needs_rescan(self, now: float) -> bool:
+        with self._lock:
+            return self._scanned_at is None or now - self._scanned_at >= DATA_RESCAN_SECONDS
+
+
+class SystemStatsCollector:
+    """Samples system and process telemetry into a ring buffer."""
+
+    def __init__(
+        self,
+        data_usage: Optional[DataUsage] = None,
+        interval: float = DEFAULT_INTERVAL_SECONDS,
+        history: int = HISTORY_SIZE,
+    ):
+        self.data_usage = data_usage or get_data_usage()
+        self.interval = interval
+        self.metrics_service = get_metrics_service()
+        self._samples: deque = deque(maxlen=history)
+        self._process = psutil.Process()
+        self._thread_times: Dict[int, float] = {}
+        self._last_sample_ts: Optional[float] = None
+        self._sample_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Prime the interval=None counters so the first sample is meaningful.
+        psutil.cpu_percent(interval=None)
+        self._process.cpu_percent(interval=None)
+
+    def start(self, interval: Optional[float] = None) -> None:
+        if interval is not None:
+            self.interval = max(0.5, float(interval))
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="system-stats")
+        self._thread.start()
+        logger.info("System stats collector started (every %.1fs)", self.interval)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self.data_usage.needs_rescan(time.time()):
+                    self.data_usage.rescan()
+                self.sample()
+            except Exception as e:
+                logger.debug("System stats sample failed: %s", e)
+            self._stop.wait(self.interval)
+
+    # ------------------------------------------------------------------
+    # Sampling
+    # ------------------------------------------------------------------
+
+    def sample(self) -> Dict[str, Any]:
+        """Take one sample now and append it to the ring."""
+        with self._sample_lock:
+            now = time.time()
+            memory = psutil.virtual_memory()
+            disk = psutil.disk_usage("/")
+            with self._process.oneshot():
+                process = {
+                    "cpu_percent": round(self._process.cpu_percent(interval=None), 1),
+                    "rss_bytes": self._process.memory_info().rss,
+                    "threads": self._process.num_threads(),
+                }
+            sample = {
+                "ts": now,
+                "cpu_percent": round(psutil.cpu_percent(interval=None), 1),
+                "memory": {"used_bytes": memory.used, "total_bytes": memory.total, "percent": round(memory.percent, 1)},
+                "disk": {"used_bytes": disk.used, "total_bytes": disk.total, "percent": round(disk.percent, 1)},
+                "process": process,
+                "threads": self._busiest_threads(now),
+                "data_dir_bytes": self.data_usage.total(),
+            }
+            self._last_sample_ts = now
+            self._samples.append(sample)
+        self.metrics_service.set_system_stats(
+            cpu_percent=sample["cpu_percent"],
+            memory_bytes=memory.used,
+            process_cpu_percent=process["cpu_percent"],
+            data_dir_bytes=sample["data_dir_bytes"],
+        )
+        return sample
+
+    def _busiest_threads(self, now: float) -> List[Dict[str, Any]]:
+        elapsed = now - self._last_sample_ts if self._last_sample_ts else None
+        names = {t.native_id: t.name for t in threading.enumerate() if t.native_id is not None}
+        times: Dict[int, float] = {}
+        busiest = []
+        for thread in self._process.threads():
+            cpu_time = thread.user_time + thread.system_time
+            times[thread.id] = cpu_time
+            previous = self._thread_times.get(thread.id)
+            if elapsed and previous is not None:
+                percent = max(0.0, (cpu_time - previous) / elapsed * 100.0)
+                busiest.append({
+                    "id": thread.id,
+                    "name": names.get(thread.id, "native"),
+                    "cpu_percent": round(percent, 1),
+                })
+        self._thread_times = times
+        busiest.sort(key=lambda item: item["cpu_percent"], reverse=True)
+        return busiest[:TOP_THREADS]
+
+    # ------------------------------------------------------------------
+    # Readers (O(1))
+    # ------------------------------------------------------------------
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        try:
+            return self._samples[-1]
+        except IndexError:
+            return None
+
+    def history(self) -> List[Dict[str, Any]]:
+        return list(self._samples)
+
+    def cpu_percent(self) -> float:
+        sample = self.latest()
+        return float(sample["cpu_percent"]) if sample else 0.0
+
+
+# Global singleton instances
+_data_usage: Optional[DataUsage] = None
+_system_stats: Optional[SystemStatsCollector] = None
+
+
+def get_data_usage() -> DataUsage:
+    """
+    Get or create the global data directory usage tracker.
+
+    Returns:
+        DataUsage: Global tracker instance
+    """
+    global _data_usage
+    if _data_usage is None:
+        _data_usage = DataUsage()
+    return _data_usage
+
+
+def get_system_stats() -> SystemStatsCollector:
+    """
+    Get or create the global system stats collector.
+
+    Returns:
+        SystemStatsCollector: Global collector instance
+    """
+    global _system_stats
+    if _system_stats is None:
+        _system_stats = SystemStatsCollector()
+    return _system_stats
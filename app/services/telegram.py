@@ -2,23 +2,62 @@
 Telegram service for Thermal Dual Vision.
 
 Handles Telegram bot notifications for events.
+
+Notifications are queued onto a service-owned event loop that keeps one
+long-lived Bot (pooled HTTP session) per token. Media is uploaded once to
+the first chat and the returned file_id is reused for the remaining chats,
+which are served concurrently.
 """
+import asyncio
+import concurrent.futures
 import logging
+import threading
 import time
 from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
-import asyncio
 
 from telegram import Bot
-from telegram.error import TelegramError
+from telegram.error import RetryAfter, TelegramError
+from telegram.request import HTTPXRequest
 
 from app.services.settings import get_settings_service
 
 
 logger = logging.getLogger(__name__)
 
+# Pending notifications beyond this are dropped instead of piling up.
+NOTIFICATION_QUEUE_SIZE = 100
+HTTP_POOL_SIZE = 8
+# Previews sendAnimation accepts; animated WebP previews are not sent.
+ANIMATION_SUFFIXES = (".gif", ".mp4")
+
+
+@dataclass
+class _NotificationJob:
+    event: Dict[str, Any]
+    camera: Optional[Dict[str, Any]] = None
+    collage_path: Optional[Path] = None
+    mp4_path: Optional[Path] = None
+    gif_path: Optional[Path] = None
+    future: Optional[asyncio.Future] = None
+
+
+@dataclass
+class _MediaRef:
+    """Upload payload for one media item; file_id replaces bytes after upload."""
+    data: Optional[bytes] = None
+    filename: Optional[str] = None
+    file_id: Optional[str] = None
+    as_document: bool = False
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def payload(self) -> Any:
+        return self.file_id if self.file_id else self.data
+
 
 class TelegramService:
     """
@@ -34,11 +73,90 @@ class TelegramService:
     def __init__(self):
         """Initialize Telegram service."""
         self.settings_service = get_settings_service()
+        # Rate-limit state; only touched from the service loop once running.
         self.last_message_time: Dict[str, float] = {}
         self.cooldown_until: Dict[str, float] = {}
         self._message_timestamps: deque = deque()
+        self._retry_after_until: float = 0.0
+        # Sender loop, queue and pooled client
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+        self._queue: Optional[asyncio.Queue] = None
+        self._bot: Optional[Bot] = None
+        self._bot_token: Optional[str] = None
         logger.info("TelegramService initialized")
-    
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the sender loop thread on first use."""
+        with self._loop_lock:
+            if self._loop and self._loop.is_running():
+                return self._loop
+
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _runner() -> None:
+                asyncio.set_event_loop(loop)
+                self._queue = asyncio.Queue(maxsize=NOTIFICATION_QUEUE_SIZE)
+                worker = loop.create_task(self._queue_worker())
+                loop.call_soon(ready.set)
+                try:
+                    loop.run_forever()
+                finally:
+                    worker.cancel()
+                    loop.run_until_complete(asyncio.gather(worker, return_exceptions=True))
+                    loop.close()
+
+            thread = threading.Thread(target=_runner, daemon=True, name="telegram-sender")
+            thread.start()
+            ready.wait(timeout=5.0)
+            self._loop = loop
+            self._loop_thread = thread
+            return loop
+
+    def stop(self) -> None:
+        """Close the pooled client and stop the sender loop."""
+        with self._loop_lock:
+            loop = self._loop
+            self._loop = None
+        if loop is None or not loop.is_running():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_bot(), loop).result(timeout=5.0)
+        except Exception:
+            pass
+        loop.call_soon_threadsafe(loop.stop)
+        if self._loop_thread:
+            self._loop_thread.join(timeout=5.0)
+        self._loop_thread = None
+
+    def enqueue_event_notification(
+        self,
+        event: Dict[str, Any],
+        camera: Optional[Dict[str, Any]] = None,
+        collage_path: Optional[Path] = None,
+        mp4_path: Optional[Path] = None,
+        gif_path: Optional[Path] = None,
+    ) -> "concurrent.futures.Future[bool]":
+        """
+        Queue an event notification without waiting for delivery.
+        
+        Safe to call from any thread.
+        
+        Returns:
+            Future resolving to True if sent to at least one chat
+        """
+        job = _NotificationJob(
+            event=event,
+            camera=camera,
+            collage_path=collage_path,
+            mp4_path=mp4_path,
+            gif_path=gif_path,
+        )
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self._submit(job), loop)
+
     async def send_event_notification(
         self,
         event: Dict[str, Any],
@@ -59,147 +177,268 @@ class TelegramService:
         Returns:
             True if sent successfully, False otherwise
         """
-        bot: Bot | None = None
+        future = self.enqueue_event_notification(event, camera, collage_path, mp4_path, gif_path)
         try:
-            # Load config
-            config = self.settings_service.load_config()
-            
-            # Check if Telegram is enabled
-            if not config.telegram.enabled:
-                logger.debug("Telegram is disabled")
-                return False
-            
-            # Check bot token
-            if not config.telegram.bot_token or config.telegram.bot_token == "***REDACTED***":
-                logger.warning("Telegram bot token not configured")
-                return False
-            
-            # Check chat IDs
-            if not config.telegram.chat_ids:
-                logger.warning("No Telegram chat IDs configured")
-                return False
-            
-            # Check rate limit
-            camera_id = event.get('camera_id', 'unknown')
-            if not self._check_rate_limit(camera_id, config.telegram.rate_limit_seconds):
-                logger.debug(f"Rate limit active for camera {camera_id}")
-                return False
-            
-            # Check cooldown
-            if not self._check_cooldown(camera_id, config.telegram.cooldown_seconds):
-                logger.debug(f"Cooldown active for camera {camera_id}")
-                return False
-            
-            # Check max messages per minute (global rate limit)
-            max_per_min = getattr(config.telegram, "max_messages_per_min", 20) or 20
-            if not self._check_max_messages_per_min(max_per_min):
-                logger.debug("Max messages per minute limit reached")
-                return False
-            
-            # Create bot (session closed in finally to prevent HTTP connection leak)
-            bot = Bot(token=config.telegram.bot_token)
-            
-            # Format message
-            message = self._format_message(event, camera)
-            
-            # Send to all chat IDs
-            success = False
-            for chat_id in config.telegram.chat_ids:
-                try:
-                    # Send photo with caption if collage available
-                    if collage_path and collage_path.exists() and config.telegram.send_images:
-                        with open(collage_path, 'rb') as photo:
-                            await bot.send_photo(
-                                chat_id=chat_id,
-                                photo=photo,
-                                caption=message,
-                                parse_mode='HTML'
-                            )
-                    else:
-                        # Send text only
-                        await bot.send_message(
-                            chat_id=chat_id,
-                            text=message,
-                            parse_mode='HTML'
-                        )
-                    
-                    # Send MP4 timelapse if available
-                    if mp4_path and config.telegram.send_images:
-                        if self._is_playable_mp4(mp4_path):
-                            try:
-                                size_mb = mp4_path.stat().st_size / 1024 / 1024
-                            except Exception:
-                                size_mb = None
-                            logger.info(
-                                "Telegram video send queued (event=%s, size=%sMB)",
-                                event.get("id"),
-                                f"{size_mb:.2f}" if size_mb is not None else "unknown",
-                            )
-                            try:
-                                with open(mp4_path, 'rb') as video:
-                                    await bot.send_video(
-                                        chat_id=chat_id,
-                                        video=video,
-                                        caption="🎥 Event Video",
-                                        supports_streaming=True
-                                    )
-                                logger.info("Telegram video sent (event=%s)", event.get("id"))
-                            except TelegramError as e:
-                                logger.warning(
-                                    "Telegram send_video failed (event=%s): %s. Sending as document.",
-                                    event.get("id"),
-                                    e,
-                                )
-                                try:
-                                    with open(mp4_path, 'rb') as video:
-                                        await bot.send_document(
-                                            chat_id=chat_id,
-                                            document=video,
-                                            caption="🎥 Event Video",
-                                        )
-                                    logger.info("Telegram video sent as document (event=%s)", event.get("id"))
-                                except TelegramError as doc_err:
-                                    logger.error(
-                                        "Telegram send_document failed (event=%s): %s",
-                                        event.get("id"),
-                                        doc_err,
-                                    )
-                        else:
-                            logger.warning(
-                                "Telegram video skipped (event=%s): mp4 not playable",
-                                event.get("id"),
-                            )
-                    elif gif_path and gif_path.exists() and config.telegram.send_images:
-                        with open(gif_path, 'rb') as animation:
-                            await bot.send_animation(
-                                chat_id=chat_id,
-                                animation=animation,
-                                caption="🎞️ Event Preview",
-                            )
-                    
-                    logger.info(f"Telegram notification sent to {chat_id}")
-                    success = True
-                    
-                except TelegramError as e:
-                    logger.error(f"Failed to send to {chat_id}: {e}")
-            
-            # Update rate limit
-            if success:
-                self._update_rate_limit(camera_id)
-                self._set_cooldown(camera_id, config.telegram.cooldown_seconds)
-                self._record_message_sent()
-            
-            return success
-
+            return await asyncio.wrap_future(future)
         except Exception as e:
             logger.error(f"Telegram notification failed: {e}")
             return False
-        finally:
-            if bot is not None:
-                try:
-                    await bot.session.close()
-                except Exception:
-                    pass
+
+    async def _submit(self, job: _NotificationJob) -> bool:
+        job.future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            logger.warning("Telegram queue full, dropping notification for event %s", job.event.get("id"))
+            return False
+        return await job.future
+
+    async def _queue_worker(self) -> None:
+        """Deliver queued notifications in order."""
+        while True:
+            job = await self._queue.get()
+            try:
+                result = await self._deliver(job)
+            except Exception as e:
+                logger.error(f"Telegram notification failed: {e}")
+                result = False
+            if job.future is not None and not job.future.done():
+                job.future.set_result(result)
+            self._queue.task_done()
+
+    async def _get_bot(self, token: str) -> Bot:
+        """Return the long-lived Bot for token, replacing it on token change."""
+        if self._bot is not None and self._bot_token == token:
+            return self._bot
+        await self._close_bot()
+        self._bot = Bot(
+            token=token,
+            request=HTTPXRequest(connection_pool_size=HTTP_POOL_SIZE, media_write_timeout=60.0),
+        )
+        self._bot_token = token
+        return self._bot
+
+    async def _close_bot(self) -> None:
+        bot = self._bot
+        self._bot = None
+        self._bot_token = None
+        if bot is not None:
+            try:
+                await bot.shutdown()
+            except Exception:
+                pass
+
+    async def _deliver(self, job: _NotificationJob) -> bool:
+        """Apply config and rate limits, then fan the message out to all chats."""
+        event = job.event
+        # Load config
+        config = self.settings_service.load_config()
+        
+        # Check if Telegram is enabled
+        if not config.telegram.enabled:
+            logger.debug("Telegram is disabled")
+            return False
+        
+        # Check bot token
+        if not config.telegram.bot_token or config.telegram.bot_token == "***REDACTED***":
+            logger.warning("Telegram bot token not configured")
+            return False
+        
+        # Check chat IDs
+        if not config.telegram.chat_ids:
+            logger.warning("No Telegram chat IDs configured")
+            return False
+        
+        # Check rate limit
+        camera_id = event.get('camera_id', 'unknown')
+        if not self._check_rate_limit(camera_id, config.telegram.rate_limit_seconds):
+            logger.debug(f"Rate limit active for camera {camera_id}")
+            return False
+        
+        # Check cooldown
+        if not self._check_cooldown(camera_id, config.telegram.cooldown_seconds):
+            logger.debug(f"Cooldown active for camera {camera_id}")
+            return False
+        
+        # Check max messages per minute (global rate limit)
+        max_per_min = getattr(config.telegram, "max_messages_per_min", 20) or 20
+        if not self._check_max_messages_per_min(max_per_min):
+            logger.debug("Max messages per minute limit reached")
+            return False
+        
+        bot = await self._get_bot(config.telegram.bot_token)
+        message = self._format_message(event, camera=job.camera)
+        # File reads and the mp4 check block; keep them off the sender's loop.
+        photo, video, animation = await asyncio.to_thread(self._load_media, job, config)
+        
+        # First chat uploads the media; the rest reuse its file_ids concurrently.
+        chat_ids = list(config.telegram.chat_ids)
+        results = [await self._send_to_chat(bot, chat_ids[0], event, message, photo, video, animation)]
+        if len(chat_ids) > 1:
+            results.extend(await asyncio.gather(*(
+                self._send_to_chat(bot, chat_id, event, message, photo, video, animation)
+                for chat_id in chat_ids[1:]
+            )))
+        success = any(results)
+        
+        # Update rate limit
+        if success:
+            self._update_rate_limit(camera_id)
+            self._set_cooldown(camera_id, config.telegram.cooldown_seconds)
+            self._record_message_sent()
+        
+        return success
+
+    def _load_media(self, job: _NotificationJob, config: Any):
+        """Read each media file once for all chats."""
+        photo = video = animation = None
+        if not config.telegram.send_images:
+            return photo, video, animation
+        try:
+            if job.collage_path and job.collage_path.exists():
+                photo = _MediaRef(data=job.collage_path.read_bytes(), filename=job.collage_path.name)
+            if job.mp4_path:
+                if self._is_playable_mp4(job.mp4_path):
+                    data = job.mp4_path.read_bytes()
+                    logger.info(
+                        "Telegram video send queued (event=%s, size=%.2fMB)",
+                        job.event.get("id"),
+                        len(data) / 1024 / 1024,
+                    )
+                    video = _MediaRef(data=data, filename=job.mp4_path.name)
+                else:
+                    logger.warning(
+                        "Telegram video skipped (event=%s): mp4 not playable",
+                        job.event.get("id"),
+                    )
+            elif job.gif_path and job.gif_path.suffix in ANIMATION_SUFFIXES and job.gif_path.exists():
+                animation = _MediaRef(data=job.gif_path.read_bytes(), filename=job.gif_path.name)
+        except OSError as e:
+            logger.warning("Telegram media read failed (event=%s): %s", job.event.get("id"), e)
+        return photo, video, animation
+
+    async def _call(self, method, **kwargs):
+        """Call a Bot method honouring a shared RetryAfter window."""
+        for attempt in range(2):
+            wait = self._retry_after_until - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                return await method(**kwargs)
+            except RetryAfter as e:
+                retry_after = e.retry_after
+                if isinstance(retry_after, timedelta):
+                    retry_after = retry_after.total_seconds()
+                self._retry_after_until = max(
+                    self._retry_after_until, time.monotonic() + float(retry_after)
+                )
+                if attempt:
+                    raise
+        return None
+
+    @staticmethod
+    def _remember_file_id(ref: _MediaRef, message: Any, attr: str) -> None:
+        if ref.file_id or message is None:
+            return
+        try:
+            media = getattr(message, attr, None)
+            if isinstance(media, (list, tuple)):
+                media = media[-1] if media else None
+            file_id = getattr(media, "file_id", None)
+            if isinstance(file_id, str) and file_id:
+                ref.file_id = file_id
+                ref.data = None
+        except Exception:
+            pass
+
+    async def _send_to_chat(
+        self,
+        bot: Bot,
+        chat_id: str,
+        event: Dict[str, Any],
+        message: str,
+        photo: Optional[_MediaRef],
+        video: Optional[_MediaRef],
+        animation: Optional[_MediaRef],
+    ) -> bool:
+        """Send caption/photo plus optional video or animation to one chat."""
+        try:
+            # Send photo with caption if collage available
+            if photo is not None:
+                sent = await self._call(
+                    bot.send_photo,
+                    chat_id=chat_id,
+                    photo=photo.payload,
+                    caption=message,
+                    parse_mode='HTML',
+                )
+                self._remember_file_id(photo, sent, "photo")
+            else:
+                # Send text only
+                await self._call(
+                    bot.send_message,
+                    chat_id=chat_id,
+                    text=message,
+                    parse_mode='HTML',
+                )
+            
+            # Send MP4 timelapse if available
+            if video is not None:
+                await self._send_video(bot, chat_id, event, video)
+            elif animation is not None:
+                sent = await self._call(
+                    bot.send_animation,
+                    chat_id=chat_id,
+                    animation=animation.payload,
+                    caption="🎞️ Event Preview",
+                    filename=animation.filename,
+                )
+                self._remember_file_id(animation, sent, "animation")
+            
+            logger.info(f"Telegram notification sent to {chat_id}")
+            return True
+        except TelegramError as e:
+            logger.error(f"Failed to send to {chat_id}: {e}")
+            return False
+
+    async def _send_video(self, bot: Bot, chat_id: str, event: Dict[str, Any], video: _MediaRef) -> None:
+        if not video.as_document:
+            try:
+                sent = await self._call(
+                    bot.send_video,
+                    chat_id=chat_id,
+                    video=video.payload,
+                    caption="🎥 Event Video",
+                    supports_streaming=True,
+                    filename=video.filename,
+                )
+                self._remember_file_id(video, sent, "video")
+                logger.info("Telegram video sent (event=%s)", event.get("id"))
+                return
+            except TelegramError as e:
+                logger.warning(
+                    "Telegram send_video failed (event=%s): %s. Sending as document.",
+                    event.get("id"),
+                    e,
+                )
+                if video.file_id is None:
+                    video.as_document = True
+        try:
+            sent = await self._call(
+                bot.send_document,
+                chat_id=chat_id,
+                document=video.payload,
+                caption="🎥 Event Video",
+                filename=video.filename,
+            )
+            self._remember_file_id(video, sent, "document")
+            logger.info("Telegram video sent as document (event=%s)", event.get("id"))
+        except TelegramError as doc_err:
+            logger.error(
+                "Telegram send_document failed (event=%s): %s",
+                event.get("id"),
+                doc_err,
+            )
     
     def _format_message(
         self,
@@ -341,6 +580,7 @@ class TelegramService:
         Returns:
             Dict with success status and message
         """
+        bot: Bot | None = None
         try:
             # Create bot
             bot = Bot(token=bot_token)
@@ -381,6 +621,12 @@ class TelegramService:
                 "latency_ms": None,
                 "error_reason": str(e)
             }
+        finally:
+            if bot is not None:
+                try:
+                    await bot.shutdown()
+                except Exception:
+                    pass
     
     def is_enabled(self) -> bool:
         """
@@ -0,0 +1,305 @@
+"""
+Lightweight multi-object tracker for detection gating.
+
+Keeps per-camera track state in NumPy arrays so the temporal, movement and
+static-object checks in the detector workers become cheap reads instead of
+pairwise IoU loops over the detection history.
+
+Matching uses a vectorized IoU matrix against constant-velocity predicted
+boxes with greedy assignment, which is plenty for the handful of people a
+camera sees at once.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+def iou_matrix(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    Pairwise IoU between two sets of [x1, y1, x2, y2] boxes.
+
+    Args:
+        boxes_a: Array of shape (N, 4)
+        boxes_b: Array of shape (M, 4)
+
+    Returns:
+        Array of shape (N, M)
+    """
+    a = np.asarray(boxes_a, dtype=np.float32).reshape(-1, 4)
+    b = np.asarray(boxes_b, dtype=np.float32).reshape(-1, 4)
+    if a.shape[0] == 0 or b.shape[0] == 0:
+        return np.zeros((a.shape[0], b.shape[0]), dtype=np.float32)
+    ix1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    iy1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    ix2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    iy2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(ix2 - ix1, 0.0, None) * np.clip(iy2 - iy1, 0.0, None)
+    area_a = np.clip(a[:, 2] - a[:, 0], 0.0, None) * np.clip(a[:, 3] - a[:, 1], 0.0, None)
+    area_b = np.clip(b[:, 2] - b[:, 0], 0.0, None) * np.clip(b[:, 3] - b[:, 1], 0.0, None)
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0.0, inter / np.maximum(union, 1e-6), 0.0).astype(np.float32)
+
+
+def _paired_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """IoU of boxes_a[i] with boxes_b[i] for each row."""
+    ix1 = np.maximum(boxes_a[:, 0], boxes_b[:, 0])
+    iy1 = np.maximum(boxes_a[:, 1], boxes_b[:, 1])
+    ix2 = np.minimum(boxes_a[:, 2], boxes_b[:, 2])
+    iy2 = np.minimum(boxes_a[:, 3], boxes_b[:, 3])
+    inter = np.clip(ix2 - ix1, 0.0, None) * np.clip(iy2 - iy1, 0.0, None)
+    area_a = np.clip(boxes_a[:, 2] - boxes_a[:, 0], 0.0, None) * np.clip(boxes_a[:, 3] - boxes_a[:, 1], 0.0, None)
+    area_b = np.clip(boxes_b[:, 2] - boxes_b[:, 0], 0.0, None) * np.clip(boxes_b[:, 3] - boxes_b[:, 1], 0.0, None)
+    union = area_a + area_b - inter
+    return np.where(union > 0.0, inter / np.maximum(union, 1e-6), 0.0)
+
+
+def _centers(boxes: np.ndarray) -> np.ndarray:
+    return np.stack(
+        ((boxes[..., 0] + boxes[..., 2]) / 2.0, (boxes[..., 1] + boxes[..., 3]) / 2.0),
+        axis=-1,
+    )
+
+
+class ObjectTracker:
+    """
+    Per-camera multi-object tracker.
+
+    Besides tracks, it keeps a ring of the best (highest confidence) box per
+    frame and whether the frame had any detection, which is what the gating
+    heuristics in the workers look at.
+    """
+
+    def __init__(
+        self,
+        history: int = 5,
+        iou_threshold: float = 0.3,
+        max_misses: int = 3,
+        velocity_smoothing: float = 0.5,
+    ):
+        """
+        Initialize tracker.
+
+        Args:
+            history: Frames of per-frame and per-track history to keep
+            iou_threshold: Minimum IoU between a prediction and a detection to match
+            max_misses: Frames a track may go unmatched before it is dropped
+            velocity_smoothing: Weight of the newest velocity estimate (0-1)
+        """
+        self.history = max(2, int(history))
+        self.iou_threshold = float(iou_threshold)
+        self.max_misses = max(0, int(max_misses))
+        self.velocity_smoothing = float(velocity_smoothing)
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop all tracks and frame history."""
+        self._next_id = 1
+        self.frames = 0
+        # Track state, one row per live track
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.boxes = np.zeros((0, 4), dtype=np.float32)
+        self.velocity = np.zeros((0, 4), dtype=np.float32)
+        self.hits = np.zeros(0, dtype=np.int32)
+        self.misses = np.zeros(0, dtype=np.int32)
+        self.age = np.zeros(0, dtype=np.int32)
+        self.origin = np.zeros((0, 2), dtype=np.float32)
+        # Center history per track, NaN where the track was not observed
+        self.center_history = np.zeros((0, self.history, 2), dtype=np.float32)
+        # Per-frame ring buffers, oldest first
+        self.presence = np.zeros(self.history, dtype=bool)
+        self.best_boxes = np.zeros((self.history, 4), dtype=np.float32)
+        self.best_valid = np.zeros(self.history, dtype=bool)
+        self.last_track_ids: List[int] = []
+
+    def predict(self) -> np.ndarray:
+        """Constant-velocity prediction of every track's box for the next frame."""
+        return self.boxes + self.velocity
+
+    def update(self, detections: Sequence[Dict[str, Any]]) -> List[int]:
+        """
+        Advance one frame with this frame's detections.
+
+        Args:
+            detections: Detection dicts with "bbox" and "confidence"
+
+        Returns:
+            Track id assigned to each detection, in input order
+        """
+        dets = [d for d in detections if d.get("bbox") is not None]
+        det_boxes = np.array([d["bbox"] for d in dets], dtype=np.float32).reshape(-1, 4)
+        det_conf = np.array([float(d.get("confidence", 0.0)) for d in dets], dtype=np.float32)
+
+        self.frames += 1
+        self.presence = np.roll(self.presence, -1)
+        self.presence[-1] = len(dets) > 0
+        self.best_boxes = np.roll(self.best_boxes, -1, axis=0)
+        self.best_valid = np.roll(self.best_valid, -1)
+        self.best_valid[-1] = len(dets) > 0
+        if len(dets):
+            self.best_boxes[-1] = det_boxes[int(np.argmax(det_conf))]
+
+        n_tracks = self.ids.shape[0]
+        matched_track = np.full(len(dets), -1, dtype=np.int64)
+        if n_tracks and len(dets):
+            ious = iou_matrix(self.predict(), det_boxes)
+            # Greedy assignment, best pairs first
+            order = np.argsort(-ious, axis=None)
+            used_tracks = np.zeros(n_tracks, dtype=bool)
+            for flat in order:
+                t, d = divmod(int(flat), len(dets))
+                if ious[t, d] < self.iou_threshold:
+                    break
+                if used_tracks[t] or matched_track[d] >= 0:
+                    continue
+                used_tracks[t] = True
+                matched_track[d] = t
+
+        self.center_history = np.roll(self.center_history, -1, axis=1)
+        self.center_history[:, -1] = np.nan
+        self.age += 1
+        self.misses += 1
+
+        has_match = matched_track >= 0
+        if has_match.any():
+            t_idx = matched_track[has_match]
+            new_boxes = det_boxes[has_match]
+            measured = new_boxes - self.boxes[t_idx]
+            alpha = self.velocity_smoothing
+            self.velocity[t_idx] = alpha * measured + (1.0 - alpha) * self.velocity[t_idx]
+            self.boxes[t_idx] = new_boxes
+            self.hits[t_idx] += 1
+            self.misses[t_idx] = 0
+            self.center_history[t_idx, -1] = _centers(new_boxes)
+
+        new_boxes = det_boxes[~has_match]
+        if new_boxes.shape[0]:
+            count = new_boxes.shape[0]
+            new_ids = np.arange(self._next_id, self._next_id + count, dtype=np.int64)
+            self._next_id += count
+            history = np.full((count, self.history, 2), np.nan, dtype=np.float32)
+            history[:, -1] = _centers(new_boxes)
+            first_row = self.ids.shape[0]
+            self.ids = np.concatenate((self.ids, new_ids))
+            self.boxes = np.concatenate((self.boxes, new_boxes))
+            self.velocity = np.concatenate((self.velocity, np.zeros((count, 4), dtype=np.float32)))
+            self.hits = np.concatenate((self.hits, np.ones(count, dtype=np.int32)))
+            self.misses = np.concatenate((self.misses, np.zeros(count, dtype=np.int32)))
+            self.age = np.concatenate((self.age, np.ones(count, dtype=np.int32)))
+            self.origin = np.concatenate((self.origin, _centers(new_boxes)))
+            self.center_history = np.concatenate((self.center_history, history))
+            matched_track[~has_match] = np.arange(first_row, first_row + count)
+
+        track_ids = [int(self.ids[t]) for t in matched_track]
+
+        keep = self.misses <= self.max_misses
+        if not keep.all():
+            self.ids = self.ids[keep]
+            self.boxes = self.boxes[keep]
+            self.velocity = self.velocity[keep]
+            self.hits = self.hits[keep]
+            self.misses = self.misses[keep]
+            self.age = self.age[keep]
+            self.origin = self.origin[keep]
+            self.center_history = self.center_history[keep]
+
+        self.last_track_ids = track_ids
+        return track_ids
+
+    def _row(self, track_id: int) -> Optional[int]:
+        rows = np.nonzero(self.ids == int(track_id))[0]
+        return int(rows[0]) if rows.size else None
+
+    def is_temporally_consistent(self, min_consecutive_frames: int = 3, max_gap_frames: int = 1) -> bool:
+        """
+        Same rule as InferenceService.check_temporal_consistency, read from
+        the presence ring (which includes the current frame).
+        """
+        if not self.presence[-1]:
+            return False
+        window = max(1, int(min_consecutive_frames))
+        seen = min(self.frames, self.history)
+        if seen < window:
+            return False
+        frames_with_detections = int(self.presence[-window:].sum())
+        return (window - frames_with_detections) <= max_gap_frames
+
+    def displacement(self, track_id: int, min_lag: int = 2) -> Optional[float]:
+        """
+        Center distance between the track now and its most recent observation
+        at least min_lag frames ago.
+
+        Returns:
+            Distance in pixels, or None if the track has no such observation
+        """
+        row = self._row(track_id)
+        if row is None:
+            return None
+        history = self.center_history[row]
+        current = history[-1]
+        if np.isnan(current).any():
+            return None
+        older = history[: -max(1, int(min_lag))]
+        seen = ~np.isnan(older[:, 0])
+        if not seen.any():
+            return None
+        previous = older[np.nonzero(seen)[0][-1]]
+        return float(np.hypot(*(current - previous)))
+
+    def track_stats(self, track_id: int) -> Dict[str, Any]:
+        """Age, hit count and net displacement since the track was created."""
+        row = self._row(track_id)
+        if row is None:
+            return {}
+        center = _centers(self.boxes[row])
+        return {
+            "track_id": int(track_id),
+            "age": int(self.age[row]),
+            "hits": int(self.hits[row]),
+            "misses": int(self.misses[row]),
+            "net_displacement": float(np.hypot(*(center - self.origin[row]))),
+        }
+
+    def best_box_stats(
+        self,
+        frame_width: int,
+        frame_height: int,
+        sample_frames: int = 5,
+        margin_ratio: float = 0.03,
+    ) -> Dict[str, float]:
+        """
+        Movement signature of the best box across recent frames.
+
+        Returns:
+            Dict with center spread, median consecutive IoU, net center
+            displacement and the share of boxes touching the frame border
+        """
+        window = max(2, int(sample_frames))
+        boxes = self.best_boxes[-window:][self.best_valid[-window:]]
+        stats = {"spread": 0.0, "median_iou": 0.0, "net_displacement": 0.0, "edge_touch_ratio": 0.0}
+        if boxes.shape[0] == 0:
+            return stats
+
+        w = float(max(1, int(frame_width)))
+        h = float(max(1, int(frame_height)))
+        margin_x = max(2.0, w * float(margin_ratio))
+        margin_y = max(2.0, h * float(margin_ratio))
+        touches = (
+            (boxes[:, 0] <= margin_x)
+            | (boxes[:, 1] <= margin_y)
+            | (boxes[:, 2] >= w - margin_x)
+            | (boxes[:, 3] >= h - margin_y)
+        )
+        stats["edge_touch_ratio"] = float(touches.mean())
+        if boxes.shape[0] < 2:
+            return stats
+
+        centers = _centers(boxes)
+        extent = centers.max(axis=0) - centers.min(axis=0)
+        stats["spread"] = float(extent.max())
+        stats["net_displacement"] = float(np.hypot(*(centers[-1] - centers[0])))
+        stats["median_iou"] = float(np.median(_paired_iou(boxes[:-1], boxes[1:])))
+        return stats
@@ -1,19 +1,295 @@
 """
-Video frame-by-frame analyzer service.
+Video analyzer service.
 Detects duplicate frames, dropped frames, timing issues.
 Used by API and can be called from analyze_video.py CLI.
+
+The default fast mode does not decode the whole file: duration, fps and
+frame count come from the container metadata (ffprobe, or OpenCV's
+container properties when ffprobe is missing) and the duplicate percentage
+is estimated from up to MAX_SAMPLE_PAIRS pairs of consecutive frames
+picked by ffmpeg's select filter. Sampled pairs are compared at full
+resolution with the same mean squared difference and threshold as deep
+mode, one pair in memory at a time: thumbnails average away sensor noise
+and small motion, which would turn a slow walker into "duplicates". Deep
+mode decodes every frame and also reports timestamp jumps and duplicate
+sequences.
 """
+import json
 import logging
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
 import cv2
 import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Mean squared gray difference below which a frame repeats the previous one.
+DUPLICATE_MSE_THRESHOLD = 1.0
+MAX_SAMPLE_PAIRS = 48
+PROBE_TIMEOUT_SECONDS = 10
+SAMPLE_TIMEOUT_SECONDS = 30
+ANALYZE_WORKERS = 4
+
+
+def probe_video(video_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Read width, height, fps, frame count and duration from the container.
+
+    Returns:
+        Properties dict, or None if the file cannot be opened
+    """
+    ffprobe = shutil.which("ffprobe")
+    if ffprobe:
+        props = _probe_ffprobe(ffprobe, video_path)
+        if props:
+            return props
+    return _probe_opencv(video_path)
+
+
+def _parse_rate(value: Optional[str]) -> float:
+    try:
+        num, _, den = str(value or "0").partition("/")
+        return float(num) / float(den or 1) if float(den or 1) else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _probe_ffprobe(ffprobe: str, video_path: str) -> Optional[Dict[str, Any]]:
+    cmd = [
+        ffprobe,
+        "-v", "error",
+        "-select_streams", "v:0",
+        "-show_entries", "stream=width,height,avg_frame_rate,r_frame_rate,nb_frames,duration:format=duration",
+        "-of", "json",
+        video_path,
+    ]
+    try:
+        data = json.loads(subprocess.check_output(cmd, timeout=PROBE_TIMEOUT_SECONDS) or b"{}")
+    except Exception as e:
+        logger.debug("ffprobe failed for %s: %s", video_path, e)
+        return None
+    streams = data.get("streams") or []
+    if not streams:
+        return None
+    stream = streams[0]
+    fps = _parse_rate(stream.get("avg_frame_rate")) or _parse_rate(stream.get("r_frame_rate"))
+    try:
+        duration = float(stream.get("duration") or data.get("format", {}).get("duration") or 0.0)
+    except (TypeError, ValueError):
+        duration = 0.0
+    nb_frames = str(stream.get("nb_frames") or "")
+    frame_count = int(nb_frames) if nb_frames.isdigit() else int(round(duration * fps))
+    if not duration and fps > 0:
+        duration = frame_count / fps
+    return {
+        "width": int(stream.get("width") or 0),
+        "height": int(stream.get("height") or 0),
+        "fps": fps,
+        "frame_count": frame_count,
+        "duration": duration,
+    }
+
+
+def _probe_opencv(video_path: str) -> Optional[Dict[str, Any]]:
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return None
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        return {
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": fps,
+            "frame_count": frame_count,
+            "duration": frame_count / fps if fps > 0 else 0.0,
+        }
+    finally:
+        cap.release()
+
+
+def _sample_stride(frame_count: int, max_pairs: int) -> int:
+    """Distance between sampled pairs; 2 decodes every pair."""
+    return max(2, frame_count // max(1, max_pairs))
+
+
+def frame_mse(first: np.ndarray, second: np.ndarray) -> float:
+    """Mean squared difference of two gray frames (without uint8 overflow)."""
+    diff = cv2.absdiff(first, second).astype(np.float32)
+    return float(np.mean(diff * diff))
+
+
+def _sample_pairs_ffmpeg(
+    ffmpeg: str,
+    video_path: str,
+    stride: int,
+    width: int,
+    height: int,
+) -> Optional[List[float]]:
+    """MSE of frames n and n+1 for every stride-th n, read from ffmpeg as full-size gray."""
+    vf = f"select='lt(mod(n\\,{stride})\\,2)',scale={width}:{height},format=gray"
+    cmd = [ffmpeg, "-v", "error", "-i", video_path, "-vf", vf, "-vsync", "0", "-f", "rawvideo", "pipe:1"]
+    frame_bytes = width * height
+    errors: List[float] = []
+    try:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    except OSError as e:
+        logger.debug("ffmpeg sampling failed for %s: %s", video_path, e)
+        return None
+    timer = threading.Timer(SAMPLE_TIMEOUT_SECONDS, proc.kill)
+    timer.start()
+    try:
+        while True:
+            pair = proc.stdout.read(frame_bytes * 2)
+            if len(pair) < frame_bytes * 2:
+                break
+            frames = np.frombuffer(pair, dtype=np.uint8).reshape(2, height, width)
+            errors.append(frame_mse(frames[0], frames[1]))
+    finally:
+        timer.cancel()
+        proc.stdout.close()
+        returncode = proc.wait()
+    if returncode != 0:
+        logger.debug("ffmpeg sampling failed for %s: exit %s", video_path, returncode)
+        return None
+    return errors
+
+
+def _sample_pairs_opencv(video_path: str, stride: int) -> Optional[List[float]]:
+    """OpenCV fallback: grab() skips conversion of the frames not sampled."""
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return None
+    errors: List[float] = []
+    try:
+        index = 0
+        first: Optional[np.ndarray] = None
+        while cap.grab():
+            position = index % stride
+            if position < 2:
+                ok, frame = cap.retrieve()
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if ok else None
+                if position == 0:
+                    first = gray
+                elif first is not None and gray is not None:
+                    errors.append(frame_mse(first, gray))
+            index += 1
+    finally:
+        cap.release()
+    return errors
+
+
+def pair_duplicate_ratio(pair_errors: Sequence[float]) -> Dict[str, Any]:
+    """Duplicate share among sampled pairs, from their mean squared differences."""
+    pairs = len(pair_errors)
+    if pairs == 0:
+        return {"sampled_pairs": 0, "duplicate_pairs": 0, "duplicate_percentage": 0.0}
+    duplicates = sum(1 for mse in pair_errors if mse < DUPLICATE_MSE_THRESHOLD)
+    return {
+        "sampled_pairs": pairs,
+        "duplicate_pairs": duplicates,
+        "duplicate_percentage": round(100.0 * duplicates / pairs, 1),
+    }
+
+
+def _analyze_fast(video_path: str, max_pairs: int = MAX_SAMPLE_PAIRS) -> Optional[Dict[str, Any]]:
+    props = probe_video(video_path)
+    if props is None:
+        logger.error("Cannot open video: %s", video_path)
+        return None
+
+    stride = _sample_stride(props["frame_count"], max_pairs)
+    ffmpeg = shutil.which("ffmpeg")
+    samples = None
+    if ffmpeg and props["width"] > 0 and props["height"] > 0:
+        samples = _sample_pairs_ffmpeg(ffmpeg, video_path, stride, props["width"], props["height"])
+    if samples is None:
+        samples = _sample_pairs_opencv(video_path, stride)
+    if samples is None:
+        logger.error("Cannot decode video: %s", video_path)
+        return None
+
+    dup = pair_duplicate_ratio(samples)
+    fps = props["fps"]
+    frame_count = props["frame_count"]
+    duration = props["duration"]
+    issues: List[str] = []
+    if dup["duplicate_pairs"] > 0:
+        issues.append(
+            f"DUPLICATE FRAMES: ~{dup['duplicate_percentage']:.1f}% "
+            f"({dup['duplicate_pairs']}/{dup['sampled_pairs']} sampled pairs)"
+        )
+    return {
+        "video_properties": {
+            "width": props["width"],
+            "height": props["height"],
+            "fps": round(fps, 2),
+            "frame_count": frame_count,
+            "duration": round(duration, 2),
+        },
+        "analysis": {
+            "total_frames": frame_count,
+            "calculated_duration": round(frame_count / fps, 2) if fps > 0 else round(duration, 2),
+            "actual_duration": round(duration, 2),
+            "duplicate_frames": int(round(frame_count * dup["duplicate_percentage"] / 100.0)),
+            "duplicate_percentage": dup["duplicate_percentage"],
+            "sampled_pairs": dup["sampled_pairs"],
+        },
+        "ok": len(issues) == 0,
+        "issues": issues,
+        "mode": "fast",
+    }
+
+
+def analyze_video(video_path: str, deep: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Analyze a video file.
+
+    Args:
+        video_path: Path to the video
+        deep: Decode every frame (timestamp jumps, duplicate sequences)
+            instead of the metadata + sampled estimate
+
+    Returns:
+        JSON-serializable dict with analysis results, or None if the video cannot be opened
+    """
+    path = Path(video_path)
+    if not path.exists():
+        logger.error("Video file not found: %s", video_path)
+        return None
+    if deep:
+        return _analyze_deep(str(path))
+    return _analyze_fast(str(path))
+
+
+def analyze_videos(
+    video_paths: Sequence[str],
+    deep: bool = False,
+    workers: int = ANALYZE_WORKERS,
+) -> Dict[str, Optional[Dict[str, Any]]]:
+    """
+    Analyze several videos in parallel.
+
+    Decoding runs in ffmpeg subprocesses or OpenCV, both outside the GIL,
+    so a thread pool is enough.
+
+    Returns:
+        Result (or None) per path, in input order
+    """
+    paths = list(dict.fromkeys(video_paths))
+    if len(paths) <= 1 or workers <= 1:
+        return {path: analyze_video(path, deep=deep) for path in paths}
+    with ThreadPoolExecutor(max_workers=min(workers, len(paths)), thread_name_prefix="video-analyze") as pool:
+        results = pool.map(lambda path: analyze_video(path, deep=deep), paths)
+        return dict(zip(paths, results))
+
 
-def analyze_video(video_path: str) -> Optional[Dict[str, Any]]:
+def _analyze_deep(video_path: str) -> Optional[Dict[str, Any]]:
     """
     Analyze video frame by frame.
     Returns JSON-serializable dict with analysis results, or None if video cannot be opened.
@@ -58,11 +334,10 @@ def analyze_video(video_path: str) -> Optional[Dict[str, Any]]:
             diff_score = 0.0
 
             if prev_frame is not None:
-                diff = cv2.absdiff(gray, prev_frame)
-                mse = float(np.mean(diff ** 2))
+                mse = frame_mse(gray, prev_frame)
                 diff_score = mse
 
-                if mse < 1.0:
+                if mse < DUPLICATE_MSE_THRESHOLD:
                     is_duplicate = True
                     duplicate_count += 1
                     current_duplicate_seq.append(frame_idx)
@@ -156,6 +431,7 @@ def analyze_video(video_path: str) -> Optional[Dict[str, Any]]:
             ],
             "ok": len(issues) == 0,
             "issues": issues,
+            "mode": "deep",
         }
     finally:
         cap.release()
@@ -2,65 +2,134 @@
 WebSocket service for Thermal Dual Vision.
 
 Handles real-time event and status updates via WebSocket connections.
+
+Every client gets its own bounded send queue served by a dedicated sender
+task, so one slow browser cannot stall delivery to the others. Status
+updates are coalesced per camera within a short tick and every message is
+serialized exactly once regardless of the number of clients.
 """
+import asyncio
 import json
 import logging
 import threading
-from typing import List, Dict, Any, Callable, Coroutine
-from fastapi import WebSocket
-import asyncio
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from fastapi import WebSocket, status
+
+from app.services.metrics import get_metrics_service
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 
 logger = logging.getLogger(__name__)
 
+# Per-client queue bound. Status messages are dropped oldest-first when the
+# queue is full; events are only dropped when a queue holds nothing else.
+CLIENT_QUEUE_SIZE = 64
+# Window used to coalesce status updates for the same camera.
+STATUS_COALESCE_SECONDS = 0.1
+# A client that cannot accept a frame within this time is disconnected.
+SEND_TIMEOUT_SECONDS = 10.0
+# Bound on closing a dropped client's socket (its transport may be stuck).
+CLOSE_TIMEOUT_SECONDS = 1.0
+
+KIND_EVENT = "event"
+KIND_STATUS = "status"
+
+
+def _dumps(message: Dict[str, Any]) -> str:
+    """Serialize a message to JSON text, preferring orjson when installed."""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(message).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(message, separators=(",", ":"), default=str)
+
+
+class _ClientChannel:
+    """Bounded outbound queue and sender task for a single WebSocket."""
+
+    def __init__(self, websocket: WebSocket, max_queue: int):
+        self.websocket = websocket
+        self.max_queue = max(1, max_queue)
+        self.queue: Deque[Tuple[str, str]] = deque()
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.dropped = 0
+        self.closed = False
+
+    def enqueue(self, kind: str, payload: str) -> bool:
+        """
+        Queue a serialized message without blocking.
+
+        Returns:
+            False if an older message had to be dropped to make room
+        """
+        dropped = False
+        if len(self.queue) >= self.max_queue:
+            victim = None
+            for index, (queued_kind, _) in enumerate(self.queue):
+                if queued_kind == KIND_STATUS:
+                    victim = index
+                    break
+            if victim is None:
+                self.queue.popleft()
+            else:
+                del self.queue[victim]
+            self.dropped += 1
+            dropped = True
+        self.queue.append((kind, payload))
+        self.wakeup.set()
+        return not dropped
+
 
 class WebSocketManager:
     """
     WebSocket connection manager.
     
     Manages active WebSocket connections and broadcasts messages
-    to all connected clients.
+    to all connected clients through per-client send queues.
     """
-    
-    def __init__(self):
+
+    def __init__(
+        self,
+        max_queue: int = CLIENT_QUEUE_SIZE,
+        coalesce_seconds: float = STATUS_COALESCE_SECONDS,
+        send_timeout: float = SEND_TIMEOUT_SECONDS,
+    ):
         """Initialize WebSocket manager."""
-        self.active_connections: List[WebSocket] = []
-        # Lock is created lazily inside the running event loop to avoid
-        # "no current event loop" errors when the manager is instantiated
-        # at module import time (outside async context).
-        self._lock: asyncio.Lock | None = None
-        self._bg_loop: asyncio.AbstractEventLoop | None = None
-        self._bg_thread: threading.Thread | None = None
-        self._bg_lock = threading.Lock()
+        self.max_queue = max_queue
+        self.coalesce_seconds = coalesce_seconds
+        self.send_timeout = send_timeout
+        self._channels: Dict[WebSocket, _ClientChannel] = {}
+        # Loop that owns the connections; captured on first connect so that
+        # worker threads can hand messages over with call_soon_threadsafe.
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        # Pending status messages keyed by camera, shared with worker threads.
+        self._pending_lock = threading.Lock()
+        self._pending_status: Dict[str, Dict[str, Any]] = {}
+        self._flush_scheduled = False
+        self._stats = {
+            "broadcasts": 0,
+            "status_coalesced": 0,
+            "dropped": 0,
+            "disconnected_slow": 0,
+        }
         logger.info("WebSocketManager initialized")
-    def _ensure_background_loop(self) -> asyncio.AbstractEventLoop:
-        with self._bg_lock:
-            if self._bg_loop and self._bg_loop.is_running():
-                return self._bg_loop
-
-            loop = asyncio.new_event_loop()
-
-            def _runner() -> None:
-                asyncio.set_event_loop(loop)
-                loop.run_forever()
 
-            thread = threading.Thread(
-                target=_runner,
-                daemon=True,
-                name="websocket-manager-loop",
-            )
-            thread.start()
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        """Currently registered connections."""
+        return list(self._channels.keys())
 
-            self._bg_loop = loop
-            self._bg_thread = thread
-            return loop
-
-
-    def _get_lock(self) -> asyncio.Lock:
-        if self._lock is None:
-            self._lock = asyncio.Lock()
-        return self._lock
-    
     async def connect(self, websocket: WebSocket):
         """
         Accept and register a new WebSocket connection.
@@ -69,11 +138,12 @@ class WebSocketManager:
             websocket: WebSocket connection to register
         """
         await websocket.accept()
-        lock = self._get_lock()
-        async with lock:
-            self.active_connections.append(websocket)
-        logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
-    
+        self._loop = asyncio.get_running_loop()
+        channel = _ClientChannel(websocket, self.max_queue)
+        channel.task = asyncio.create_task(self._sender(channel))
+        self._channels[websocket] = channel
+        logger.info(f"WebSocket connected. Total connections: {len(self._channels)}")
+
     async def disconnect(self, websocket: WebSocket):
         """
         Remove a WebSocket connection.
@@ -81,12 +151,14 @@ class WebSocketManager:
         Args:
             websocket: WebSocket connection to remove
         """
-        lock = self._get_lock()
-        async with lock:
-            if websocket in self.active_connections:
-                self.active_connections.remove(websocket)
-        logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
-    
+        channel = self._channels.pop(websocket, None)
+        if channel is not None:
+            channel.closed = True
+            channel.wakeup.set()
+            if channel.task and channel.task is not asyncio.current_task():
+                channel.task.cancel()
+        logger.info(f"WebSocket disconnected. Total connections: {len(self._channels)}")
+
     async def broadcast_event(self, event_data: Dict[str, Any]):
         """
         Broadcast event to all connected clients.
@@ -98,84 +170,172 @@ class WebSocketManager:
             "type": "event",
             "data": event_data
         }
-        
-        await self._broadcast(message)
+
+        self._fanout(KIND_EVENT, message)
         logger.debug(f"Broadcasted event: {event_data.get('id', 'unknown')}")
     
     async def broadcast_status(self, status_data: Dict[str, Any]):
         """
         Broadcast system status to all connected clients.
-        
+
+        Updates for the same camera within the coalesce window are merged
+        so that only the most recent one is sent.
+
         Args:
             status_data: Status data to broadcast
         """
-        message = {
-            "type": "status",
-            "data": status_data
-        }
-        
-        await self._broadcast(message)
-        logger.debug("Broadcasted status update")
+        self._queue_status(status_data)
+        logger.debug("Queued status update")
 
     def broadcast_event_sync(self, event_data: Dict[str, Any]) -> None:
-        if not self.active_connections:
+        """Thread-safe variant of broadcast_event for worker threads."""
+        loop = self._live_loop()
+        if loop is None:
             return
-        self._run_async(lambda: self.broadcast_event(event_data))
+        message = {"type": "event", "data": event_data}
+        try:
+            loop.call_soon_threadsafe(self._fanout, KIND_EVENT, message)
+        except RuntimeError:
+            pass
 
     def broadcast_status_sync(self, status_data: Dict[str, Any]) -> None:
-        if not self.active_connections:
+        """Thread-safe variant of broadcast_status for worker threads."""
+        if self._live_loop() is None:
             return
-        self._run_async(lambda: self.broadcast_status(status_data))
+        self._queue_status(status_data)
 
-    def _run_async(self, coro_factory: Callable[[], Coroutine[Any, Any, Any]]) -> None:
-        try:
-            loop = asyncio.get_running_loop()
-            loop.create_task(coro_factory())
-        except RuntimeError:
-            if not self.active_connections:
-                try:
-                    coro_factory().close()
-                except Exception:
-                    pass
-                return
-            loop = self._ensure_background_loop()
-            asyncio.run_coroutine_threadsafe(coro_factory(), loop)
-    
-    async def _broadcast(self, message: Dict[str, Any]):
+    def get_stats(self) -> Dict[str, Any]:
         """
-        Send message to all connected clients.
-        
-        Args:
-            message: Message to broadcast
+        Backpressure statistics for the broadcaster.
+
+        Returns:
+            Dict with connection count, per-client queue depths and counters
         """
-        if not self.active_connections:
+        channels = list(self._channels.values())
+        depths = [len(channel.queue) for channel in channels]
+        return {
+            "connections": len(channels),
+            "queue_depth_max": max(depths) if depths else 0,
+            "queue_depth_total": sum(depths),
+            "queue_limit": self.max_queue,
+            "pending_status": len(self._pending_status),
+            **self._stats,
+        }
+
+    def _live_loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        if not self._channels:
+            return None
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return None
+        return loop
+
+    def _queue_status(self, status_data: Dict[str, Any]) -> None:
+        key = str(status_data.get("camera_id") or "_system")
+        with self._pending_lock:
+            if key in self._pending_status:
+                self._stats["status_coalesced"] += 1
+            self._pending_status[key] = status_data
+            if self._flush_scheduled:
+                return
+            self._flush_scheduled = True
+        loop = self._loop
+        try:
+            if loop is None or loop.is_closed():
+                raise RuntimeError("no event loop")
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is loop:
+                loop.call_later(self.coalesce_seconds, self._flush_status)
+            else:
+                loop.call_soon_threadsafe(
+                    loop.call_later, self.coalesce_seconds, self._flush_status
+                )
+        except RuntimeError:
+            with self._pending_lock:
+                self._pending_status.clear()
+                self._flush_scheduled = False
+
+    def _flush_status(self) -> None:
+        with self._pending_lock:
+            pending = list(self._pending_status.values())
+            self._pending_status.clear()
+            self._flush_scheduled = False
+        for status_data in pending:
+            self._fanout(KIND_STATUS, {"type": "status", "data": status_data})
+
+    def _fanout(self, kind: str, message: Dict[str, Any]) -> None:
+        """Serialize once and enqueue for every client. Runs on the loop."""
+        if not self._channels:
             return
-        
-        # Convert message to JSON
-        message_json = json.dumps(message)
-        
-        # Send to all connections
-        lock = self._get_lock()
-        async with lock:
-            connections = list(self.active_connections)
-        disconnected = []
+        payload = _dumps(message)
+        self._stats["broadcasts"] += 1
+        dropped = 0
+        depth = 0
+        for channel in list(self._channels.values()):
+            if not channel.enqueue(kind, payload):
+                dropped += 1
+            depth = max(depth, len(channel.queue))
+        self._stats["dropped"] += dropped
+        try:
+            get_metrics_service().set_websocket_stats(len(self._channels), depth, dropped)
+        except Exception:
+            pass
 
-        for connection in connections:
+    async def _sender(self, channel: _ClientChannel) -> None:
+        """Drain one client's queue; a slow client only delays itself."""
+        try:
+            while not channel.closed:
+                await channel.wakeup.wait()
+                channel.wakeup.clear()
+                while channel.queue and not channel.closed:
+                    _, payload = channel.queue.popleft()
+                    started = time.monotonic()
+                    await asyncio.wait_for(
+                        channel.websocket.send_text(payload),
+                        timeout=self.send_timeout,
+                    )
+                    channel.sent += 1
+                    elapsed = time.monotonic() - started
+                    if elapsed > 1.0:
+                        logger.debug("Slow WebSocket send: %.2fs", elapsed)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self._stats["disconnected_slow"] += 1
+            logger.warning("Dropping WebSocket client: send timed out after %.0fs", self.send_timeout)
+            await self.disconnect(channel.websocket)
+            # Close the socket too, or the client never learns it was dropped
+            # and its receive loop keeps the connection open.
             try:
-                await connection.send_text(message_json)
-            except Exception as e:
-                logger.error(f"Failed to send message to client: {e}")
-                disconnected.append(connection)
-        
-        # Remove disconnected clients
-        if disconnected:
-            lock = self._get_lock()
-            async with lock:
-                for connection in disconnected:
-                    if connection in self.active_connections:
-                        self.active_connections.remove(connection)
-            logger.info(f"Removed {len(disconnected)} disconnected clients")
-    
+                await asyncio.wait_for(
+                    channel.websocket.close(code=status.WS_1013_TRY_AGAIN_LATER),
+                    timeout=CLOSE_TIMEOUT_SECONDS,
+                )
+            except Exception:
+                pass
+        except Exception as e:
+            logger.error(f"Failed to send message to client: {e}")
+            await self.disconnect(channel.websocket)
+
+    def reply(self, websocket: WebSocket, text: str) -> bool:
+        """
+        Queue a raw text reply (e.g. "pong") for a connected client.
+
+        Goes through the client's channel so its sender task stays the only
+        writer on the socket.
+
+        Returns:
+            False if the client is not connected
+        """
+        channel = self._channels.get(websocket)
+        if channel is None or channel.closed:
+            return False
+        channel.enqueue(KIND_STATUS, text)
+        return True
+
     async def send_to_client(self, websocket: WebSocket, message: Dict[str, Any]):
         """
         Send message to a specific client.
@@ -184,9 +344,12 @@ class WebSocketManager:
             websocket: Target WebSocket connection
             message: Message to send
         """
+        channel = self._channels.get(websocket)
+        if channel is not None:
+            channel.enqueue(KIND_EVENT, _dumps(message))
+            return
         try:
-            message_json = json.dumps(message)
-            await websocket.send_text(message_json)
+            await websocket.send_text(_dumps(message))
         except Exception as e:
             logger.error(f"Failed to send message to client: {e}")
             await self.disconnect(websocket)
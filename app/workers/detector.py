@@ -18,28 +18,39 @@ import asyncio
 import shutil
 import subprocess
 from collections import defaultdict, deque
+from concurrent.futures import Future
 from datetime import datetime, timezone
 from types import SimpleNamespace
 from typing import Dict, List, Optional, Tuple, Any
 
 import cv2
 import numpy as np
-import psutil
 from sqlalchemy.orm import Session
 
 from app.db.models import Camera, Event, CameraStatus
 from app.db.session import session_scope
+from app.db.writer import get_db_writer
 from app.services.camera import CameraService
+from app.services.camera_crud import get_camera_crud_service
+from app.services.capture_mux import ReaderTask, get_capture_mux, get_reader_pool
+from app.services.event_index import get_event_index
 from app.services.events import get_event_service
 from app.services.ai import get_ai_service
 from app.services.inference import get_inference_service
+from app.services.inference_scheduler import get_inference_scheduler
 from app.services.media import get_media_service
 from app.services.settings import get_settings_service
+from app.services.system_stats import get_system_stats
 from app.services.telegram import get_telegram_service
 from app.services.time_utils import get_detection_source
+from app.services.frame_buffer import buffer_jpeg_quality, pack_frame, unpack_frames
+from app.services.frame_gate import FrameChangeGate, frame_fingerprint
+from app.services.motion import union_motion_bbox
+from app.services.tracker import ObjectTracker
 from app.services.websocket import get_websocket_manager
 from app.services.mqtt import get_mqtt_service
 from app.services.go2rtc import get_go2rtc_service
+from app.services.ingest import get_ingest_manager
 from app.services.metrics import get_metrics_service
 from app.services.ai_constants import AI_NEGATIVE_MARKERS, AI_POSITIVE_MARKERS
 from app.utils.rtsp import redact_rtsp_url
@@ -47,6 +58,12 @@ from app.utils.rtsp import redact_rtsp_url
 
 logger = logging.getLogger(__name__)
 
+# How long a reader waits for a new ffmpeg (or shared ingest) frame before
+# counting a failed read.
+FFMPEG_READ_TIMEOUT_SECONDS = 5.0
+# Pooled readers re-check a capture this often while waiting for a new frame.
+READER_POLL_SECONDS = 0.02
+
 
 def _utc_now_naive() -> datetime:
     return datetime.now(timezone.utc).replace(tzinfo=None)
@@ -78,7 +95,11 @@ class DetectorWorker:
         # Services
         self.camera_service = CameraService()
         self.inference_service = get_inference_service()
+        self.inference_scheduler = get_inference_scheduler()
         self.event_service = get_event_service()
+        self.db_writer = get_db_writer()
+        self.event_index = get_event_index()
+        self.camera_crud_service = get_camera_crud_service()
         self.ai_service = get_ai_service()
         self.settings_service = get_settings_service()
         self.media_service = get_media_service()
@@ -87,6 +108,10 @@ class DetectorWorker:
         self.mqtt_service = get_mqtt_service()
         self.go2rtc_service = get_go2rtc_service()
         self.metrics_service = get_metrics_service()
+        self.ingest_manager = get_ingest_manager()
+        self.system_stats = get_system_stats()
+        self.capture_mux = get_capture_mux()
+        self.reader_pool = get_reader_pool()
         
         # Per-camera state
         self.frame_buffers: Dict[str, deque] = defaultdict(deque)
@@ -97,7 +122,7 @@ class DetectorWorker:
         self.video_last_sample: Dict[str, float] = {}
         self.latest_frames: Dict[str, np.ndarray] = {}
         self.latest_frame_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
-        self.detection_history: Dict[str, deque] = defaultdict(lambda: deque(maxlen=5))
+        self.trackers: Dict[str, ObjectTracker] = defaultdict(ObjectTracker)
         self.zone_history: Dict[str, Dict[str, deque]] = defaultdict(lambda: defaultdict(lambda: deque(maxlen=5)))
         self.last_event_time: Dict[str, float] = {}
         self.event_start_time: Dict[str, Optional[float]] = {}
@@ -108,6 +133,8 @@ class DetectorWorker:
         self.ffmpeg_frame_shapes: Dict[str, Tuple[int, int]] = {}
         self.ffmpeg_last_errors: Dict[str, deque] = defaultdict(lambda: deque(maxlen=3))
         self.ffmpeg_error_lock = threading.Lock()
+        # ffmpeg capture pid -> multiplexed stdout/stderr pipes
+        self.ffmpeg_pipes: Dict[int, Any] = {}
         self.ffmpeg_fallback_until: Dict[str, float] = {}
         self.last_detection_log: Dict[str, float] = {}
         self.last_detection_pipeline_log: Dict[str, float] = {}
@@ -118,13 +145,28 @@ class DetectorWorker:
         self.thermal_motion_peak_area: Dict[str, int] = defaultdict(int)
         self.thermal_motion_peak_ts: Dict[str, float] = {}
         self.last_relaxed_infer_time: Dict[str, float] = {}
+        self.roi_inference_counter: Dict[str, int] = {}
         self.stale_gate_hits: Dict[str, int] = defaultdict(int)
+        self.frame_gates: Dict[str, FrameChangeGate] = defaultdict(FrameChangeGate)
         self.last_reconnect_ts: Dict[str, float] = {}
         self.stream_stats: Dict[str, Dict[str, Any]] = defaultdict(dict)
         self.stream_stats_lock = threading.Lock()
         
         logger.info("DetectorWorker initialized")
     
+    def load_model(self) -> None:
+        """
+        Load the configured YOLOv8 model (backend export and warmup included).
+        
+        Called separately during staged startup so camera threads can be
+        reported as their own stage; start() loads it if still needed.
+        """
+        config = self.settings_service.load_config()
+        model_name = config.detection.model.replace("-person", "")  # yolov8n-person → yolov8n
+        if self.inference_service.model is not None and self.inference_service.model_name == model_name:
+            return
+        self.inference_service.load_model(model_name)
+    
     def start(self) -> None:
         """
         Start detection worker.
@@ -136,12 +178,11 @@ class DetectorWorker:
             return
         
         try:
-            # Load settings
-            config = self.settings_service.load_config()
-            
             # Load YOLOv8 model
-            model_name = config.detection.model.replace("-person", "")  # yolov8n-person → yolov8n
-            self.inference_service.load_model(model_name)
+            self.load_model()
+
+            # Last event per camera for cooldown, one grouped query
+            self.event_index.ensure_loaded()
             
             self.running = True
             logger.info("DetectorWorker started")
@@ -183,6 +224,8 @@ class DetectorWorker:
             logger.info(f"Stopping detection thread for camera {camera_id}")
             thread.join(timeout=5)
         
+        for camera_id in list(self.threads):
+            self.inference_scheduler.remove_camera(camera_id)
         self.threads.clear()
         self.camera_stop_events.clear()
         self.frame_buffers.clear()
@@ -191,7 +234,7 @@ class DetectorWorker:
         self.video_buffers.clear()
         self.video_buffer_locks.clear()
         self.video_last_sample.clear()
-        self.detection_history.clear()
+        self.trackers.clear()
         self.zone_history.clear()
         self.last_event_time.clear()
         self.event_start_time.clear()
@@ -202,6 +245,7 @@ class DetectorWorker:
         self.latest_frames.clear()
         self.latest_frame_locks.clear()
         self.stale_gate_hits.clear()
+        self.frame_gates.clear()
         self.thermal_motion_peak_area.clear()
         self.thermal_motion_peak_ts.clear()
         self.last_reconnect_ts.clear()
@@ -222,13 +266,14 @@ class DetectorWorker:
         self._cleanup_camera_state(camera_id)
 
     def _cleanup_camera_state(self, camera_id: str) -> None:
+        self.inference_scheduler.remove_camera(camera_id)
         self.frame_buffers.pop(camera_id, None)
         self.frame_counters.pop(camera_id, None)
         self.frame_buffer_locks.pop(camera_id, None)
         self.video_buffers.pop(camera_id, None)
         self.video_buffer_locks.pop(camera_id, None)
         self.video_last_sample.pop(camera_id, None)
-        self.detection_history.pop(camera_id, None)
+        self.trackers.pop(camera_id, None)
         self.zone_history.pop(camera_id, None)
         self.last_event_time.pop(camera_id, None)
         self.event_start_time.pop(camera_id, None)
@@ -244,7 +289,9 @@ class DetectorWorker:
         self.last_fallback_log.pop(camera_id, None)
         self.no_detection_streak.pop(camera_id, None)
         self.last_relaxed_infer_time.pop(camera_id, None)
+        self.roi_inference_counter.pop(camera_id, None)
         self.stale_gate_hits.pop(camera_id, None)
+        self.frame_gates.pop(camera_id, None)
         self.last_motion_area.pop(camera_id, None)
         self.thermal_motion_peak_area.pop(camera_id, None)
         self.thermal_motion_peak_ts.pop(camera_id, None)
@@ -706,7 +753,7 @@ class DetectorWorker:
                     trimmed = deque((item for item in vbuffer if item[1] >= cutoff), maxlen=vbuffer.maxlen)
                     self.video_buffers[camera_id] = trimmed
         self.frame_counters[camera_id] = 0
-        self.detection_history[camera_id].clear()
+        self.trackers[camera_id].reset()
 
     def _camera_snapshot(self, camera: Camera) -> SimpleNamespace:
         """Create a detached camera snapshot safe for worker threads."""
@@ -761,10 +808,19 @@ class DetectorWorker:
         """
         camera_id = camera.id
         cap = None
+        ffmpeg_proc = None
         reader_stop = stop_event
-        latest_frame: Dict[str, Optional[np.ndarray]] = {"frame": None}
+        latest_frame: Dict[str, Optional[np.ndarray]] = {"frame": None, "fingerprint": None}
         frame_lock = threading.Lock()
+        # Frames are read by a pooled step, or by reader_thread while the
+        # camera is on the (blocking) OpenCV backend; reader_lock guards the
+        # hand-over between the two.
+        reader_lock = threading.Lock()
+        reader_task: Optional[ReaderTask] = None
         reader_thread: Optional[threading.Thread] = None
+        # Reopen/stop of the capture running on the reader pool's blocking
+        # executor; the reader step only polls it.
+        capture_job: Optional[Future] = None
         
         try:
             # Get settings
@@ -772,20 +828,14 @@ class DetectorWorker:
             last_config_refresh = time.time()
 
             # Initialize cooldown from last persisted event to survive restarts
-            with session_scope() as db:
-                latest = (
-                    db.query(Event)
-                    .filter(Event.camera_id == camera_id)
-                    .order_by(Event.timestamp.desc())
-                    .first()
+            last_event_ts = self.event_index.last_event_time(camera_id)
+            if last_event_ts:
+                self.last_event_time[camera_id] = last_event_ts
+                logger.info(
+                    "Loaded last event time for camera %s: %s",
+                    camera_id,
+                    datetime.fromtimestamp(last_event_ts, tz=timezone.utc).isoformat(),
                 )
-                if latest and latest.timestamp:
-                    self.last_event_time[camera_id] = latest.timestamp.timestamp()
-                    logger.info(
-                        "Loaded last event time for camera %s: %s",
-                        camera_id,
-                        latest.timestamp.isoformat(),
-                    )
             
             # Determine detection source (auto mode support)
             detection_source = get_detection_source(camera.detection_source.value)
@@ -815,7 +865,11 @@ class DetectorWorker:
             cap = None
             active_url = None
 
-            if capture_backend in ("auto", "ffmpeg"):
+            cap = self._open_ingest_capture(rtsp_urls[0], config, camera_id)
+            if cap is not None:
+                active_backend = "ingest"
+                active_url = rtsp_urls[0]
+            elif capture_backend in ("auto", "ffmpeg"):
                 ffmpeg_proc, active_url, ffmpeg_frame_shape = self._open_ffmpeg_with_fallbacks(
                     rtsp_urls,
                     config,
@@ -830,7 +884,7 @@ class DetectorWorker:
                         camera_id,
                     )
 
-            if active_backend != "ffmpeg":
+            if active_backend == "opencv":
                 # Open video capture with codec fallback
                 cap, active_url = self._open_capture_with_fallbacks(rtsp_urls, config, camera_id)
 
@@ -842,395 +896,485 @@ class DetectorWorker:
             logger.info("Capture backend for camera %s: %s", camera_id, active_backend)
             
             # FPS control
-            target_fps = config.detection.inference_fps
+            target_fps = max(float(config.detection.inference_fps), 1.0)
             frame_delay = 1.0 / target_fps
             record_fps = float(getattr(config.event, "record_fps", target_fps))
             record_fps = max(1.0, min(record_fps, 30.0))
             reader_delay = 1.0 / record_fps
             last_inference_time = 0
             buffer_size = max(config.event.frame_buffer_size, 10)
-            last_cpu_check = 0.0
+            last_rate_check = 0.0
             stream_log_interval = 30.0
             protocol = config.stream.protocol
 
             self._init_stream_stats(camera_id)
             ffmpeg_reconnect_times: deque[float] = deque(maxlen=12)
 
-            def reader_loop() -> None:
-                nonlocal cap, active_url, rtsp_urls, ffmpeg_proc, ffmpeg_frame_shape, ffmpeg_frame_size, active_backend
-                failures = 0
-                open_failures = 0
-
-                def _capture_ready() -> bool:
-                    if active_backend == "ffmpeg":
-                        return (
-                            ffmpeg_proc is not None
-                            and ffmpeg_proc.poll() is None
-                            and ffmpeg_frame_size
-                        )
-                    return cap is not None and cap.isOpened()
-
-                def _open_capture_backend(is_reconnect: bool = False) -> bool:
-                    nonlocal cap, active_url, ffmpeg_proc, ffmpeg_frame_shape, ffmpeg_frame_size, active_backend
-                    if self._allows_ffmpeg_flapping_fallback(capture_backend):
-                        now_ts = time.time()
-                        fallback_until = float(self.ffmpeg_fallback_until.get(camera_id, 0.0))
-                        reconnect_pressure = (
-                            self._count_recent_reconnects(camera_id, window_seconds=300.0)
-                            if is_reconnect
-                            else 0
-                        )
-                        selected_backend = self._select_capture_backend_for_reopen(
-                            current_backend=active_backend,
-                            configured_backend=capture_backend,
-                            fallback_until_ts=fallback_until,
-                            now_ts=now_ts,
-                            recent_reconnects=reconnect_pressure,
-                        )
-                        if selected_backend != active_backend:
-                            if selected_backend == "opencv":
-                                logger.warning(
-                                    "Camera %s using temporary OpenCV fallback for %.0fs after ffmpeg exits",
+            failures = 0
+            open_failures = 0
+            # Reads poll the capture without blocking; one read fails after
+            # FFMPEG_READ_TIMEOUT_SECONDS without a new frame.
+            read_deadline = time.monotonic() + FFMPEG_READ_TIMEOUT_SECONDS
+
+            def _capture_ready() -> bool:
+                if active_backend == "ffmpeg":
+                    return (
+                        ffmpeg_proc is not None
+                        and ffmpeg_proc.poll() is None
+                        and ffmpeg_frame_size
+                    )
+                return cap is not None and cap.isOpened()
+
+            def _open_capture_backend(is_reconnect: bool = False) -> bool:
+                nonlocal cap, active_url, ffmpeg_proc, ffmpeg_frame_shape, ffmpeg_frame_size, active_backend
+                if active_backend == "ingest":
+                    cap = self._open_ingest_capture(
+                        rtsp_urls[0],
+                        config,
+                        camera_id,
+                        is_reconnect=is_reconnect,
+                    )
+                    if cap is not None:
+                        active_url = rtsp_urls[0]
+                        if is_reconnect:
+                            self.last_reconnect_ts[camera_id] = time.time()
+                            logger.info("Reconnected camera %s (shared ingest)", camera_id)
+                        return True
+                    # Recording stopped or moved to another stream.
+                    active_backend = "ffmpeg" if capture_backend in ("auto", "ffmpeg") else "opencv"
+                if self._allows_ffmpeg_flapping_fallback(capture_backend):
+                    now_ts = time.time()
+                    fallback_until = float(self.ffmpeg_fallback_until.get(camera_id, 0.0))
+                    reconnect_pressure = (
+                        self._count_recent_reconnects(camera_id, window_seconds=300.0)
+                        if is_reconnect
+                        else 0
+                    )
+                    selected_backend = self._select_capture_backend_for_reopen(
+                        current_backend=active_backend,
+                        configured_backend=capture_backend,
+                        fallback_until_ts=fallback_until,
+                        now_ts=now_ts,
+                        recent_reconnects=reconnect_pressure,
+                    )
+                    if selected_backend != active_backend:
+                        if selected_backend == "opencv":
+                            logger.warning(
+                                "Camera %s using temporary OpenCV fallback for %.0fs after ffmpeg exits",
+                                camera_id,
+                                max(0.0, fallback_until - now_ts),
+                            )
+                        else:
+                            if fallback_until > now_ts:
+                                logger.info(
+                                    "Camera %s retrying ffmpeg backend early (OpenCV reconnect pressure=%s, fallback_left=%.0fs)",
                                     camera_id,
+                                    reconnect_pressure,
                                     max(0.0, fallback_until - now_ts),
                                 )
                             else:
-                                if fallback_until > now_ts:
-                                    logger.info(
-                                        "Camera %s retrying ffmpeg backend early (OpenCV reconnect pressure=%s, fallback_left=%.0fs)",
-                                        camera_id,
-                                        reconnect_pressure,
-                                        max(0.0, fallback_until - now_ts),
-                                    )
-                                else:
-                                    logger.info(
-                                        "Camera %s retrying ffmpeg backend after fallback window",
-                                        camera_id,
-                                    )
-                            active_backend = selected_backend
-
-                    if active_backend == "ffmpeg":
-                        ffmpeg_proc, active_url, ffmpeg_frame_shape = self._open_ffmpeg_with_fallbacks(
-                            rtsp_urls,
-                            config,
-                            camera_id,
-                            is_reconnect=is_reconnect,
-                        )
-                        if ffmpeg_proc and ffmpeg_frame_shape:
-                            ffmpeg_frame_size = ffmpeg_frame_shape[0] * ffmpeg_frame_shape[1] * 3
-                            if is_reconnect:
-                                now_ts = time.time()
-                                self.last_reconnect_ts[camera_id] = now_ts
-                                reconnect_warmup = max(
-                                    8.0,
-                                    float(getattr(config.motion, "thermal_reconnect_warmup_seconds", 6.0)) + 4.0,
+                                logger.info(
+                                    "Camera %s retrying ffmpeg backend after fallback window",
+                                    camera_id,
                                 )
-                                self._mark_thermal_reconnect_warmup(
-                                    camera_id=camera_id,
+                        active_backend = selected_backend
+
+                if active_backend == "ffmpeg":
+                    ffmpeg_proc, active_url, ffmpeg_frame_shape = self._open_ffmpeg_with_fallbacks(
+                        rtsp_urls,
+                        config,
+                        camera_id,
+                        is_reconnect=is_reconnect,
+                    )
+                    if ffmpeg_proc and ffmpeg_frame_shape:
+                        ffmpeg_frame_size = ffmpeg_frame_shape[0] * ffmpeg_frame_shape[1] * 3
+                        if is_reconnect:
+                            now_ts = time.time()
+                            self.last_reconnect_ts[camera_id] = now_ts
+                            reconnect_warmup = max(
+                                8.0,
+                                float(getattr(config.motion, "thermal_reconnect_warmup_seconds", 6.0)) + 4.0,
+                            )
+                            self._mark_thermal_reconnect_warmup(
+                                camera_id=camera_id,
+                                now_ts=now_ts,
+                                warmup_seconds=reconnect_warmup,
+                            )
+                            ffmpeg_reconnect_times.append(now_ts)
+                            self._update_stream_stats(
+                                camera_id,
+                                reconnect_increment=1,
+                                last_reconnect_reason="ffmpeg_reopen",
+                            )
+                            if (
+                                self._allows_ffmpeg_flapping_fallback(capture_backend)
+                                and self._should_fallback_from_ffmpeg_flapping(
+                                    reconnect_timestamps=list(ffmpeg_reconnect_times),
                                     now_ts=now_ts,
-                                    warmup_seconds=reconnect_warmup,
                                 )
-                                ffmpeg_reconnect_times.append(now_ts)
-                                self._update_stream_stats(
+                            ):
+                                logger.warning(
+                                    "Camera %s ffmpeg reconnect flapping detected (mode=%s); falling back to OpenCV backend",
                                     camera_id,
-                                    reconnect_increment=1,
-                                    last_reconnect_reason="ffmpeg_reopen",
+                                    capture_backend,
                                 )
-                                if (
-                                    self._allows_ffmpeg_flapping_fallback(capture_backend)
-                                    and self._should_fallback_from_ffmpeg_flapping(
-                                        reconnect_timestamps=list(ffmpeg_reconnect_times),
-                                        now_ts=now_ts,
-                                    )
-                                ):
-                                    logger.warning(
-                                        "Camera %s ffmpeg reconnect flapping detected (mode=%s); falling back to OpenCV backend",
-                                        camera_id,
-                                        capture_backend,
-                                    )
-                                    self._stop_ffmpeg_capture(ffmpeg_proc)
-                                    ffmpeg_proc = None
-                                    active_backend = "opencv"
-                                else:
-                                    return True
+                                self._stop_ffmpeg_capture(ffmpeg_proc)
+                                ffmpeg_proc = None
+                                active_backend = "opencv"
                             else:
                                 return True
-                        if capture_backend == "auto":
-                            active_backend = "opencv"
-                    if active_backend == "opencv":
-                        cap, active_url = self._open_capture_with_fallbacks(rtsp_urls, config, camera_id)
-                        if cap is not None and cap.isOpened():
-                            if is_reconnect:
-                                now_ts = time.time()
-                                self.last_reconnect_ts[camera_id] = now_ts
-                                reconnect_warmup = max(
-                                    8.0,
-                                    float(getattr(config.motion, "thermal_reconnect_warmup_seconds", 6.0)) + 4.0,
-                                )
-                                self._mark_thermal_reconnect_warmup(
-                                    camera_id=camera_id,
-                                    now_ts=now_ts,
-                                    warmup_seconds=reconnect_warmup,
-                                )
-                                logger.info("Reconnected camera %s (opencv backend)", camera_id)
+                        else:
                             return True
-                    return False
+                    if capture_backend == "auto":
+                        active_backend = "opencv"
+                if active_backend == "opencv":
+                    cap, active_url = self._open_capture_with_fallbacks(rtsp_urls, config, camera_id)
+                    if cap is not None and cap.isOpened():
+                        if is_reconnect:
+                            now_ts = time.time()
+                            self.last_reconnect_ts[camera_id] = now_ts
+                            reconnect_warmup = max(
+                                8.0,
+                                float(getattr(config.motion, "thermal_reconnect_warmup_seconds", 6.0)) + 4.0,
+                            )
+                            self._mark_thermal_reconnect_warmup(
+                                camera_id=camera_id,
+                                now_ts=now_ts,
+                                warmup_seconds=reconnect_warmup,
+                            )
+                            logger.info("Reconnected camera %s (opencv backend)", camera_id)
+                        return True
+                return False
+
+            def _close_capture(delay: float = 0.0) -> float:
+                """Stop the current capture (may block); returns delay."""
+                nonlocal cap, ffmpeg_proc, active_url
+                if ffmpeg_proc is not None:
+                    self._stop_ffmpeg_capture(ffmpeg_proc)
+                    ffmpeg_proc = None
+                if cap is not None:
+                    try:
+                        cap.release()
+                    except Exception:
+                        pass
+                    cap = None
+                active_url = None
+                return delay
+
+            def _reopen_capture() -> float:
+                """Replace a capture that is gone (may block); returns the delay before the next read."""
+                nonlocal cap, active_url, ffmpeg_proc, ffmpeg_frame_shape, ffmpeg_frame_size, active_backend
+                nonlocal failures, open_failures, read_deadline
+                if active_backend == "ffmpeg":
+                    exit_code = ffmpeg_proc.poll() if ffmpeg_proc else None
+                    if ffmpeg_proc is not None and exit_code is not None:
+                        reconnect_pressure = self._count_recent_reconnects(
+                            camera_id,
+                            window_seconds=300.0,
+                        )
+                        recent_code0_exits = self._count_recent_reconnect_reasons(
+                            camera_id,
+                            reasons={"ffmpeg_exit_0"},
+                            window_seconds=180.0,
+                        )
+                        use_fallback = self._should_use_opencv_fallback_after_ffmpeg_exit(
+                            exit_code=exit_code,
+                            recent_code0_ffmpeg_exits=recent_code0_exits,
+                            recent_reconnects=reconnect_pressure,
+                        )
+                        if (
+                            self._allows_ffmpeg_flapping_fallback(capture_backend)
+                            and use_fallback
+                        ):
+                            now_ts = time.time()
+                            fallback_seconds = self._ffmpeg_exit_opencv_fallback_seconds(
+                                exit_code,
+                                recent_reconnects=reconnect_pressure,
+                            )
+                            self.ffmpeg_fallback_until[camera_id] = max(
+                                float(self.ffmpeg_fallback_until.get(camera_id, 0.0)),
+                                now_ts + fallback_seconds,
+                            )
+                        self._update_stream_stats(
+                            camera_id,
+                            reconnect_increment=1,
+                            last_reconnect_reason=f"ffmpeg_exit_{int(exit_code)}",
+                        )
+                        error_hint = self._latest_ffmpeg_error_hint(camera_id)
+                        logger.warning(
+                            "Camera %s ffmpeg capture exited (code=%s); reopening%s",
+                            camera_id,
+                            exit_code,
+                            f" | ffmpeg: {error_hint}" if error_hint else "",
+                        )
+                        if int(exit_code) == 0 and not use_fallback:
+                            logger.info(
+                                "Camera %s ffmpeg exit code=0 appears isolated; retrying ffmpeg without OpenCV fallback",
+                                camera_id,
+                            )
+                        if int(exit_code) == 0 and use_fallback:
+                            logger.warning(
+                                "Camera %s code=0 exit repeated (recent=%s, pressure=%s); enabling temporary OpenCV fallback",
+                                camera_id,
+                                recent_code0_exits,
+                                reconnect_pressure,
+                            )
+                        # Unregister the exited process's pipes before replacing it.
+                        self._stop_ffmpeg_capture(ffmpeg_proc)
+                        ffmpeg_proc = None
+                if not _open_capture_backend(is_reconnect=True):
+                    open_failures += 1
+                    delay = 1.0
+                    if open_failures >= max(config.stream.max_reconnect_attempts, 1):
+                        logger.warning(
+                            "STREAM camera=%s reopen_failed=%s delay=%ss",
+                            camera_id,
+                            open_failures,
+                            config.stream.reconnect_delay_seconds,
+                        )
+                        open_failures = 0
+                        delay += max(config.stream.reconnect_delay_seconds, 1)
+                    failures = 0
+                    return delay
+                open_failures = 0
+                if reader_stop.is_set():
+                    # The camera stopped while this was opening.
+                    _close_capture()
+                read_deadline = time.monotonic() + FFMPEG_READ_TIMEOUT_SECONDS
+                return 0.0
+
+            def reader_step() -> float:
+                """Take the newest frame (or handle a failed read); returns the delay before the next step."""
+                nonlocal cap, active_url, ffmpeg_proc, ffmpeg_frame_shape, ffmpeg_frame_size, active_backend
+                nonlocal failures, open_failures, read_deadline, capture_job
+                self._log_stream_summary(
+                    camera_id=camera_id,
+                    interval=stream_log_interval,
+                    protocol=protocol,
+                )
+                if capture_job is not None:
+                    if not capture_job.done():
+                        return READER_POLL_SECONDS
+                    job, capture_job = capture_job, None
+                    try:
+                        return job.result()
+                    except Exception as e:
+                        logger.error("Capture reopen failed for camera %s: %s", camera_id, e)
+                        return 1.0
+                if not _capture_ready():
+                    capture_job = self.reader_pool.submit(_reopen_capture)
+                    return READER_POLL_SECONDS
 
                 try:
-                    while self.running and not reader_stop.is_set():
-                        self._log_stream_summary(
-                            camera_id=camera_id,
-                            interval=stream_log_interval,
-                            protocol=protocol,
+                    if active_backend == "ffmpeg":
+                        frame = self._read_ffmpeg_frame(
+                            ffmpeg_proc,
+                            ffmpeg_frame_size,
+                            ffmpeg_frame_shape,
+                            timeout=0.0,
                         )
-                        if not _capture_ready():
-                            if active_backend == "ffmpeg":
-                                exit_code = ffmpeg_proc.poll() if ffmpeg_proc else None
-                                if ffmpeg_proc is not None and exit_code is not None:
-                                    reconnect_pressure = self._count_recent_reconnects(
-                                        camera_id,
-                                        window_seconds=300.0,
-                                    )
-                                    recent_code0_exits = self._count_recent_reconnect_reasons(
-                                        camera_id,
-                                        reasons={"ffmpeg_exit_0"},
-                                        window_seconds=180.0,
-                                    )
-                                    use_fallback = self._should_use_opencv_fallback_after_ffmpeg_exit(
-                                        exit_code=exit_code,
-                                        recent_code0_ffmpeg_exits=recent_code0_exits,
-                                        recent_reconnects=reconnect_pressure,
-                                    )
-                                    if (
-                                        self._allows_ffmpeg_flapping_fallback(capture_backend)
-                                        and use_fallback
-                                    ):
-                                        now_ts = time.time()
-                                        fallback_seconds = self._ffmpeg_exit_opencv_fallback_seconds(
-                                            exit_code,
-                                            recent_reconnects=reconnect_pressure,
-                                        )
-                                        self.ffmpeg_fallback_until[camera_id] = max(
-                                            float(self.ffmpeg_fallback_until.get(camera_id, 0.0)),
-                                            now_ts + fallback_seconds,
-                                        )
-                                    self._update_stream_stats(
-                                        camera_id,
-                                        reconnect_increment=1,
-                                        last_reconnect_reason=f"ffmpeg_exit_{int(exit_code)}",
-                                    )
-                                    error_hint = self._latest_ffmpeg_error_hint(camera_id)
-                                    logger.warning(
-                                        "Camera %s ffmpeg capture exited (code=%s); reopening%s",
-                                        camera_id,
-                                        exit_code,
-                                        f" | ffmpeg: {error_hint}" if error_hint else "",
-                                    )
-                                    if int(exit_code) == 0 and not use_fallback:
-                                        logger.info(
-                                            "Camera %s ffmpeg exit code=0 appears isolated; retrying ffmpeg without OpenCV fallback",
-                                            camera_id,
-                                        )
-                                    if int(exit_code) == 0 and use_fallback:
-                                        logger.warning(
-                                            "Camera %s code=0 exit repeated (recent=%s, pressure=%s); enabling temporary OpenCV fallback",
-                                            camera_id,
-                                            recent_code0_exits,
-                                            reconnect_pressure,
-                                        )
-                            if not _open_capture_backend(is_reconnect=True):
-                                open_failures += 1
-                                if open_failures >= max(config.stream.max_reconnect_attempts, 1):
-                                    logger.warning(
-                                        "STREAM camera=%s reopen_failed=%s delay=%ss",
-                                        camera_id,
-                                        open_failures,
-                                        config.stream.reconnect_delay_seconds,
-                                    )
-                                    open_failures = 0
-                                    time.sleep(max(config.stream.reconnect_delay_seconds, 1))
-                                failures = 0
-                                time.sleep(1)
-                                continue
-                            open_failures = 0
+                        ret = frame is not None
+                        pipe = self.ffmpeg_pipes.get(ffmpeg_proc.pid)
+                        waiting = pipe is not None and not pipe.closed
+                    else:
+                        # Shared ingest reads are polled (timeout 0); OpenCV blocks.
+                        ret, frame = cap.read()
+                        waiting = active_backend == "ingest" and cap.isOpened()
 
-                        try:
-                            if active_backend == "ffmpeg":
-                                frame = self._read_ffmpeg_frame(
-                                    ffmpeg_proc,
-                                    ffmpeg_frame_size,
-                                    ffmpeg_frame_shape,
-                                )
-                                ret = frame is not None
-                            else:
-                                ret, frame = cap.read()
+                    if (not ret or frame is None) and waiting and time.monotonic() < read_deadline:
+                        return READER_POLL_SECONDS
+                    read_deadline = time.monotonic() + FFMPEG_READ_TIMEOUT_SECONDS
 
-                            if not ret or frame is None:
-                                failures += 1
-                                self._update_stream_stats(
-                                    camera_id,
-                                    failed_increment=1,
-                                    last_error="read_failed",
-                                )
-                                base_failure_threshold = max(
-                                    1,
-                                    int(getattr(config.stream, "read_failure_threshold", 3)),
-                                )
-                                base_failure_timeout = float(
-                                    getattr(config.stream, "read_failure_timeout_seconds", 8.0)
-                                )
-                                now = time.time()
-                                last_reconnect = float(self.last_reconnect_ts.get(camera_id, 0.0))
-                                since_reconnect = (
-                                    now - last_reconnect if last_reconnect > 0.0 else float("inf")
-                                )
-                                recent_reconnects = self._count_recent_reconnects(
-                                    camera_id,
-                                    window_seconds=300.0,
-                                )
-                                (
-                                    failure_threshold,
-                                    failure_timeout,
-                                    reconnect_cooldown,
-                                ) = self._stream_read_failure_policy(
-                                    base_failure_threshold,
-                                    base_failure_timeout,
-                                    since_reconnect,
+                    if not ret or frame is None:
+                        failures += 1
+                        self._update_stream_stats(
+                            camera_id,
+                            failed_increment=1,
+                            last_error="read_failed",
+                        )
+                        base_failure_threshold = max(
+                            1,
+                            int(getattr(config.stream, "read_failure_threshold", 3)),
+                        )
+                        base_failure_timeout = float(
+                            getattr(config.stream, "read_failure_timeout_seconds", 8.0)
+                        )
+                        now = time.time()
+                        last_reconnect = float(self.last_reconnect_ts.get(camera_id, 0.0))
+                        since_reconnect = (
+                            now - last_reconnect if last_reconnect > 0.0 else float("inf")
+                        )
+                        recent_reconnects = self._count_recent_reconnects(
+                            camera_id,
+                            window_seconds=300.0,
+                        )
+                        (
+                            failure_threshold,
+                            failure_timeout,
+                            reconnect_cooldown,
+                        ) = self._stream_read_failure_policy(
+                            base_failure_threshold,
+                            base_failure_timeout,
+                            since_reconnect,
+                            recent_reconnects=recent_reconnects,
+                            detection_source=detection_source,
+                        )
+                        fallback_until = float(self.ffmpeg_fallback_until.get(camera_id, 0.0))
+                        fallback_active = (
+                            str(active_backend).lower() == "opencv"
+                            and now < fallback_until
+                        )
+                        (
+                            failure_threshold,
+                            failure_timeout,
+                            reconnect_cooldown,
+                        ) = self._stream_fallback_read_failure_policy(
+                            failure_threshold=failure_threshold,
+                            failure_timeout=failure_timeout,
+                            reconnect_cooldown=reconnect_cooldown,
+                            active_backend=active_backend,
+                            fallback_until_ts=fallback_until,
+                            now_ts=now,
+                            detection_source=detection_source,
+                        )
+                        (
+                            failure_threshold,
+                            failure_timeout,
+                            reconnect_cooldown,
+                        ) = self._stream_opencv_read_failure_policy(
+                            failure_threshold=failure_threshold,
+                            failure_timeout=failure_timeout,
+                            reconnect_cooldown=reconnect_cooldown,
+                            active_backend=active_backend,
+                            recent_reconnects=recent_reconnects,
+                            detection_source=detection_source,
+                        )
+                        if failures >= failure_threshold:
+                            last_frame_age = self._get_last_frame_age(camera_id, now)
+                            is_stale = last_frame_age is None or last_frame_age >= failure_timeout
+                            if is_stale:
+                                reconnect_age_gate = self._stream_reconnect_age_gate(
+                                    failure_timeout=failure_timeout,
                                     recent_reconnects=recent_reconnects,
                                     detection_source=detection_source,
+                                    fallback_active=fallback_active,
+                                    opencv_backend=str(active_backend).lower() == "opencv",
                                 )
-                                fallback_until = float(self.ffmpeg_fallback_until.get(camera_id, 0.0))
-                                fallback_active = (
-                                    str(active_backend).lower() == "opencv"
-                                    and now < fallback_until
-                                )
-                                (
-                                    failure_threshold,
-                                    failure_timeout,
-                                    reconnect_cooldown,
-                                ) = self._stream_fallback_read_failure_policy(
-                                    failure_threshold=failure_threshold,
-                                    failure_timeout=failure_timeout,
-                                    reconnect_cooldown=reconnect_cooldown,
-                                    active_backend=active_backend,
-                                    fallback_until_ts=fallback_until,
-                                    now_ts=now,
-                                    detection_source=detection_source,
+                                if (
+                                    last_frame_age is not None
+                                    and last_frame_age < reconnect_age_gate
+                                ):
+                                    return 0.2
+                                if now - last_reconnect < reconnect_cooldown:
+                                    return 0.2
+                                logger.info("Reconnecting camera %s after read failures", camera_id)
+                                failures = 0
+                                self._update_stream_stats(
+                                    camera_id,
+                                    reconnect_increment=1,
+                                    last_reconnect_reason="read_failures",
                                 )
-                                (
-                                    failure_threshold,
-                                    failure_timeout,
-                                    reconnect_cooldown,
-                                ) = self._stream_opencv_read_failure_policy(
-                                    failure_threshold=failure_threshold,
-                                    failure_timeout=failure_timeout,
-                                    reconnect_cooldown=reconnect_cooldown,
-                                    active_backend=active_backend,
-                                    recent_reconnects=recent_reconnects,
-                                    detection_source=detection_source,
+                                self.last_reconnect_ts[camera_id] = now
+                                capture_job = self.reader_pool.submit(
+                                    _close_capture,
+                                    float(config.stream.reconnect_delay_seconds or 0.0) + 0.2,
                                 )
-                                if failures >= failure_threshold:
-                                    last_frame_age = self._get_last_frame_age(camera_id, now)
-                                    is_stale = last_frame_age is None or last_frame_age >= failure_timeout
-                                    if is_stale:
-                                        reconnect_age_gate = self._stream_reconnect_age_gate(
-                                            failure_timeout=failure_timeout,
-                                            recent_reconnects=recent_reconnects,
-                                            detection_source=detection_source,
-                                            fallback_active=fallback_active,
-                                            opencv_backend=str(active_backend).lower() == "opencv",
-                                        )
-                                        if (
-                                            last_frame_age is not None
-                                            and last_frame_age < reconnect_age_gate
-                                        ):
-                                            time.sleep(0.2)
-                                            continue
-                                        if now - last_reconnect < reconnect_cooldown:
-                                            time.sleep(0.2)
-                                            continue
-                                        logger.info("Reconnecting camera %s after read failures", camera_id)
-                                        if active_backend == "ffmpeg":
-                                            self._stop_ffmpeg_capture(ffmpeg_proc)
-                                            ffmpeg_proc = None
-                                        else:
-                                            try:
-                                                cap.release()
-                                            except Exception:
-                                                pass
-                                            cap = None
-                                        active_url = None
-                                        failures = 0
-                                        self._update_stream_stats(
-                                            camera_id,
-                                            reconnect_increment=1,
-                                            last_reconnect_reason="read_failures",
-                                        )
-                                        self.last_reconnect_ts[camera_id] = now
-                                        if config.stream.reconnect_delay_seconds:
-                                            time.sleep(config.stream.reconnect_delay_seconds)
-                                time.sleep(0.2)
-                                continue
-
-                            # Optimization: Resize large frames immediately to save memory
-                            # YOLO usually needs 640x640, so keeping 1080p in memory is wasteful
-                            if frame.shape[1] > 1280: 
-                                height = int(frame.shape[0] * 1280 / frame.shape[1])
-                                frame = cv2.resize(frame, (1280, height))
-
-                            failures = 0
-                            self._update_stream_stats(
-                                camera_id,
-                                read_increment=1,
-                                last_frame_time=time.time(),
-                            )
-                            with frame_lock:
-                                latest_frame["frame"] = frame
-                            with self.latest_frame_locks[camera_id]:
-                                self.latest_frames[camera_id] = frame
-                            record_fps_local = max(1.0, float(record_fps))
-                            prebuffer_seconds = float(getattr(config.event, "prebuffer_seconds", 0.0))
-                            postbuffer_seconds = float(getattr(config.event, "postbuffer_seconds", 0.0))
-                            window_seconds = max(prebuffer_seconds + postbuffer_seconds, 1.0)
-                            video_buffer_size = max(
-                                int(math.ceil(window_seconds * record_fps_local)),
-                                10,
-                            )
-                            self._update_video_buffer(
-                                camera_id=camera_id,
-                                frame=frame,
-                                buffer_size=video_buffer_size,
-                                record_interval=1.0 / record_fps_local,
-                                max_age_seconds=window_seconds,
-                            )
+                                return READER_POLL_SECONDS
+                        return 0.2
 
-                            if reader_delay > 0:
-                                time.sleep(reader_delay)
+                    # Optimization: Resize large frames immediately to save memory
+                    # YOLO usually needs 640x640, so keeping 1080p in memory is wasteful
+                    if frame.shape[1] > 1280: 
+                        height = int(frame.shape[0] * 1280 / frame.shape[1])
+                        frame = cv2.resize(frame, (1280, height))
 
-                        except Exception as e:
-                            logger.error(f"Reader loop error: {e}")
-                            failures += 1
-                            self._update_stream_stats(
-                                camera_id,
-                                failed_increment=1,
-                                last_error=str(e),
-                            )
-                            time.sleep(0.5)
-                finally:
-                    if ffmpeg_proc is not None:
-                        self._stop_ffmpeg_capture(ffmpeg_proc)
-                    if cap is not None:
+                    failures = 0
+                    self._update_stream_stats(
+                        camera_id,
+                        read_increment=1,
+                        last_frame_time=time.time(),
+                    )
+                    fingerprint = frame_fingerprint(frame)
+                    frozen_limit = float(getattr(config.stream, "frozen_stream_seconds", 0.0) or 0.0)
+                    frozen_for = self.frame_gates[camera_id].observe(fingerprint, frame=frame)
+                    if frozen_limit > 0 and frozen_for >= frozen_limit:
+                        logger.warning(
+                            "Camera %s delivered identical frames for %.0fs; reconnecting",
+                            camera_id,
+                            frozen_for,
+                        )
+                        capture_job = self.reader_pool.submit(_close_capture)
+                        self.frame_gates[camera_id].reset_frozen()
+                        self._update_stream_stats(
+                            camera_id,
+                            reconnect_increment=1,
+                            last_reconnect_reason="frozen_stream",
+                        )
                         try:
-                            cap.release()
+                            self.metrics_service.record_stream_reconnect(camera_id, "frozen_stream")
                         except Exception:
                             pass
+                        self.last_reconnect_ts[camera_id] = time.time()
+                        return READER_POLL_SECONDS
+                    with frame_lock:
+                        latest_frame["frame"] = frame
+                        latest_frame["fingerprint"] = fingerprint
+                    with self.latest_frame_locks[camera_id]:
+                        self.latest_frames[camera_id] = frame
+                    record_fps_local = max(1.0, float(record_fps))
+                    prebuffer_seconds = float(getattr(config.event, "prebuffer_seconds", 0.0))
+                    postbuffer_seconds = float(getattr(config.event, "postbuffer_seconds", 0.0))
+                    window_seconds = max(prebuffer_seconds + postbuffer_seconds, 1.0)
+                    video_buffer_size = max(
+                        int(math.ceil(window_seconds * record_fps_local)),
+                        10,
+                    )
+                    self._update_video_buffer(
+                        camera_id=camera_id,
+                        frame=frame,
+                        buffer_size=video_buffer_size,
+                        record_interval=1.0 / record_fps_local,
+                        max_age_seconds=window_seconds,
+                        jpeg_quality=self._buffer_jpeg_quality(config),
+                    )
+                    return max(reader_delay, 0.0)
 
-            reader_thread = threading.Thread(
-                target=reader_loop,
-                daemon=True,
-                name=f"reader-{camera_id}",
-            )
-            reader_thread.start()
+                except Exception as e:
+                    logger.error(f"Reader loop error: {e}")
+                    failures += 1
+                    self._update_stream_stats(
+                        camera_id,
+                        failed_increment=1,
+                        last_error=str(e),
+                    )
+                    return 0.5
+
+            def pooled_reader_step() -> Optional[float]:
+                nonlocal reader_thread
+                with reader_lock:
+                    if not self.running or reader_stop.is_set():
+                        return None
+                    if active_backend == "opencv":
+                        # VideoCapture.read blocks in native code: hand the camera
+                        # to a thread of its own until it leaves the OpenCV backend.
+                        reader_thread = threading.Thread(
+                            target=blocking_reader_loop,
+                            daemon=True,
+                            name=f"reader-{camera_id}",
+                        )
+                        reader_thread.start()
+                        return None
+                return reader_step()
+
+            def blocking_reader_loop() -> None:
+                nonlocal reader_task
+                while self.running and not reader_stop.is_set() and active_backend == "opencv":
+                    reader_stop.wait(reader_step())
+                with reader_lock:
+                    if self.running and not reader_stop.is_set():
+                        reader_task = self.reader_pool.add(f"reader-{camera_id}", pooled_reader_step)
+
+            reader_task = self.reader_pool.add(f"reader-{camera_id}", pooled_reader_step)
             
             while self.running and not stop_event.is_set():
                 current_time = time.time()
@@ -1241,33 +1385,22 @@ class DetectorWorker:
                     record_fps = max(1.0, min(record_fps, 30.0))
                     reader_delay = 1.0 / record_fps
                 
-                # Dynamic FPS based on CPU load (aggressive throttling to reduce CPU)
-                if current_time - last_cpu_check >= 5.0:
+                # The loop offers frames at the configured rate; how many of
+                # them get inferred is decided by the global inference
+                # scheduler (fair share across cameras), not per camera.
+                if current_time - last_rate_check >= 5.0:
+                    last_rate_check = current_time
+                    target_fps = max(float(config.detection.inference_fps), 1.0)
+                    frame_delay = 1.0 / target_fps
                     try:
-                        cpu_percent = psutil.cpu_percent(interval=None)
-                        base_fps = config.detection.inference_fps
-                        if cpu_percent > 90:
-                            target_fps = max(1, base_fps - 3)
-                        elif cpu_percent > 80:
-                            target_fps = max(2, base_fps - 2)
-                        elif cpu_percent > 65:
-                            target_fps = max(2, base_fps - 1)
-                        elif cpu_percent < 40:
-                            target_fps = min(5, base_fps + 1)  # Cap at 5 to avoid CPU spike
-                        else:
-                            target_fps = base_fps
-                        frame_delay = 1.0 / max(target_fps, 1)
-                        record_fps = float(getattr(config.event, "record_fps", target_fps))
-                        record_fps = max(1.0, min(record_fps, 30.0))
-                        reader_delay = 1.0 / record_fps
-                        last_cpu_check = current_time
-                        try:
-                            self.metrics_service.set_fps(camera_id, float(target_fps))
-                            self.metrics_service.set_cpu_usage(camera_id, cpu_percent)
-                        except Exception:
-                            pass
+                        granted_fps = self.inference_scheduler.granted_fps(camera_id)
+                        self.metrics_service.set_fps(
+                            camera_id,
+                            float(granted_fps if granted_fps is not None else target_fps),
+                        )
+                        self.metrics_service.set_cpu_usage(camera_id, self.system_stats.cpu_percent())
                     except Exception:
-                        last_cpu_check = current_time
+                        pass
 
                 # FPS throttling
                 if current_time - last_inference_time < frame_delay:
@@ -1278,6 +1411,7 @@ class DetectorWorker:
 
                 with frame_lock:
                     frame = latest_frame["frame"]
+                    fingerprint = latest_frame["fingerprint"]
                     if frame is not None:
                         frame = frame.copy()
                 if frame is None:
@@ -1333,6 +1467,17 @@ class DetectorWorker:
                 )
 
                 motion_active = self._is_motion_active(camera, frame, config)
+                event_active = (
+                    self.event_start_time.get(camera_id) is not None
+                    or current_time - float(self.last_event_time.get(camera_id, 0.0)) <= postbuffer_seconds
+                )
+                self.inference_scheduler.update_camera(
+                    camera_id,
+                    max_fps=target_fps,
+                    min_fps=float(getattr(config.performance, "scheduler_min_fps", 1.0)),
+                    motion=motion_active,
+                    event=event_active,
+                )
                 if not motion_active:
                     self._update_frame_buffer(
                         camera_id=camera_id,
@@ -1340,69 +1485,120 @@ class DetectorWorker:
                         detections=[],
                         frame_interval=frame_interval,
                         buffer_size=buffer_size,
+                        jpeg_quality=self._buffer_jpeg_quality(config),
                     )
                     continue
 
                 active_motion_cameras = self._count_recent_motion_cameras(window_seconds=6.0)
 
-                # Preprocess frame
-                # Thermal cameras: motion-guided crop → grayscale→BGR → YOLO
-                # Color cameras: standard preprocessing (unchanged)
-                crop_info: Optional[tuple] = None
-                if detection_source == "thermal":
-                    preprocessed, crop_info = self._motion_crop_thermal_frame(
-                        frame,
-                        camera_id,
-                        tuple(config.detection.inference_resolution),
+                # Single confidence threshold for all cameras
+                confidence_threshold = float(config.detection.confidence_threshold)
+
+                # Frame-change gate: near-identical frames reuse the last result
+                frame_gate = self.frame_gates[camera_id]
+                gate_enabled = bool(getattr(config.detection, "frame_change_gate", True))
+                gate_key = (confidence_threshold, detection_source)
+                cached_detections = None
+                if gate_enabled:
+                    cached_detections = frame_gate.lookup(fingerprint, gate_key, now=current_time)
+                    try:
+                        self.metrics_service.record_frame_gate(camera_id, cached_detections is not None)
+                    except Exception:
+                        pass
+
+                if cached_detections is None and not self.inference_scheduler.acquire(camera_id):
+                    # Camera is over its share of the global inference budget;
+                    # the frame still goes into the media buffer.
+                    _log_gate("inference_deferred")
+                    self._update_frame_buffer(
+                        camera_id=camera_id,
+                        frame=frame,
+                        detections=[],
+                        frame_interval=frame_interval,
+                        buffer_size=buffer_size,
+                        jpeg_quality=self._buffer_jpeg_quality(config),
                     )
+                    continue
+                infer_seconds: Optional[float] = None
+                if cached_detections is not None:
+                    detections_raw = cached_detections
                 else:
-                    preprocessed = self.inference_service.preprocess_color(frame)
+                    detections_raw = []
+                    infer_started = time.perf_counter()
+                    try:
+                        # Preprocess frame
+                        # Thermal cameras: motion-guided crop → grayscale→BGR → YOLO
+                        # Color cameras: standard preprocessing (unchanged)
+                        crop_info: Optional[tuple] = None
+                        roi_offset: Optional[Tuple[int, int]] = None
+                        if detection_source == "thermal":
+                            preprocessed, crop_info = self._motion_crop_thermal_frame(
+                                frame,
+                                camera_id,
+                                tuple(config.detection.inference_resolution),
+                            )
+                            infer_resolution = tuple(config.detection.inference_resolution)
+                        else:
+                            preprocessed = self.inference_service.preprocess_color(frame)
+                            roi_plan = self._plan_roi_inference(camera_id, frame, config)
+                            if roi_plan is not None:
+                                (rx1, ry1, rx2, ry2), infer_resolution = roi_plan
+                                preprocessed = preprocessed[ry1:ry2, rx1:rx2]
+                                roi_offset = (rx1, ry1)
+                            else:
+                                infer_resolution = tuple(config.detection.inference_resolution)
 
-                # Single confidence threshold for all cameras
-                confidence_threshold = float(config.detection.confidence_threshold)
-                t0 = time.perf_counter()
-                detections_raw = self.inference_service.infer(
-                    preprocessed,
-                    confidence_threshold=confidence_threshold,
-                    inference_resolution=tuple(config.detection.inference_resolution),
-                )
-                # Relaxed retry for color cameras only.
-                # Thermal cameras: no fallback — the configured threshold is final.
-                # Thermal fallbacks produced too many false positives in production.
-                if len(detections_raw) == 0 and detection_source != "thermal":
-                    relaxed_threshold = max(0.35, confidence_threshold - 0.10)
-                    last_relaxed = float(self.last_relaxed_infer_time.get(camera_id, 0.0))
-                    if (
-                        relaxed_threshold < confidence_threshold
-                        and current_time - last_relaxed >= 1.0
-                    ):
-                        relaxed_detections = self.inference_service.infer(
+                        t0 = time.perf_counter()
+                        detections_raw = self.inference_service.infer(
                             preprocessed,
-                            confidence_threshold=relaxed_threshold,
-                            inference_resolution=tuple(config.detection.inference_resolution),
+                            confidence_threshold=confidence_threshold,
+                            inference_resolution=infer_resolution,
                         )
-                        self.last_relaxed_infer_time[camera_id] = current_time
-                        if relaxed_detections:
-                            detections_raw = relaxed_detections
-                            logger.debug(
-                                "DETECT camera=%s relaxed_threshold=%.2f recovered=%s",
-                                camera_id,
-                                relaxed_threshold,
-                                len(relaxed_detections),
+                        # Relaxed retry for color cameras only.
+                        # Thermal cameras: no fallback — the configured threshold is final.
+                        # Thermal fallbacks produced too many false positives in production.
+                        if len(detections_raw) == 0 and detection_source != "thermal":
+                            relaxed_threshold = max(0.35, confidence_threshold - 0.10)
+                            last_relaxed = float(self.last_relaxed_infer_time.get(camera_id, 0.0))
+                            if (
+                                relaxed_threshold < confidence_threshold
+                                and current_time - last_relaxed >= 1.0
+                            ):
+                                relaxed_detections = self.inference_service.infer(
+                                    preprocessed,
+                                    confidence_threshold=relaxed_threshold,
+                                    inference_resolution=infer_resolution,
+                                )
+                                self.last_relaxed_infer_time[camera_id] = current_time
+                                if relaxed_detections:
+                                    detections_raw = relaxed_detections
+                                    logger.debug(
+                                        "DETECT camera=%s relaxed_threshold=%.2f recovered=%s",
+                                        camera_id,
+                                        relaxed_threshold,
+                                        len(relaxed_detections),
+                                    )
+                        # Scale bounding boxes from cropped inference coords back to full frame
+                        if crop_info is not None and detections_raw:
+                            detections_raw = self._scale_detections_to_frame(
+                                detections_raw, crop_info, tuple(config.detection.inference_resolution)
                             )
-                # Scale bounding boxes from cropped inference coords back to full frame
-                if crop_info is not None and detections_raw:
-                    detections_raw = self._scale_detections_to_frame(
-                        detections_raw, crop_info, tuple(config.detection.inference_resolution)
-                    )
-                inference_latency = time.perf_counter() - t0
-                model_name = getattr(config.detection, "model", "yolov8n-person") or "yolov8n-person"
-                try:
-                    self.metrics_service.record_inference_latency(
-                        camera_id, model_name.replace("-person", ""), inference_latency
-                    )
-                except Exception:
-                    pass
+                        elif roi_offset is not None and detections_raw:
+                            detections_raw = self.inference_service.offset_detections(detections_raw, *roi_offset)
+                        inference_latency = time.perf_counter() - t0
+                        model_name = getattr(config.detection, "model", "yolov8n-person") or "yolov8n-person"
+                        try:
+                            self.metrics_service.record_inference_latency(
+                                camera_id, model_name.replace("-person", ""), inference_latency
+                            )
+                        except Exception:
+                            pass
+                        if gate_enabled:
+                            frame_gate.store(fingerprint, detections_raw, gate_key, now=current_time)
+                        infer_seconds = time.perf_counter() - infer_started
+                    finally:
+                        if infer_seconds is None:
+                            self.inference_scheduler.release(camera_id, time.perf_counter() - infer_started)
                 
                 # Filter by aspect ratio (preset or custom)
                 #
@@ -1452,7 +1648,17 @@ class DetectorWorker:
                         # Motion-mask overlap was too strict for sparse IIR masks.
                         filtered_thermal.append(det)
                     detections = filtered_thermal
-                
+
+                if infer_seconds is not None:
+                    # Only detections that pass the filters and zones earn the
+                    # camera the scheduler's detection boost.
+                    detections_in_zones = self._filter_detections_by_zones(camera, detections, frame.shape)
+                    self.inference_scheduler.release(
+                        camera_id,
+                        infer_seconds,
+                        detected=bool(detections_in_zones),
+                    )
+
                 # Update frame buffer for media generation
                 self._update_frame_buffer(
                     camera_id=camera_id,
@@ -1460,11 +1666,16 @@ class DetectorWorker:
                     detections=detections,
                     frame_interval=frame_interval,
                     buffer_size=buffer_size,
+                    jpeg_quality=self._buffer_jpeg_quality(config),
                 )
+                if cached_detections is not None:
+                    # Reused result of an unchanged frame: not a new observation
+                    # for the tracker or the temporal-consistency counters.
+                    continue
 
                 # Update detection history
                 detections_after_qual = len(detections)
-                detections = self._filter_detections_by_zones(camera, detections, frame.shape)
+                detections = detections_in_zones
                 last_pipe_log = self.last_detection_pipeline_log.get(camera_id, 0.0)
                 if current_time - last_pipe_log >= 10.0:
                     raw_best_conf = max((d.get("confidence", 0.0) for d in detections_raw), default=0.0)
@@ -1494,7 +1705,8 @@ class DetectorWorker:
                             raw_best_conf,
                         )
                     self.last_detection_pipeline_log[camera_id] = current_time
-                self.detection_history[camera_id].append(detections)
+                tracker = self.trackers[camera_id]
+                track_ids = tracker.update(detections)
 
                 # Detection log: when person found throttle to 10s; empty every 60s (reduces log noise)
                 last_log = self.last_detection_log.get(camera_id, 0.0)
@@ -1551,9 +1763,7 @@ class DetectorWorker:
                 else:
                     temporal_min_frames = 2
                     temporal_max_gap = 2
-                temporal_pass = self.inference_service.check_temporal_consistency(
-                    detections,
-                    list(self.detection_history[camera_id])[:-1],  # Exclude current
+                temporal_pass = tracker.is_temporally_consistent(
                     min_consecutive_frames=temporal_min_frames,
                     max_gap_frames=temporal_max_gap,
                 )
@@ -1596,40 +1806,22 @@ class DetectorWorker:
                     _log_gate("temporal_consistency_failed")
                     continue
 
-                # Scrypted-style movement check: require detection centroid to have
-                # moved across history frames (d.movement.moving in Scrypted).
-                # Stationary objects (poles, trees, furniture) that pass temporal
-                # consistency are rejected here. Only MOVING detections create events.
-                if detections:
-                    history_list = list(self.detection_history[camera_id])
-                    if len(history_list) >= 3:
-                        best = max(detections, key=lambda d: float(d.get("confidence", 0.0)))
-                        bx1, by1, bx2, by2 = best["bbox"]
-                        cur_cx = (bx1 + bx2) / 2.0
-                        cur_cy = (by1 + by2) / 2.0
-                        # Check frames from 3+ cycles ago (skip the 2 most recent)
-                        old_frames = [f for f in history_list[:-2] if f]
-                        if old_frames:
-                            for old_frame in reversed(old_frames):
-                                for od in old_frame:
-                                    ox1, oy1, ox2, oy2 = od["bbox"]
-                                    inter_w = max(0, min(bx2, ox2) - max(bx1, ox1))
-                                    inter_h = max(0, min(by2, oy2) - max(by1, oy1))
-                                    inter = inter_w * inter_h
-                                    union = max(1, (bx2 - bx1) * (by2 - by1) + (ox2 - ox1) * (oy2 - oy1) - inter)
-                                    if inter / union > 0.30:
-                                        # Same object found in older frame — did it move?
-                                        ocx = (ox1 + ox2) / 2.0
-                                        ocy = (oy1 + oy2) / 2.0
-                                        dist = ((cur_cx - ocx) ** 2 + (cur_cy - ocy) ** 2) ** 0.5
-                                        if dist < 12.0:
-                                            # Barely moved → stationary object → reject
-                                            _log_gate("stationary_object")
-                                            self.event_start_time[camera_id] = None
-                                            temporal_pass = False
-                                        break
-                                if not temporal_pass:
-                                    break
+                # Scrypted-style movement check: require the best detection's
+                # track to have moved since it was seen 2+ cycles ago
+                # (d.movement.moving in Scrypted). Stationary objects (poles,
+                # trees, furniture) that pass temporal consistency are rejected
+                # here. Only MOVING detections create events.
+                if detections and len(track_ids) == len(detections):
+                    best_index = max(
+                        range(len(track_ids)),
+                        key=lambda i: float(detections[i].get("confidence", 0.0)),
+                    )
+                    moved = tracker.displacement(track_ids[best_index], min_lag=2)
+                    if moved is not None and moved < 12.0:
+                        # Barely moved → stationary object → reject
+                        _log_gate("stationary_object")
+                        self.event_start_time[camera_id] = None
+                        temporal_pass = False
 
                 if not temporal_pass:
                     continue
@@ -1665,7 +1857,24 @@ class DetectorWorker:
             self._update_camera_status(camera_id, CameraStatus.DOWN, None)
         
         finally:
-            stop_event.set()
+            with reader_lock:
+                stop_event.set()
+                task, thread = reader_task, reader_thread
+            # Let an in-flight read finish before its capture is closed.
+            stopped = self.reader_pool.cancel(task, timeout=5)
+            if thread:
+                thread.join(timeout=5)
+                stopped = stopped and not thread.is_alive()
+            if capture_job is not None:
+                # A reopen in flight closes what it opened once it sees the stop.
+                try:
+                    capture_job.result(timeout=15)
+                except Exception:
+                    stopped = False
+            if not stopped:
+                logger.warning("Reader did not stop cleanly for camera %s", camera_id)
+            if ffmpeg_proc is not None:
+                self._stop_ffmpeg_capture(ffmpeg_proc)
             if cap is not None:
                 try:
                     cap.release()
@@ -1673,10 +1882,6 @@ class DetectorWorker:
                     pass
                 logger.info(f"Released camera {camera_id}")
                 self._update_camera_status(camera_id, CameraStatus.DOWN, None)
-            if reader_thread:
-                reader_thread.join(timeout=5)
-                if reader_thread.is_alive():
-                    logger.warning("Reader thread did not stop cleanly for camera %s", camera_id)
             self._cleanup_camera_state(camera_id)
 
     def _update_camera_status(
@@ -1692,17 +1897,13 @@ class DetectorWorker:
             return
 
         try:
-            with session_scope() as db:
-                camera = db.query(Camera).filter(Camera.id == camera_id).first()
-                if not camera:
-                    return
-
-                camera.status = status
-                if last_frame_ts is not None:
-                    camera.last_frame_ts = last_frame_ts
-                db.commit()
-                self.last_status_update[camera_id] = now
+            if not self.db_writer.run(
+                lambda db: self.camera_crud_service.set_status(db, camera_id, status, last_frame_ts)
+            ):
+                return
+            self.last_status_update[camera_id] = now
 
+            with session_scope() as db:
                 try:
                     online = db.query(Camera).filter(Camera.status == CameraStatus.CONNECTED).count()
                     retrying = db.query(Camera).filter(Camera.status == CameraStatus.RETRYING).count()
@@ -1734,29 +1935,21 @@ class DetectorWorker:
             # Get highest confidence detection
             best_detection = max(detections, key=lambda d: d["confidence"])
             
-            # Get database session
-            with session_scope() as db:
-                # Enforce cooldown against persisted events (handles restarts/multi-process)
-                if config.event.cooldown_seconds > 0:
-                    latest = (
-                        db.query(Event)
-                        .filter(Event.camera_id == camera.id)
-                        .order_by(Event.timestamp.desc())
-                        .first()
-                    )
-                    if latest and latest.timestamp:
-                        elapsed = (_utc_now_naive() - latest.timestamp).total_seconds()
-                        if elapsed < config.event.cooldown_seconds:
-                            logger.info(
-                                "Event suppressed by cooldown (db) camera=%s remaining=%.1fs",
-                                camera.id,
-                                config.event.cooldown_seconds - elapsed,
-                            )
-                            return
+            person_count = len(detections)
 
-                # Create event with person count
-                person_count = len(detections)
-                event = self.event_service.create_event(
+            # Enforce cooldown against the event index (persisted events loaded
+            # at startup plus every insert since), without a DB round trip.
+            reservation = self.event_index.reserve(camera.id, config.event.cooldown_seconds)
+            if reservation is None:
+                logger.info(
+                    "Event suppressed by cooldown (index) camera=%s remaining=%.1fs",
+                    camera.id,
+                    self.event_index.cooldown_remaining(camera.id, config.event.cooldown_seconds),
+                )
+                return
+
+            def _insert(db) -> Event:
+                return self.event_service.create_event(
                     db=db,
                     camera_id=camera.id,
                     timestamp=_utc_now_naive(),
@@ -1766,59 +1959,66 @@ class DetectorWorker:
                     summary=None,  # AI summary will be added later
                     ai_enabled=config.ai.enabled,
                     ai_reason="not_configured" if not config.ai.enabled else None,
+                    commit=False,
                 )
-                
-                logger.info(
-                    "EVENT camera=%s id=%s confidence=%.2f",
-                    camera.id,
-                    event.id,
-                    best_detection["confidence"],
-                )
-                try:
-                    self.metrics_service.record_event(camera.id, event.event_type or "person")
-                except Exception:
-                    pass
-                try:
-                    # Don't send media URLs via WebSocket (no Ingress prefix available here)
-                    # Frontend will fetch URLs from /api/events endpoint
-                    self.websocket_manager.broadcast_event_sync({
+
+            try:
+                event = self.db_writer.run(_insert)
+            except Exception:
+                self.event_index.release(camera.id, reservation)
+                raise
+            self.event_index.record(camera.id, event.id, event.timestamp)
+            logger.info(
+                "EVENT camera=%s id=%s confidence=%.2f",
+                camera.id,
+                event.id,
+                best_detection["confidence"],
+            )
+            try:
+                self.metrics_service.record_event(camera.id, event.event_type or "person")
+            except Exception:
+                pass
+            try:
+                # Don't send media URLs via WebSocket (no Ingress prefix available here)
+                # Frontend will fetch URLs from /api/events endpoint
+                self.websocket_manager.broadcast_event_sync({
+                    "id": event.id,
+                    "camera_id": event.camera_id,
+                    "timestamp": event.timestamp.isoformat() + "Z",
+                    "confidence": event.confidence,
+                    "event_type": event.event_type,
+                    "summary": event.summary,
+                    "collage_url": None,  # Will be fetched from API
+                    "gif_url": None,
+                    "mp4_url": None,
+                })
+            except Exception as e:
+                logger.debug("Event broadcast skipped: %s", e)
+
+            # MQTT Publish (skip person alarm if AI confirmation required)
+            try:
+                if not self._ai_requires_confirmation(config):
+                    self.mqtt_service.publish_event({
                         "id": event.id,
                         "camera_id": event.camera_id,
                         "timestamp": event.timestamp.isoformat() + "Z",
                         "confidence": event.confidence,
                         "event_type": event.event_type,
                         "summary": event.summary,
-                        "collage_url": None,  # Will be fetched from API
-                        "gif_url": None,
-                        "mp4_url": None,
+                        "person_count": person_count,
+                        "ai_required": False,
+                        "ai_confirmed": True,
                     })
-                except Exception as e:
-                    logger.debug("Event broadcast skipped: %s", e)
-
-                # MQTT Publish (skip person alarm if AI confirmation required)
-                try:
-                    if not self._ai_requires_confirmation(config):
-                        self.mqtt_service.publish_event({
-                            "id": event.id,
-                            "camera_id": event.camera_id,
-                            "timestamp": event.timestamp.isoformat() + "Z",
-                            "confidence": event.confidence,
-                            "event_type": event.event_type,
-                            "summary": event.summary,
-                            "person_count": person_count,
-                            "ai_required": False,
-                            "ai_confirmed": True,
-                        })
-                except Exception as e:
-                    logger.error("MQTT publish failed: %s", e)
+            except Exception as e:
+                logger.error("MQTT publish failed: %s", e)
 
-                self._start_media_generation(
-                    camera,
-                    event.id,
-                    config,
-                    event_timestamp=event.timestamp,
-                )
-                
+            self._start_media_generation(
+                camera,
+                event.id,
+                config,
+                event_timestamp=event.timestamp,
+            )
+            
         except Exception as e:
             logger.error(f"Failed to create event: {e}")
 
@@ -1892,6 +2092,43 @@ class DetectorWorker:
         logger.error("Failed to open camera: %s", redact_rtsp_url(rtsp_url))
         return None
 
+    def _open_ingest_capture(
+        self,
+        rtsp_url: str,
+        config,
+        camera_id: str,
+        is_reconnect: bool = False,
+    ):
+        """
+        Read frames from the recorder's shared ingest for this stream.
+
+        Returns None unless stream.shared_ingest is on and the camera is being
+        recorded from the same URL; the caller then opens its own capture.
+        A reconnect restarts the shared decoder; the recording keeps running.
+        """
+        if not getattr(config.stream, "shared_ingest", False) or not rtsp_url:
+            return None
+        if not self.ingest_manager.is_recording(camera_id, rtsp_url):
+            return None
+        size = self.ffmpeg_frame_shapes.get(camera_id)
+        if not size:
+            size = self._probe_stream_resolution(rtsp_url, config, camera_id)
+            if not size:
+                return None
+            self.ffmpeg_frame_shapes[camera_id] = size
+        capture = self.ingest_manager.open_capture(
+            camera_id,
+            rtsp_url,
+            size,
+            restart=is_reconnect,
+        )
+        if capture is not None:
+            # Polled by the reader pool; a read returns at once without a new frame.
+            capture.timeout = 0.0
+            if not is_reconnect:
+                logger.info("Opened camera %s via shared ingest", camera_id)
+        return capture
+
     def _open_capture_with_fallbacks(
         self,
         rtsp_urls: List[str],
@@ -2038,7 +2275,7 @@ class DetectorWorker:
                     cmd,
                     stdout=subprocess.PIPE,
                     stderr=subprocess.PIPE,
-                    bufsize=frame_size * 2,
+                    bufsize=0,
                 )
             except Exception as exc:
                 logger.warning("Failed to start ffmpeg capture for camera %s: %s", camera_id, exc)
@@ -2071,7 +2308,7 @@ class DetectorWorker:
                 self._stop_ffmpeg_capture(process)
                 return None
 
-            self._start_ffmpeg_stderr_reader(process, camera_id)
+            self._register_ffmpeg_pipes(process, camera_id, (output_size[1], output_size[0]))
             if is_reconnect:
                 if camera_id:
                     self.last_reconnect_ts[camera_id] = time.time()
@@ -2099,32 +2336,26 @@ class DetectorWorker:
             return True
         return False
 
-    def _start_ffmpeg_stderr_reader(
+    def _register_ffmpeg_pipes(
         self,
         process: subprocess.Popen,
         camera_id: Optional[str],
+        frame_shape: Tuple[int, int],
     ) -> None:
-        if not process.stderr or not camera_id:
-            return
-
-        def _reader() -> None:
-            try:
-                for raw in iter(process.stderr.readline, b""):
-                    if not raw:
-                        break
-                    text = raw.decode(errors="ignore").strip()
-                    if not text:
-                        continue
-                    with self.ffmpeg_error_lock:
-                        self.ffmpeg_last_errors[camera_id].append(text)
-            except Exception:
+        """Hand the process's stdout/stderr to the shared capture multiplexer."""
+        def _on_stderr_line(text: str) -> None:
+            if not camera_id:
                 return
-
-        threading.Thread(
-            target=_reader,
-            daemon=True,
-            name=f"ffmpeg-stderr-{camera_id}",
-        ).start()
+            with self.ffmpeg_error_lock:
+                self.ffmpeg_last_errors[camera_id].append(text)
+
+        self.ffmpeg_pipes[process.pid] = self.capture_mux.register(
+            process.stdout,
+            frame_shape,
+            stderr=process.stderr,
+            on_stderr_line=_on_stderr_line,
+            name=camera_id or str(process.pid),
+        )
 
     def _open_ffmpeg_with_fallbacks(
         self,
@@ -2189,23 +2420,23 @@ class DetectorWorker:
         process: Optional[subprocess.Popen],
         frame_size: Optional[int],
         frame_shape: Optional[Tuple[int, int]],
+        timeout: float = FFMPEG_READ_TIMEOUT_SECONDS,
     ) -> Optional[np.ndarray]:
-        if process is None or process.stdout is None or not frame_size or not frame_shape:
-            return None
-        try:
-            raw = process.stdout.read(frame_size)
-        except Exception:
-            return None
-        if not raw or len(raw) < frame_size:
+        if process is None or not frame_size or not frame_shape:
             return None
-        try:
-            return np.frombuffer(raw, dtype=np.uint8).reshape((frame_shape[0], frame_shape[1], 3))
-        except Exception:
+        pipe = self.ffmpeg_pipes.get(process.pid)
+        if pipe is None or pipe.frame_bytes != frame_size:
             return None
+        # Latest frame wins: frames that arrived while this reader was busy
+        # were overwritten in the multiplexer's slots instead of queueing.
+        return pipe.next_frame(timeout)
 
     def _stop_ffmpeg_capture(self, process: Optional[subprocess.Popen]) -> None:
         if process is None:
             return
+        pipe = self.ffmpeg_pipes.pop(process.pid, None)
+        # The multiplexer closes the pipes it serves once they are out of its selector.
+        self.capture_mux.unregister(pipe)
         try:
             if process.poll() is None:
                 process.terminate()
@@ -2215,6 +2446,8 @@ class DetectorWorker:
                 process.kill()
             except Exception:
                 pass
+        if pipe is not None:
+            return
         try:
             if process.stdout:
                 process.stdout.close()
@@ -2340,6 +2573,30 @@ class DetectorWorker:
             inference_frame = full_resized
         return inference_frame, None
 
+    def _plan_roi_inference(self, camera_id: str, frame: np.ndarray, config) -> Optional[tuple]:
+        """
+        Decide whether this inference can run on the motion region only.
+
+        Every roi_full_frame_interval-th inference runs on the full frame so
+        people outside the current motion region are not missed. The motion
+        bbox is consumed: a later inference without fresh motion analysis
+        runs on the full frame instead of a stale region.
+        Returns InferenceService.plan_roi() output or None for full frame.
+        """
+        motion_bbox = self.motion_state.get(camera_id, {}).pop("motion_bbox", None)
+        if not getattr(config.detection, "roi_inference", True):
+            return None
+        interval = max(1, int(getattr(config.detection, "roi_full_frame_interval", 8)))
+        count = (self.roi_inference_counter.get(camera_id, 0) + 1) % interval
+        self.roi_inference_counter[camera_id] = count
+        if count == 0:
+            return None
+        return self.inference_service.plan_roi(
+            frame.shape,
+            motion_bbox,
+            tuple(config.detection.inference_resolution),
+        )
+
     @staticmethod
     def _scale_detections_to_frame(
         detections: list,
@@ -2589,6 +2846,7 @@ class DetectorWorker:
                     camera.id,
                 )
                 state["motion_disabled_logged"] = True
+            state.pop("motion_bbox", None)
             return True
         state.pop("motion_disabled_logged", None)
 
@@ -2653,6 +2911,13 @@ class DetectorWorker:
             motion_area = self._motion_area_background_subtractor(camera.id, gray, algorithm, sensitivity, state)
         else:
             motion_area = self._motion_area_frame_diff(gray, sensitivity, state)
+        if not is_thermal_motion:
+            # Motion region for ROI inference, in full-frame coordinates
+            state["motion_bbox"] = union_motion_bbox(
+                state.pop("motion_mask", None),
+                min_blob_area=max(8, int(min_area * 0.12)),
+                scale=original_w / float(gray.shape[1]),
+            )
 
         if mode == "auto":
             profile = str(motion_settings.get("auto_profile", getattr(config.motion, "auto_profile", "normal"))).lower()
@@ -2830,6 +3095,7 @@ class DetectorWorker:
         thresh = cv2.dilate(thresh, None, iterations=2)
         motion_area = int(cv2.countNonZero(thresh))
         state["prev_frame"] = gray.copy()
+        state["motion_mask"] = thresh
         return motion_area
 
     def _motion_area_background_subtractor(
@@ -2855,7 +3121,9 @@ class DetectorWorker:
             return 0
         fg_mask = subtractor.apply(gray)
         # 0=background, 127=shadow (MOG2/KNN), 255=foreground; count only foreground
-        motion_area = int(np.sum(fg_mask == 255))
+        foreground = fg_mask == 255
+        motion_area = int(np.count_nonzero(foreground))
+        state["motion_mask"] = foreground.view(np.uint8)
         return motion_area
 
     def _motion_area_thermal_iir(
@@ -3088,6 +3356,11 @@ class DetectorWorker:
             j = i
         return inside
 
+    @staticmethod
+    def _buffer_jpeg_quality(config) -> int:
+        """JPEG quality for buffered event frames; 0 keeps raw BGR frames."""
+        return buffer_jpeg_quality(config)
+
     def _update_frame_buffer(
         self,
         camera_id: str,
@@ -3095,6 +3368,7 @@ class DetectorWorker:
         detections: List[Dict],
         frame_interval: int,
         buffer_size: int,
+        jpeg_quality: int = 0,
     ) -> None:
         lock = self.frame_buffer_locks[camera_id]
         with lock:
@@ -3118,7 +3392,7 @@ class DetectorWorker:
                     "bbox": list(best_detection["bbox"]),
                 }
 
-            buffer.append((frame.copy(), best_detection, time.time()))
+            buffer.append((pack_frame(frame, jpeg_quality), best_detection, time.time()))
 
     def _update_video_buffer(
         self,
@@ -3127,6 +3401,7 @@ class DetectorWorker:
         buffer_size: int,
         record_interval: float,
         max_age_seconds: Optional[float] = None,
+        jpeg_quality: int = 0,
     ) -> None:
         if record_interval <= 0:
             return
@@ -3135,13 +3410,14 @@ class DetectorWorker:
         if now - last_sample < record_interval:
             return
         self.video_last_sample[camera_id] = now
+        packed = pack_frame(frame, jpeg_quality)
         lock = self.video_buffer_locks[camera_id]
         with lock:
             buffer = self.video_buffers[camera_id]
             if buffer.maxlen != buffer_size:
                 buffer = deque(buffer, maxlen=buffer_size)
                 self.video_buffers[camera_id] = buffer
-            buffer.append((frame.copy(), now))
+            buffer.append((packed, now))
             if max_age_seconds and max_age_seconds > 0:
                 cutoff = now - max_age_seconds
                 while buffer and buffer[0][1] < cutoff:
@@ -3270,6 +3546,26 @@ class DetectorWorker:
             "sampled_frames": float(len(frames)),
         }
 
+    def _update_event(self, db: Session, event: Event, **values: Any) -> None:
+        """Write event columns through the DB writer, then reload event in db."""
+        event_id = event.id
+        self.db_writer.apply(
+            db,
+            lambda session: session.query(Event).filter(Event.id == event_id).update(
+                values, synchronize_session=False
+            ),
+        )
+        db.refresh(event)
+
+    def _delete_event(self, db: Session, event_id: str) -> None:
+        """Delete an event through the DB writer."""
+        self.db_writer.apply(
+            db,
+            lambda session: session.query(Event).filter(Event.id == event_id).delete(
+                synchronize_session=False
+            ),
+        )
+
     def _start_media_generation(
         self,
         camera: Camera,
@@ -3313,10 +3609,7 @@ class DetectorWorker:
                 return
             with session_scope() as db:
                 if not self._has_bbox_detections(detections):
-                    event = db.query(Event).filter(Event.id == event_id).first()
-                    if event:
-                        db.delete(event)
-                        db.commit()
+                    self._delete_event(db, event_id)
                     logger.warning(
                         "Deleted phantom event %s (no bbox in media window — thermal ghost)",
                         event_id,
@@ -3325,10 +3618,7 @@ class DetectorWorker:
 
                 phantom_metrics = self._detect_static_phantom_event(frames, detections)
                 if phantom_metrics:
-                    event = db.query(Event).filter(Event.id == event_id).first()
-                    if event:
-                        db.delete(event)
-                        db.commit()
+                    self._delete_event(db, event_id)
                     logger.info(
                         "Deleted phantom event %s early (dup=%.1f%% conf=%.2f spread=%.1fx%.1f)",
                         event_id,
@@ -3348,7 +3638,7 @@ class DetectorWorker:
                 )
 
                 if ai_required:
-                    collage_path = self.media_service.generate_collage_for_ai(
+                    rendered = self.media_service.render_collage_for_ai(
                         db=db,
                         event_id=event_id,
                         frames=frames,
@@ -3356,8 +3646,9 @@ class DetectorWorker:
                         timestamps=timestamps,
                         camera_name=camera.name or "Camera",
                     )
-                    if not collage_path:
+                    if not rendered:
                         return
+                    collage_path, collage_bytes = rendered
                     event = db.query(Event).filter(Event.id == event_id).first()
                     if not event:
                         return
@@ -3375,6 +3666,7 @@ class DetectorWorker:
                             "type": camera.type.value if camera.type else None,
                             "detection_source": get_detection_source(camera.detection_source.value),
                         },
+                        image_bytes=collage_bytes,
                     ))
                     if not self._is_ai_confirmed(summary):
                         logger.info("Event %s rejected by AI, keeping for review", event_id)
@@ -3386,20 +3678,22 @@ class DetectorWorker:
                             timestamps=timestamps,
                             camera_name=camera.name or "Camera",
                         )
-                        event.rejected_by_ai = True
-                        event.summary = summary
-                        event.collage_url = (
-                            f"/api/events/{event_id}/collage"
-                            if review_collage
-                            else None
+                        self._update_event(
+                            db,
+                            event,
+                            rejected_by_ai=True,
+                            summary=summary,
+                            collage_url=f"/api/events/{event_id}/collage" if review_collage else None,
                         )
-                        db.commit()
                         return
-                    event.summary = summary
-                    event.ai_enabled = True
-                    event.ai_reason = None
-                    event.rejected_by_ai = False
-                    db.commit()
+                    self._update_event(
+                        db,
+                        event,
+                        summary=summary,
+                        ai_enabled=True,
+                        ai_reason=None,
+                        rejected_by_ai=False,
+                    )
 
                     # Publish immediately after AI-confirmed collage decision.
                     # Video generation can continue in background.
@@ -3436,7 +3730,7 @@ class DetectorWorker:
                 if event:
                     collage_path = self.media_service.get_media_path(event_id, "collage")
                     mp4_path = self.media_service.get_media_path(event_id, "mp4")
-                    gif_path = self.media_service.get_media_path(event_id, "gif")
+                    gif_path = self.media_service.get_media_path(event_id, "preview")
 
                     if not ai_required:
                         summary = None
@@ -3459,13 +3753,14 @@ class DetectorWorker:
                             ))
                         has_key = bool(config.ai.api_key) and config.ai.api_key != "***REDACTED***"
                         if summary:
-                            event.summary = summary
-                            event.ai_enabled = True
-                            event.ai_reason = None
+                            self._update_event(db, event, summary=summary, ai_enabled=True, ai_reason=None)
                         elif config.ai.enabled:
-                            event.ai_enabled = bool(has_key)
-                            event.ai_reason = "no_api_key" if not has_key else "analysis_failed"
-                        db.commit()
+                            self._update_event(
+                                db,
+                                event,
+                                ai_enabled=bool(has_key),
+                                ai_reason="no_api_key" if not has_key else "analysis_failed",
+                            )
 
                     ai_confirmed = self._event_is_ai_confirmed(event, ai_required)
 
@@ -3489,39 +3784,21 @@ class DetectorWorker:
 
                     if ai_confirmed:
                         try:
-                            asyncio.run(
-                                self.telegram_service.send_event_notification(
-                                    event={
-                                        "id": event.id,
-                                        "camera_id": event.camera_id,
-                                        "timestamp": event.timestamp.isoformat() + "Z",
-                                        "confidence": event.confidence,
-                                        "summary": event.summary,
-                                    },
-                                    camera={"id": camera.id, "name": camera.name},
-                                    collage_path=collage_path,
-                                    mp4_path=mp4_path,
-                                    gif_path=gif_path,
-                                )
-                            )
-                        except RuntimeError:
-                            loop = asyncio.new_event_loop()
-                            loop.run_until_complete(
-                                self.telegram_service.send_event_notification(
-                                    event={
-                                        "id": event.id,
-                                        "camera_id": event.camera_id,
-                                        "timestamp": event.timestamp.isoformat() + "Z",
-                                        "confidence": event.confidence,
-                                        "summary": event.summary,
-                                    },
-                                    camera={"id": camera.id, "name": camera.name},
-                                    collage_path=collage_path,
-                                    mp4_path=mp4_path,
-                                    gif_path=gif_path,
-                                )
+                            self.telegram_service.enqueue_event_notification(
+                                event={
+                                    "id": event.id,
+                                    "camera_id": event.camera_id,
+                                    "timestamp": event.timestamp.isoformat() + "Z",
+                                    "confidence": event.confidence,
+                                    "summary": event.summary,
+                                },
+                                camera={"id": camera.id, "name": camera.name},
+                                collage_path=collage_path,
+                                mp4_path=mp4_path,
+                                gif_path=gif_path,
                             )
-                            loop.close()
+                        except Exception as e:
+                            logger.warning("Telegram notify failed: %s", e)
                     else:
                         logger.info(
                             "Event %s notification suppressed (ai_rejected=%s, ai_required=%s)",
@@ -3581,9 +3858,12 @@ class DetectorWorker:
                         len(selected_items),
                     )
 
-            frames = [item[0] for item in selected_items]
-            detections = [item[1] for item in selected_items]
-            timestamps = [item[2] for item in selected_items if len(item) > 2]
+        # Decode outside the lock; only the selected window is decoded.
+        decoded = unpack_frames(item[0] for item in selected_items)
+        selected_items = [item for item, frame in zip(selected_items, decoded) if frame is not None]
+        frames = [frame for frame in decoded if frame is not None]
+        detections = [item[1] for item in selected_items]
+        timestamps = [item[2] for item in selected_items if len(item) > 2]
         if len(timestamps) != len(frames):
             timestamps = []
         return frames, detections, timestamps
@@ -3627,8 +3907,9 @@ class DetectorWorker:
                         camera_id,
                         len(selected_items),
                     )
-        frames = [item[0] for item in selected_items]
-        timestamps = [item[1] for item in selected_items]
+        decoded = unpack_frames(item[0] for item in selected_items)
+        frames = [frame for frame in decoded if frame is not None]
+        timestamps = [item[1] for item, frame in zip(selected_items, decoded) if frame is not None]
         return frames, timestamps
 
     def get_latest_frame(self, camera_id: str) -> Optional[np.ndarray]:
@@ -10,7 +10,6 @@ import asyncio
 import logging
 import multiprocessing as mp
 import os
-import shutil
 import signal
 import threading
 import time
@@ -19,13 +18,22 @@ from datetime import datetime, timezone as tz
 from typing import Any, Dict, List, Optional, Tuple
 import numpy as np
 
-from app.db.models import Camera, CameraStatus
+from app.db.models import Camera, CameraStatus, Event
 from app.db.session import session_scope, SessionLocal
+from app.db.writer import get_db_writer
+from app.services.camera_crud import get_camera_crud_service
+from app.services.event_index import get_event_index, read_shared_last_event
+from app.services.frame_buffer import buffer_jpeg_quality, read_slot, write_slot
+from app.services.metrics import get_metrics_service
+from app.services.system_stats import get_data_usage
 from app.services.ai_constants import AI_NEGATIVE_MARKERS, AI_POSITIVE_MARKERS
 
 
 logger = logging.getLogger(__name__)
 
+# Camera processes report frame-gate hit/miss deltas this often.
+GATE_STATS_INTERVAL_SECONDS = 10.0
+
 
 def _utc_now_naive() -> datetime:
     return datetime.now(tz.utc).replace(tzinfo=None)
@@ -127,9 +135,19 @@ class SharedFrameBuffer:
     
     Uses numpy arrays backed by shared memory.
     NOW WITH TIMESTAMP TRACKING TO FIX TIMELINE ISSUES!
+
+    Slots are raw frame-sized; in jpeg buffer mode a slot holds the encoded
+    frame at its start (length in ``lengths``, 0 = raw), so only those
+    pages of the shared memory are touched.
     """
     
-    def __init__(self, camera_id: str, buffer_size: int = 60, frame_shape: Tuple[int, int, int] = (720, 1280, 3)):
+    def __init__(
+        self,
+        camera_id: str,
+        buffer_size: int = 60,
+        frame_shape: Tuple[int, int, int] = (720, 1280, 3),
+        jpeg_quality: int = 0,
+    ):
         """
         Initialize shared frame buffer.
         
@@ -137,17 +155,19 @@ class SharedFrameBuffer:
             camera_id: Camera identifier
             buffer_size: Number of frames to buffer (circular)
             frame_shape: Shape of frames (height, width, channels)
+            jpeg_quality: JPEG quality for write_frame; 0 stores raw frames
         """
         self.camera_id = camera_id
         self.buffer_size = buffer_size
         self.frame_shape = frame_shape
+        self.jpeg_quality = jpeg_quality
         
         # Shared memory for frames (circular buffer)
         frame_size = int(np.prod(frame_shape))
         total_size = frame_size * buffer_size
         
-        # Shared memory for timestamps (one float64 per frame)
-        timestamp_size = buffer_size * 8  # 8 bytes per float64
+        # Shared memory for timestamps and encoded lengths (float64 + int64 per frame)
+        timestamp_size = buffer_size * 16
         
         try:
             from multiprocessing import shared_memory
@@ -186,8 +206,16 @@ class SharedFrameBuffer:
                 buffer=self.shm_ts.buf
             )
             
+            self.lengths = np.ndarray(
+                (buffer_size,),
+                dtype=np.int64,
+                buffer=self.shm_ts.buf,
+                offset=buffer_size * 8,
+            )
+            
             # Initialize timestamps to 0
             self.timestamps[:] = 0.0
+            self.lengths[:] = 0
             
             # Shared values for circular buffer management
             self.write_index = mp.Value('i', 0)  # Current write position
@@ -219,7 +247,7 @@ class SharedFrameBuffer:
             
             # Write to current position
             idx = self.write_index.value
-            self.frames[idx] = frame
+            self.lengths[idx] = write_slot(self.frames[idx], frame, self.jpeg_quality)
             
             # Update indices (circular)
             self.write_index.value = (idx + 1) % self.buffer_size
@@ -241,7 +269,7 @@ class SharedFrameBuffer:
             n: Number of frames to read (None = all available)
             
         Returns:
-            List of frames
+            List of frames (frames that fail to decode are skipped)
         """
         with self.lock:
             available = self.count.value
@@ -254,7 +282,9 @@ class SharedFrameBuffer:
             frames = []
             for i in range(n):
                 idx = (self.read_index.value + i) % self.buffer_size
-                frames.append(self.frames[idx].copy())
+                frame = read_slot(self.frames[idx], int(self.lengths[idx]))
+                if frame is not None:
+                    frames.append(frame)
             
             return frames
     
@@ -271,7 +301,7 @@ class SharedFrameBuffer:
             
             # Latest frame is at (write_index - 1)
             idx = (self.write_index.value - 1) % self.buffer_size
-            return self.frames[idx].copy()
+            return read_slot(self.frames[idx], int(self.lengths[idx]))
 
     def get_latest_frame_by_timestamp(self) -> Optional[np.ndarray]:
         """
@@ -287,7 +317,7 @@ class SharedFrameBuffer:
             if not np.any(valid):
                 return None
             idx = int(np.argmax(ts))
-            return self.frames[idx].copy()
+            return read_slot(self.frames[idx], int(self.lengths[idx]))
     
     def cleanup(self):
         """Cleanup shared memory."""
@@ -311,6 +341,8 @@ def camera_detection_process(
     shm_write_index: Optional[mp.Value] = None,
     shm_count: Optional[mp.Value] = None,
     shm_lock: Optional[mp.Lock] = None,
+    event_table: Optional[Any] = None,
+    event_slot: int = -1,
 ):
     """
     Individual camera detection process.
@@ -324,6 +356,8 @@ def camera_detection_process(
         event_queue: Queue for sending events to main process
         control_queue: Queue for receiving control commands
         stop_event: Multiprocessing event for graceful shutdown
+        event_table: Shared last-event table of the main process's event index
+        event_slot: This camera's slot in event_table (-1 = none)
     """
     # Setup process-specific logging (child processes don't inherit parent's FileHandler)
     from pathlib import Path
@@ -362,6 +396,9 @@ def camera_detection_process(
         from app.services.inference import get_inference_service
         from app.services.motion import get_motion_service
         from app.services.settings import get_settings_service
+        from app.services.motion import union_motion_bbox
+        from app.services.tracker import ObjectTracker
+        from app.services.frame_gate import FrameChangeGate, frame_fingerprint
         
         # Initialize services (process-local)
         inference_service = get_inference_service()
@@ -393,12 +430,20 @@ def camera_detection_process(
                     dtype=np.float64,
                     buffer=shm_ts.buf
                 )
+                lengths_array = np.ndarray(
+                    (buffer_size,),
+                    dtype=np.int64,
+                    buffer=shm_ts.buf,
+                    offset=buffer_size * 8,
+                )
                 
                 frame_buffer = {
                     'shm': shm,
                     'shm_ts': shm_ts,
                     'frames': frames_array,
                     'timestamps': timestamps_array,
+                    'lengths': lengths_array,
+                    'jpeg_quality': buffer_jpeg_quality(config),
                     'buffer_size': buffer_size,
                     'frame_shape': frame_shape,
                     'write_index': shm_write_index,
@@ -515,7 +560,10 @@ def camera_detection_process(
         _send_status("connected")
         
         # Detection state (process-local)
-        detection_history = deque(maxlen=5)  # Keep last 5 detections for temporal consistency
+        tracker = ObjectTracker(history=5)  # Track state for temporal/movement gating
+        frame_gate = FrameChangeGate()
+        gate_reported = (0, 0)
+        last_gate_report = 0.0
         event_start_time = None
         last_event_time = 0
         last_frame_time = 0
@@ -525,6 +573,7 @@ def camera_detection_process(
         last_suppression_probe = 0.0
         suppression_rearm_until = 0.0
         last_motion_area = 0
+        roi_counter = 0
         thermal_motion_peak_area = 0
         thermal_motion_peak_ts = 0.0
         _last_buffer_time = 0.0
@@ -662,6 +711,8 @@ def camera_detection_process(
                 area = int(stats[idx, cv2.CC_STAT_AREA])
                 if area >= min_blob:
                     motion_area_local += area
+            state["thermal_motion_mask"] = raw_mask
+            state["thermal_min_blob"] = min_blob
 
             persist_window = int(motion_config.get("thermal_persistence_window", 4))
             persist_required = int(motion_config.get("thermal_persistence_required", 3))
@@ -839,138 +890,8 @@ def camera_detection_process(
                 return area
             return max(area, int(int(thermal_motion_peak_area) * 0.85))
 
-        def _thermal_bbox_center_spread(
-            detection_frames: List[List[Dict[str, Any]]],
-            sample_frames: int = 5,
-        ) -> float:
-            """Estimate bbox center spread across recent detections."""
-            if not detection_frames:
-                return 0.0
-            frames = detection_frames[-max(2, int(sample_frames)) :]
-            centers_x: List[float] = []
-            centers_y: List[float] = []
-            for frame_dets in frames:
-                dets_with_bbox = [
-                    det for det in (frame_dets or []) if isinstance(det, dict) and det.get("bbox")
-                ]
-                if not dets_with_bbox:
-                    continue
-                best_det = max(dets_with_bbox, key=lambda det: float(det.get("confidence", 0.0)))
-                x1, y1, x2, y2 = best_det["bbox"]
-                centers_x.append((float(x1) + float(x2)) / 2.0)
-                centers_y.append((float(y1) + float(y2)) / 2.0)
-            if len(centers_x) < 2:
-                return 0.0
-            return max(max(centers_x) - min(centers_x), max(centers_y) - min(centers_y))
-
-        def _thermal_bbox_net_displacement(
-            detection_frames: List[List[Dict[str, Any]]],
-            sample_frames: int = 5,
-        ) -> float:
-            """Net center displacement between first and last recent best boxes."""
-            if not detection_frames:
-                return 0.0
-            frames = detection_frames[-max(2, int(sample_frames)) :]
-            centers: List[tuple[float, float]] = []
-            for frame_dets in frames:
-                dets_with_bbox = [
-                    det for det in (frame_dets or []) if isinstance(det, dict) and det.get("bbox")
-                ]
-                if not dets_with_bbox:
-                    continue
-                best_det = max(dets_with_bbox, key=lambda det: float(det.get("confidence", 0.0)))
-                x1, y1, x2, y2 = map(float, best_det["bbox"])
-                centers.append(((x1 + x2) / 2.0, (y1 + y2) / 2.0))
-            if len(centers) < 2:
-                return 0.0
-            sx, sy = centers[0]
-            ex, ey = centers[-1]
-            return float(np.hypot(ex - sx, ey - sy))
-
-        def _bbox_iou(box_a: List[float], box_b: List[float]) -> float:
-            """Compute IoU for two [x1, y1, x2, y2] boxes."""
-            ax1, ay1, ax2, ay2 = map(float, box_a)
-            bx1, by1, bx2, by2 = map(float, box_b)
-            inter_x1 = max(ax1, bx1)
-            inter_y1 = max(ay1, by1)
-            inter_x2 = min(ax2, bx2)
-            inter_y2 = min(ay2, by2)
-            inter_w = max(0.0, inter_x2 - inter_x1)
-            inter_h = max(0.0, inter_y2 - inter_y1)
-            inter_area = inter_w * inter_h
-            area_a = max(0.0, ax2 - ax1) * max(0.0, ay2 - ay1)
-            area_b = max(0.0, bx2 - bx1) * max(0.0, by2 - by1)
-            union = area_a + area_b - inter_area
-            if union <= 0.0:
-                return 0.0
-            return inter_area / union
-
-        def _thermal_bbox_median_iou(
-            detection_frames: List[List[Dict[str, Any]]],
-            sample_frames: int = 5,
-        ) -> float:
-            """Median IoU of consecutive best boxes across recent frames."""
-            if not detection_frames:
-                return 0.0
-            frames = detection_frames[-max(2, int(sample_frames)) :]
-            boxes: List[List[float]] = []
-            for frame_dets in frames:
-                dets_with_bbox = [
-                    det for det in (frame_dets or []) if isinstance(det, dict) and det.get("bbox")
-                ]
-                if not dets_with_bbox:
-                    continue
-                best_det = max(dets_with_bbox, key=lambda det: float(det.get("confidence", 0.0)))
-                boxes.append(best_det["bbox"])
-            if len(boxes) < 2:
-                return 0.0
-            ious = [
-                _bbox_iou(boxes[idx - 1], boxes[idx])
-                for idx in range(1, len(boxes))
-            ]
-            if not ious:
-                return 0.0
-            return float(np.median(np.array(ious, dtype=np.float32)))
-
-        def _thermal_bbox_edge_touch_ratio(
-            detection_frames: List[List[Dict[str, Any]]],
-            frame_width: int,
-            frame_height: int,
-            sample_frames: int = 5,
-            margin_ratio: float = 0.03,
-        ) -> float:
-            """Share of recent best boxes touching frame borders."""
-            if not detection_frames:
-                return 0.0
-            w = max(1, int(frame_width))
-            h = max(1, int(frame_height))
-            margin_x = max(2.0, float(w) * float(margin_ratio))
-            margin_y = max(2.0, float(h) * float(margin_ratio))
-            frames = detection_frames[-max(2, int(sample_frames)) :]
-            touches = 0
-            total = 0
-            for frame_dets in frames:
-                dets_with_bbox = [
-                    det for det in (frame_dets or []) if isinstance(det, dict) and det.get("bbox")
-                ]
-                if not dets_with_bbox:
-                    continue
-                best_det = max(dets_with_bbox, key=lambda det: float(det.get("confidence", 0.0)))
-                x1, y1, x2, y2 = map(float, best_det["bbox"])
-                total += 1
-                if (
-                    x1 <= margin_x
-                    or y1 <= margin_y
-                    or x2 >= (float(w) - margin_x)
-                    or y2 >= (float(h) - margin_y)
-                ):
-                    touches += 1
-            if total == 0:
-                return 0.0
-            return float(touches) / float(total)
-
         def _passes_thermal_static_event_guard(
-            detection_frames: List[List[Dict[str, Any]]],
+            current_dets: List[Dict[str, Any]],
             motion_area_now: int,
             confidence_threshold: float,
             base_min_area: int,
@@ -984,22 +905,18 @@ def camera_detection_process(
             a robust local heuristic: allow movement or strong confidence+motion.
             Minimum confidence floor + IoU movement signature blocks static ghosts.
             """
-            spread = _thermal_bbox_center_spread(detection_frames=detection_frames, sample_frames=5)
-            median_iou = _thermal_bbox_median_iou(detection_frames=detection_frames, sample_frames=5)
-            net_displacement = _thermal_bbox_net_displacement(
-                detection_frames=detection_frames,
+            movement = tracker.best_box_stats(
+                frame_width=frame_width,
+                frame_height=frame_height,
                 sample_frames=5,
             )
+            spread = movement["spread"]
+            median_iou = movement["median_iou"]
+            net_displacement = movement["net_displacement"]
             directional_ratio = float(net_displacement) / max(float(spread), 1.0)
-            current_dets = detection_frames[-1] if detection_frames else []
             best_conf = max((float(det.get("confidence", 0.0)) for det in current_dets), default=0.0)
             min_conf_floor = max(float(confidence_threshold) + 0.15, 0.67)
-            edge_touch_ratio = _thermal_bbox_edge_touch_ratio(
-                detection_frames=detection_frames,
-                frame_width=frame_width,
-                frame_height=frame_height,
-                sample_frames=5,
-            )
+            edge_touch_ratio = movement["edge_touch_ratio"]
             if edge_touch_ratio >= 0.80 and best_conf < max(float(confidence_threshold) + 0.25, 0.78):
                 return False
             if edge_touch_ratio >= 0.60 and best_conf < max(float(confidence_threshold) + 0.20, 0.74):
@@ -1205,6 +1122,30 @@ def camera_detection_process(
                 height = int(frame.shape[0] * 1280 / frame.shape[1])
                 frame = cv2.resize(frame, (1280, height))
 
+            fingerprint = frame_fingerprint(frame)
+            frozen_limit = float(getattr(config.stream, "frozen_stream_seconds", 0.0) or 0.0)
+            frozen_for = frame_gate.observe(fingerprint, now=current_time, frame=frame)
+            if frozen_limit > 0 and frozen_for >= frozen_limit:
+                process_logger.warning(
+                    "Camera %s (%s) delivered identical frames for %.0fs; reconnecting",
+                    cam_name,
+                    camera_id[:8],
+                    frozen_for,
+                )
+                try:
+                    cap.release()
+                except Exception:
+                    pass
+                cap = _open_capture(is_reconnect=True)
+                frame_gate.reset_frozen()
+                if cap and cap.isOpened():
+                    last_reconnect_time = time.time()
+                    _send_status("connected")
+                    suppression_rearm_until = time.time() + 20.0
+                else:
+                    time.sleep(reconnect_delay)
+                continue
+
             # Write frame to shared circular buffer at record_fps rate
             if frame_buffer:
                 try:
@@ -1225,7 +1166,9 @@ def camera_detection_process(
                         if buf_lock is not None and buf_write_idx is not None and buf_count is not None:
                             with buf_lock:
                                 idx = buf_write_idx.value
-                                frame_buffer['frames'][idx] = frame_resized
+                                frame_buffer['lengths'][idx] = write_slot(
+                                    frame_buffer['frames'][idx], frame_resized, frame_buffer['jpeg_quality']
+                                )
                                 frame_buffer['timestamps'][idx] = current_time
                                 buf_write_idx.value = (idx + 1) % buf_size
                                 if buf_count.value < buf_size:
@@ -1233,7 +1176,9 @@ def camera_detection_process(
                         else:
                             # Fallback: write without shared index tracking
                             idx = int(current_time * config.event.record_fps) % buf_size
-                            frame_buffer['frames'][idx] = frame_resized
+                            frame_buffer['lengths'][idx] = write_slot(
+                                frame_buffer['frames'][idx], frame_resized, frame_buffer['jpeg_quality']
+                            )
                             frame_buffer['timestamps'][idx] = current_time
 
                         _last_buffer_time = current_time
@@ -1255,6 +1200,7 @@ def camera_detection_process(
             # Motion detection (pre-filter)
             motion_active = True
             motion_area = 0
+            motion_bbox = None
             motion_min_area_eff = 0
             if motion_enabled:
                 motion_min_area_request = motion_min_area
@@ -1320,16 +1266,27 @@ def camera_detection_process(
                         state=thermal_motion_state,
                         now_ts=current_time,
                     )
+                    motion_bbox = union_motion_bbox(
+                        thermal_motion_state.pop("thermal_motion_mask", None),
+                        min_blob_area=int(thermal_motion_state.get("thermal_min_blob", 8)),
+                        scale=original_w / float(gray.shape[1]),
+                    )
                     motion_min_area_eff = motion_min_area_request
                     motion_detected = motion_area >= motion_min_area_request
                     motion_algo = "thermal_iir"
                 else:
-                    motion_detected, _, motion_area, motion_min_area_eff = motion_service.detect_motion(
+                    motion_detected, fg_mask, motion_area, motion_min_area_eff = motion_service.detect_motion(
                         camera_id=camera_id,
                         frame=frame,
                         min_area=motion_min_area_request,
                         sensitivity=motion_sensitivity,
                     )
+                    if fg_mask is not None:
+                        motion_bbox = union_motion_bbox(
+                            fg_mask,
+                            min_blob_area=max(8, int(motion_min_area_eff * 0.12)),
+                            scale=frame.shape[1] / float(fg_mask.shape[1]),
+                        )
                     motion_algo = str(motion_config.get("algorithm", "mog2"))
                 if auto_motion_mode:
                     auto_motion_history.append(float(motion_area))
@@ -1490,63 +1447,104 @@ def camera_detection_process(
                         continue
                 last_motion_area = current_area
             
-            # Preprocess frame — v5.0 motion-guided approach:
-            # thermal cameras use grayscale→BGR (no CLAHE; motion crop is the filter).
-            # color cameras use standard preprocessing (unchanged).
-            preprocessed = inference_service.preprocess_color(frame)
-
             # Single confidence threshold for all cameras (no thermal-specific relaxation)
             confidence_threshold = float(config.detection.confidence_threshold)
-            
-            detections_raw = inference_service.infer(
-                preprocessed,
-                confidence_threshold=confidence_threshold,
-                inference_resolution=tuple(config.detection.inference_resolution),
-            )
-            # Relaxed retry for color cameras only.
-            # Thermal cameras: no fallback — the configured threshold is final.
-            if len(detections_raw) == 0 and detection_source != "thermal":
-                relaxed_threshold = max(0.35, confidence_threshold - 0.10)
-                class_diag_summary = ""
-                if relaxed_threshold < confidence_threshold and (current_time - last_relaxed_infer_time) >= 1.0:
-                    relaxed_detections = inference_service.infer(
-                        preprocessed,
-                        confidence_threshold=relaxed_threshold,
-                        inference_resolution=tuple(config.detection.inference_resolution),
-                    )
-                    last_relaxed_infer_time = current_time
-                    if relaxed_detections:
-                        detections_raw = relaxed_detections
-                        process_logger.debug(
-                            "DETECT [%s] relaxed_threshold=%.2f recovered=%s",
-                            cam_name,
-                            relaxed_threshold,
-                            len(relaxed_detections),
+
+            # Frame-change gate: near-identical frames reuse the last result
+            gate_enabled = bool(getattr(config.detection, "frame_change_gate", True))
+            gate_key = (confidence_threshold, detection_source)
+            cached_detections = None
+            if gate_enabled:
+                cached_detections = frame_gate.lookup(fingerprint, gate_key, now=current_time)
+                if current_time - last_gate_report >= GATE_STATS_INTERVAL_SECONDS:
+                    try:
+                        event_queue.put_nowait({
+                            "type": "frame_gate",
+                            "camera_id": camera_id,
+                            "hits": frame_gate.hits - gate_reported[0],
+                            "misses": frame_gate.misses - gate_reported[1],
+                        })
+                        gate_reported = (frame_gate.hits, frame_gate.misses)
+                    except Exception:
+                        pass
+                    last_gate_report = current_time
+
+            if cached_detections is not None:
+                detections_raw = cached_detections
+            else:
+                # Preprocess frame — v5.0 motion-guided approach:
+                # thermal cameras use grayscale→BGR (no CLAHE; motion crop is the filter).
+                # color cameras use standard preprocessing (unchanged).
+                preprocessed = inference_service.preprocess_color(frame)
+                # ROI inference: crop to the motion region, with a periodic full frame
+                infer_resolution = tuple(config.detection.inference_resolution)
+                roi_offset = None
+                roi_plan = None
+                # Thermal input is never cropped (same as threading mode).
+                if getattr(config.detection, "roi_inference", True) and detection_source != "thermal":
+                    roi_interval = max(1, int(getattr(config.detection, "roi_full_frame_interval", 8)))
+                    roi_counter = (roi_counter + 1) % roi_interval
+                    if roi_counter != 0:
+                        roi_plan = inference_service.plan_roi(frame.shape, motion_bbox, infer_resolution)
+                motion_bbox = None
+                if roi_plan is not None:
+                    (rx1, ry1, rx2, ry2), infer_resolution = roi_plan
+                    preprocessed = preprocessed[ry1:ry2, rx1:rx2]
+                    roi_offset = (rx1, ry1)
+
+                detections_raw = inference_service.infer(
+                    preprocessed,
+                    confidence_threshold=confidence_threshold,
+                    inference_resolution=infer_resolution,
+                )
+                # Relaxed retry for color cameras only.
+                # Thermal cameras: no fallback — the configured threshold is final.
+                if len(detections_raw) == 0 and detection_source != "thermal":
+                    relaxed_threshold = max(0.35, confidence_threshold - 0.10)
+                    class_diag_summary = ""
+                    if relaxed_threshold < confidence_threshold and (current_time - last_relaxed_infer_time) >= 1.0:
+                        relaxed_detections = inference_service.infer(
+                            preprocessed,
+                            confidence_threshold=relaxed_threshold,
+                            inference_resolution=infer_resolution,
                         )
-            elif len(detections_raw) == 0 and detection_source == "thermal":
-                motion_area_now = int(thermal_motion_state.get("thermal_motion_area_raw", 0))
-                retry_motion_gate = max(900, int(getattr(config.motion, "min_area", 0)) * 2)
-                relaxed_threshold = max(0.25, confidence_threshold - 0.05)
-                if (
-                    motion_area_now >= retry_motion_gate
-                    and relaxed_threshold < confidence_threshold
-                    and (current_time - last_relaxed_infer_time) >= 1.0
-                ):
-                    relaxed_detections = inference_service.infer(
-                        preprocessed,
-                        confidence_threshold=relaxed_threshold,
-                        inference_resolution=tuple(config.detection.inference_resolution),
-                    )
-                    last_relaxed_infer_time = current_time
-                    if relaxed_detections:
-                        detections_raw = relaxed_detections
-                        process_logger.debug(
-                            "DETECT [%s] thermal_relaxed_threshold=%.2f recovered=%s area=%s",
-                            cam_name,
-                            relaxed_threshold,
-                            len(relaxed_detections),
-                            motion_area_now,
+                        last_relaxed_infer_time = current_time
+                        if relaxed_detections:
+                            detections_raw = relaxed_detections
+                            process_logger.debug(
+                                "DETECT [%s] relaxed_threshold=%.2f recovered=%s",
+                                cam_name,
+                                relaxed_threshold,
+                                len(relaxed_detections),
+                            )
+                elif len(detections_raw) == 0 and detection_source == "thermal":
+                    motion_area_now = int(thermal_motion_state.get("thermal_motion_area_raw", 0))
+                    retry_motion_gate = max(900, int(getattr(config.motion, "min_area", 0)) * 2)
+                    relaxed_threshold = max(0.25, confidence_threshold - 0.05)
+                    if (
+                        motion_area_now >= retry_motion_gate
+                        and relaxed_threshold < confidence_threshold
+                        and (current_time - last_relaxed_infer_time) >= 1.0
+                    ):
+                        relaxed_detections = inference_service.infer(
+                            preprocessed,
+                            confidence_threshold=relaxed_threshold,
+                            inference_resolution=infer_resolution,
                         )
+                        last_relaxed_infer_time = current_time
+                        if relaxed_detections:
+                            detections_raw = relaxed_detections
+                            process_logger.debug(
+                                "DETECT [%s] thermal_relaxed_threshold=%.2f recovered=%s area=%s",
+                                cam_name,
+                                relaxed_threshold,
+                                len(relaxed_detections),
+                                motion_area_now,
+                            )
+                if roi_offset is not None and detections_raw:
+                    detections_raw = inference_service.offset_detections(detections_raw, *roi_offset)
+                if gate_enabled:
+                    frame_gate.store(fingerprint, detections_raw, gate_key, now=current_time)
             
             # Filter by aspect ratio
             #
@@ -1635,8 +1633,13 @@ def camera_detection_process(
                     )
                 last_pipeline_log = current_time
             
-            # Update detection history
-            detection_history.append(detections)
+            if cached_detections is not None:
+                # Reused result of an unchanged frame: not a new observation
+                # for the tracker or the temporal-consistency counters.
+                continue
+
+            # Update track state
+            tracker.update(detections)
             
             # If suppression was active, lift it only after probe sees actual detections
             if suppression_active and len(detections) > 0:
@@ -1697,9 +1700,7 @@ def camera_detection_process(
             # Check temporal consistency (tuned for short walk-through scenarios)
             temporal_min_frames = 3 if detection_source == "thermal" else 2
             temporal_max_gap = 1 if detection_source == "thermal" else 2
-            temporal_pass = inference_service.check_temporal_consistency(
-                detections,
-                list(detection_history)[:-1],  # Exclude current
+            temporal_pass = tracker.is_temporally_consistent(
                 min_consecutive_frames=temporal_min_frames,
                 max_gap_frames=temporal_max_gap,
             )
@@ -1733,7 +1734,7 @@ def camera_detection_process(
                 motion_area_now = int(thermal_motion_state.get("thermal_motion_area_raw", 0))
                 frame_h, frame_w = frame.shape[:2]
                 if not _passes_thermal_static_event_guard(
-                    detection_frames=list(detection_history),
+                    current_dets=detections,
                     motion_area_now=motion_area_now,
                     confidence_threshold=confidence_threshold,
                     base_min_area=int(motion_config.get("min_area", 0) or 0),
@@ -1756,7 +1757,9 @@ def camera_detection_process(
                 )
                 continue
             
-            # Check event cooldown
+            # Check event cooldown (local sends and events the main process
+            # recorded, including those persisted before a restart)
+            last_event_time = max(last_event_time, read_shared_last_event(event_table, event_slot))
             if current_time - last_event_time < config.event.cooldown_seconds:
                 _log_gate(
                     f"cooldown_active remaining={config.event.cooldown_seconds - (current_time - last_event_time):.1f}s"
@@ -1866,6 +1869,7 @@ class MultiprocessingDetectorWorker:
         self.control_queues: Dict[str, mp.Queue] = {}
         self.frame_buffers: Dict[str, SharedFrameBuffer] = {}
         self.last_status_update: Dict[str, float] = {}
+        self.event_index = get_event_index()
         
         # Event handler thread (in main process)
         self.event_handler_thread = None
@@ -1890,17 +1894,13 @@ class MultiprocessingDetectorWorker:
             return
 
         try:
-            with session_scope() as db:
-                camera = db.query(Camera).filter(Camera.id == camera_id).first()
-                if not camera:
-                    return
-
-                camera.status = status
-                if last_frame_ts is not None:
-                    camera.last_frame_ts = last_frame_ts
-                db.commit()
-                self.last_status_update[camera_id] = now
+            if not get_db_writer().run(
+                lambda db: get_camera_crud_service().set_status(db, camera_id, status, last_frame_ts)
+            ):
+                return
+            self.last_status_update[camera_id] = now
 
+            with session_scope() as db:
                 try:
                     online = db.query(Camera).filter(Camera.status == CameraStatus.CONNECTED).count()
                     retrying = db.query(Camera).filter(Camera.status == CameraStatus.RETRYING).count()
@@ -2091,12 +2091,14 @@ class MultiprocessingDetectorWorker:
         shm_write_index = _fb.write_index if _fb else None
         shm_count = _fb.count if _fb else None
         shm_lock = _fb.lock if _fb else None
+        event_table, event_slot = self.event_index.shared_slot(camera.id)
 
         # Create process
         process = mp.Process(
             target=camera_detection_process,
             args=(camera.id, camera_config, event_queue, control_queue, stop_event,
-                  frame_buffer_name, shm_write_index, shm_count, shm_lock),
+                  frame_buffer_name, shm_write_index, shm_count, shm_lock,
+                  event_table, event_slot),
             daemon=False,  # Don't use daemon for clean shutdown
             name=f"detector-{camera.id}"
         )
@@ -2215,17 +2217,35 @@ class MultiprocessingDetectorWorker:
                     except ValueError:
                         pass
 
-            event = event_service.create_event(
-                db=db,
-                camera_id=camera.id,
-                timestamp=event_ts,
-                confidence=confidence,
-                event_type="person",
-                summary=None,
-                ai_enabled=config.ai.enabled,
-                ai_reason="not_configured" if not config.ai.enabled else None,
-                person_count=person_count,
+            # Second cooldown guard: the camera process gates on its shared
+            # slot, this also catches sends from a restarted process.
+            reservation = self.event_index.reserve(
+                camera_id,
+                config.event.cooldown_seconds,
+                now=event_ts.replace(tzinfo=tz.utc).timestamp(),
             )
+            if reservation is None:
+                logger.info("Event suppressed by cooldown (index) camera=%s", camera_id)
+                return
+
+            try:
+                created = get_db_writer().run(lambda writer_db: event_service.create_event(
+                    db=writer_db,
+                    camera_id=camera_id,
+                    timestamp=event_ts,
+                    confidence=confidence,
+                    event_type="person",
+                    summary=None,
+                    ai_enabled=config.ai.enabled,
+                    ai_reason="not_configured" if not config.ai.enabled else None,
+                    person_count=person_count,
+                    commit=False,
+                ))
+            except Exception:
+                self.event_index.release(camera_id, reservation)
+                raise
+            self.event_index.record(camera_id, created.id, created.timestamp)
+            event = db.query(Event).filter(Event.id == created.id).one()
             logger.info(f"Event created: {event.id} for camera {camera_id}")
 
             ai_required = _ai_requires_confirmation(config)
@@ -2254,6 +2274,7 @@ class MultiprocessingDetectorWorker:
                 frame_shape = tuple(buffer_info['frame_shape'])
                 frames_array = np.ndarray((buffer_size, *frame_shape), dtype=np.uint8, buffer=shm.buf)
                 timestamps_array = np.ndarray((buffer_size,), dtype=np.float64, buffer=shm_ts.buf)
+                lengths_array = np.ndarray((buffer_size,), dtype=np.int64, buffer=shm_ts.buf, offset=buffer_size * 8)
 
                 if event_ts_str:
                     try:
@@ -2275,7 +2296,9 @@ class MultiprocessingDetectorWorker:
                     for i in range(buffer_size):
                         ts = timestamps_array[i]
                         if ts > 0 and st <= ts <= et:
-                            out.append((ts, i, frames_array[i].copy()))
+                            frame = read_slot(frames_array[i], int(lengths_array[i]))
+                            if frame is not None:
+                                out.append((ts, i, frame))
                     out.sort(key=lambda x: x[0])
                     return out
 
@@ -2354,22 +2377,23 @@ class MultiprocessingDetectorWorker:
                             _mw = _get_mw()
                             _ai_collage_path = media_service.MEDIA_DIR / event.id / "collage_ai.jpg"
                             ai_collage_to_use = None
+                            ai_collage_bytes = None
                             try:
-                                _mw.create_ai_collage(
+                                ai_collage_bytes = _mw.encode_ai_collage(
                                     frames,
                                     detections_list,
                                     frame_timestamps,
-                                    str(_ai_collage_path),
                                     camera_name,
                                     event.timestamp,
                                     event.confidence,
                                 )
-                                if _ai_collage_path.exists():
-                                    ai_collage_to_use = _ai_collage_path
+                                _ai_collage_path.parent.mkdir(parents=True, exist_ok=True)
+                                _ai_collage_path.write_bytes(ai_collage_bytes)
+                                ai_collage_to_use = _ai_collage_path
                             except Exception:
                                 ai_collage_to_use = None
 
-                            if ai_collage_to_use and ai_collage_to_use.exists():
+                            if ai_collage_to_use and ai_collage_bytes:
                                 from app.services.time_utils import get_detection_source
                                 detection_source = get_detection_source(
                                     camera_obj.detection_source.value if hasattr(camera_obj, "detection_source") and camera_obj.detection_source else "thermal"
@@ -2382,6 +2406,7 @@ class MultiprocessingDetectorWorker:
                                         "confidence": event.confidence,
                                     },
                                     collage_path=str(ai_collage_to_use),
+                                    image_bytes=ai_collage_bytes,
                                     camera={
                                         "id": camera_obj.id,
                                         "name": camera_name,
@@ -2457,7 +2482,7 @@ class MultiprocessingDetectorWorker:
                                 telegram = get_telegram_service()
                                 collage_path_obj = media_service.get_media_path(event.id, "collage")
                                 mp4_path_obj = media_service.get_media_path(event.id, "mp4")
-                                _get_async_runner().submit(telegram.send_event_notification(
+                                telegram.enqueue_event_notification(
                                     event={
                                         "id": event.id,
                                         "camera_id": event.camera_id,
@@ -2468,7 +2493,7 @@ class MultiprocessingDetectorWorker:
                                     camera={"id": camera_obj.id, "name": camera_name},
                                     collage_path=collage_path_obj,
                                     mp4_path=mp4_path_obj,
-                                ))
+                                )
                             except Exception as te:
                                 logger.warning(f"Telegram notify failed: {te}")
                     except Exception as e:
@@ -2483,7 +2508,7 @@ class MultiprocessingDetectorWorker:
                     try:
                         event_dir = media_service.MEDIA_DIR / event.id
                         if event_dir.exists():
-                            shutil.rmtree(event_dir, ignore_errors=True)
+                            get_data_usage().remove(event_dir)
                         db.delete(event)
                         db.commit()
                     except Exception as e:
@@ -2583,6 +2608,11 @@ class MultiprocessingDetectorWorker:
                                 )
                                 restart_t.start()
 
+                            elif event_type == "frame_gate":
+                                metrics = get_metrics_service()
+                                metrics.record_frame_gate(camera_id, True, int(event_data.get("hits", 0)))
+                                metrics.record_frame_gate(camera_id, False, int(event_data.get("misses", 0)))
+
                             elif event_type == "status":
                                 # Handle status update
                                 try:
@@ -3,7 +3,7 @@ Media generation worker for Thermal Dual Vision.
 
 This worker handles creation of event media files:
 - Collage (5 frame grid)
-- Timeline GIF (preview)
+- Event preview loop (animated WebP or muted H.264; GIF fallback)
 - Timelapse MP4 (720p with detection boxes)
 
 Better than Scrypted: More frames, higher quality, detection boxes!
@@ -15,14 +15,17 @@ import subprocess
 import sys
 import tempfile
 from datetime import datetime, timedelta, timezone
+from functools import partial
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import cv2
 import imageio
 import numpy as np
 
+from app.services.system_stats import get_data_usage
 from app.utils.paths import DATA_DIR
+from app.workers.overlay import get_overlay_renderer, grid_layout, mp4_layout
 
 logger = logging.getLogger(__name__)
 
@@ -75,6 +78,14 @@ class MediaWorker:
     GIF_DURATION = 0.5  # seconds per frame
     GIF_MAX_SIZE_MB = 2.0  # Telegram limit
     GIF_QUALITY = 85
+
+    # Preview settings (animated WebP or muted H.264 loop; GIF stays the fallback)
+    PREVIEW_FORMATS = ("webp", "mp4", "gif")
+    PREVIEW_MAX_DURATION = 6.0  # seconds
+    PREVIEW_MAX_BYTES = 600_000
+    PREVIEW_REDUCED_SIZE = (480, 360)
+    PREVIEW_WEBP_QUALITY = 70
+    PREVIEW_MP4_CRF = 28
     
     # MP4 settings
     MP4_MAX_SIZE = (1280, 720)
@@ -98,6 +109,8 @@ class MediaWorker:
         # Ensure media directory exists
         self.MEDIA_DIR.mkdir(parents=True, exist_ok=True)
         self._ffmpeg_blacklist: set[str] = set()
+        self.overlay = get_overlay_renderer()
+        self.data_usage = get_data_usage()
         logger.info("MediaWorker initialized")
 
     def _get_mp4_target_size(self, frame: np.ndarray) -> tuple[int, int]:
@@ -167,6 +180,19 @@ class MediaWorker:
         label: str,
     ) -> int:
         """Write JPEG with descending quality until size cap is met."""
+        data = self._encode_jpeg_with_size_cap(image, preferred_quality, min_quality, max_bytes, label)
+        Path(output_path).write_bytes(data)
+        return int(len(data))
+
+    def _encode_jpeg_with_size_cap(
+        self,
+        image: np.ndarray,
+        preferred_quality: int,
+        min_quality: int,
+        max_bytes: int,
+        label: str,
+    ) -> bytes:
+        """Encode JPEG with descending quality until size cap is met."""
         max_bytes = max(40_000, int(max_bytes))
         best_data: Optional[bytes] = None
         best_quality = int(preferred_quality)
@@ -180,7 +206,6 @@ class MediaWorker:
                 best_data = data
                 best_quality = int(quality)
             if len(data) <= max_bytes:
-                Path(output_path).write_bytes(data)
                 if int(quality) < int(preferred_quality):
                     logger.info(
                         "%s JPEG compressed to %.1fKB (q=%d, cap=%.1fKB)",
@@ -189,12 +214,11 @@ class MediaWorker:
                         int(quality),
                         max_bytes / 1024.0,
                     )
-                return int(len(data))
+                return data
 
         if best_data is None:
             raise RuntimeError(f"{label} JPEG encode failed")
 
-        Path(output_path).write_bytes(best_data)
         logger.warning(
             "%s JPEG remains above cap: %.1fKB (q=%d, cap=%.1fKB)",
             label,
@@ -202,7 +226,7 @@ class MediaWorker:
             best_quality,
             max_bytes / 1024.0,
         )
-        return int(len(best_data))
+        return best_data
 
     def _select_indices(self, frame_count: int, target_count: int) -> List[int]:
         """Select indices evenly - never repeat frames."""
@@ -290,16 +314,14 @@ class MediaWorker:
         try:
             fd, raw_path = tempfile.mkstemp(suffix=".raw")
             os.close(fd)
-            with open(raw_path, "wb") as f:
+            # Counted only when the temp directory lies under the data directory.
+            with self.data_usage.track(raw_path), open(raw_path, "wb") as f:
                 for frame in resized:
                     f.write(frame.tobytes())
         except Exception as exc:
             logger.warning("FFmpeg encode: failed to write temp raw file: %s", exc)
-            if raw_path and os.path.exists(raw_path):
-                try:
-                    os.unlink(raw_path)
-                except OSError:
-                    pass
+            if raw_path:
+                self.data_usage.remove(raw_path)
             return False
 
         try:
@@ -352,11 +374,7 @@ class MediaWorker:
                     logger.warning("FFmpeg binary disabled after failures: %s", ffmpeg)
             return False
         finally:
-            if raw_path and os.path.exists(raw_path):
-                try:
-                    os.unlink(raw_path)
-                except OSError:
-                    pass
+            self.data_usage.remove(raw_path)
 
     def _remux_mp4_faststart(self, mp4_path: str) -> None:
         """Remux MP4 with moov atom at start for web streaming (Range requests)."""
@@ -435,7 +453,7 @@ class MediaWorker:
             if timestamp:
                 margin = 8
                 tstr = (timestamp + timedelta(seconds=len(processed) / max(1, fps))).strftime("%H:%M:%S")
-                cv2.putText(img, tstr, (margin, 40), cv2.FONT_HERSHEY_SIMPLEX, 0.7, self.COLOR_WHITE, 1)
+                self.overlay.draw_dynamic_text(img, tstr, (margin, 40), 0.7, self.COLOR_WHITE, 1)
             processed.append(img)
         encoded = self._encode_mp4_ffmpeg(processed, output_path, fps, size)
         if not encoded:
@@ -657,6 +675,39 @@ class MediaWorker:
         except Exception:
             return None
 
+    @staticmethod
+    def _bbox_to_tile(
+        detection: Optional[Dict],
+        frame: np.ndarray,
+        tile_size: Tuple[int, int],
+    ) -> Optional[Tuple[int, int, int, int]]:
+        """Scale a detection bbox from frame to tile pixels, clamped to the tile."""
+        if not detection or not detection.get("bbox"):
+            return None
+        x1, y1, x2, y2 = detection["bbox"]
+        scale_x = tile_size[0] / frame.shape[1]
+        scale_y = tile_size[1] / frame.shape[0]
+        max_x, max_y = tile_size[0] - 1, tile_size[1] - 1
+        return (
+            max(0, min(int(x1 * scale_x), max_x)),
+            max(0, min(int(y1 * scale_y), max_y)),
+            max(0, min(int(x2 * scale_x), max_x)),
+            max(0, min(int(y2 * scale_y), max_y)),
+        )
+
+    @staticmethod
+    def _assemble_grid(
+        tiles: List[np.ndarray],
+        tile_size: Tuple[int, int],
+        grid: Tuple[int, int],
+    ) -> np.ndarray:
+        """Place tiles on a grid canvas; missing slots stay black."""
+        layout = grid_layout(tile_size, grid)
+        canvas = np.zeros((layout.canvas_size[1], layout.canvas_size[0], 3), dtype=np.uint8)
+        for tile, (x, y) in zip(tiles, layout.origins):
+            canvas[y:y + tile_size[1], x:x + tile_size[0]] = tile
+        return canvas
+
     @staticmethod
     def _bbox_to_frame_pixels(
         frame: np.ndarray,
@@ -934,6 +985,23 @@ class MediaWorker:
         confidence: float = 0.0,
     ) -> str:
         """Create an AI-focused collage with detection-centric crops and lighter payload."""
+        data = self.encode_ai_collage(
+            frames, detections, timestamps, camera_name, timestamp, confidence
+        )
+        Path(output_path).write_bytes(data)
+        logger.info("AI collage created: %s (%.1fKB)", output_path, len(data) / 1024.0)
+        return output_path
+
+    def encode_ai_collage(
+        self,
+        frames: List[np.ndarray],
+        detections: Optional[List[Optional[Dict]]],
+        timestamps: Optional[List[float]],
+        camera_name: str = "Camera",
+        timestamp: Optional[datetime] = None,
+        confidence: float = 0.0,
+    ) -> bytes:
+        """Render the AI collage and return the encoded JPEG bytes."""
         if len(frames) == 0:
             raise ValueError("Need at least 1 frame for AI collage")
 
@@ -995,57 +1063,34 @@ class MediaWorker:
 
             img = cv2.resize(focused, self.AI_COLLAGE_FRAME_SIZE, interpolation=cv2.INTER_AREA)
             if bbox_on_tile is not None:
-                cv2.rectangle(
-                    img,
-                    (bbox_on_tile[0], bbox_on_tile[1]),
-                    (bbox_on_tile[2], bbox_on_tile[3]),
-                    self.COLOR_ACCENT,
-                    2,
-                )
+                self.overlay.draw_detection(img, bbox_on_tile, self.COLOR_ACCENT, 2)
 
-            cv2.putText(
-                img,
-                str(tile_idx + 1),
-                (8, 24),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.7,
-                self.COLOR_WHITE,
-                2,
-            )
+            self.overlay.draw_text(img, str(tile_idx + 1), (8, 24), 0.7, self.COLOR_WHITE, 2)
+            time_org = (8, self.AI_COLLAGE_FRAME_SIZE[1] - 10)
             if timestamps and frame_idx < len(timestamps):
-                cv2.putText(
+                self.overlay.draw_dynamic_text(
                     img,
                     _local_time_ms_from_epoch(float(timestamps[frame_idx])),
-                    (8, self.AI_COLLAGE_FRAME_SIZE[1] - 10),
-                    cv2.FONT_HERSHEY_SIMPLEX,
+                    time_org,
                     0.45,
                     self.COLOR_WHITE,
                     1,
                 )
             elif tile_idx == 0 and timestamp:
-                cv2.putText(
-                    img,
-                    _local_time_str(timestamp),
-                    (8, self.AI_COLLAGE_FRAME_SIZE[1] - 10),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.45,
-                    self.COLOR_WHITE,
-                    1,
-                )
+                self.overlay.draw_dynamic_text(img, _local_time_str(timestamp), time_org, 0.45, self.COLOR_WHITE, 1)
 
             if tile_idx == event_slot:
-                label_x = self.AI_COLLAGE_FRAME_SIZE[0] - 70
-                label_y = 22
+                label = f"{confidence:.0%}"
                 if bbox_on_tile is not None:
-                    cv2.rectangle(
+                    self.overlay.draw_detection(
                         img,
-                        (bbox_on_tile[0], bbox_on_tile[1]),
-                        (bbox_on_tile[2], bbox_on_tile[3]),
+                        bbox_on_tile,
                         self.COLOR_ACCENT,
                         3,
+                        label=label,
+                        label_org=(max(4, bbox_on_tile[0]), max(20, bbox_on_tile[1] - 8)),
+                        font_scale=0.5,
                     )
-                    label_x = max(4, bbox_on_tile[0])
-                    label_y = max(20, bbox_on_tile[1] - 8)
                 else:
                     cv2.circle(
                         img,
@@ -1054,49 +1099,28 @@ class MediaWorker:
                         self.COLOR_ACCENT,
                         -1,
                     )
-                cv2.putText(
-                    img,
-                    f"{confidence:.0%}",
-                    (label_x, label_y),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.5,
-                    self.COLOR_ACCENT,
-                    2,
-                )
+                    self.overlay.draw_text(
+                        img, label, (self.AI_COLLAGE_FRAME_SIZE[0] - 70, 22), 0.5, self.COLOR_ACCENT, 2
+                    )
             tiles.append(img)
 
-        rows = []
-        for row_idx in range(self.AI_COLLAGE_GRID[1]):
-            row_frames = []
-            for col_idx in range(self.AI_COLLAGE_GRID[0]):
-                idx = row_idx * self.AI_COLLAGE_GRID[0] + col_idx
-                if idx < len(tiles):
-                    row_frames.append(tiles[idx])
-                else:
-                    row_frames.append(np.zeros((*self.AI_COLLAGE_FRAME_SIZE[::-1], 3), dtype=np.uint8))
-            rows.append(np.hstack(row_frames))
-        collage = np.vstack(rows)
-
-        cv2.putText(
+        collage = self._assemble_grid(tiles, self.AI_COLLAGE_FRAME_SIZE, self.AI_COLLAGE_GRID)
+        self.overlay.draw_text(
             collage,
             _ascii_safe(camera_name),
             (collage.shape[1] - 240, 24),
-            cv2.FONT_HERSHEY_SIMPLEX,
             0.55,
             self.COLOR_WHITE,
             1,
         )
 
-        saved_bytes = self._write_jpeg_with_size_cap(
+        return self._encode_jpeg_with_size_cap(
             image=collage,
-            output_path=output_path,
             preferred_quality=self.AI_COLLAGE_QUALITY,
             min_quality=self.AI_COLLAGE_MIN_QUALITY,
             max_bytes=self.AI_COLLAGE_MAX_BYTES,
             label="AI collage",
         )
-        logger.info("AI collage created: %s (%.1fKB)", output_path, saved_bytes / 1024.0)
-        return output_path
     
     def create_collage(
         self,
@@ -1154,27 +1178,6 @@ class MediaWorker:
         if indices and len(indices) < self.COLLAGE_FRAMES:
             indices.extend([indices[-1]] * (self.COLLAGE_FRAMES - len(indices)))
         
-        def _draw_badge(img: np.ndarray, text: str) -> None:
-            (w, h), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.9, 2)
-            pad = 10
-            x, y = 10, 10
-            cv2.rectangle(
-                img,
-                (x, y),
-                (x + w + pad * 2, y + h + pad * 2),
-                self.COLOR_ACCENT,
-                -1,
-            )
-            cv2.putText(
-                img,
-                text,
-                (x + pad, y + h + pad),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.9,
-                self.COLOR_WHITE,
-                2,
-            )
-
         # Select 6 dense timeline frames
         selected_indices = list(indices)
         selected = [frames[i] for i in selected_indices]
@@ -1182,131 +1185,61 @@ class MediaWorker:
             range(len(selected_indices)),
             key=lambda i: abs(selected_indices[i] - best_idx),
         )
-        
+        tile_h = self.COLLAGE_FRAME_SIZE[1]
+
         # Resize all frames
         resized = []
         for idx, frame in enumerate(selected):
             img = cv2.resize(frame, self.COLLAGE_FRAME_SIZE)
             frame_idx = selected_indices[idx] if idx < len(selected_indices) else None
-
+            detection = None
             if detections and frame_idx is not None and frame_idx < len(detections):
                 detection = detections[frame_idx]
-                if detection and detection.get("bbox"):
-                    x1, y1, x2, y2 = detection["bbox"]
-                    scale_x = self.COLLAGE_FRAME_SIZE[0] / frame.shape[1]
-                    scale_y = self.COLLAGE_FRAME_SIZE[1] / frame.shape[0]
-                    x1 = int(x1 * scale_x)
-                    y1 = int(y1 * scale_y)
-                    x2 = int(x2 * scale_x)
-                    y2 = int(y2 * scale_y)
-                    x1 = max(0, min(x1, self.COLLAGE_FRAME_SIZE[0] - 1))
-                    y1 = max(0, min(y1, self.COLLAGE_FRAME_SIZE[1] - 1))
-                    x2 = max(0, min(x2, self.COLLAGE_FRAME_SIZE[0] - 1))
-                    y2 = max(0, min(y2, self.COLLAGE_FRAME_SIZE[1] - 1))
-                    cv2.rectangle(img, (x1, y1), (x2, y2), self.COLOR_ACCENT, 2)
-                    label = f"Person {float(detection.get('confidence', 0.0)):.0%}"
-                    cv2.putText(
-                        img,
-                        label,
-                        (x1, max(20, y1 - 10)),
-                        cv2.FONT_HERSHEY_SIMPLEX,
-                        0.6,
-                        self.COLOR_ACCENT,
-                        2,
-                    )
-            
-            # Add frame number badge (1-5)
-            _draw_badge(img, str(idx + 1))
-            
+            box = self._bbox_to_tile(detection, frame, self.COLLAGE_FRAME_SIZE)
+
+            if box is not None:
+                self.overlay.draw_detection(
+                    img,
+                    box,
+                    self.COLOR_ACCENT,
+                    2,
+                    label=f"Person {float(detection.get('confidence', 0.0)):.0%}",
+                    label_org=(box[0], max(20, box[1] - 10)),
+                )
+
+            # Add frame number badge (1-6)
+            self.overlay.draw_badge(img, str(idx + 1), (10, 10), 0.9, 2, 10, self.COLOR_ACCENT, self.COLOR_WHITE)
+
             # Add frame timestamp with millisecond precision.
             if timestamps and frame_idx is not None and frame_idx < len(timestamps):
                 frame_time_text = _local_time_ms_from_epoch(float(timestamps[frame_idx]))
-                cv2.putText(
-                    img,
-                    frame_time_text,
-                    (10, 72),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.56,
-                    self.COLOR_WHITE,
-                    2
-                )
+                self.overlay.draw_dynamic_text(img, frame_time_text, (10, 72), 0.56, self.COLOR_WHITE, 2)
             elif idx == 0 and timestamp:
-                cv2.putText(
-                    img,
-                    _local_time_str(timestamp),
-                    (10, 72),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.56,
-                    self.COLOR_WHITE,
-                    2
-                )
-            
+                self.overlay.draw_dynamic_text(img, _local_time_str(timestamp), (10, 72), 0.56, self.COLOR_WHITE, 2)
+
             # Add confidence and explicit event highlight on best-match frame.
             if idx == event_slot:
-                cv2.putText(
-                    img,
-                    f"{confidence:.0%}",
-                    (10, 460),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.7,
-                    self.COLOR_ACCENT,
-                    2
-                )
-                cv2.putText(
-                    img,
-                    "EVENT",
-                    (10, 432),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.62,
-                    self.COLOR_ACCENT,
-                    2,
-                )
+                self.overlay.draw_text(img, f"{confidence:.0%}", (10, tile_h - 20), 0.7, self.COLOR_ACCENT, 2)
+                self.overlay.draw_text(img, "EVENT", (10, tile_h - 48), 0.62, self.COLOR_ACCENT, 2)
                 # Important: never highlight the whole frame.
                 # Event marker should point to the detected person area only.
-                if detections and frame_idx is not None and frame_idx < len(detections):
-                    event_det = detections[frame_idx]
-                    if event_det and event_det.get("bbox"):
-                        x1, y1, x2, y2 = event_det["bbox"]
-                        scale_x = self.COLLAGE_FRAME_SIZE[0] / frame.shape[1]
-                        scale_y = self.COLLAGE_FRAME_SIZE[1] / frame.shape[0]
-                        x1 = int(x1 * scale_x)
-                        y1 = int(y1 * scale_y)
-                        x2 = int(x2 * scale_x)
-                        y2 = int(y2 * scale_y)
-                        x1 = max(0, min(x1, self.COLLAGE_FRAME_SIZE[0] - 1))
-                        y1 = max(0, min(y1, self.COLLAGE_FRAME_SIZE[1] - 1))
-                        x2 = max(0, min(x2, self.COLLAGE_FRAME_SIZE[0] - 1))
-                        y2 = max(0, min(y2, self.COLLAGE_FRAME_SIZE[1] - 1))
-                        cv2.rectangle(img, (x1, y1), (x2, y2), self.COLOR_ACCENT, 3)
-            
+                if box is not None:
+                    self.overlay.draw_detection(img, box, self.COLOR_ACCENT, 3)
+
             resized.append(img)
-        
-        # Create grid
-        rows = []
-        for row_idx in range(self.COLLAGE_GRID[1]):
-            row_frames = []
-            for col_idx in range(self.COLLAGE_GRID[0]):
-                frame_idx = row_idx * self.COLLAGE_GRID[0] + col_idx
-                if frame_idx < len(resized):
-                    row_frames.append(resized[frame_idx])
-                else:
-                    # Empty frame (black)
-                    row_frames.append(np.zeros((*self.COLLAGE_FRAME_SIZE[::-1], 3), dtype=np.uint8))
-            rows.append(np.hstack(row_frames))
-        
-        collage = np.vstack(rows)
-        
+
+        collage = self._assemble_grid(resized, self.COLLAGE_FRAME_SIZE, self.COLLAGE_GRID)
+
         # Add camera name (top right) — ASCII-safe for cv2 HERSHEY font
-        cv2.putText(
+        self.overlay.draw_text(
             collage,
             _ascii_safe(camera_name),
-            (1700, 40),
-            cv2.FONT_HERSHEY_SIMPLEX,
+            (collage.shape[1] - 220, 40),
             1.0,
             self.COLOR_WHITE,
-            2
+            2,
         )
-        
+
         # Save with adaptive JPEG quality so collage size does not explode on noisy thermal frames.
         saved_bytes = self._write_jpeg_with_size_cap(
             image=collage,
@@ -1347,82 +1280,11 @@ class MediaWorker:
         if len(frames) == 0:
             raise ValueError("Need at least 1 frame for GIF")
 
-        frame_count = min(self.GIF_FRAMES, len(frames))
-        
-        # Select 10 evenly distributed frames
-        total = len(frames)
-        if frame_count == 1:
-            indices = [0]
-        else:
-            indices = [int(i * (total - 1) / (frame_count - 1)) for i in range(frame_count)]
-        selected = [frames[i] for i in indices]
-        
-        # Process frames
-        processed = []
-        for idx, frame in enumerate(selected):
-            # Resize
-            img = cv2.resize(frame, self.GIF_SIZE)
-
-            # Add frame number badge
-            badge_text = str(idx + 1)
-            (w, h), _ = cv2.getTextSize(badge_text, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)
-            pad = 8
-            x, y = 10, 10
-            cv2.rectangle(
-                img,
-                (x, y),
-                (x + w + pad * 2, y + h + pad * 2),
-                self.COLOR_ACCENT,
-                -1,
-            )
-            cv2.putText(
-                img,
-                badge_text,
-                (x + pad, y + h + pad),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.8,
-                self.COLOR_WHITE,
-                2,
-            )
-            
-            # Add timestamp
-            if timestamp:
-                frame_time = timestamp + timedelta(seconds=idx * self.GIF_DURATION)
-                cv2.putText(
-                    img,
-                    frame_time.strftime("%H:%M:%S"),
-                    (10, 40),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    0.7,
-                    self.COLOR_WHITE,
-                    2
-                )
-            
-            # Add camera name
-            cv2.putText(
-                img,
-                _ascii_safe(camera_name),
-                (480, 30),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.6,
-                self.COLOR_WHITE,
-                2
-            )
-            
-            # Add progress bar (timeline indicator) - Scrypted doesn't have this!
-            progress = idx / max(frame_count - 1, 1)
-            bar_width = int(self.GIF_SIZE[0] * progress)
-            cv2.rectangle(
-                img,
-                (0, self.GIF_SIZE[1] - 10),
-                (bar_width, self.GIF_SIZE[1]),
-                self.COLOR_ACCENT,
-                -1
-            )
-            
-            # Convert BGR to RGB for imageio
-            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-            processed.append(img_rgb)
+        # Convert BGR to RGB for imageio
+        processed = [
+            cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            for img in self._render_preview_frames(frames, self.GIF_FRAMES, camera_name, timestamp)
+        ]
         
         # imageio v3 expects duration in milliseconds; v2 expected seconds.
         # Using ms avoids the 2000 fps bug introduced by v3's changed convention.
@@ -1455,6 +1317,245 @@ class MediaWorker:
         logger.info(f"Timeline GIF created: {output_path} ({size_mb:.2f}MB)")
         return output_path
     
+    def _render_preview_frames(
+        self,
+        frames: List[np.ndarray],
+        frame_count: int,
+        camera_name: str,
+        timestamp: Optional[datetime],
+        size: Optional[Tuple[int, int]] = None,
+    ) -> Iterator[np.ndarray]:
+        """
+        Yield evenly spaced preview frames (BGR) with badge, time, name and progress bar.
+
+        Overlay positions are laid out for GIF_SIZE; frames are scaled to size
+        after drawing, one at a time, so encoders can consume them as a stream.
+        """
+        frame_count = max(1, min(frame_count, len(frames)))
+        total = len(frames)
+        if frame_count == 1:
+            indices = [0]
+        else:
+            indices = [int(i * (total - 1) / (frame_count - 1)) for i in range(frame_count)]
+        safe_name = _ascii_safe(camera_name)
+        gif_w, gif_h = self.GIF_SIZE
+
+        for idx, frame_idx in enumerate(indices):
+            img = cv2.resize(frames[frame_idx], self.GIF_SIZE)
+
+            # Add frame number badge
+            self.overlay.draw_badge(img, str(idx + 1), (10, 10), 0.8, 2, 8, self.COLOR_ACCENT, self.COLOR_WHITE)
+
+            # Add timestamp
+            if timestamp:
+                frame_time = timestamp + timedelta(seconds=idx * self.GIF_DURATION)
+                self.overlay.draw_dynamic_text(
+                    img, frame_time.strftime("%H:%M:%S"), (10, 40), 0.7, self.COLOR_WHITE, 2
+                )
+
+            # Add camera name
+            self.overlay.draw_text(img, safe_name, (480, 30), 0.6, self.COLOR_WHITE, 2)
+
+            # Add progress bar (timeline indicator) - Scrypted doesn't have this!
+            progress = idx / max(frame_count - 1, 1)
+            cv2.rectangle(img, (0, gif_h - 10), (int(gif_w * progress), gif_h), self.COLOR_ACCENT, -1)
+
+            if size and size != self.GIF_SIZE:
+                img = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+            yield img
+
+    def create_preview(
+        self,
+        frames: List[np.ndarray],
+        output_path: str,
+        camera_name: str = "Camera",
+        timestamp: Optional[datetime] = None,
+        preview_format: str = "webp",
+    ) -> str:
+        """
+        Create the event preview loop as animated WebP, muted H.264 MP4 or GIF.
+
+        Uses the timeline GIF frame selection and overlays. Frames are rendered
+        one at a time and piped into ffmpeg. The loop is capped at
+        PREVIEW_MAX_DURATION seconds; a file above PREVIEW_MAX_BYTES is encoded
+        again at PREVIEW_REDUCED_SIZE. When a format cannot be produced the
+        next one in PREVIEW_FORMATS is tried, ending with GIF.
+
+        Args:
+            frames: List of frames
+            output_path: Output path; its suffix is replaced by the format written
+            camera_name: Camera name for overlay
+            timestamp: Event start timestamp
+            preview_format: "webp", "mp4" or "gif"
+
+        Returns:
+            Path of the preview actually written
+        """
+        if len(frames) == 0:
+            raise ValueError("Need at least 1 frame for preview")
+        if preview_format not in self.PREVIEW_FORMATS:
+            raise ValueError(f"Unknown preview format: {preview_format}")
+
+        frame_count = min(self.GIF_FRAMES, int(self.PREVIEW_MAX_DURATION / self.GIF_DURATION))
+        base = Path(output_path)
+        order = [preview_format] + [fmt for fmt in self.PREVIEW_FORMATS if fmt not in (preview_format, "mp4")]
+        for fmt in order:
+            path = str(base.with_suffix(f".{fmt}"))
+            if fmt == "gif":
+                written = self.create_timeline_gif(frames, path, camera_name, timestamp)
+            else:
+                written = None
+                for size in (self.GIF_SIZE, self.PREVIEW_REDUCED_SIZE):
+                    source = partial(self._render_preview_frames, frames, frame_count, camera_name, timestamp, size)
+                    if not self._encode_preview(source, path, fmt, size):
+                        break
+                    written = path
+                    if os.path.getsize(path) <= self.PREVIEW_MAX_BYTES:
+                        break
+                    logger.warning(
+                        "Preview %s %.1fKB > %.1fKB, reducing size",
+                        fmt,
+                        os.path.getsize(path) / 1024.0,
+                        self.PREVIEW_MAX_BYTES / 1024.0,
+                    )
+                if written is None:
+                    logger.warning("Preview %s encode unavailable, trying next format", fmt)
+                    continue
+
+            for other in self.PREVIEW_FORMATS:
+                stale = base.with_suffix(f".{other}")
+                if str(stale) != written and stale.exists():
+                    try:
+                        stale.unlink()
+                    except OSError:
+                        pass
+            logger.info("Event preview created: %s (%.1fKB)", written, os.path.getsize(written) / 1024.0)
+            return written
+        raise RuntimeError("Preview encode failed in every format")
+
+    def _encode_preview(
+        self,
+        frame_source: Callable[[], Iterable[np.ndarray]],
+        output_path: str,
+        preview_format: str,
+        size: Tuple[int, int],
+    ) -> bool:
+        """Encode a WebP or MP4 preview atomically; ffmpeg first, Pillow for WebP."""
+        parent = os.path.dirname(os.path.abspath(output_path))
+        fd, tmp_path = tempfile.mkstemp(suffix=f".{preview_format}", dir=parent)
+        os.close(fd)
+        try:
+            encoded = self._encode_preview_ffmpeg(frame_source, tmp_path, preview_format, size)
+            if not encoded and preview_format == "webp":
+                encoded = self._encode_webp_pillow(frame_source, tmp_path)
+            if encoded:
+                os.replace(tmp_path, output_path)
+            return encoded
+        finally:
+            if os.path.exists(tmp_path):
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+    def _encode_preview_ffmpeg(
+        self,
+        frame_source: Callable[[], Iterable[np.ndarray]],
+        output_path: str,
+        preview_format: str,
+        size: Tuple[int, int],
+    ) -> bool:
+        """Pipe raw BGR frames into ffmpeg as they are rendered."""
+        width, height = size
+        if preview_format == "webp":
+            codec_args = [
+                "-c:v", "libwebp_anim",
+                "-quality", str(self.PREVIEW_WEBP_QUALITY),
+                "-compression_level", "4",
+                "-loop", "0",
+                "-f", "webp",
+            ]
+        else:
+            codec_args = [
+                "-c:v", "libx264",
+                "-preset", "veryfast",
+                "-crf", str(self.PREVIEW_MP4_CRF),
+                "-profile:v", "baseline",
+                "-pix_fmt", "yuv420p",
+                "-movflags", "+faststart",
+                "-f", "mp4",
+            ]
+        fps = f"{1.0 / self.GIF_DURATION:g}"
+
+        for ffmpeg in self._resolve_ffmpeg_candidates():
+            cmd = [
+                ffmpeg,
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-y",
+                "-f",
+                "rawvideo",
+                "-pix_fmt",
+                "bgr24",
+                "-s",
+                f"{width}x{height}",
+                "-r",
+                fps,
+                "-i",
+                "pipe:0",
+                "-an",
+                *codec_args,
+                output_path,
+            ]
+            with tempfile.TemporaryFile() as stderr:
+                try:
+                    proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr)
+                except OSError as exc:
+                    logger.warning("FFmpeg preview start failed: %s", exc)
+                    continue
+                try:
+                    for frame in frame_source():
+                        proc.stdin.write(np.ascontiguousarray(frame).tobytes())
+                    proc.stdin.close()
+                    returncode = proc.wait(timeout=60)
+                except (BrokenPipeError, subprocess.TimeoutExpired) as exc:
+                    proc.kill()
+                    proc.wait()
+                    returncode = -1
+                    logger.debug("FFmpeg preview pipe aborted: %s", exc)
+                if returncode == 0 and os.path.getsize(output_path) > 0:
+                    return True
+                stderr.seek(0)
+                error_text = stderr.read().decode(errors="ignore").strip()
+                logger.warning("FFmpeg preview encode failed (%s): %s", preview_format, error_text or "unknown")
+        return False
+
+    def _encode_webp_pillow(
+        self,
+        frame_source: Callable[[], Iterable[np.ndarray]],
+        output_path: str,
+    ) -> bool:
+        """Animated WebP through Pillow when ffmpeg is unavailable."""
+        try:
+            from PIL import Image
+
+            images = [Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)) for frame in frame_source()]
+            images[0].save(
+                output_path,
+                format="WEBP",
+                save_all=True,
+                append_images=images[1:],
+                duration=int(self.GIF_DURATION * 1000),
+                loop=0,
+                quality=self.PREVIEW_WEBP_QUALITY,
+                method=4,
+            )
+            return True
+        except Exception as exc:
+            logger.warning("Pillow WebP encode failed: %s", exc)
+            return False
+
     def create_timelapse_mp4(
         self,
         frames: List[np.ndarray],
@@ -1530,12 +1631,13 @@ class MediaWorker:
             else:
                 indices = self._select_indices(frame_count, target_frame_count)
             speed_factor = max(actual_duration / max(target_duration, 0.1), 1.0)
-        scale_ref = min(target_size[0] / 1280, target_size[1] / 720)
-        margin = max(8, int(16 * scale_ref))
-        font_large = max(0.5, 1.0 * scale_ref)
-        font_medium = max(0.45, 0.8 * scale_ref)
-        font_small = max(0.45, 0.7 * scale_ref)
-        text_thickness = max(1, int(2 * scale_ref))
+        layout = mp4_layout(target_size)
+        margin = layout.margin
+        safe_name = _ascii_safe(camera_name) if camera_name else ""
+        if safe_name:
+            name_h = self.overlay.text_size(safe_name, layout.font_medium, self.COLOR_WHITE, layout.thickness)[1]
+            name_y = max(margin, name_h + margin // 2)
+        speed_text = f"{speed_factor:.1f}x"
 
         processed_frames: List[np.ndarray] = []
         for out_idx, frame_idx in enumerate(indices):
@@ -1560,23 +1662,15 @@ class MediaWorker:
                 x2_scaled = int(x2 * scale) + x_offset
                 y2_scaled = int(y2 * scale) + y_offset
 
-                cv2.rectangle(
+                self.overlay.draw_detection(
                     img,
-                    (x1_scaled, y1_scaled),
-                    (x2_scaled, y2_scaled),
+                    (x1_scaled, y1_scaled, x2_scaled, y2_scaled),
                     self.COLOR_ACCENT,
-                    max(2, text_thickness + 1),
-                )
-
-                label = f"Person {detection['confidence']:.0%}"
-                cv2.putText(
-                    img,
-                    label,
-                    (x1_scaled, max(0, y1_scaled - margin)),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    font_medium,
-                    self.COLOR_ACCENT,
-                    text_thickness,
+                    layout.box_thickness,
+                    label=f"Person {detection['confidence']:.0%}",
+                    label_org=(x1_scaled, max(0, y1_scaled - margin)),
+                    font_scale=layout.font_medium,
+                    thickness=layout.thickness,
                 )
 
             if timestamp:
@@ -1588,49 +1682,34 @@ class MediaWorker:
                         frame_time = datetime.fromtimestamp(timestamps[frame_idx]).replace(tzinfo=None)
                 else:
                     frame_time = timestamp + timedelta(seconds=out_idx / target_fps_int)
-                cv2.putText(
+                self.overlay.draw_dynamic_text(
                     img,
                     frame_time.strftime("%H:%M:%S.%f")[:-3],
-                    (margin, max(margin, int(40 * scale_ref))),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    font_large,
+                    layout.time_org,
+                    layout.font_large,
                     self.COLOR_WHITE,
-                    text_thickness,
+                    layout.thickness,
                 )
 
-            if camera_name:
-                safe_name = _ascii_safe(camera_name)
-                (name_w, name_h), _ = cv2.getTextSize(
-                    safe_name,
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    font_medium,
-                    text_thickness,
-                )
-                cv2.putText(
+            if safe_name:
+                self.overlay.draw_text_right(
                     img,
                     safe_name,
-                    (target_size[0] - name_w - margin, max(margin, name_h + margin // 2)),
-                    cv2.FONT_HERSHEY_SIMPLEX,
-                    font_medium,
+                    target_size[0] - margin,
+                    name_y,
+                    layout.font_medium,
                     self.COLOR_WHITE,
-                    text_thickness,
+                    layout.thickness,
                 )
 
-            speed_text = f"{speed_factor:.1f}x"
-            (speed_w, speed_h), _ = cv2.getTextSize(
-                speed_text,
-                cv2.FONT_HERSHEY_SIMPLEX,
-                font_small,
-                text_thickness,
-            )
-            cv2.putText(
+            self.overlay.draw_text_right(
                 img,
                 speed_text,
-                (target_size[0] - speed_w - margin, target_size[1] - margin),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                font_small,
+                target_size[0] - margin,
+                target_size[1] - margin,
+                layout.font_small,
                 self.COLOR_WHITE,
-                text_thickness,
+                layout.thickness,
             )
 
             processed_frames.append(img)
@@ -0,0 +1,276 @@
+"""
+Overlay rendering for event media.
+
+Collages, the timeline GIF and the timelapse MP4 draw the same overlays:
+frame badges, timestamps, camera names, confidence labels and detection
+boxes. OverlayRenderer is the one drawing path for all of them.
+
+Text that repeats across frames (camera name, speed, labels, percentages) is
+rasterized once into a premultiplied sprite and alpha-blended in place with
+two cv2 calls, about half the cost of cv2.putText and without a per-frame
+getTextSize. Badges are kept as ready BGR patches. Text that changes on
+every frame (timestamps) still goes to cv2.putText: composing it from cached
+glyphs in Python costs more than the single C call it would replace.
+Layout geometry per output size is computed once and cached.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+# Rendered strings kept per renderer (camera names, labels, percentages).
+MAX_TEXT_SPRITES = 512
+
+Color = Tuple[int, int, int]
+
+
+@dataclass(frozen=True)
+class TextSprite:
+    """Rasterized text: premultiplied color, inverse alpha and origin offset."""
+
+    color: np.ndarray
+    inverse_alpha: np.ndarray
+    left: int
+    top: int
+    width: int
+    height: int
+
+
+@dataclass(frozen=True)
+class Mp4Layout:
+    """Overlay geometry of a timelapse MP4 frame."""
+
+    size: Tuple[int, int]
+    margin: int
+    font_large: float
+    font_medium: float
+    font_small: float
+    thickness: int
+    box_thickness: int
+    time_org: Tuple[int, int]
+
+
+@dataclass(frozen=True)
+class GridLayout:
+    """Canvas size and tile origins of a collage grid."""
+
+    tile_size: Tuple[int, int]
+    canvas_size: Tuple[int, int]
+    origins: Tuple[Tuple[int, int], ...]
+
+
+@lru_cache(maxsize=32)
+def mp4_layout(target_size: Tuple[int, int]) -> Mp4Layout:
+    """Overlay geometry for an MP4 output size (scaled from a 1280x720 reference)."""
+    scale_ref = min(target_size[0] / 1280, target_size[1] / 720)
+    margin = max(8, int(16 * scale_ref))
+    thickness = max(1, int(2 * scale_ref))
+    return Mp4Layout(
+        size=target_size,
+        margin=margin,
+        font_large=max(0.5, 1.0 * scale_ref),
+        font_medium=max(0.45, 0.8 * scale_ref),
+        font_small=max(0.45, 0.7 * scale_ref),
+        thickness=thickness,
+        box_thickness=max(2, thickness + 1),
+        time_org=(margin, max(margin, int(40 * scale_ref))),
+    )
+
+
+@lru_cache(maxsize=32)
+def grid_layout(tile_size: Tuple[int, int], grid: Tuple[int, int]) -> GridLayout:
+    """Tile origins for a columns x rows grid of equally sized tiles."""
+    cols, rows = grid
+    return GridLayout(
+        tile_size=tile_size,
+        canvas_size=(tile_size[0] * cols, tile_size[1] * rows),
+        origins=tuple(
+            (col * tile_size[0], row * tile_size[1])
+            for row in range(rows)
+            for col in range(cols)
+        ),
+    )
+
+
+def render_text_sprite(text: str, font_scale: float, color: Color, thickness: int) -> TextSprite:
+    """Rasterize text with cv2.putText and crop it to its strokes."""
+    (width, height), baseline = cv2.getTextSize(text, FONT, font_scale, thickness)
+    pad = thickness + height
+    canvas = np.zeros((height + baseline + 2 * pad, width + 2 * pad), dtype=np.uint8)
+    cv2.putText(canvas, text, (pad, pad + height), FONT, font_scale, 255, thickness)
+    ys, xs = np.nonzero(canvas)
+    if len(xs) == 0:
+        empty = np.zeros((0, 0, 3), dtype=np.uint8)
+        return TextSprite(empty, empty, 0, 0, width, height)
+    x0, x1, y0, y1 = xs.min(), xs.max() + 1, ys.min(), ys.max() + 1
+    alpha = cv2.merge([canvas[y0:y1, x0:x1]] * 3)
+    solid = np.empty_like(alpha)
+    solid[:] = color
+    return TextSprite(
+        color=cv2.multiply(solid, alpha, scale=1 / 255.0),
+        inverse_alpha=cv2.bitwise_not(alpha),
+        left=int(pad - x0),
+        top=int(pad + height - y0),
+        width=width,
+        height=height,
+    )
+
+
+class OverlayRenderer:
+    """Cached text sprites and badges blended into BGR frames in place."""
+
+    def __init__(self, max_sprites: int = MAX_TEXT_SPRITES):
+        self.max_sprites = max_sprites
+        self._lock = threading.Lock()
+        self._sprites: "OrderedDict[Tuple, TextSprite]" = OrderedDict()
+        self._badges: Dict[Tuple, np.ndarray] = {}
+
+    def text_sprite(self, text: str, font_scale: float, color: Color, thickness: int) -> TextSprite:
+        """Sprite of a whole string (LRU cached)."""
+        key = (text, font_scale, color, thickness)
+        with self._lock:
+            sprite = self._sprites.get(key)
+            if sprite is not None:
+                self._sprites.move_to_end(key)
+                return sprite
+        sprite = render_text_sprite(text, font_scale, color, thickness)
+        with self._lock:
+            self._sprites[key] = sprite
+            while len(self._sprites) > self.max_sprites:
+                self._sprites.popitem(last=False)
+        return sprite
+
+    def text_size(self, text: str, font_scale: float, color: Color, thickness: int) -> Tuple[int, int]:
+        """Same as cv2.getTextSize(...)[0], from the sprite cache."""
+        sprite = self.text_sprite(text, font_scale, color, thickness)
+        return sprite.width, sprite.height
+
+    def draw_text(
+        self,
+        img: np.ndarray,
+        text: str,
+        org: Tuple[int, int],
+        font_scale: float,
+        color: Color,
+        thickness: int,
+    ) -> None:
+        """Draw text that repeats across frames (names, labels, percentages)."""
+        self.blit(img, self.text_sprite(text, font_scale, color, thickness), org)
+
+    def draw_text_right(
+        self,
+        img: np.ndarray,
+        text: str,
+        right: int,
+        y: int,
+        font_scale: float,
+        color: Color,
+        thickness: int,
+    ) -> None:
+        """Draw cached text whose right edge ends at x=right."""
+        sprite = self.text_sprite(text, font_scale, color, thickness)
+        self.blit(img, sprite, (right - sprite.width, y))
+
+    @staticmethod
+    def draw_dynamic_text(
+        img: np.ndarray,
+        text: str,
+        org: Tuple[int, int],
+        font_scale: float,
+        color: Color,
+        thickness: int,
+    ) -> None:
+        """Draw text that changes every frame (timestamps); not cached."""
+        cv2.putText(img, text, org, FONT, font_scale, color, thickness)
+
+    def draw_badge(
+        self,
+        img: np.ndarray,
+        text: str,
+        org: Tuple[int, int],
+        font_scale: float,
+        thickness: int,
+        pad: int,
+        background: Color,
+        color: Color,
+    ) -> None:
+        """Paste a filled box with text inset by pad, its top-left corner at org."""
+        key = (text, font_scale, thickness, pad, background, color)
+        patch = self._badges.get(key)
+        if patch is None:
+            (w, h), _ = cv2.getTextSize(text, FONT, font_scale, thickness)
+            patch = np.empty((h + pad * 2 + 1, w + pad * 2 + 1, 3), dtype=np.uint8)
+            patch[:] = background
+            cv2.putText(patch, text, (pad, h + pad), FONT, font_scale, color, thickness)
+            with self._lock:
+                self._badges[key] = patch
+        x0, y0 = org
+        ix0, iy0 = max(x0, 0), max(y0, 0)
+        ix1 = min(x0 + patch.shape[1], img.shape[1])
+        iy1 = min(y0 + patch.shape[0], img.shape[0])
+        if ix1 > ix0 and iy1 > iy0:
+            img[iy0:iy1, ix0:ix1] = patch[iy0 - y0:iy1 - y0, ix0 - x0:ix1 - x0]
+
+    def draw_detection(
+        self,
+        img: np.ndarray,
+        box: Tuple[int, int, int, int],
+        color: Color,
+        box_thickness: int,
+        label: Optional[str] = None,
+        label_org: Optional[Tuple[int, int]] = None,
+        font_scale: float = 0.6,
+        thickness: int = 2,
+    ) -> None:
+        """Draw a detection box and an optional cached label."""
+        x1, y1, x2, y2 = box
+        cv2.rectangle(img, (x1, y1), (x2, y2), color, box_thickness)
+        if label:
+            self.draw_text(img, label, label_org or (x1, max(0, y1 - 10)), font_scale, color, thickness)
+
+    @staticmethod
+    def blit(img: np.ndarray, sprite: TextSprite, org: Tuple[int, int]) -> None:
+        """Alpha-blend a sprite with its text origin at org, clipped to the image."""
+        sprite_h, sprite_w = sprite.inverse_alpha.shape[:2]
+        if sprite_w == 0:
+            return
+        x0 = org[0] - sprite.left
+        y0 = org[1] - sprite.top
+        ix0, iy0 = max(x0, 0), max(y0, 0)
+        ix1 = min(x0 + sprite_w, img.shape[1])
+        iy1 = min(y0 + sprite_h, img.shape[0])
+        if ix1 <= ix0 or iy1 <= iy0:
+            return
+        region = img[iy0:iy1, ix0:ix1]
+        if ix1 - ix0 == sprite_w and iy1 - iy0 == sprite_h:
+            inverse_alpha, color = sprite.inverse_alpha, sprite.color
+        else:
+            rows = slice(iy0 - y0, iy1 - y0)
+            cols = slice(ix0 - x0, ix1 - x0)
+            inverse_alpha, color = sprite.inverse_alpha[rows, cols], sprite.color[rows, cols]
+        cv2.multiply(region, inverse_alpha, dst=region, scale=1 / 255.0)
+        cv2.add(region, color, dst=region)
+
+
+# Global singleton instance
+_overlay_renderer: Optional[OverlayRenderer] = None
+
+
+def get_overlay_renderer() -> OverlayRenderer:
+    """
+    Get or create the global overlay renderer.
+
+    Returns:
+        OverlayRenderer: Global renderer instance
+    """
+    global _overlay_renderer
+    if _overlay_renderer is None:
+        _overlay_renderer = OverlayRenderer()
+    return _overlay_renderer
@@ -16,7 +16,9 @@ from sqlalchemy.orm import Session
 
 from app.db.models import Event
 from app.db.session import session_scope
+from app.db.writer import get_db_writer
 from app.services.settings import get_settings_service
+from app.services.system_stats import get_data_usage
 from app.utils.paths import DATA_DIR
 
 
@@ -38,6 +40,8 @@ class RetentionWorker:
     """
     
     MEDIA_DIR = DATA_DIR / "media"
+    # Event rows deleted per writer job by cleanup_old_events
+    DELETE_CHUNK_SIZE = 500
     
     def __init__(self):
         """Initialize retention worker."""
@@ -45,6 +49,7 @@ class RetentionWorker:
         self.thread: Optional[threading.Thread] = None
         self._stop_event = threading.Event()
         self.settings_service = get_settings_service()
+        self.data_usage = get_data_usage()
         
         logger.info("RetentionWorker initialized")
     
@@ -136,27 +141,32 @@ class RetentionWorker:
         # Calculate cutoff date
         cutoff_date = _utc_now_naive() - timedelta(days=retention_days)
         
-        # Query old events
-        old_events = db.query(Event).filter(Event.timestamp < cutoff_date).all()
+        # Query old event ids only; rows are deleted in chunks below
+        old_ids = [
+            event_id for (event_id,) in
+            db.query(Event.id).filter(Event.timestamp < cutoff_date).order_by(Event.timestamp.asc()).all()
+        ]
         
         deleted_count = 0
         
-        for event in old_events:
+        for offset in range(0, len(old_ids), self.DELETE_CHUNK_SIZE):
+            chunk = old_ids[offset: offset + self.DELETE_CHUNK_SIZE]
             try:
-                # Delete DB record first so a crash leaves orphan files
+                # Delete DB rows first so a crash leaves orphan files
                 # (harmless) rather than orphan DB rows (invisible ghost events).
-                db.delete(event)
-                db.commit()
-
-                # Files are now unreferenced — safe to remove
-                self.delete_event_media(event.id)
-                
-                deleted_count += 1
-                logger.debug(f"Deleted old event: {event.id} (age: {(_utc_now_naive() - event.timestamp).days} days)")
-                
+                self._delete_event_rows(db, chunk)
             except Exception as e:
-                logger.error(f"Failed to delete event {event.id}: {e}")
-                db.rollback()
+                logger.error(f"Failed to delete {len(chunk)} old events: {e}")
+                continue
+
+            # Files are now unreferenced — safe to remove
+            for event_id in chunk:
+                try:
+                    self.delete_event_media(event_id)
+                    deleted_count += 1
+                    logger.debug(f"Deleted old event: {event_id}")
+                except Exception as e:
+                    logger.error(f"Failed to delete event {event_id}: {e}")
         
         return deleted_count
     
@@ -186,19 +196,18 @@ class RetentionWorker:
         
         logger.warning(f"Disk usage {disk_usage:.1f}% exceeds limit {disk_limit_percent}%")
         
-        # Get oldest events
-        old_events = db.query(Event).order_by(Event.timestamp.asc()).all()
+        # Get oldest event ids
+        old_ids = [event_id for (event_id,) in db.query(Event.id).order_by(Event.timestamp.asc()).all()]
         
         deleted_count = 0
         
-        for event in old_events:
+        for event_id in old_ids:
             try:
                 # Commit DB deletion first to avoid orphan DB rows on crash
-                db.delete(event)
-                db.commit()
+                self._delete_event_rows(db, [event_id])
 
                 # Files now unreferenced — safe to remove
-                self.delete_event_media(event.id)
+                self.delete_event_media(event_id)
                 
                 deleted_count += 1
                 
@@ -208,11 +217,19 @@ class RetentionWorker:
                     break
                 
             except Exception as e:
-                logger.error(f"Failed to delete event {event.id}: {e}")
-                db.rollback()
+                logger.error(f"Failed to delete event {event_id}: {e}")
         
         return deleted_count
     
+    def _delete_event_rows(self, db: Session, event_ids: List[str]) -> None:
+        """Delete event rows through the DB writer (one short transaction)."""
+        get_db_writer().apply(
+            db,
+            lambda session: session.query(Event).filter(Event.id.in_(event_ids)).delete(
+                synchronize_session=False
+            ),
+        )
+    
     def delete_event_media(self, event_id: str) -> None:
         """
         Delete all media files for an event.
@@ -227,8 +244,19 @@ class RetentionWorker:
         if not event_dir.exists():
             return
         
-        # Delete in order: mp4 (largest) → gif → collage → legacy marker
-        delete_order = ["timelapse.mp4", "preview.gif", "collage.jpg", "timelapse.mp4.legacy"]
+        with self.data_usage.track(event_dir):
+            self._delete_event_dir(event_dir)
+
+    def _delete_event_dir(self, event_dir: Path) -> None:
+        # Delete in order: mp4 (largest) → preview → collage → legacy marker
+        delete_order = [
+            "timelapse.mp4",
+            "preview.gif",
+            "preview.webp",
+            "preview.mp4",
+            "collage.jpg",
+            "timelapse.mp4.legacy",
+        ]
         
         for filename in delete_order:
             file_path = event_dir / filename
@@ -0,0 +1,183 @@
+"""
+Event write burst benchmark for the SQLite single-writer queue.
+
+Simulates a burst where every camera detects at once: each camera thread
+inserts events back to back while reader threads poll the events list query.
+The burst runs twice against a fresh temporary database, once with one
+session and commit per insert (the old detector path) and once through
+DatabaseWriter, and reports insert throughput, SQLITE_BUSY failures and
+reader latency percentiles. Readers pause between queries like API clients
+do; with no pause they mostly measure GIL contention within this process.
+
+Usage:
+    python tests/db_write_benchmark.py --cameras 30 --events 40 --readers 4 --read-interval 0.01
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.db.models import Base, Camera, CameraStatus, CameraType, Event
+from app.db.session import DB_BUSY_TIMEOUT_MS, tune_sqlite_connection
+from app.db.writer import DatabaseWriter
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def _make_factory(db_path: Path, cameras: int) -> sessionmaker:
+    engine = create_engine(
+        f"sqlite:///{db_path}",
+        connect_args={"check_same_thread": False, "timeout": DB_BUSY_TIMEOUT_MS / 1000.0},
+    )
+    event.listen(engine, "connect", lambda dbapi_conn, _record: tune_sqlite_connection(dbapi_conn))
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = factory()
+    db.add_all(
+        Camera(id=f"cam-{i}", name=f"Camera {i}", type=CameraType.THERMAL, status=CameraStatus.CONNECTED)
+        for i in range(cameras)
+    )
+    db.commit()
+    db.close()
+    return factory
+
+
+def _new_event(camera_id: str, index: int) -> Event:
+    return Event(
+        camera_id=camera_id,
+        timestamp=datetime(2026, 1, 1) + timedelta(seconds=index),
+        confidence=0.8,
+        event_type="person",
+        person_count=1,
+    )
+
+
+def _run_burst(
+    factory: sessionmaker,
+    insert: Callable[[str, int], None],
+    cameras: int,
+    events: int,
+    readers: int,
+    read_interval: float,
+) -> Dict[str, float]:
+    failures = 0
+    lock = threading.Lock()
+    done = threading.Event()
+    read_ms: List[float] = []
+
+    def _camera(camera_id: str) -> None:
+        nonlocal failures
+        for index in range(events):
+            try:
+                insert(camera_id, index)
+            except Exception:
+                with lock:
+                    failures += 1
+
+    def _reader() -> None:
+        while not done.is_set():
+            started = time.perf_counter()
+            db: Session = factory()
+            try:
+                db.query(Event).order_by(Event.timestamp.desc()).limit(50).all()
+            finally:
+                db.close()
+            with lock:
+                read_ms.append((time.perf_counter() - started) * 1000.0)
+            done.wait(read_interval)
+
+    reader_threads = [threading.Thread(target=_reader) for _ in range(readers)]
+    for thread in reader_threads:
+        thread.start()
+    started = time.perf_counter()
+    camera_threads = [threading.Thread(target=_camera, args=(f"cam-{i}",)) for i in range(cameras)]
+    for thread in camera_threads:
+        thread.start()
+    for thread in camera_threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    done.set()
+    for thread in reader_threads:
+        thread.join()
+
+    inserted = cameras * events - failures
+    return {
+        "seconds": elapsed,
+        "inserts_per_s": inserted / elapsed if elapsed else 0.0,
+        "failures": failures,
+        "read_p50_ms": statistics.median(read_ms) if read_ms else 0.0,
+        "read_p99_ms": _percentile(read_ms, 0.99),
+    }
+
+
+def _direct(factory: sessionmaker) -> Callable[[str, int], None]:
+    def _insert(camera_id: str, index: int) -> None:
+        db = factory()
+        try:
+            db.add(_new_event(camera_id, index))
+            db.commit()
+        finally:
+            db.close()
+    return _insert
+
+
+def _queued(writer: DatabaseWriter) -> Callable[[str, int], None]:
+    def _insert(camera_id: str, index: int) -> None:
+        writer.run(lambda db: db.add(_new_event(camera_id, index)))
+    return _insert
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cameras", type=int, default=30)
+    parser.add_argument("--events", type=int, default=40, help="Events inserted per camera")
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--read-interval", type=float, default=0.01, help="Seconds between reader queries")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        direct_factory = _make_factory(Path(tmpdir) / "direct.db", args.cameras)
+        direct = _run_burst(
+            direct_factory, _direct(direct_factory), args.cameras, args.events, args.readers, args.read_interval
+        )
+
+        queued_factory = _make_factory(Path(tmpdir) / "queued.db", args.cameras)
+        writer = DatabaseWriter(queued_factory)
+        try:
+            queued = _run_burst(
+                queued_factory, _queued(writer), args.cameras, args.events, args.readers, args.read_interval
+            )
+            writer_stats = writer.get_stats()
+        finally:
+            writer.stop()
+
+    print(f"{args.cameras} cameras x {args.events} events, {args.readers} readers")
+    print(f"{'mode':<10}{'seconds':>10}{'inserts/s':>12}{'failed':>8}{'read p50':>11}{'read p99':>11}")
+    for name, result in (("direct", direct), ("writer", queued)):
+        print(
+            f"{name:<10}{result['seconds']:>10.2f}{result['inserts_per_s']:>12.0f}{result['failures']:>8}"
+            f"{result['read_p50_ms']:>9.1f}ms{result['read_p99_ms']:>9.1f}ms"
+        )
+    print(
+        f"writer: {writer_stats['batches']} batches, avg {writer_stats['avg_batch_size']} jobs, "
+        f"largest {writer_stats['largest_batch']}, commit {writer_stats['commit_ms_avg']}ms avg"
+    )
+
+
+if __name__ == "__main__":
+    main()
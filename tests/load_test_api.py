@@ -0,0 +1,124 @@
+"""
+API load test for Thermal Dual Vision.
+
+Hammers the events page, live view and settings endpoints at the same time
+and reports per-endpoint latency percentiles against an idle baseline,
+plus the event loop lag the server reports in /api/health. A /ready probe
+runs alongside the load: with blocking work off the event loop its p99
+stays close to the baseline, while the hammered endpoints only slow down
+as much as the thread pool saturates.
+
+Usage:
+    python tests/load_test_api.py --url http://localhost:8000 --concurrency 20 --seconds 30
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import httpx
+
+PROBE_PATH = "/ready"
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def _discover_paths(client: httpx.AsyncClient) -> List[str]:
+    paths = ["/api/events?page=1&page_size=20", "/api/settings", "/api/live", "/api/cameras/status"]
+    try:
+        streams = (await client.get("/api/live")).json().get("streams", [])
+        paths.extend(f"/api/live/{stream['camera_id']}.jpg" for stream in streams[:2])
+    except Exception:
+        pass
+    return paths
+
+
+async def _measure(client: httpx.AsyncClient, path: str, results: Dict[str, List[float]]) -> None:
+    started = time.perf_counter()
+    try:
+        response = await client.get(path)
+        ok = response.status_code < 500
+    except httpx.HTTPError:
+        ok = False
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+    results[path if ok else f"{path} (failed)"].append(elapsed_ms)
+
+
+async def _baseline(client: httpx.AsyncClient, paths: List[str], rounds: int) -> Dict[str, List[float]]:
+    results: Dict[str, List[float]] = defaultdict(list)
+    for _ in range(rounds):
+        for path in paths:
+            await _measure(client, path, results)
+    return results
+
+
+async def _hammer(client: httpx.AsyncClient, paths: List[str], concurrency: int, seconds: float) -> Dict[str, List[float]]:
+    results: Dict[str, List[float]] = defaultdict(list)
+    deadline = time.monotonic() + seconds
+
+    async def _worker(offset: int) -> None:
+        index = offset
+        while time.monotonic() < deadline:
+            await _measure(client, paths[index % len(paths)], results)
+            index += 1
+
+    async def _probe() -> None:
+        # A cheap endpoint on a fixed cadence: its latency is what a blocked
+        # event loop shows up in first.
+        while time.monotonic() < deadline:
+            await _measure(client, PROBE_PATH, results)
+            await asyncio.sleep(0.05)
+
+    await asyncio.gather(_probe(), *[_worker(i) for i in range(concurrency)])
+    return results
+
+
+def _report(title: str, results: Dict[str, List[float]]) -> None:
+    print(f"\n{title}")
+    print(f"{'endpoint':<45} {'n':>6} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for path, values in sorted(results.items()):
+        print(
+            f"{path:<45} {len(values):>6} {statistics.median(values):>9.1f} "
+            f"{_percentile(values, 0.99):>9.1f} {max(values):>9.1f}"
+        )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="API latency under concurrent load")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--baseline-rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    limits = httpx.Limits(max_connections=args.concurrency + 5)
+    async with httpx.AsyncClient(base_url=args.url, timeout=30.0, limits=limits) as client:
+        paths = await _discover_paths(client)
+        baseline = await _baseline(client, paths + [PROBE_PATH], args.baseline_rounds)
+        _report("Baseline (sequential)", baseline)
+
+        loaded = await _hammer(client, paths, args.concurrency, args.seconds)
+        _report(f"Under load ({args.concurrency} concurrent clients, {args.seconds:.0f}s)", loaded)
+
+        try:
+            event_loop = (await client.get("/api/health")).json().get("event_loop", {})
+            print(f"\nServer event loop lag: {event_loop}")
+        except Exception as e:
+            print(f"\nCould not read event loop lag: {e}")
+
+    print("\np99 ratio (load / baseline):")
+    for path in sorted(baseline):
+        if path in loaded:
+            base = _percentile(baseline[path], 0.99) or 1.0
+            print(f"  {path:<45} {_percentile(loaded[path], 0.99) / base:>6.2f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -8,6 +8,7 @@ Tests cover:
 - API key validation
 - Image encoding
 """
+import asyncio
 import tempfile
 from pathlib import Path
 from unittest.mock import patch, Mock, MagicMock, AsyncMock
@@ -293,3 +294,96 @@ def test_prompt_formatting(ai_service, test_event, mock_config):
         
         assert "renkli" in prompt.lower()
         assert "{camera_name}" not in prompt
+
+
+def _stub_client_factory(content: str, calls: list):
+    """Build a client factory returning a stubbed OpenAI client."""
+    def factory(api_key):
+        client = AsyncMock()
+        response = Mock()
+        response.choices = [Mock()]
+        response.choices[0].message = Mock()
+        response.choices[0].message.content = content
+        async def create(**kwargs):
+            calls.append(kwargs)
+            return response
+        client.chat.completions.create = create
+        return client
+    return factory
+
+
+def _jpeg_bytes(width: int, height: int) -> bytes:
+    import cv2
+    import numpy as np
+    ok, encoded = cv2.imencode(".jpg", np.full((height, width, 3), 128, dtype=np.uint8))
+    assert ok
+    return encoded.tobytes()
+
+
+@pytest.mark.asyncio
+async def test_analyze_event_uses_in_memory_bytes_and_caches(ai_service, test_event, test_camera, mock_config):
+    """Test that collage bytes skip disk reads and repeat calls hit the cache."""
+    calls = []
+    ai_service.set_client_factory(_stub_client_factory("Kamerada insan tespit edildi.", calls))
+    image = _jpeg_bytes(64, 48)
+
+    with patch.object(ai_service.settings_service, 'load_config', return_value=mock_config), \
+         patch.object(ai_service, '_read_image') as read_image:
+        first = await ai_service.analyze_event(test_event, None, test_camera, image_bytes=image)
+        second = await ai_service.analyze_event(test_event, None, test_camera, image_bytes=image)
+
+    assert first == second == "Kamerada insan tespit edildi."
+    assert len(calls) == 1
+    read_image.assert_not_called()
+    assert ai_service.stats["cache_hits"] == 1
+
+
+def test_fit_model_input_downscales_large_images(ai_service):
+    """Test that oversized collages are shrunk to the model input size."""
+    import cv2
+    import numpy as np
+
+    resized = ai_service._fit_model_input(_jpeg_bytes(3000, 1500))
+    image = cv2.imdecode(np.frombuffer(resized, dtype=np.uint8), cv2.IMREAD_COLOR)
+    assert image.shape[0] <= 768
+    assert image.shape[1] <= 2048
+
+    small = _jpeg_bytes(640, 480)
+    assert ai_service._fit_model_input(small) is small
+
+
+@pytest.mark.asyncio
+async def test_concurrency_slot_released_on_error(ai_service, test_event, test_camera, mock_config):
+    """Test that a failed request does not leak a concurrency slot."""
+    def failing_factory(api_key):
+        client = AsyncMock()
+        client.chat.completions.create.side_effect = Exception("API Error")
+        return client
+
+    ai_service.set_client_factory(failing_factory)
+    with patch.object(ai_service.settings_service, 'load_config', return_value=mock_config):
+        for _ in range(5):
+            assert await ai_service.analyze_event(test_event, None, test_camera, image_bytes=_jpeg_bytes(32, 32)) is None
+
+    assert ai_service._semaphore.acquire(blocking=False)
+    ai_service._semaphore.release()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_slot_wait_does_not_leak(ai_service):
+    """Test that cancelling a caller waiting for a slot leaves the slots intact."""
+    held = []
+    while ai_service._semaphore.acquire(blocking=False):
+        held.append(True)
+    waiter = asyncio.ensure_future(ai_service._acquire_slot(5.0))
+    await asyncio.sleep(0.1)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    for _ in held:
+        ai_service._semaphore.release()
+
+    await asyncio.sleep(0.1)
+    for _ in held:
+        assert ai_service._semaphore.acquire(blocking=False)
+    assert await ai_service._acquire_slot(0.1) is False
@@ -2,7 +2,9 @@
 Integration tests for events API endpoints.
 """
 from datetime import datetime, timezone
+import time
 import uuid
+from types import SimpleNamespace
 
 import pytest
 from fastapi.testclient import TestClient
@@ -10,6 +12,7 @@ from fastapi.testclient import TestClient
 from app.main import app
 from app.db.session import get_session, init_db
 from app.db.models import Camera, Event, CameraType, CameraStatus
+from app.routers.events import _resolve_media_urls
 
 
 def _utc_now_naive() -> datetime:
@@ -66,14 +69,26 @@ def _cleanup_camera(camera_id: str, event_ids: list[str]) -> None:
         db.close()
 
 
+def _wait_for_job(client, job_id: str, timeout: float = 10.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get(f"/api/events/jobs/{job_id}")
+        assert response.status_code == 200
+        job = response.json()
+        if job["status"] not in ("queued", "running") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.05)
+
+
 def test_post_events_bulk_delete_success(client):
     camera_id, event_ids = _seed_events()
     try:
-        response = client.post("/api/events/bulk-delete", json={"event_ids": event_ids})
-        assert response.status_code == 200
-        payload = response.json()
+        response = client.post("/api/events/bulk-delete", json={"event_ids": event_ids + ["missing-id"]})
+        assert response.status_code == 202
+        payload = _wait_for_job(client, response.json()["job_id"])
+        assert payload["status"] == "completed"
         assert payload["deleted_count"] == len(event_ids)
-        assert payload["failed_ids"] == []
+        assert payload["failed_ids"] == ["missing-id"]
 
         db = next(get_session())
         try:
@@ -90,3 +105,60 @@ def test_post_events_bulk_delete_validation_error(client):
     assert response.status_code == 400
     detail = response.json().get("detail", {})
     assert detail.get("code") == "VALIDATION_ERROR"
+
+
+def test_post_events_clear_filters_by_camera(client):
+    camera_id, event_ids = _seed_events()
+    other_camera_id, other_event_ids = _seed_events()
+    try:
+        response = client.post("/api/events/clear", json={"camera_id": camera_id, "min_confidence": 0.5})
+        assert response.status_code == 202
+        assert response.json()["total"] == len(event_ids)
+        payload = _wait_for_job(client, response.json()["job_id"])
+        assert payload["status"] == "completed"
+        assert payload["deleted_count"] == len(event_ids)
+
+        db = next(get_session())
+        try:
+            assert db.query(Event).filter(Event.id.in_(event_ids)).count() == 0
+            assert db.query(Event).filter(Event.id.in_(other_event_ids)).count() == len(other_event_ids)
+        finally:
+            db.close()
+    finally:
+        _cleanup_camera(camera_id, event_ids)
+        _cleanup_camera(other_camera_id, other_event_ids)
+
+
+def test_post_events_clear_validation_error(client):
+    response = client.post("/api/events/clear", json={"date": "yesterday"})
+    assert response.status_code == 400
+    assert response.json()["detail"]["code"] == "VALIDATION_ERROR"
+
+
+def test_get_event_job_not_found(client):
+    response = client.get("/api/events/jobs/unknown")
+    assert response.status_code == 404
+    assert response.json()["detail"]["code"] == "JOB_NOT_FOUND"
+
+
+def test_get_event_preview_serves_written_format(client, tmp_path, monkeypatch):
+    from app.dependencies import media_service
+
+    monkeypatch.setattr(media_service, "MEDIA_DIR", tmp_path)
+    event_id = str(uuid.uuid4())
+    (tmp_path / event_id).mkdir()
+    (tmp_path / event_id / "preview.webp").write_bytes(b"RIFF0000WEBP")
+
+    response = client.get(f"/api/events/{event_id}/preview.webp")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+
+    # preview.gif only serves a real GIF; WebP/MP4 have their own URLs.
+    assert client.get(f"/api/events/{event_id}/preview.gif").status_code == 404
+    assert client.get(f"/api/events/{event_id}/preview.mp4").status_code == 404
+    assert client.get(f"/api/events/{event_id}/preview.bmp").status_code == 404
+
+    event = SimpleNamespace(id=event_id, collage_url=None, gif_url=None, mp4_url=None)
+    urls = _resolve_media_urls(event)
+    assert urls["gif_url"] is None
+    assert urls["preview_url"] == f"/api/events/{event_id}/preview.webp"
@@ -0,0 +1,211 @@
+"""
+Unit tests for the selector-based capture multiplexer.
+
+Tests cover:
+- Frames read into preallocated slots, latest frame wins
+- stderr split into lines for the callback
+- EOF closes the pipe; unregister stops serving it and closes its files
+- A pipe that cannot be watched is closed with a warning
+- Reader steps sharing a fixed set of pool threads
+- Blocking capture work kept off the reader threads
+- Detector ffmpeg reads going through the multiplexer
+"""
+import logging
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+from app.services.capture_mux import CaptureMultiplexer, ReaderPool
+from app.workers.detector import DetectorWorker
+
+
+WIDTH, HEIGHT = 4, 2
+FRAME_BYTES = WIDTH * HEIGHT * 3
+
+WRITER_SCRIPT = (
+    "import sys, time\n"
+    "size, count = int(sys.argv[1]), int(sys.argv[2])\n"
+    "sys.stderr.write('Input #0, rtsp\\nStream #0:0: Video: h264\\n')\n"
+    "sys.stderr.flush()\n"
+    "for i in range(count):\n"
+    "    data = bytes([i % 256]) * size\n"
+    # Split writes so frames arrive across several reads.
+    "    sys.stdout.buffer.write(data[:5]); sys.stdout.buffer.flush()\n"
+    "    sys.stdout.buffer.write(data[5:]); sys.stdout.buffer.flush()\n"
+    "    time.sleep(0.01)\n"
+    "sys.stderr.write('done')\n"
+)
+
+
+def _spawn(count, hold=False):
+    script = WRITER_SCRIPT + ("time.sleep(30)\n" if hold else "")
+    return subprocess.Popen(
+        [sys.executable, "-c", script, str(FRAME_BYTES), str(count)],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        bufsize=0,
+    )
+
+
+def _stop(process):
+    if process.poll() is None:
+        process.kill()
+    process.wait()
+    process.stdout.close()
+    process.stderr.close()
+
+
+def test_frames_and_stderr_lines_are_multiplexed():
+    mux = CaptureMultiplexer()
+    lines = []
+    process = _spawn(5)
+    pipe = mux.register(
+        process.stdout,
+        (HEIGHT, WIDTH),
+        stderr=process.stderr,
+        on_stderr_line=lines.append,
+        name="cam1",
+    )
+    try:
+        assert pipe.wait_closed(timeout=5.0)
+        # Only the newest frame is kept; it was fully assembled from split writes.
+        seq, frame = pipe.read(0, timeout=0.1)
+        assert seq == 5
+        assert frame.shape == (HEIGHT, WIDTH, 3)
+        assert np.all(frame == 4)
+        assert pipe.read(seq, timeout=0.1) == (seq, None)
+        assert pipe.bytes_read == 5 * FRAME_BYTES
+
+        deadline = time.monotonic() + 2.0
+        while "done" not in lines and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert lines == ["Input #0, rtsp", "Stream #0:0: Video: h264", "done"]
+    finally:
+        mux.unregister(pipe)
+        _stop(process)
+
+
+def test_reader_gets_copies_and_unregister_closes():
+    mux = CaptureMultiplexer()
+    process = _spawn(1000, hold=True)
+    pipe = mux.register(process.stdout, (HEIGHT, WIDTH), stderr=process.stderr, name="cam1")
+    try:
+        first = pipe.next_frame(timeout=5.0)
+        second = pipe.next_frame(timeout=5.0)
+        assert first is not None and second is not None
+        assert first is not second
+        assert not np.shares_memory(first, second)
+        assert mux.get_stats()["pipes"] == 1
+    finally:
+        mux.unregister(pipe)
+        _stop(process)
+
+    assert pipe.closed
+    assert process.stdout.closed and process.stderr.closed
+    assert mux.get_stats()["pipes"] == 0
+    assert pipe.next_frame(timeout=0.1) is None
+
+
+def test_unwatchable_pipe_is_closed_with_warning(tmp_path, caplog):
+    mux = CaptureMultiplexer()
+    path = tmp_path / "frames.raw"
+    path.write_bytes(b"")
+    with open(path, "rb") as regular_file, caplog.at_level(logging.WARNING):
+        # epoll refuses regular files.
+        pipe = mux.register(regular_file, (HEIGHT, WIDTH), name="cam1")
+        assert pipe.wait_closed(timeout=2.0)
+        mux.unregister(pipe)
+
+    assert "cannot watch cam1" in caplog.text
+
+
+def test_reader_pool_runs_steps_on_fixed_threads():
+    pool = ReaderPool(workers=2)
+    counts = [0] * 8
+
+    def make_step(index):
+        def step():
+            counts[index] += 1
+            return None if counts[index] >= 5 else 0.01
+        return step
+
+    tasks = [pool.add(f"cam{index}", make_step(index)) for index in range(8)]
+    for task in tasks:
+        assert task.wait(timeout=5.0)
+
+    assert counts == [5] * 8
+    assert pool.get_stats()["workers"] == 2
+    assert pool.get_stats()["tasks"] == 0
+
+
+def test_reader_pool_cancel_waits_for_running_step():
+    pool = ReaderPool(workers=1)
+    started = threading.Event()
+    finished = []
+
+    def slow_step():
+        started.set()
+        time.sleep(0.2)
+        finished.append(True)
+        return 0.0
+
+    task = pool.add("cam1", slow_step)
+    assert started.wait(timeout=5.0)
+    assert pool.cancel(task, timeout=5.0)
+    assert finished == [True]
+    runs = task.runs
+    time.sleep(0.1)
+    assert task.runs == runs
+    # Cancelling a task that is waiting in the schedule finishes it at once.
+    idle = pool.add("cam2", lambda: 0.0, delay=60.0)
+    assert pool.cancel(idle, timeout=0.1)
+
+
+def test_reader_pool_blocking_work_does_not_stall_other_steps():
+    pool = ReaderPool(workers=1)
+    release = threading.Event()
+    job = {}
+    other_runs = []
+
+    def reconnecting_step():
+        if "future" not in job:
+            # Stands in for ffmpeg stop/ffprobe/open on a reconnect.
+            job["future"] = pool.submit(release.wait, 5.0)
+        return None if job["future"].done() else 0.01
+
+    def reading_step():
+        other_runs.append(time.monotonic())
+        return 0.01
+
+    slow = pool.add("cam1", reconnecting_step)
+    fast = pool.add("cam2", reading_step)
+    time.sleep(0.3)
+    assert len(other_runs) >= 5
+    assert not slow.done
+    release.set()
+    assert slow.wait(timeout=5.0)
+    assert pool.cancel(fast, timeout=5.0)
+
+
+def test_detector_reads_ffmpeg_frames_through_mux():
+    worker = DetectorWorker()
+    worker.capture_mux = CaptureMultiplexer()
+    process = _spawn(1000, hold=True)
+    try:
+        worker._register_ffmpeg_pipes(process, "cam1", (HEIGHT, WIDTH))
+        frame = worker._read_ffmpeg_frame(process, FRAME_BYTES, (HEIGHT, WIDTH))
+        assert frame is not None and frame.shape == (HEIGHT, WIDTH, 3)
+        assert worker._read_ffmpeg_frame(process, FRAME_BYTES + 1, (HEIGHT, WIDTH)) is None
+
+        deadline = time.monotonic() + 2.0
+        while len(worker.ffmpeg_last_errors["cam1"]) < 2 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert "Input #0, rtsp" in worker.ffmpeg_last_errors["cam1"]
+    finally:
+        worker._stop_ffmpeg_capture(process)
+
+    assert process.pid not in worker.ffmpeg_pipes
+    assert worker._read_ffmpeg_frame(process, FRAME_BYTES, (HEIGHT, WIDTH)) is None
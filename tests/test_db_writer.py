@@ -0,0 +1,143 @@
+"""
+Unit tests for the single-writer database queue.
+
+Tests cover:
+- Concurrent submissions grouped into batched commits
+- A failing job rolled back alone, the rest of its batch committed
+- Nested submit from inside a job running in the same batch
+- apply() writing directly for sessions on another engine
+- WAL checkpoint and stats
+"""
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Base, Camera, CameraStatus, CameraType, Event
+from app.db.session import tune_sqlite_connection
+from app.db.writer import DatabaseWriter
+
+
+@pytest.fixture
+def session_factory():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = create_engine(
+            f"sqlite:///{Path(tmpdir) / 'writer.db'}",
+            connect_args={"check_same_thread": False},
+        )
+        event.listen(engine, "connect", lambda dbapi_conn, _record: tune_sqlite_connection(dbapi_conn))
+        Base.metadata.create_all(bind=engine)
+        factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        db = factory()
+        db.add(Camera(id="cam-1", name="Writer Camera", type=CameraType.THERMAL, status=CameraStatus.CONNECTED))
+        db.commit()
+        db.close()
+        yield factory
+        engine.dispose()
+
+
+@pytest.fixture
+def writer(session_factory):
+    writer = DatabaseWriter(session_factory, checkpoint_interval=3600)
+    yield writer
+    writer.stop()
+
+
+def _insert(event_id: str):
+    def _job(db):
+        db.add(Event(id=event_id, camera_id="cam-1", timestamp=datetime(2026, 1, 1), confidence=0.5))
+        db.flush()
+        return event_id
+    return _job
+
+
+def _count(session_factory) -> int:
+    db = session_factory()
+    try:
+        return db.query(Event).count()
+    finally:
+        db.close()
+
+
+def test_concurrent_writes_are_batched(writer, session_factory):
+    gate = threading.Event()
+    # Hold the writer busy so the submissions below queue up behind it.
+    blocker = writer.submit(lambda db: gate.wait(5))
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = list(pool.map(lambda i: writer.submit(_insert(f"event-{i}")), range(40)))
+    gate.set()
+
+    assert blocker.result(timeout=5) is True
+    assert sorted(future.result(timeout=5) for future in futures) == sorted(f"event-{i}" for i in range(40))
+    assert _count(session_factory) == 40
+    stats = writer.get_stats()
+    assert stats["jobs"] == 41
+    assert stats["batches"] < 41
+    assert stats["largest_batch"] > 1
+
+
+def test_failing_job_rolls_back_alone(writer, session_factory):
+    gate = threading.Event()
+    writer.submit(lambda db: gate.wait(5))
+    ok = writer.submit(_insert("good"))
+    duplicate = writer.submit(_insert("good"))
+
+    def _broken(db):
+        db.add(Event(id="partial", camera_id="cam-1", timestamp=datetime(2026, 1, 1), confidence=0.5))
+        db.flush()
+        raise ValueError("boom")
+
+    broken = writer.submit(_broken)
+    after = writer.submit(_insert("after"))
+    gate.set()
+
+    assert ok.result(timeout=5) == "good"
+    assert after.result(timeout=5) == "after"
+    with pytest.raises(Exception):
+        duplicate.result(timeout=5)
+    with pytest.raises(ValueError):
+        broken.result(timeout=5)
+    db = session_factory()
+    try:
+        assert sorted(row.id for row in db.query(Event).all()) == ["after", "good"]
+    finally:
+        db.close()
+    assert writer.get_stats()["failed_jobs"] == 2
+
+
+def test_nested_submit_runs_in_same_batch(writer, session_factory):
+    def _outer(db):
+        inner = writer.submit(_insert("inner"))
+        db.add(Event(id="outer", camera_id="cam-1", timestamp=datetime(2026, 1, 1), confidence=0.5))
+        return inner.result(timeout=0)
+
+    assert writer.run(_outer) == "inner"
+    assert _count(session_factory) == 2
+    assert writer.get_stats()["batches"] == 1
+
+
+def test_apply_on_other_engine_writes_directly(session_factory):
+    writer = DatabaseWriter()  # bound to the application database
+    db = session_factory()
+    try:
+        assert writer.apply(db, _insert("direct")) == "direct"
+        assert db.query(Event).filter(Event.id == "direct").count() == 1
+    finally:
+        db.close()
+    assert writer.get_stats()["running"] is False
+
+
+def test_checkpoint_truncates_wal(writer, session_factory):
+    for i in range(5):
+        writer.run(_insert(f"event-{i}"))
+    result = writer.checkpoint()
+
+    assert result["busy"] == 0
+    assert result["log_pages"] == 0  # TRUNCATE resets the WAL
+    assert writer.get_stats()["checkpoints"] == 1
+    assert writer.get_stats()["last_checkpoint"] == result
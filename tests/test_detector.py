@@ -407,6 +407,39 @@ def test_get_event_video_data_filters_to_event_window():
     assert timestamps == [120.1, 120.7]
 
 
+def test_jpeg_video_buffer_decodes_only_event_window():
+    """Compressed buffer mode stores JPEG frames and decodes them on demand."""
+    worker = DetectorWorker.__new__(DetectorWorker)
+    camera_id = "cam-jpeg"
+    worker.video_buffers = {camera_id: deque()}
+    worker.video_buffer_locks = {camera_id: threading.Lock()}
+    worker.video_last_sample = {}
+    frame = np.full((48, 64, 3), 120, dtype=np.uint8)
+
+    with patch("app.workers.detector.time.time", return_value=120.5):
+        worker._update_video_buffer(
+            camera_id,
+            frame,
+            buffer_size=10,
+            record_interval=0.1,
+            jpeg_quality=90,
+        )
+
+    stored = worker.video_buffers[camera_id][0][0]
+    assert not isinstance(stored, np.ndarray)
+    frames, timestamps = worker._get_event_video_data(camera_id, 120.0, 121.0)
+    assert timestamps == [120.5]
+    assert frames[0].shape == (48, 64, 3)
+    assert abs(int(frames[0][10, 10, 0]) - 120) <= 2
+
+    config = Mock()
+    config.event.buffer_mode = "raw"
+    assert DetectorWorker._buffer_jpeg_quality(config) == 0
+    config.event.buffer_mode = "jpeg"
+    config.event.buffer_jpeg_quality = 85
+    assert DetectorWorker._buffer_jpeg_quality(config) == 85
+
+
 def test_stream_read_failure_policy_softens_reconnect_flap_after_reconnect():
     """Read failure reconnect should be more conservative right after reconnect."""
     worker = DetectorWorker.__new__(DetectorWorker)
@@ -891,3 +924,47 @@ def test_motion_crop_thermal_frame_with_bbox():
     assert x1 >= 0 and y1 >= 0
     assert cw > 0 and ch > 0
     assert result_frame.shape == (640, 640, 3)
+
+
+def test_union_motion_bbox_scales_to_frame():
+    """Motion blob union is returned in full-frame coordinates, small blobs ignored."""
+    from app.services.motion import union_motion_bbox
+
+    mask = np.zeros((120, 160), dtype=np.uint8)
+    mask[10:30, 20:30] = 255
+    mask[50:70, 60:80] = 255
+    mask[100, 150] = 255  # noise pixel
+
+    bbox = union_motion_bbox(mask, min_blob_area=8, scale=4.0)
+
+    assert bbox == (80, 40, 240, 240)
+    assert union_motion_bbox(np.zeros((10, 10), dtype=np.uint8)) is None
+
+
+def test_plan_roi_inference_full_frame_cadence():
+    """Every roi_full_frame_interval-th inference runs on the full frame."""
+    from types import SimpleNamespace
+
+    worker = DetectorWorker.__new__(DetectorWorker)
+    worker.roi_inference_counter = {}
+    worker.motion_state = {"cam1": {}}
+    worker.inference_service = InferenceService()
+    worker.inference_service.dynamic_input = True
+    config = SimpleNamespace(
+        detection=SimpleNamespace(
+            roi_inference=True,
+            roi_full_frame_interval=3,
+            inference_resolution=[640, 640],
+        )
+    )
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+
+    plans = []
+    for _ in range(6):
+        worker.motion_state["cam1"]["motion_bbox"] = (900, 400, 60, 160)
+        plans.append(worker._plan_roi_inference("cam1", frame, config))
+
+    assert [plan is None for plan in plans] == [False, False, True, False, False, True]
+    # The bbox is used once; without fresh motion analysis the next plan is full frame.
+    assert "motion_bbox" not in worker.motion_state["cam1"]
+    assert worker._plan_roi_inference("cam1", frame, config) is None
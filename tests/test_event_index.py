@@ -0,0 +1,118 @@
+"""
+Unit tests for the in-memory last-event index.
+
+Tests cover:
+- Loading the newest event per camera with one grouped query
+- Cooldown reservation: atomic across threads, released on failed inserts
+- Recording created events and forgetting deleted cameras
+- Shared-memory slots read by camera processes
+"""
+import tempfile
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Base, Camera, CameraStatus, CameraType, Event
+from app.services.event_index import EventIndex, read_shared_last_event
+
+
+def _epoch(value: datetime) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+@pytest.fixture
+def db_session():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        engine = create_engine(f"sqlite:///{Path(tmpdir) / 'index.db'}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+        try:
+            yield session
+        finally:
+            session.close()
+            engine.dispose()
+
+
+def test_load_picks_newest_event_per_camera(db_session):
+    base = datetime(2026, 1, 1, 12)
+    for camera_id in ("cam-a", "cam-b", "cam-c"):
+        db_session.add(Camera(id=camera_id, name=camera_id, type=CameraType.THERMAL, status=CameraStatus.CONNECTED))
+    db_session.add_all([
+        Event(id="a-old", camera_id="cam-a", timestamp=base, confidence=0.5),
+        Event(id="a-new", camera_id="cam-a", timestamp=base + timedelta(minutes=5), confidence=0.5),
+        Event(id="a-mid", camera_id="cam-a", timestamp=base + timedelta(minutes=2), confidence=0.5),
+        Event(id="b-only", camera_id="cam-b", timestamp=base + timedelta(hours=1), confidence=0.5),
+    ])
+    db_session.commit()
+
+    index = EventIndex()
+    assert index.load(db_session) == 2
+    assert index.last_event("cam-a") == (_epoch(base + timedelta(minutes=5)), "a-new")
+    assert index.last_event("cam-b") == (_epoch(base + timedelta(hours=1)), "b-only")
+    assert index.last_event("cam-c") is None
+    assert index.last_event_time("cam-c") == 0.0
+
+
+def test_reserve_release_and_record(db_session):
+    index = EventIndex()
+    index.load(db_session)
+
+    token = index.reserve("cam-1", cooldown_seconds=10, now=1000.0)
+    assert token == (0.0, None)
+    assert index.reserve("cam-1", cooldown_seconds=10, now=1005.0) is None
+    assert index.cooldown_remaining("cam-1", 10, now=1005.0) == pytest.approx(5.0)
+
+    # Insert failed: the camera may retry immediately.
+    index.release("cam-1", token)
+    assert index.reserve("cam-1", cooldown_seconds=10, now=1005.0) is not None
+
+    created = datetime(2026, 1, 1, 12)
+    index.record("cam-1", "event-1", created)
+    assert index.last_event("cam-1") == (_epoch(created), "event-1")
+    assert index.reserve("cam-1", cooldown_seconds=0) is not None
+
+    index.forget("cam-1")
+    assert index.last_event("cam-1") is None
+
+
+def test_concurrent_reserve_admits_one(db_session):
+    index = EventIndex()
+    index.load(db_session)
+    barrier = threading.Barrier(8)
+    results = []
+
+    def _try():
+        barrier.wait()
+        results.append(index.reserve("cam-1", cooldown_seconds=30, now=5000.0))
+
+    threads = [threading.Thread(target=_try) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(result is not None for result in results) == 1
+
+
+def test_shared_slot_mirrors_last_event(db_session):
+    index = EventIndex(shared_slots=2)
+    index.load(db_session)
+    index.record("cam-1", "event-1", datetime(2026, 1, 1))
+
+    table, slot = index.shared_slot("cam-1")
+    assert read_shared_last_event(table, slot) == _epoch(datetime(2026, 1, 1))
+
+    index.reserve("cam-1", cooldown_seconds=5, now=_epoch(datetime(2026, 1, 2)))
+    assert read_shared_last_event(table, slot) == _epoch(datetime(2026, 1, 2))
+
+    assert index.shared_slot("cam-2")[1] != slot
+    assert index.shared_slot("cam-3") == (None, -1)
+    assert read_shared_last_event(None, -1) == 0.0
+
+    index.forget("cam-1")
+    assert read_shared_last_event(table, slot) == 0.0
+    assert index.shared_slot("cam-3")[1] == slot
@@ -0,0 +1,141 @@
+"""
+Unit tests for background event deletion jobs.
+
+Tests cover:
+- Chunked id deletion with missing ids reported
+- Filtered clear deleting only matching events
+- Media removal on the I/O pool, failures counted not fatal
+- Other writers committing between chunks
+"""
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from app.db.models import Camera, CameraStatus, CameraType, Event
+from app.db.session import init_db, session_scope
+from app.services.event_jobs import EventJobService, build_event_filters
+
+
+def _seed(count: int, confidence: float = 0.9):
+    init_db()
+    camera_id = f"jobs-test-{uuid.uuid4()}"
+    with session_scope() as db:
+        db.add(Camera(
+            id=camera_id,
+            name="Jobs Test Camera",
+            type=CameraType.THERMAL,
+            enabled=True,
+            status=CameraStatus.CONNECTED,
+        ))
+        db.flush()
+        events = [
+            Event(camera_id=camera_id, timestamp=datetime(2026, 1, 1, 12, 0, i), confidence=confidence)
+            for i in range(count)
+        ]
+        db.add_all(events)
+        db.flush()
+        event_ids = [event.id for event in events]
+    return camera_id, event_ids
+
+
+def _cleanup(camera_id: str) -> None:
+    with session_scope() as db:
+        db.query(Event).filter(Event.camera_id == camera_id).delete(synchronize_session=False)
+        db.query(Camera).filter(Camera.id == camera_id).delete(synchronize_session=False)
+
+
+def _remaining(camera_id: str) -> int:
+    with session_scope() as db:
+        return db.query(Event).filter(Event.camera_id == camera_id).count()
+
+
+def _wait(service: EventJobService, job_id: str, timeout: float = 10.0) -> dict:
+    deadline = time.monotonic() + timeout
+    job = service.get(job_id)
+    while job["status"] in ("queued", "running") and time.monotonic() < deadline:
+        time.sleep(0.02)
+        job = service.get(job_id)
+    return job
+
+
+def test_delete_job_chunks_ids_and_removes_media():
+    camera_id, event_ids = _seed(5)
+    removed = []
+    threads = set()
+
+    def _delete_media(event_id):
+        threads.add(threading.current_thread().name)
+        removed.append(event_id)
+
+    service = EventJobService(delete_media=_delete_media, chunk_size=2, chunk_pause=0)
+    try:
+        job = service.submit_delete(event_ids + ["missing"])
+        assert job["total"] == 6
+        job = _wait(service, job["job_id"])
+
+        assert job["status"] == "completed"
+        assert job["deleted_count"] == 5
+        assert job["failed_ids"] == ["missing"]
+        assert sorted(removed) == sorted(event_ids)
+        assert all(name.startswith("event-media-delete") for name in threads)
+        assert _remaining(camera_id) == 0
+    finally:
+        service.shutdown()
+        _cleanup(camera_id)
+
+
+def test_clear_job_deletes_only_matching_events():
+    camera_id, low_ids = _seed(3, confidence=0.3)
+    other_camera_id, other_ids = _seed(2)
+
+    def _failing_media(event_id):
+        raise OSError("busy")
+
+    service = EventJobService(delete_media=_failing_media, chunk_size=2, chunk_pause=0)
+    try:
+        filters = build_event_filters(camera_id=camera_id, min_confidence=0.2)
+        job = service.submit_clear(filters)
+        assert job["total"] == 3
+        job = _wait(service, job["job_id"])
+
+        assert job["status"] == "completed"
+        assert job["deleted_count"] == 3
+        assert job["media_failed"] == 3
+        assert _remaining(camera_id) == 0
+        assert _remaining(other_camera_id) == len(other_ids)
+    finally:
+        service.shutdown()
+        _cleanup(camera_id)
+        _cleanup(other_camera_id)
+
+
+def test_writers_commit_between_chunks():
+    camera_id, event_ids = _seed(6)
+    first_chunk_done = threading.Event()
+    insert_done = threading.Event()
+
+    def _delete_media(_event_id):
+        first_chunk_done.set()
+
+    def _insert():
+        first_chunk_done.wait(5)
+        with session_scope() as db:
+            db.add(Event(camera_id=camera_id, timestamp=datetime(2026, 1, 2), confidence=0.5))
+        insert_done.set()
+
+    writer = threading.Thread(target=_insert)
+    writer.start()
+    service = EventJobService(delete_media=_delete_media, chunk_size=2, chunk_pause=0.2, media_workers=1)
+    try:
+        job = service.submit_delete(event_ids)
+        # The detector-side insert lands while the job is still running.
+        assert insert_done.wait(5)
+        assert service.get(job["job_id"])["status"] == "running"
+        job = _wait(service, job["job_id"])
+        assert job["deleted_count"] == 6
+        assert _remaining(camera_id) == 1
+    finally:
+        writer.join()
+        service.shutdown()
+        _cleanup(camera_id)
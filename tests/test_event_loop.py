@@ -0,0 +1,74 @@
+"""
+Unit tests for the non-blocking API layer.
+
+Tests cover:
+- Event loop lag measured when the loop is blocked
+- Thread pool sizing for sync routes and asyncio.to_thread
+- A slow database route not delaying other requests
+"""
+import asyncio
+import time
+
+import anyio.to_thread
+import httpx
+import pytest
+
+from app.main import app
+from app.routers import events as events_router
+from app.services.event_loop import EventLoopMonitor, configure_api_thread_pool
+
+
+@pytest.mark.asyncio
+async def test_monitor_records_blocked_loop():
+    monitor = EventLoopMonitor(interval=0.02)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        time.sleep(0.2)  # blocks the loop on purpose
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    stats = monitor.get_stats()
+    assert stats["lag_max_ms"] >= 150
+    assert stats["lag_p99_ms"] >= stats["lag_ms"]
+    assert EventLoopMonitor().get_stats()["lag_ms"] is None
+
+
+@pytest.mark.asyncio
+async def test_configure_api_thread_pool():
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    original = limiter.total_tokens
+    try:
+        configure_api_thread_pool(8)
+        assert limiter.total_tokens == 8
+        assert await asyncio.to_thread(lambda: 42) == 42
+    finally:
+        limiter.total_tokens = original
+
+
+@pytest.mark.asyncio
+async def test_slow_route_does_not_block_other_requests(monkeypatch):
+    def _slow_get_events(**_kwargs):
+        time.sleep(0.6)
+        return {"page": 1, "page_size": 20, "total": 0, "events": []}
+
+    monkeypatch.setattr(events_router.event_service, "get_events", _slow_get_events)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        async def _timed_ready():
+            await asyncio.sleep(0.1)
+            started = time.perf_counter()
+            response = await client.get("/ready")
+            return response.status_code, time.perf_counter() - started
+
+        slow, *quick = await asyncio.gather(
+            client.get("/api/events"),
+            *[_timed_ready() for _ in range(5)],
+        )
+
+    assert slow.status_code == 200
+    assert all(status == 200 for status, _ in quick)
+    # /ready answered while get_events was still sleeping in a worker thread.
+    assert max(elapsed for _, elapsed in quick) < 0.3
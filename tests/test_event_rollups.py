@@ -0,0 +1,158 @@
+"""
+Unit tests for the hourly event rollup table.
+
+Tests cover:
+- Rollups maintained by triggers on insert, AI verdict and delete
+- Bucket maximum recomputed when the top event is deleted
+- Camera cascade clearing its rollups
+- /api/events/stats zero-filled buckets and /api/cameras/status counts
+- Recent activity over an exact window, last event time outside it
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db.models import Camera, CameraStatus, CameraType, Event, EventRollup
+from app.db.session import init_db, session_scope
+from app.main import app
+
+
+def _utc_now_naive() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@pytest.fixture
+def camera_id():
+    init_db()
+    camera_id = f"rollup-test-{uuid.uuid4()}"
+    with session_scope() as db:
+        db.add(Camera(
+            id=camera_id,
+            name="Rollup Test Camera",
+            type=CameraType.THERMAL,
+            enabled=True,
+            status=CameraStatus.CONNECTED,
+        ))
+    yield camera_id
+    with session_scope() as db:
+        db.query(Event).filter(Event.camera_id == camera_id).delete(synchronize_session=False)
+        db.query(Camera).filter(Camera.id == camera_id).delete(synchronize_session=False)
+
+
+def _add_event(camera_id: str, timestamp: datetime, confidence: float, person_count: int = 1) -> str:
+    with session_scope() as db:
+        event = Event(camera_id=camera_id, timestamp=timestamp, confidence=confidence, person_count=person_count)
+        db.add(event)
+        db.flush()
+        return event.id
+
+
+def _rollups(camera_id: str):
+    with session_scope() as db:
+        rows = db.query(EventRollup).filter(EventRollup.camera_id == camera_id).order_by(EventRollup.hour).all()
+        return [(row.hour, row.event_count, row.rejected_count, row.max_confidence, row.person_count_sum) for row in rows]
+
+
+def test_rollup_tracks_insert_verdict_and_delete(camera_id):
+    hour = datetime(2026, 1, 1, 12)
+    hour_index = int((hour - datetime(1970, 1, 1)).total_seconds()) // 3600
+    top = _add_event(camera_id, hour + timedelta(minutes=5), 0.9, person_count=2)
+    low = _add_event(camera_id, hour + timedelta(minutes=59, seconds=59), 0.4)
+    _add_event(camera_id, hour + timedelta(hours=1), 0.7)
+    assert _rollups(camera_id) == [
+        (hour_index, 2, 0, 0.9, 3),
+        (hour_index + 1, 1, 0, 0.7, 1),
+    ]
+
+    with session_scope() as db:
+        db.query(Event).filter(Event.id == low).update({"rejected_by_ai": True})
+    assert _rollups(camera_id)[0] == (hour_index, 2, 1, 0.9, 3)
+
+    with session_scope() as db:
+        db.query(Event).filter(Event.id == top).delete()
+    assert _rollups(camera_id)[0] == (hour_index, 1, 1, 0.4, 1)
+
+    with session_scope() as db:
+        db.query(Event).filter(Event.id == low).delete()
+    assert _rollups(camera_id) == [(hour_index + 1, 1, 0, 0.7, 1)]
+
+
+def test_camera_delete_cascades_rollups(camera_id):
+    _add_event(camera_id, datetime(2026, 1, 1, 8), 0.8)
+    with session_scope() as db:
+        db.query(Camera).filter(Camera.id == camera_id).delete(synchronize_session=False)
+    assert _rollups(camera_id) == []
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_event_stats_endpoint(client, camera_id):
+    day = datetime(2026, 1, 1)
+    _add_event(camera_id, day + timedelta(hours=1, minutes=10), 0.6)
+    _add_event(camera_id, day + timedelta(hours=1, minutes=20), 0.8)
+    _add_event(camera_id, day + timedelta(hours=3), 0.5, person_count=3)
+
+    response = client.get("/api/events/stats", params={
+        "start": "2026-01-01T00:00:00Z",
+        "end": "2026-01-01T04:00:00Z",
+        "camera_id": camera_id,
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert data["bucket"] == "hour"
+    assert [bucket["event_count"] for bucket in data["buckets"]] == [0, 2, 0, 1]
+    assert data["buckets"][1]["start"] == "2026-01-01T01:00:00Z"
+    assert data["buckets"][1]["max_confidence"] == 0.8
+    assert data["totals"] == {"event_count": 3, "rejected_count": 0, "max_confidence": 0.8, "person_count": 5}
+    assert data["cameras"][0]["camera_id"] == camera_id
+
+    daily = client.get("/api/events/stats", params={
+        "start": "2026-01-01T00:00:00Z",
+        "end": "2026-01-03T00:00:00Z",
+        "camera_id": camera_id,
+        "bucket": "day",
+    }).json()
+    assert [bucket["event_count"] for bucket in daily["buckets"]] == [3, 0]
+
+
+def test_event_stats_validation(client):
+    response = client.get("/api/events/stats", params={"start": "2026-01-02T00:00:00", "end": "2026-01-01T00:00:00"})
+    assert response.status_code == 400
+    assert response.json()["detail"]["code"] == "VALIDATION_ERROR"
+    response = client.get("/api/events/stats", params={"start": "2020-01-01T00:00:00", "end": "2026-01-01T00:00:00"})
+    assert response.status_code == 400
+
+
+def test_cameras_status_counts_from_rollups(client, camera_id):
+    now = _utc_now_naive()
+    _add_event(camera_id, now - timedelta(minutes=5), 0.9)
+    _add_event(camera_id, now - timedelta(hours=3), 0.9)
+    _add_event(camera_id, now - timedelta(days=3), 0.9)
+
+    response = client.get("/api/cameras/status")
+    assert response.status_code == 200
+    camera = next(item for item in response.json()["cameras"] if item["id"] == camera_id)
+    assert camera["event_count_24h"] == 2
+    assert camera["last_event_ts"] is not None
+
+
+def test_recent_activity_counts_exact_window(camera_id):
+    from app.services.events import get_event_service
+
+    now = _utc_now_naive()
+    _add_event(camera_id, now - timedelta(hours=23, minutes=30), 0.9)
+    _add_event(camera_id, now - timedelta(hours=24, minutes=30), 0.9)
+    with session_scope() as db:
+        activity = get_event_service().get_recent_activity(db, hours=24)
+    assert activity[camera_id]["count"] == 1
+
+    with session_scope() as db:
+        activity = get_event_service().get_recent_activity(db, hours=1)
+    # Nothing in the last hour: the last event time still comes back.
+    assert activity[camera_id]["count"] == 0
+    assert activity[camera_id]["last_ts"] is not None
@@ -0,0 +1,132 @@
+"""
+Unit tests for full-text search over AI summaries.
+
+Tests cover:
+- events_fts kept in sync on insert, summary update and delete
+- q= combined with camera and rejected filters, ranked by relevance
+- Prefix and diacritic-insensitive matching, operator characters ignored
+- LIKE fallback when the FTS5 index is unavailable
+- Startup rebuilding an index that drifted from the events table
+"""
+import uuid
+from datetime import datetime
+
+from sqlalchemy import text
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.db.models import Camera, CameraStatus, CameraType, Event
+from app.db.session import engine, event_search_index_in_sync, init_db, session_scope
+from app.main import app
+from app.services import events as events_service
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture
+def camera_id():
+    init_db()
+    camera_id = f"search-test-{uuid.uuid4()}"
+    with session_scope() as db:
+        db.add(Camera(
+            id=camera_id,
+            name="Search Test Camera",
+            type=CameraType.THERMAL,
+            enabled=True,
+            status=CameraStatus.CONNECTED,
+        ))
+    yield camera_id
+    with session_scope() as db:
+        db.query(Event).filter(Event.camera_id == camera_id).delete(synchronize_session=False)
+        db.query(Camera).filter(Camera.id == camera_id).delete(synchronize_session=False)
+
+
+def _add_event(camera_id: str, summary, minute: int = 0, rejected: bool = False) -> str:
+    with session_scope() as db:
+        event = Event(
+            camera_id=camera_id,
+            timestamp=datetime(2026, 1, 1, 12, minute),
+            confidence=0.8,
+            summary=summary,
+            rejected_by_ai=rejected,
+        )
+        db.add(event)
+        db.flush()
+        return event.id
+
+
+def _search(client, camera_id: str, q: str, **params):
+    response = client.get("/api/events", params={"camera_id": camera_id, "q": q, **params})
+    assert response.status_code == 200
+    return [event["id"] for event in response.json()["events"]]
+
+
+def test_search_tracks_summary_changes(client, camera_id):
+    gate = _add_event(camera_id, "A person at the gate carrying a bag", minute=1)
+    _add_event(camera_id, "Cat walking along the fence", minute=2)
+    pending = _add_event(camera_id, None, minute=3)
+
+    assert _search(client, camera_id, "person gate bag") == [gate]
+    assert _search(client, camera_id, "gate") == [gate]
+    assert _search(client, camera_id, "dog") == []
+
+    with session_scope() as db:
+        db.query(Event).filter(Event.id == pending).update({"summary": "Delivery person at the gate"})
+    assert set(_search(client, camera_id, "gate")) == {gate, pending}
+
+    with session_scope() as db:
+        db.query(Event).filter(Event.id == gate).delete()
+    assert _search(client, camera_id, "bag") == []
+    assert _search(client, camera_id, "gate") == [pending]
+
+
+def test_search_ranks_and_combines_filters(client, camera_id):
+    weak = _add_event(camera_id, "Vehicle on the road, a person far behind", minute=1)
+    strong = _add_event(camera_id, "Person, person and another person near the gate", minute=2)
+    rejected = _add_event(camera_id, "Person shaped shadow", minute=3, rejected=True)
+
+    ranked = _search(client, camera_id, "person")
+    assert ranked[0] == strong
+    assert set(ranked) == {strong, weak, rejected}
+    assert _search(client, camera_id, "person", rejected="true") == [rejected]
+    assert rejected not in _search(client, camera_id, "person", rejected="false")
+
+
+def test_search_prefix_diacritics_and_operators(client, camera_id):
+    event_id = _add_event(camera_id, "Kapıda çantalı bir kişi görüldü")
+
+    assert _search(client, camera_id, "çanta") == [event_id]
+    assert _search(client, camera_id, "cantalı") == [event_id]
+    assert _search(client, camera_id, 'kişi" (görüldü* -') == [event_id]
+    assert len(_search(client, camera_id, "***")) == 1  # no words: filter not applied
+
+
+def test_search_falls_back_to_like(client, camera_id, monkeypatch):
+    event_id = _add_event(camera_id, "Person at the gate")
+    _add_event(camera_id, "Empty yard", minute=1)
+    monkeypatch.setattr(events_service, "get_migration_status", lambda: {"event_search": {"ok": False}})
+
+    assert _search(client, camera_id, "gate person") == [event_id]
+
+
+def test_startup_rebuilds_drifted_index(client, camera_id):
+    event_id = _add_event(camera_id, "Courier at the gate")
+    with engine.begin() as conn:
+        rowid, summary = conn.execute(
+            text("SELECT rowid, summary FROM events WHERE id = :id"), {"id": event_id}
+        ).one()
+        conn.execute(
+            text("INSERT INTO events_fts(events_fts, rowid, summary) VALUES ('delete', :rowid, :summary)"),
+            {"rowid": rowid, "summary": summary},
+        )
+    assert _search(client, camera_id, "courier") == []
+    assert not event_search_index_in_sync()
+
+    init_db()
+
+    assert event_search_index_in_sync()
+    assert _search(client, camera_id, "courier") == [event_id]
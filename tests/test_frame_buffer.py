@@ -0,0 +1,72 @@
+"""
+Unit tests for compressed event buffer frames.
+"""
+import cv2
+import numpy as np
+
+from app.services.frame_buffer import (
+    EncodedFrame,
+    buffered_nbytes,
+    pack_frame,
+    read_slot,
+    unpack_frame,
+    unpack_frames,
+    write_slot,
+)
+
+
+def _scene(width=1280, height=720):
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    frame = np.stack([np.broadcast_to(x, (height, width)), np.broadcast_to(y, (height, width)), (x + y) / 2], axis=2)
+    frame = frame.astype(np.uint8)
+    cv2.rectangle(frame, (400, 200), (520, 460), (30, 30, 200), -1)
+    cv2.putText(frame, "CAM 1", (40, 60), cv2.FONT_HERSHEY_SIMPLEX, 1.5, (255, 255, 255), 2)
+    return frame
+
+
+def test_raw_mode_keeps_a_copy():
+    frame = _scene(64, 48)
+    packed = pack_frame(frame, 0)
+
+    assert isinstance(packed, np.ndarray)
+    assert packed is not frame
+    assert unpack_frame(packed) is packed
+
+
+def test_jpeg_mode_round_trip_is_close():
+    frame = _scene()
+    packed = pack_frame(frame, 90)
+
+    assert isinstance(packed, EncodedFrame)
+    assert packed.shape == frame.shape
+    decoded = unpack_frame(packed)
+    assert decoded.shape == frame.shape
+    assert np.abs(decoded.astype(np.int16) - frame.astype(np.int16)).mean() < 3.0
+
+
+def test_jpeg_buffer_uses_far_less_memory():
+    frames = [_scene() for _ in range(5)]
+    raw = [pack_frame(f, 0) for f in frames]
+    jpeg = [pack_frame(f, 90) for f in frames]
+
+    assert buffered_nbytes(raw) >= 10 * buffered_nbytes(jpeg)
+
+
+def test_undecodable_frame_is_none():
+    assert unpack_frames([EncodedFrame(b"not a jpeg", (4, 4, 3))]) == [None]
+
+
+def test_slot_holds_jpeg_at_its_start():
+    frame = _scene()
+    slot = np.zeros_like(frame)
+
+    length = write_slot(slot, frame, 90)
+
+    assert 0 < length < frame.nbytes // 10
+    assert not slot.reshape(-1)[length:].any()
+    decoded = read_slot(slot, length)
+    assert np.abs(decoded.astype(np.int16) - frame.astype(np.int16)).mean() < 3.0
+
+    assert write_slot(slot, frame, 0) == 0
+    assert np.array_equal(read_slot(slot, 0), frame)
@@ -0,0 +1,85 @@
+"""
+Unit tests for the frame-change gate.
+
+Tests cover:
+- Cached detections reused for near-identical frames
+- Localized changes and key changes force inference
+- Reuse bounded by count and age
+- Frozen stream detection, and static but live scenes not reported frozen
+"""
+import numpy as np
+
+from app.services.frame_gate import FrameChangeGate, frame_fingerprint
+
+
+def _frame(value=100, noise=0):
+    frame = np.full((480, 640, 3), value, dtype=np.uint8)
+    if noise:
+        rng = np.random.default_rng(noise)
+        frame = np.clip(frame.astype(np.int16) + rng.integers(-1, 2, frame.shape), 0, 255).astype(np.uint8)
+    return frame
+
+
+DETS = [{"bbox": [10, 10, 50, 120], "confidence": 0.8}]
+
+
+def test_near_identical_frame_reuses_detections():
+    gate = FrameChangeGate()
+    gate.store(frame_fingerprint(_frame()), DETS, key=0.5, now=0.0)
+
+    cached = gate.lookup(frame_fingerprint(_frame(noise=1)), key=0.5, now=0.1)
+
+    assert cached == DETS
+    assert cached[0] is not DETS[0]
+    assert gate.hits == 1
+
+
+def test_local_change_or_new_key_forces_inference():
+    gate = FrameChangeGate()
+    gate.store(frame_fingerprint(_frame()), DETS, key=0.5, now=0.0)
+    moved = _frame()
+    moved[200:280, 300:340] = 255
+
+    assert gate.lookup(frame_fingerprint(moved), key=0.5, now=0.1) is None
+    assert gate.lookup(frame_fingerprint(_frame()), key=0.4, now=0.1) is None
+    assert gate.misses == 2
+
+
+def test_reuse_bounded_by_count_and_age():
+    gate = FrameChangeGate(max_reuse=2, max_age_seconds=1.0)
+    fp = frame_fingerprint(_frame())
+    gate.store(fp, DETS, now=0.0)
+
+    assert gate.lookup(fp, now=0.1) is not None
+    assert gate.lookup(fp, now=0.2) is not None
+    assert gate.lookup(fp, now=0.3) is None
+
+    gate.store(fp, DETS, now=1.0)
+    assert gate.lookup(fp, now=2.5) is None
+
+
+def test_observe_reports_frozen_duration():
+    gate = FrameChangeGate()
+    fp = frame_fingerprint(_frame())
+
+    assert gate.observe(fp, now=0.0) == 0.0
+    assert gate.observe(fp, now=1.0) == 0.0
+    assert gate.observe(fp, now=31.0) == 30.0
+    assert gate.observe(frame_fingerprint(_frame(120)), now=32.0) == 0.0
+
+    gate.observe(fp, now=33.0)
+    gate.reset_frozen()
+    assert gate.observe(fp, now=40.0) == 0.0
+
+
+def test_static_live_scene_is_not_frozen():
+    gate = FrameChangeGate()
+    # Sensor noise of +-1 level: fingerprints match, frame bytes do not.
+    frames = [_frame(noise=seed) for seed in range(1, 5)]
+    assert gate.observe(frame_fingerprint(frames[0]), now=0.0, frame=frames[0]) == 0.0
+    for index, frame in enumerate(frames[1:], start=1):
+        assert gate.observe(frame_fingerprint(frame), now=index * 20.0, frame=frame) == 0.0
+
+    repeated = frames[-1].copy()
+    assert gate.observe(frame_fingerprint(repeated), now=100.0, frame=repeated) == 0.0
+    assert gate.observe(frame_fingerprint(repeated), now=131.0, frame=repeated.copy()) == 31.0
@@ -145,6 +145,49 @@ class TestInferenceService:
         
         assert result is False
 
+    def test_plan_roi_shrinks_input_for_dynamic_models(self):
+        """Test ROI crop and input size keep full-frame person scale."""
+        service = InferenceService()
+        service.dynamic_input = True
+        
+        # 1920x1080 frame, small motion region
+        plan = service.plan_roi((1080, 1920, 3), (900, 400, 60, 160), (640, 640))
+        
+        assert plan is not None
+        (x1, y1, x2, y2), (inf_w, inf_h) = plan
+        assert x1 <= 900 and y1 <= 400 and x2 >= 960 and y2 >= 560
+        # Full-frame scale is 640/1920; the crop input must not be smaller
+        assert inf_w >= (x2 - x1) * 640 / 1920
+        assert inf_h >= (y2 - y1) * 640 / 1920
+        assert inf_w % 32 == 0 and inf_h % 32 == 0
+        assert inf_w < 640 and inf_h < 640
+    
+    def test_plan_roi_skipped_for_fixed_input(self):
+        """Test exported (fixed-shape) models always infer on the full frame."""
+        service = InferenceService()
+        service.dynamic_input = False
+        
+        plan = service.plan_roi((1080, 1920, 3), (900, 400, 60, 160), (640, 640))
+        
+        assert plan is None
+    
+    def test_plan_roi_large_motion_uses_full_frame(self):
+        """Test large or missing motion regions fall back to full frame."""
+        service = InferenceService()
+        service.dynamic_input = True
+        
+        assert service.plan_roi((480, 640, 3), (0, 0, 600, 450), (640, 640)) is None
+        assert service.plan_roi((480, 640, 3), None, (640, 640)) is None
+    
+    def test_offset_detections(self):
+        """Test crop detections are shifted back to frame coordinates."""
+        detections = [{"bbox": [10, 20, 30, 60], "confidence": 0.8}]
+        
+        shifted = InferenceService.offset_detections(detections, 100, 50)
+        
+        assert shifted[0]["bbox"] == [110, 70, 130, 110]
+        assert detections[0]["bbox"] == [10, 20, 30, 60]
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
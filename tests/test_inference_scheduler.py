@@ -0,0 +1,98 @@
+"""
+Unit tests for the global fair-share inference scheduler.
+
+Tests cover:
+- Weighted max-min split with guaranteed minimums
+- Token-bucket slots and deferred frame counting
+- Budget from the perf profile or from measured latency
+"""
+import pytest
+
+from app.services.inference import InferenceService
+from app.services.inference_scheduler import InferenceScheduler, fair_share
+from app.services.perf_profile import FPS_HEADROOM, build_profile
+
+
+def _req(demand, floor=1.0, weight=1.0):
+    return {"demand": demand, "floor": floor, "weight": weight}
+
+
+def test_fair_share_weights_and_caps_at_demand():
+    grants = fair_share(10.0, {
+        "event": _req(5.0, weight=4.0),
+        "idle": _req(1.0, weight=1.0),
+        "motion": _req(5.0, weight=2.0),
+    })
+
+    assert grants["event"] == pytest.approx(5.0)
+    assert grants["idle"] == pytest.approx(1.0)
+    assert grants["motion"] == pytest.approx(4.0)
+    assert sum(grants.values()) == pytest.approx(10.0)
+
+
+def test_fair_share_keeps_minimum_under_overload():
+    grants = fair_share(2.0, {cid: _req(5.0) for cid in ("a", "b", "c")})
+
+    assert grants == {"a": 1.0, "b": 1.0, "c": 1.0}
+    assert fair_share(None, {"a": _req(5.0)}) == {"a": 5.0}
+
+
+def _run(scheduler, seconds, fps, cameras):
+    step = 1.0 / fps
+    for i in range(int(seconds * fps)):
+        now = 100.0 + i * step
+        for camera_id in cameras:
+            if scheduler.acquire(camera_id, now=now):
+                scheduler.release(camera_id, 0.02, now=now)
+
+
+def test_slots_follow_priority_and_count_deferred_frames():
+    scheduler = InferenceScheduler(profile_capacity=lambda: 6.0)
+    scheduler.update_camera("busy", max_fps=5.0, motion=True, event=True)
+    scheduler.update_camera("quiet", max_fps=5.0, motion=True)
+
+    _run(scheduler, seconds=10, fps=5.0, cameras=["busy", "quiet"])
+
+    stats = scheduler.get_stats()
+    busy, quiet = stats["cameras"]["busy"], stats["cameras"]["quiet"]
+    assert stats["budget_fps"] == pytest.approx(6.0)
+    assert stats["budget_source"] == "profile"
+    # 1 fps floor each, remaining 4 fps split 4:2 (event vs motion).
+    assert busy["granted_fps"] == pytest.approx(11 / 3, abs=0.01)
+    assert quiet["granted_fps"] == pytest.approx(7 / 3, abs=0.01)
+    assert busy["granted"] > quiet["granted"]
+    assert quiet["granted"] + quiet["deferred"] == 50
+    assert quiet["deferred"] >= 20
+    assert stats["in_flight"] == 0
+
+
+def test_budget_measured_from_latency_without_profile():
+    scheduler = InferenceScheduler(profile_capacity=lambda: None)
+    scheduler.update_camera("cam", max_fps=5.0, motion=True)
+    assert scheduler.capacity() is None
+
+    for i in range(25):
+        assert scheduler.acquire("cam", now=float(i))
+        scheduler.release("cam", 0.1, now=float(i))
+
+    assert scheduler.capacity() == pytest.approx(8.0)
+    scheduler.remove_camera("cam")
+    assert scheduler.acquire("cam") is True
+    assert scheduler.get_stats()["cameras"] == {}
+
+
+def test_budget_follows_single_image_profile_capacity():
+    service = InferenceService()
+    service.perf_profile = build_profile([
+        {"backend": "onnx", "threads": None, "imgsz": 640, "batch": 1, "fps": 25.0, "latency_ms": 40.0},
+        {"backend": "onnx", "threads": None, "imgsz": 640, "batch": 4, "fps": 60.0, "latency_ms": 66.7},
+    ], "yolov8n", 640, cpu_count=4)
+    scheduler = InferenceScheduler(profile_capacity=lambda: service.camera_fps_cap(1))
+    scheduler.update_camera("cam", max_fps=30.0, motion=True)
+
+    assert scheduler.capacity() == pytest.approx(25.0 * FPS_HEADROOM)
+    _run(scheduler, seconds=2, fps=30.0, cameras=["cam"])
+    stats = scheduler.get_stats()
+    assert stats["budget_fps"] == pytest.approx(25.0 * FPS_HEADROOM)
+    assert stats["budget_source"] == "profile"
+    assert stats["cameras"]["cam"]["deferred"] > 0
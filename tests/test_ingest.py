@@ -0,0 +1,241 @@
+"""
+Unit tests for the shared RTSP ingest.
+
+Tests cover:
+- One source command carrying both the segment output and the relay pipe
+- Frame fan-out to captures and snapshots from one source connection
+- Decoder restarts and idling that leave the recording process alone
+- Attach rules (recorded stream only) and restart after a crash
+- ContinuousRecorder recording through the shared ingest
+"""
+import subprocess
+import sys
+import time
+
+import pytest
+
+from app.services import ingest as ingest_module
+from app.services import recorder as recorder_service
+from app.services.ingest import IngestManager, build_decode_command, build_ingest_command
+
+
+URL = "rtsp://127.0.0.1:8554/cam1"
+
+TS_SCRIPT = (
+    "import sys, time\n"
+    "while True:\n"
+    "    sys.stdout.buffer.write(b'\\x47' * 188)\n"
+    "    sys.stdout.buffer.flush()\n"
+    "    time.sleep(0.01)\n"
+)
+
+FRAME_SCRIPT = (
+    "import sys, threading, time\n"
+    "threading.Thread(target=lambda: [None for _ in iter(lambda: sys.stdin.buffer.read(4096), b'')], daemon=True).start()\n"
+    "size = int(sys.argv[1])\n"
+    "i = 0\n"
+    "while True:\n"
+    "    sys.stdout.buffer.write(bytes([i % 256]) * size)\n"
+    "    sys.stdout.buffer.flush()\n"
+    "    i += 1\n"
+    "    time.sleep(0.02)\n"
+)
+
+
+class FakeSpawner:
+    """Stands in for ffmpeg: the source relays TS bytes, the decoder streams 4x2 frames."""
+
+    def __init__(self, exit_immediately=False):
+        self.commands = []
+        self.exit_immediately = exit_immediately
+
+    @property
+    def sources(self):
+        return [cmd for cmd in self.commands if "pipe:0" not in cmd]
+
+    @property
+    def decoders(self):
+        return [cmd for cmd in self.commands if "pipe:0" in cmd]
+
+    def __call__(self, cmd, bufsize, stdin=False):
+        self.commands.append(cmd)
+        if self.exit_immediately:
+            return subprocess.Popen([sys.executable, "-c", "pass"])
+        if "pipe:0" in cmd:
+            return subprocess.Popen(
+                [sys.executable, "-c", FRAME_SCRIPT, str(4 * 2 * 3)],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+            )
+        if "pipe:1" in cmd:
+            return subprocess.Popen([sys.executable, "-c", TS_SCRIPT], stdout=subprocess.PIPE)
+        return subprocess.Popen(
+            [sys.executable, "-c", "import time; time.sleep(30)"],
+            stdout=subprocess.DEVNULL,
+        )
+
+
+@pytest.fixture(autouse=True)
+def fast_supervisor(monkeypatch):
+    monkeypatch.setattr(ingest_module, "SETTLE_SECONDS", 0.2)
+    monkeypatch.setattr(ingest_module, "RESTART_BACKOFF_MIN", 0.05)
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_command_has_single_input_and_both_outputs():
+    cmd = build_ingest_command("ffmpeg", URL, output_pattern="/rec/%Y.mp4", relay=True)
+
+    assert cmd.count("-i") == 1
+    assert cmd[cmd.index("-c") + 1] == "copy"
+    assert "/rec/%Y.mp4" in cmd
+    assert cmd[-3:] == ["-f", "mpegts", "pipe:1"]
+    assert cmd[cmd.index("mpegts") - 3:cmd.index("mpegts") - 1] == ["-c", "copy"]
+    assert build_decode_command("ffmpeg")[-1] == "pipe:1"
+    assert "pipe:1" not in build_ingest_command("ffmpeg", URL, output_pattern="/rec/%Y.mp4")
+
+
+def test_recording_and_capture_share_one_process(tmp_path):
+    spawner = FakeSpawner()
+    manager = IngestManager(spawn=spawner)
+    try:
+        manager.start_recording("cam1", URL, str(tmp_path / "%Y%m%d_%H%M%S.mp4"))
+        first = manager.open_capture("cam1", URL, (4, 2))
+        second = manager.open_capture("cam1", URL, (4, 2))
+
+        ok, frame = first.read()
+        assert ok and frame.shape == (2, 4, 3)
+        ok, newer = first.read()
+        assert ok and newer is not frame
+        assert second.read()[0]
+        assert manager.latest_frame("cam1") is not None
+
+        # Recorder and both readers share one source connection and one decoder.
+        assert len(spawner.sources) == 1
+        assert len(spawner.decoders) == 1
+        assert spawner.sources[0].count("-i") == 1
+        assert "pipe:1" in spawner.sources[0]
+        stats = manager.get_stats()["cam1"]
+        assert stats["readers"] == 2 and stats["recording"] and stats["decoding"]
+    finally:
+        manager.stop()
+
+    assert not first.isOpened()
+    assert first.read() == (False, None)
+
+
+def test_decoder_restart_keeps_recording_process(tmp_path):
+    spawner = FakeSpawner()
+    manager = IngestManager(spawn=spawner)
+    try:
+        stream = manager.start_recording("cam1", URL, str(tmp_path / "%Y.mp4"))
+        capture = manager.open_capture("cam1", URL, (4, 2))
+        assert capture.read()[0]
+        source = stream._process
+
+        capture.release()
+        restarted = manager.open_capture("cam1", URL, (4, 2), restart=True)
+        assert _wait_for(lambda: stream.decoder_starts >= 2)
+        assert restarted.read()[0]
+
+        assert stream._process is source
+        assert len(spawner.sources) == 1
+        assert stream.restarts == 0
+    finally:
+        manager.stop()
+
+
+def test_decoder_stops_after_idle_grace(tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest_module, "DECODE_IDLE_SECONDS", 0.2)
+    spawner = FakeSpawner()
+    manager = IngestManager(spawn=spawner)
+    try:
+        stream = manager.start_recording("cam1", URL, str(tmp_path / "%Y.mp4"))
+        capture = manager.open_capture("cam1", URL, (4, 2))
+        assert capture.read()[0]
+        source = stream._process
+
+        capture.release()
+        assert _wait_for(lambda: not stream.get_stats()["decoding"])
+        assert stream._process is source and stream.get_stats()["recording"]
+
+        # A new reader resumes decoding on the same connection.
+        assert manager.open_capture("cam1", URL, (4, 2)).read()[0]
+        assert len(spawner.sources) == 1
+        assert len(spawner.decoders) == 2
+    finally:
+        manager.stop()
+
+
+def test_late_reader_does_not_restart_source(tmp_path):
+    spawner = FakeSpawner()
+    manager = IngestManager(spawn=spawner)
+    try:
+        stream = manager.start_recording("cam1", URL, str(tmp_path / "%Y.mp4"))
+        assert _wait_for(lambda: stream._process is not None)
+        source = stream._process
+        assert "pipe:1" in spawner.sources[0]
+        assert not stream.get_stats()["decoding"]
+
+        capture = manager.open_capture("cam1", URL, (4, 2))
+        assert capture.read()[0]
+        assert stream._process is source
+        assert source.poll() is None
+        assert len(spawner.sources) == 1
+        assert stream.restarts == 0
+    finally:
+        manager.stop()
+
+
+def test_capture_only_attaches_to_recorded_stream(tmp_path):
+    manager = IngestManager(spawn=FakeSpawner())
+    try:
+        assert manager.open_capture("cam1", URL, (4, 2)) is None
+        manager.start_recording("cam1", URL, str(tmp_path / "%Y.mp4"))
+        assert manager.open_capture("cam1", URL + "_detect", (4, 2)) is None
+        assert manager.open_capture("cam2", URL, (4, 2)) is None
+        assert manager.open_capture("cam1", URL, (4, 2)) is not None
+
+        manager.stop_recording("cam1")
+        assert manager.open_capture("cam1", URL, (4, 2)) is None
+    finally:
+        manager.stop()
+
+
+def test_stream_restarts_after_ffmpeg_exit(tmp_path):
+    spawner = FakeSpawner(exit_immediately=True)
+    manager = IngestManager(spawn=spawner)
+    try:
+        stream = manager.start_recording("cam1", URL, str(tmp_path / "%Y.mp4"))
+        assert _wait_for(lambda: stream.restarts >= 2)
+        assert stream.is_running()
+    finally:
+        manager.stop()
+
+
+def test_recorder_uses_shared_ingest(tmp_path, monkeypatch):
+    recorder = recorder_service.ContinuousRecorder()
+    recorder.recording_dir = tmp_path
+    recorder.ingest = IngestManager(spawn=FakeSpawner())
+    monkeypatch.setattr(recorder, "_shared_ingest_enabled", lambda: True)
+    try:
+        assert recorder.start_recording("cam1", URL)
+        assert recorder.is_recording("cam1")
+        assert "cam1" not in recorder.processes
+        assert recorder.ingest.is_recording("cam1", URL)
+        # Idempotent while running.
+        assert recorder.start_recording("cam1", URL)
+        assert len(recorder.ingest.streams) == 1
+
+        recorder.stop_recording("cam1")
+        assert not recorder.is_recording("cam1")
+        assert recorder.ingest.streams == {}
+    finally:
+        recorder.ingest.stop()
@@ -0,0 +1,143 @@
+"""
+Unit tests for the shared live frame publisher.
+
+Tests cover:
+- One encode per frame regardless of viewer count
+- Per-quality encoding
+- Duplicate frames skipped
+- Publisher pauses and shuts down without subscribers
+- Viewers joining after shutdown get a fresh publisher
+"""
+import asyncio
+
+import numpy as np
+
+from app.services import live_frames
+from app.services.live_frames import LiveFrameHub, LiveFramePublisher, _Subscriber
+
+
+class FrameSource:
+    """Reader producing a new frame on every call."""
+
+    def __init__(self, static: bool = False):
+        self.static = static
+        self.calls = 0
+        self.closed = False
+
+    def factory(self):
+        return self.read, self.close
+
+    def read(self):
+        self.calls += 1
+        value = 0 if self.static else self.calls % 255
+        return np.full((32, 32, 3), value, dtype=np.uint8)
+
+    def close(self):
+        self.closed = True
+
+
+async def _take(hub, key, source, quality, count, dedupe=True):
+    frames = []
+    stream = hub.subscribe(key, source.factory, fps=50.0, quality=quality, dedupe=dedupe)
+    async for jpg in stream:
+        frames.append(jpg)
+        if len(frames) >= count:
+            break
+    await stream.aclose()
+    return frames
+
+
+async def test_viewers_share_single_encode():
+    hub = LiveFrameHub()
+    source = FrameSource()
+
+    results = await asyncio.gather(*[_take(hub, "worker:cam-1", source, 80, 3) for _ in range(4)])
+
+    assert all(len(frames) == 3 and frames[0].startswith(b"\xff\xd8") for frames in results)
+    stats = hub.get_stats()["worker:cam-1"]
+    # Four viewers, one encode per distinct frame.
+    assert stats["frames_encoded"] <= source.calls
+    hub.stop()
+
+
+async def test_each_quality_encoded_once():
+    hub = LiveFrameHub()
+    source = FrameSource()
+
+    low, high = await asyncio.gather(
+        _take(hub, "worker:cam-1", source, 30, 2),
+        _take(hub, "worker:cam-1", source, 95, 2),
+    )
+
+    assert len(low) == 2 and len(high) == 2
+    # Both qualities are served from the same reads.
+    assert hub.get_stats()["worker:cam-1"]["frames_encoded"] <= 2 * source.calls
+    hub.stop()
+
+
+async def test_duplicate_frames_not_reencoded():
+    hub = LiveFrameHub()
+    source = FrameSource(static=True)
+
+    stream = hub.subscribe("worker:cam-1", source.factory, fps=50.0, quality=80)
+    first = await stream.__anext__()
+    await asyncio.sleep(0.15)
+    await stream.aclose()
+
+    stats = hub.get_stats()["worker:cam-1"]
+    assert first
+    assert stats["frames_encoded"] == 1
+    assert stats["frames_skipped"] >= 1
+    hub.stop()
+
+
+async def test_publisher_closes_source_when_idle(monkeypatch):
+    monkeypatch.setattr(live_frames, "IDLE_LINGER_SECONDS", 0.05)
+    hub = LiveFrameHub()
+    source = FrameSource()
+
+    await _take(hub, "rtsp:cam-1", source, 80, 1, dedupe=False)
+    calls_after_viewer = source.calls
+    for _ in range(30):
+        if source.closed:
+            break
+        await asyncio.sleep(0.05)
+
+    assert source.closed
+    assert source.calls <= calls_after_viewer + 1
+    assert hub.get_stats()["rtsp:cam-1"]["subscribers"] == 0
+    hub.stop()
+
+
+async def test_viewer_after_idle_shutdown_gets_new_publisher(monkeypatch):
+    monkeypatch.setattr(live_frames, "IDLE_LINGER_SECONDS", 0.05)
+    hub = LiveFrameHub()
+    first_source, second_source = FrameSource(), FrameSource()
+
+    await _take(hub, "rtsp:cam-1", first_source, 80, 1, dedupe=False)
+    for _ in range(30):
+        if first_source.closed:
+            break
+        await asyncio.sleep(0.05)
+    stale = hub._publishers["rtsp:cam-1"]
+    assert stale.closed
+    assert not stale.add(_Subscriber(80, asyncio.get_running_loop()))
+
+    frames = await asyncio.wait_for(_take(hub, "rtsp:cam-1", second_source, 80, 1, dedupe=False), timeout=2.0)
+    assert frames and second_source.calls >= 1
+    assert hub._publishers["rtsp:cam-1"] is not stale
+    hub.stop()
+
+
+async def test_dead_publisher_replaced_despite_subscribers():
+    hub = LiveFrameHub()
+    source = FrameSource()
+    dead = LiveFramePublisher("worker:cam-1", source.read, fps=50.0)
+    dead._subscribers.add(_Subscriber(80, asyncio.get_running_loop()))
+    dead.stop()
+    hub._publishers["worker:cam-1"] = dead
+
+    frames = await asyncio.wait_for(_take(hub, "worker:cam-1", source, 80, 1), timeout=2.0)
+    assert frames
+    assert hub._publishers["worker:cam-1"] is not dead
+    hub.stop()
@@ -537,3 +537,43 @@ def test_ai_collage_marks_person_bbox_not_full_tile_border(media_worker):
         assert max_border_accent < 240
         # Person bbox overlays should create visible accent edges inside tiles.
         assert tiles_with_interior_bbox >= 3
+
+
+def test_preview_webp_replaces_stale_gif(media_worker, test_frames, tmp_path):
+    """Test animated WebP preview (Pillow path without ffmpeg) and stale preview cleanup."""
+    from PIL import Image
+
+    stale = tmp_path / "preview.gif"
+    stale.write_bytes(b"old")
+
+    result = media_worker.create_preview(
+        test_frames,
+        str(tmp_path / "preview.webp"),
+        camera_name="Test Camera",
+        timestamp=datetime.now(),
+    )
+
+    assert result == str(tmp_path / "preview.webp")
+    assert not stale.exists()
+    with Image.open(result) as image:
+        assert image.format == "WEBP"
+        assert image.n_frames == media_worker.GIF_FRAMES
+        assert image.size == media_worker.GIF_SIZE
+
+
+def test_preview_falls_back_and_caps_size(media_worker, test_frames, tmp_path, monkeypatch):
+    """Test MP4 preview without ffmpeg falls back to WebP, and the byte cap shrinks frames."""
+    from PIL import Image
+
+    monkeypatch.setattr(media_worker, "_resolve_ffmpeg_candidates", lambda: [])
+    monkeypatch.setattr(media_worker, "PREVIEW_MAX_BYTES", 1)
+
+    result = media_worker.create_preview(test_frames, str(tmp_path / "preview.mp4"), preview_format="mp4")
+
+    assert result == str(tmp_path / "preview.webp")
+    assert not (tmp_path / "preview.mp4").exists()
+    with Image.open(result) as image:
+        assert image.size == media_worker.PREVIEW_REDUCED_SIZE
+
+    with pytest.raises(ValueError):
+        media_worker.create_preview(test_frames, str(tmp_path / "preview.bmp"), preview_format="bmp")
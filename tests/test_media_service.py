@@ -129,7 +129,13 @@ def _add_camera_and_event(
     session.commit()
 
 
-def _patch_media_dependencies(monkeypatch, duplicate_percentage: float, extract_ok: bool, timer_calls: list):
+def _patch_media_dependencies(
+    monkeypatch,
+    duplicate_percentage: float,
+    extract_ok: bool,
+    timer_calls: list,
+    deep_duplicate_percentage: float = None,
+):
     class DummyRecorder:
         def extract_clip(self, *args, **kwargs):
             return extract_ok
@@ -190,10 +196,14 @@ def _patch_media_dependencies(monkeypatch, duplicate_percentage: float, extract_
     monkeypatch.setattr(
         media_service,
         "analyze_video",
-        lambda _path: {
+        lambda _path, deep=False: {
             "analysis": {
                 "actual_duration": 6.0,
-                "duplicate_percentage": duplicate_percentage,
+                "duplicate_percentage": (
+                    deep_duplicate_percentage
+                    if deep and deep_duplicate_percentage is not None
+                    else duplicate_percentage
+                ),
             }
         },
     )
@@ -235,6 +245,40 @@ def test_generate_event_media_skips_delayed_timer_for_phantom_event(tmp_path, mo
         engine.dispose()
 
 
+def test_generate_event_media_keeps_event_when_deep_analysis_disagrees(tmp_path, monkeypatch):
+    session, engine = _make_db_session(tmp_path)
+    try:
+        event_id = "event-phantom-2"
+        _add_camera_and_event(session, event_id, confidence=0.4)
+
+        media_root = tmp_path / "media"
+        monkeypatch.setattr(media_service.MediaService, "MEDIA_DIR", media_root)
+        service = media_service.MediaService()
+
+        timer_calls = []
+        service.media_worker = _patch_media_dependencies(
+            monkeypatch,
+            duplicate_percentage=100.0,
+            extract_ok=False,
+            timer_calls=timer_calls,
+            deep_duplicate_percentage=20.0,
+        )
+
+        result = service.generate_event_media(
+            db=session,
+            event_id=event_id,
+            frames=[np.zeros((8, 8, 3), dtype=np.uint8)],
+            detections=[None],
+        )
+
+        assert result["collage_url"] is not None
+        assert session.query(Event).filter(Event.id == event_id).first() is not None
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
 def test_generate_event_media_starts_delayed_timer_for_kept_event(tmp_path, monkeypatch):
     session, engine = _make_db_session(tmp_path)
     try:
@@ -304,7 +348,7 @@ def test_generate_event_media_keeps_event_on_moderate_duplicate_mp4(tmp_path, mo
         engine.dispose()
 
 
-def test_generate_collage_for_ai_uses_detection_focused_collage(tmp_path, monkeypatch):
+def test_render_collage_for_ai_returns_bytes_and_rebuilds_from_mp4(tmp_path, monkeypatch):
     session, engine = _make_db_session(tmp_path)
     try:
         event_id = "event-ai-collage-1"
@@ -314,28 +358,17 @@ def test_generate_collage_for_ai_uses_detection_focused_collage(tmp_path, monkey
         monkeypatch.setattr(media_service.MediaService, "MEDIA_DIR", media_root)
         service = media_service.MediaService()
 
-        called = {"detections": None, "output_path": None}
+        called = {"detections": None, "frames": 0}
 
         class DummyWorker:
-            def create_ai_collage(
-                self,
-                frames,
-                detections,
-                timestamps,
-                output_path,
-                camera_name,
-                timestamp,
-                confidence,
-            ):
+            def encode_ai_collage(self, frames, detections, timestamps, camera_name, timestamp, confidence):
                 called["detections"] = detections
-                called["output_path"] = output_path
-                with open(output_path, "wb") as f:
-                    f.write(b"ai-collage")
-                return output_path
+                called["frames"] = len(frames)
+                return b"ai-collage"
 
         service.media_worker = DummyWorker()
         detections = [{"bbox": [1, 1, 6, 7], "confidence": 0.88}]
-        result = service.generate_collage_for_ai(
+        path, data = service.render_collage_for_ai(
             db=session,
             event_id=event_id,
             frames=[np.zeros((8, 8, 3), dtype=np.uint8)],
@@ -344,11 +377,20 @@ def test_generate_collage_for_ai_uses_detection_focused_collage(tmp_path, monkey
             camera_name="Test Cam",
         )
 
-        assert result is not None
-        assert result.exists()
-        assert called["output_path"] == str(result)
-        assert result.name == "collage_ai.jpg"
+        assert data == b"ai-collage"
+        assert path.name == "collage_ai.jpg" and path.read_bytes() == data
         assert called["detections"] == detections
+
+        # Stored events: rebuilt in memory from the event MP4, nothing written.
+        path.unlink()
+        monkeypatch.setattr(
+            service,
+            "_extract_frames_from_mp4",
+            lambda _path, max_frames=18: [np.zeros((8, 8, 3), dtype=np.uint8)] * 3,
+        )
+        assert service.rebuild_collage_for_ai(event_id, "Test Cam") == b"ai-collage"
+        assert called["frames"] == 3
+        assert not path.exists()
     finally:
         session.close()
         Base.metadata.drop_all(bind=engine)
@@ -0,0 +1,131 @@
+"""
+Unit tests for MQTT service.
+
+Tests cover:
+- Non-blocking event publishing through the outbound queue
+- Retained payload deduplication, including after non-retained and failed publishes
+- Bounded monitoring state
+"""
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.services.mqtt import MqttService, LAST_MESSAGES_LIMIT
+
+
+@pytest.fixture
+def mqtt_service():
+    """Create MQTT service with a mocked, connected client."""
+    with patch("app.services.mqtt.get_settings_service") as mock_settings:
+        config = Mock()
+        config.mqtt.topic_prefix = "tdv"
+        config.mqtt.enabled = True
+        mock_settings.return_value.load_config.return_value = config
+        service = MqttService()
+    service.client = Mock()
+    service.client.publish.return_value.rc = 0
+    service.client.publish.return_value.is_published.return_value = True
+    service.connected = True
+    return service
+
+
+def _drain(service: MqttService) -> None:
+    batch = []
+    while not service._outbound.empty():
+        batch.append(service._outbound.get_nowait())
+    service._publish_batch(batch)
+
+
+def test_publish_event_only_enqueues(mqtt_service):
+    mqtt_service.publish_event({"id": "evt-1", "camera_id": "cam-1", "person_count": 2})
+
+    mqtt_service.client.publish.assert_not_called()
+    assert mqtt_service.get_pipeline_stats()["queue_depth"] == 4
+
+    _drain(mqtt_service)
+    topics = [call.args[0] for call in mqtt_service.client.publish.call_args_list]
+    assert topics == [
+        "tdv/camera/cam-1/person",
+        "tdv/camera/cam-1/person_count",
+        "tdv/camera/cam-1/event",
+        "tdv/events",
+    ]
+    assert mqtt_service.publish_count == 4
+
+
+def test_unchanged_retained_payload_skipped(mqtt_service):
+    mqtt_service._enqueue("tdv/status", "ON", retain=True)
+    mqtt_service._enqueue("tdv/status", "ON", retain=True)
+    mqtt_service._enqueue("tdv/status", "OFF", retain=True)
+    _drain(mqtt_service)
+
+    payloads = [call.args[1] for call in mqtt_service.client.publish.call_args_list]
+    assert payloads == ["ON", "OFF"]
+    assert mqtt_service.skipped_retained_count == 1
+
+
+def test_non_retained_payload_not_deduplicated(mqtt_service):
+    mqtt_service._enqueue("tdv/events", "{}")
+    mqtt_service._enqueue("tdv/events", "{}")
+    _drain(mqtt_service)
+
+    assert mqtt_service.client.publish.call_count == 2
+
+
+def test_non_retained_publish_resets_retained_state(mqtt_service):
+    mqtt_service._enqueue("tdv/camera/cam-1/person", "OFF", retain=True)
+    mqtt_service._enqueue("tdv/camera/cam-1/person", "ON")
+    mqtt_service._enqueue("tdv/camera/cam-1/person", "OFF", retain=True)
+    _drain(mqtt_service)
+
+    payloads = [call.args[1] for call in mqtt_service.client.publish.call_args_list]
+    assert payloads == ["OFF", "ON", "OFF"]
+
+
+def test_failed_publish_not_remembered(mqtt_service):
+    mqtt_service.client.publish.return_value.rc = 4  # MQTT_ERR_NO_CONN
+    mqtt_service._enqueue("tdv/status", "ON", retain=True)
+    _drain(mqtt_service)
+
+    mqtt_service.client.publish.return_value.rc = 0
+    mqtt_service.client.publish.return_value.is_published.return_value = False
+    mqtt_service._enqueue("tdv/status", "ON", qos=1, retain=True)
+    _drain(mqtt_service)
+
+    mqtt_service.client.publish.return_value.is_published.return_value = True
+    mqtt_service._enqueue("tdv/status", "ON", retain=True)
+    _drain(mqtt_service)
+
+    assert mqtt_service.client.publish.call_count == 3
+    assert mqtt_service.skipped_retained_count == 0
+    assert mqtt_service.publish_count == 2
+
+
+def test_stop_clears_outbound_queue(mqtt_service):
+    mqtt_service._enqueue("tdv/status", "ON", retain=True)
+    mqtt_service._enqueue("tdv/events", "{}")
+    mqtt_service.stop()
+
+    assert mqtt_service.get_pipeline_stats()["queue_depth"] == 0
+    assert mqtt_service.client is None
+
+
+def test_reconnect_clears_retained_cache(mqtt_service):
+    mqtt_service._enqueue("tdv/status", "ON", retain=True)
+    _drain(mqtt_service)
+    with patch.object(mqtt_service, "publish_discovery"):
+        mqtt_service._on_connect(mqtt_service.client, None, {}, 0)
+    mqtt_service._enqueue("tdv/status", "ON", retain=True)
+    _drain(mqtt_service)
+
+    payloads = [call.args[1] for call in mqtt_service.client.publish.call_args_list]
+    assert payloads.count("ON") == 2
+
+
+def test_last_messages_bounded_lru(mqtt_service):
+    for i in range(LAST_MESSAGES_LIMIT + 10):
+        mqtt_service._track_publish(f"tdv/topic/{i}", i)
+
+    assert len(mqtt_service.last_messages) == LAST_MESSAGES_LIMIT
+    assert "tdv/topic/0" not in mqtt_service.last_messages
+    assert next(reversed(mqtt_service.last_messages)) == f"tdv/topic/{LAST_MESSAGES_LIMIT + 9}"
@@ -0,0 +1,78 @@
+"""
+Unit tests for media overlay rendering.
+
+Tests cover:
+- Cached text sprites matching cv2.putText, including clipping at edges
+- Badge patches matching the rectangle + putText drawing
+- Sprite cache eviction
+- Cached MP4 and grid layouts
+"""
+import cv2
+import numpy as np
+import pytest
+
+from app.workers.overlay import FONT, OverlayRenderer, grid_layout, mp4_layout
+
+
+ACCENT = (255, 140, 91)
+
+
+@pytest.mark.parametrize("text,font_scale,thickness", [
+    ("Person 87%", 0.6, 2),
+    ("Kapi On | (2)", 1.0, 2),
+    ("4.0x", 0.45, 1),
+])
+@pytest.mark.parametrize("org", [(30, 60), (-6, 8), (560, 119)])
+def test_text_sprite_matches_put_text(text, font_scale, thickness, org):
+    background = np.random.default_rng(0).integers(0, 255, (120, 600, 3), dtype=np.uint8)
+    expected = background.copy()
+    cv2.putText(expected, text, org, FONT, font_scale, ACCENT, thickness)
+
+    renderer = OverlayRenderer()
+    actual = background.copy()
+    renderer.draw_text(actual, text, org, font_scale, ACCENT, thickness)
+
+    # Blending rounds once instead of putText's per-pixel mix: off by at most one level.
+    assert np.abs(actual.astype(int) - expected).max() <= 1
+    assert renderer.text_size(text, font_scale, ACCENT, thickness) == cv2.getTextSize(text, FONT, font_scale, thickness)[0]
+
+
+def test_draw_text_right_and_badge():
+    renderer = OverlayRenderer()
+    img = np.zeros((100, 300, 3), dtype=np.uint8)
+    renderer.draw_text_right(img, "Front", 290, 50, 0.8, (255, 255, 255), 2)
+    width = cv2.getTextSize("Front", FONT, 0.8, 2)[0][0]
+    expected = np.zeros_like(img)
+    cv2.putText(expected, "Front", (290 - width, 50), FONT, 0.8, (255, 255, 255), 2)
+    assert np.abs(img.astype(int) - expected).max() <= 1
+
+    img = np.zeros((100, 300, 3), dtype=np.uint8)
+    renderer.draw_badge(img, "6", (10, 10), 0.9, 2, 10, ACCENT, (255, 255, 255))
+    (w, h), _ = cv2.getTextSize("6", FONT, 0.9, 2)
+    expected = np.zeros_like(img)
+    cv2.rectangle(expected, (10, 10), (10 + w + 20, 10 + h + 20), ACCENT, -1)
+    cv2.putText(expected, "6", (20, 10 + h + 10), FONT, 0.9, (255, 255, 255), 2)
+    assert np.array_equal(img, expected)
+
+
+def test_sprite_cache_evicts_least_recently_used():
+    renderer = OverlayRenderer(max_sprites=2)
+    first = renderer.text_sprite("a", 0.5, ACCENT, 1)
+    second = renderer.text_sprite("b", 0.5, ACCENT, 1)
+    assert renderer.text_sprite("a", 0.5, ACCENT, 1) is first
+    renderer.text_sprite("c", 0.5, ACCENT, 1)
+
+    assert renderer.text_sprite("a", 0.5, ACCENT, 1) is first
+    assert renderer.text_sprite("b", 0.5, ACCENT, 1) is not second
+
+
+def test_layouts_are_cached_per_size():
+    layout = mp4_layout((1280, 720))
+    assert mp4_layout((1280, 720)) is layout
+    assert (layout.margin, layout.font_large, layout.thickness, layout.time_org) == (16, 1.0, 2, (16, 40))
+    small = mp4_layout((640, 360))
+    assert (small.margin, small.font_large, small.thickness, small.box_thickness) == (8, 0.5, 1, 2)
+
+    grid = grid_layout((640, 480), (3, 2))
+    assert grid.canvas_size == (1920, 960)
+    assert grid.origins == ((0, 0), (640, 0), (1280, 0), (0, 480), (640, 480), (1280, 480))
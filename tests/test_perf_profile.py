@@ -0,0 +1,149 @@
+"""
+Unit tests for the inference performance profile.
+
+Tests cover:
+- Deterministic benchmark image set
+- Backend/threads/input-size/batch sweep with a fake runner
+- Profile persistence and per-camera FPS caps
+- One run at a time; PyTorch threads restored after the sweep
+"""
+import threading
+
+import numpy as np
+import pytest
+
+from app.services import perf_profile
+from app.services.perf_profile import (
+    PerfTuner,
+    benchmark_frames,
+    build_profile,
+    fps_cap,
+    load_profile,
+    measure,
+    thread_candidates,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_benchmark_frames_are_deterministic():
+    first = benchmark_frames(count=3, size=(320, 180))
+    second = benchmark_frames(count=3, size=(320, 180))
+
+    assert len(first) == 3
+    assert first[0].shape == (180, 320, 3)
+    assert all(np.array_equal(a, b) for a, b in zip(first, second))
+
+
+def test_thread_candidates_bounded_by_cpu_count():
+    assert thread_candidates(1) == [1]
+    assert thread_candidates(8) == [1, 2, 4, 8]
+    assert thread_candidates(6) == [1, 2, 3, 4, 6]
+
+
+def test_measure_reports_per_image_latency():
+    clock = FakeClock()
+
+    def runner(frames, imgsz):
+        clock.now += 0.01 * len(frames)
+
+    result = measure(runner, benchmark_frames(count=4, size=(64, 64)), 640, batch=2, warmup=1, runs=3, clock=clock)
+
+    assert result["latency_ms"] == pytest.approx(10.0)
+    assert result["fps"] == pytest.approx(100.0)
+
+
+def test_benchmark_picks_fastest_backend_and_persists(tmp_path, monkeypatch):
+    monkeypatch.setattr(perf_profile, "MEASURE_RUNS", 2)
+    monkeypatch.setattr(perf_profile, "WARMUP_RUNS", 0)
+    monkeypatch.setattr(perf_profile, "BENCH_IMAGE_COUNT", 2)
+    monkeypatch.setattr(perf_profile, "_set_torch_threads", lambda threads: None)
+    (tmp_path / "yolov8n.onnx").write_bytes(b"")
+    clock = FakeClock()
+    monkeypatch.setattr(perf_profile.time, "perf_counter", clock)
+    seconds_per_image = {"onnx": 0.02, "cpu": 0.05}
+
+    def factory(backend, model_name):
+        def run(frames, imgsz):
+            scale = (imgsz / 640.0) ** 2
+            clock.now += seconds_per_image[backend] * scale * len(frames)
+        return run
+
+    path = tmp_path / "perf_profile.json"
+    tuner = PerfTuner(tmp_path, path=path)
+    profile = tuner.run("yolov8n", 640, runner_factory=factory, cpu_count=2)
+
+    assert tuner.status == "done"
+    assert profile["best"]["backend"] == "onnx"
+    assert profile["best"]["imgsz"] == 640
+    cpu_sizes = {r["imgsz"] for r in profile["results"] if r["backend"] == "cpu"}
+    assert {640, 416, 320} <= cpu_sizes
+    assert any(r["batch"] == 4 for r in profile["results"])
+    assert load_profile(path)["best"]["backend"] == "onnx"
+    assert PerfTuner(tmp_path, path=path).profile["model"] == "yolov8n"
+
+
+def test_benchmark_restores_torch_threads(tmp_path, monkeypatch):
+    monkeypatch.setattr(perf_profile, "MEASURE_RUNS", 1)
+    monkeypatch.setattr(perf_profile, "WARMUP_RUNS", 0)
+    monkeypatch.setattr(perf_profile, "BENCH_IMAGE_COUNT", 1)
+    monkeypatch.setattr(perf_profile, "CPU_INPUT_SIZES", ())
+    monkeypatch.setattr(perf_profile, "_torch_threads", lambda: 3)
+    applied = []
+    monkeypatch.setattr(perf_profile, "_set_torch_threads", applied.append)
+
+    tuner = PerfTuner(tmp_path, path=tmp_path / "perf_profile.json")
+    tuner.run("yolov8n", 640, runner_factory=lambda backend, model: lambda frames, imgsz: None, cpu_count=4)
+
+    assert set(applied[:-1]) == {1, 2, 4}
+    assert applied[-1] == 3
+
+
+def test_run_async_claims_the_run_before_returning(tmp_path, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(PerfTuner, "benchmark", lambda self, *args, **kwargs: release.wait(5.0) and {})
+    tuner = PerfTuner(tmp_path, path=tmp_path / "perf_profile.json")
+
+    assert tuner.run_async("yolov8n", 640)
+    assert tuner.running
+    assert not tuner.run_async("yolov8n", 640)
+    assert tuner.run("yolov8n", 640) is None
+
+    release.set()
+    tuner._thread.join(timeout=5.0)
+    assert tuner.status == "done"
+
+
+def test_fps_cap_scales_with_camera_count():
+    results = [
+        {"backend": "cpu", "threads": 4, "imgsz": 640, "batch": 1, "fps": 20.0, "latency_ms": 50.0},
+        {"backend": "cpu", "threads": 4, "imgsz": 320, "batch": 1, "fps": 60.0, "latency_ms": 16.7},
+    ]
+    profile = build_profile(results, "yolov8n", 640, cpu_count=4)
+
+    # Smaller input sizes are reported but never chosen automatically.
+    assert profile["best"]["imgsz"] == 640
+    assert fps_cap(profile, 1) == pytest.approx(16.0)
+    assert fps_cap(profile, 4) == pytest.approx(4.0)
+    assert fps_cap(profile, 40) == pytest.approx(0.4)
+    assert fps_cap(None, 2) is None
+
+
+def test_profile_budget_ignores_batched_throughput():
+    results = [
+        {"backend": "cpu", "threads": 4, "imgsz": 640, "batch": 1, "fps": 20.0, "latency_ms": 50.0},
+        {"backend": "onnx", "threads": None, "imgsz": 640, "batch": 1, "fps": 25.0, "latency_ms": 40.0},
+        {"backend": "onnx", "threads": None, "imgsz": 640, "batch": 4, "fps": 60.0, "latency_ms": 66.7},
+    ]
+    profile = build_profile(results, "yolov8n", 640, cpu_count=4)
+
+    assert profile["best"]["backend"] == "onnx"
+    assert profile["best"]["batch"] == 1
+    assert fps_cap(profile, 1) == pytest.approx(20.0)
+    assert any(r["batch"] == 4 for r in profile["results"])
@@ -0,0 +1,169 @@
+"""
+Unit tests for INT8 quantization.
+
+Tests cover:
+- Thermal/color calibration sets sampled from closed recording segments
+- FP32 vs INT8 detection agreement
+- Registration of accuracy-checked variants and backend selection
+"""
+import threading
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+
+from app.services.inference import InferenceService
+from app.services.quantization import (
+    QuantizationService,
+    balanced_calibration_set,
+    collect_calibration_frames,
+    compare_detections,
+    load_registry,
+    registered_variant,
+    to_input_tensor,
+)
+
+
+def _write_segment(path: Path, color: bool, frames: int = 6) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 5, (160, 120))
+    for i in range(frames):
+        if color:
+            frame = np.zeros((120, 160, 3), dtype=np.uint8)
+            frame[:, :, 2] = 200
+            frame[:, :, 1] = 40 + i
+        else:
+            frame = np.full((120, 160, 3), 80 + i * 10, dtype=np.uint8)
+        writer.write(frame)
+    writer.release()
+
+
+def _det(x1, y1, x2, y2, conf=0.8):
+    return {"bbox": [x1, y1, x2, y2], "confidence": conf}
+
+
+def test_calibration_frames_split_by_camera_type(tmp_path):
+    _write_segment(tmp_path / "cam-thermal" / "20260101_000000.mp4", color=False)
+    _write_segment(tmp_path / "cam-thermal" / "20260101_000100.mp4", color=False)
+    _write_segment(tmp_path / "cam-color" / "20260101_000000.mp4", color=True)
+    # Newest segment per camera is still being recorded and is skipped.
+    (tmp_path / "cam-color" / "20260101_000100.mp4").write_bytes(b"")
+    # Night-IR footage from a color camera looks grey but stays in the color set.
+    _write_segment(tmp_path / "cam-night" / "20260101_000000.mp4", color=False)
+    (tmp_path / "cam-night" / "20260101_000100.mp4").write_bytes(b"")
+    # Recordings of cameras that no longer exist are ignored.
+    _write_segment(tmp_path / "cam-gone" / "20260101_000000.mp4", color=True)
+    (tmp_path / "cam-gone" / "20260101_000100.mp4").write_bytes(b"")
+    domains = {"cam-thermal": "thermal", "cam-color": "color", "cam-night": "color"}
+
+    sets = collect_calibration_frames(tmp_path, domains, per_domain=20, frames_per_segment=4)
+
+    assert len(sets["thermal"]) == 4
+    assert len(sets["color"]) == 8
+    assert sum(float(frame[:, :, 2].mean()) > 150 for frame in sets["color"]) == 4
+
+    capped = collect_calibration_frames(tmp_path, domains, per_domain=3, frames_per_segment=4)
+    mixed = balanced_calibration_set(capped)
+    assert len(mixed) == 6
+    assert any(mixed[0] is frame for frame in capped["thermal"])
+    assert any(mixed[1] is frame for frame in capped["color"])
+
+
+def test_input_tensor_is_letterboxed_rgb():
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+    frame[:, :, 0] = 255  # blue
+
+    tensor = to_input_tensor(frame, 64)
+
+    assert tensor.shape == (1, 3, 64, 64)
+    assert tensor.dtype == np.float32
+    assert tensor[0, 2, 32, 32] == pytest.approx(1.0)  # blue is the last RGB channel
+    assert tensor[0, 0, 0, 32] == pytest.approx(114 / 255.0)  # padding row
+
+
+def test_compare_detections_agreement():
+    reference = [[_det(0, 0, 10, 20)], [_det(50, 50, 70, 90, 0.6)], []]
+    identical = compare_detections(reference, reference)
+    assert identical["f1"] == 1.0
+
+    shifted = [[_det(1, 0, 11, 20, 0.75)], [], [_det(0, 0, 5, 5)]]
+    metrics = compare_detections(reference, shifted)
+    assert metrics["recall"] == pytest.approx(0.5)
+    assert metrics["precision"] == pytest.approx(0.5)
+    assert metrics["confidence_shift"] == pytest.approx(-0.05)
+    assert compare_detections([[]], [[]])["f1"] == 1.0
+
+
+def test_quantize_registers_only_passing_variants(tmp_path):
+    service = QuantizationService(tmp_path, tmp_path / "recordings")
+    frames = [np.full((32, 32, 3), i, dtype=np.uint8) for i in range(8)]
+    sets = {"thermal": frames, "color": frames}
+
+    def exporter(name):
+        def export(model_name, calibration):
+            assert len(calibration) == 16
+            path = tmp_path / name
+            path.write_bytes(b"int8")
+            return path
+        return export
+
+    outputs = {
+        "fp32": [[_det(0, 0, 10, 20)]] * 8,
+        str(tmp_path / "good.onnx"): [[_det(0, 0, 10, 21)]] * 8,
+        str(tmp_path / "bad_openvino_model"): [[]] * 8,
+    }
+
+    result = service.quantize(
+        "yolov8n",
+        sets=sets,
+        exporters={"onnx": exporter("good.onnx"), "openvino": exporter("bad_openvino_model")},
+        loader=lambda source: "fp32" if source.endswith(".pt") else source,
+        predict=lambda model, frames: outputs[model],
+    )
+
+    assert result["onnx_int8"]["passed"] is True
+    assert result["openvino_int8"]["passed"] is False
+    assert set(result["onnx_int8"]["domains"]) == {"thermal", "color"}
+    assert load_registry(tmp_path)["yolov8n"]["onnx_int8"]["path"] == "good.onnx"
+    assert registered_variant(tmp_path, "yolov8n", "onnx_int8") == tmp_path / "good.onnx"
+    assert registered_variant(tmp_path, "yolov8n", "openvino_int8") is None
+
+
+def test_quantize_requires_recorded_frames(tmp_path):
+    service = QuantizationService(tmp_path, tmp_path / "recordings")
+
+    with pytest.raises(RuntimeError):
+        service.quantize("yolov8n", sets={"thermal": [], "color": []})
+
+
+def test_run_async_claims_one_run(tmp_path, monkeypatch):
+    service = QuantizationService(tmp_path, tmp_path / "recordings")
+    release = threading.Event()
+    monkeypatch.setattr(service, "quantize", lambda model_name, formats: release.wait(5) and {})
+
+    assert service.run_async("yolov8n") is True
+    # The slot is taken before the worker thread gets to run.
+    assert service.status == "running"
+    assert service.run_async("yolov8n") is False
+    assert service.run("yolov8n") is None
+
+    release.set()
+    service._thread.join(5)
+    assert service.status == "done"
+
+
+def test_auto_backend_prefers_registered_int8_on_cpu(tmp_path, monkeypatch):
+    monkeypatch.setattr(InferenceService, "MODELS_DIR", tmp_path)
+    service = InferenceService()
+    monkeypatch.setattr(service, "_get_openvino_devices", lambda: ["CPU"])
+    (tmp_path / "yolov8n.onnx").write_bytes(b"fp32")
+    (tmp_path / "yolov8n_int8.onnx").write_bytes(b"int8")
+    (tmp_path / "quantized_models.json").write_text(
+        '{"yolov8n": {"onnx_int8": {"path": "yolov8n_int8.onnx", "passed": true}}}'
+    )
+
+    backend = service._resolve_auto_backend(tmp_path / "yolov8n.engine", tmp_path / "yolov8n.onnx", "yolov8n")
+
+    assert backend == "onnx_int8"
+    assert service._resolve_auto_backend(tmp_path / "x.engine", tmp_path / "yolov8n.onnx") == "onnx"
@@ -0,0 +1,105 @@
+"""
+Tests for staged startup.
+
+Tests cover:
+- Import-time budget for the API (heavy ML/AI packages stay unimported)
+- Startup stage bookkeeping and /ready progress
+- Workers started by a cancelled startup are stopped
+"""
+import asyncio
+import json
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from app.services.startup import STARTUP_STAGES, StartupProgress
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Generous enough for slow CI hosts; loading torch alone exceeds it.
+IMPORT_BUDGET_SECONDS = 3.0
+HEAVY_MODULES = ("torch", "ultralytics", "openai", "openvino", "onnxruntime", "huggingface_hub")
+
+_IMPORT_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "heavy": heavy}}))
+"""
+
+
+def test_app_import_stays_within_budget():
+    result = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE.format(heavy=HEAVY_MODULES)],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert probe["heavy"] == []
+    assert probe["elapsed"] < IMPORT_BUDGET_SECONDS
+
+
+def test_stage_progress_and_failure():
+    progress = StartupProgress()
+    with progress.stage("dependencies"):
+        pass
+    progress.skip("metrics")
+    with pytest.raises(RuntimeError):
+        with progress.stage("model"):
+            raise RuntimeError("no model")
+
+    snapshot = progress.snapshot()
+    assert snapshot["status"] == "starting"
+    assert snapshot["stages"]["dependencies"]["status"] == "done"
+    assert snapshot["stages"]["metrics"]["status"] == "skipped"
+    assert snapshot["stages"]["model"]["status"] == "failed"
+    assert snapshot["stages"]["model"]["error"] == "no model"
+    assert snapshot["stages"]["mqtt"]["status"] == "pending"
+
+    progress.finish()
+    assert progress.is_complete
+    assert progress.snapshot()["status"] == "degraded"
+    assert progress.snapshot()["failed"] == ["model"]
+
+
+def test_ready_reports_startup_stages():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    response = TestClient(app).get("/ready")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["ready"] is True
+    assert set(data["startup"]["stages"]) == set(STARTUP_STAGES)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_startup_stops_what_it_started():
+    from app.main import _start_in_thread
+
+    calls = []
+    entered = threading.Event()
+
+    def start():
+        entered.set()
+        time.sleep(0.2)
+        calls.append("start")
+
+    task = asyncio.create_task(_start_in_thread(start, lambda: calls.append("stop")))
+    await asyncio.to_thread(entered.wait, 5.0)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert calls == ["start", "stop"]
@@ -0,0 +1,165 @@
+"""
+Unit tests for background system telemetry.
+
+Tests cover:
+- Incremental data directory size (scan once, track writes and deletes)
+- Writes reported during a rescan, and paths outside the data directory
+- Collector samples, ring size and per-thread CPU
+- Recorder counting finished segments exactly once
+- /api/system/info served from the latest sample
+"""
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routers import system as system_router
+from app.services import recorder as recorder_service
+from app.services.system_stats import DataUsage, SystemStatsCollector
+
+
+def test_data_usage_tracks_writes_and_deletes(tmp_path):
+    (tmp_path / "a.bin").write_bytes(b"x" * 100)
+    usage = DataUsage(tmp_path)
+    assert usage.total() is None
+    assert usage.rescan() == 100
+
+    event_dir = tmp_path / "media" / "evt"
+    with usage.track(event_dir):
+        event_dir.mkdir(parents=True)
+        (event_dir / "collage.jpg").write_bytes(b"y" * 50)
+        (event_dir / "timelapse.mp4").write_bytes(b"z" * 25)
+    assert usage.total() == 175
+
+    collage = event_dir / "collage.jpg"
+    with usage.track(collage):
+        collage.write_bytes(b"y" * 10)
+    assert usage.total() == 135
+
+    with usage.track(event_dir):
+        for path in event_dir.iterdir():
+            path.unlink()
+        event_dir.rmdir()
+    assert usage.total() == 100
+    assert usage.rescan() == 100
+
+
+def test_data_usage_keeps_writes_reported_during_rescan(tmp_path, monkeypatch):
+    from app.services import system_stats
+
+    (tmp_path / "a.bin").write_bytes(b"x" * 100)
+    usage = DataUsage(tmp_path)
+    walk = system_stats._path_size
+
+    def _walk_with_concurrent_write(path):
+        total = walk(path)
+        usage.add(40)
+        return total
+
+    monkeypatch.setattr(system_stats, "_path_size", _walk_with_concurrent_write)
+    assert usage.rescan() == 140
+    assert usage.total() == 140
+
+
+def test_data_usage_remove_and_outside_paths(tmp_path):
+    root = tmp_path / "data"
+    event_dir = root / "media" / "evt"
+    event_dir.mkdir(parents=True)
+    (event_dir / "collage.jpg").write_bytes(b"y" * 50)
+    usage = DataUsage(root)
+    usage.rescan()
+
+    usage.remove(event_dir)
+    assert not event_dir.exists()
+    assert usage.total() == 0
+
+    outside = tmp_path / "frames.raw"
+    with usage.track(outside):
+        outside.write_bytes(b"r" * 30)
+    assert usage.total() == 0
+    usage.remove(outside)
+    assert not outside.exists()
+    assert usage.total() == 0
+
+
+def test_collector_samples_into_ring(tmp_path):
+    usage = DataUsage(tmp_path)
+    usage.rescan()
+    collector = SystemStatsCollector(data_usage=usage, history=3)
+    assert collector.latest() is None
+    assert collector.cpu_percent() == 0.0
+
+    stop = threading.Event()
+
+    def _spin():
+        while not stop.is_set():
+            pass
+
+    busy = threading.Thread(target=_spin, name="busy-worker")
+    busy.start()
+    try:
+        collector.sample()
+        time.sleep(0.2)
+        for _ in range(3):
+            sample = collector.sample()
+    finally:
+        stop.set()
+        busy.join()
+
+    assert len(collector.history()) == 3
+    assert collector.latest() is sample
+    assert sample["data_dir_bytes"] == 0
+    assert sample["process"]["threads"] >= 2
+    assert 0.0 <= sample["memory"]["percent"] <= 100.0
+    names = [thread["name"] for thread in collector.history()[0]["threads"]]
+    assert "busy-worker" in names
+
+
+def test_recorder_counts_finished_segments_once(tmp_path):
+    recorder = recorder_service.ContinuousRecorder()
+    recorder.recording_dir = tmp_path
+    recorder.data_usage = DataUsage(tmp_path)
+    recorder.data_usage.rescan()
+    recorder.processes["cam1"] = object()
+    camera_dir = tmp_path / "cam1"
+    camera_dir.mkdir()
+    (camera_dir / "20260101_000000.mp4").write_bytes(b"a" * 10)
+    (camera_dir / "20260101_000100.mp4").write_bytes(b"b" * 20)
+    try:
+        # Existing segments are covered by the startup scan.
+        recorder._account_new_segments()
+        assert recorder.data_usage.total() == 0
+
+        (camera_dir / "20260101_000200.mp4").write_bytes(b"c" * 40)
+        recorder._account_new_segments()
+        assert recorder.data_usage.total() == 20  # 000100 closed; 000200 still open
+        recorder._account_new_segments()
+        assert recorder.data_usage.total() == 20
+    finally:
+        recorder.processes.clear()
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_system_info_reads_latest_sample(client, monkeypatch, tmp_path):
+    usage = DataUsage(tmp_path)
+    (tmp_path / "media.bin").write_bytes(b"m" * 2048)
+    usage.rescan()
+    collector = SystemStatsCollector(data_usage=usage)
+    sample = collector.sample()
+    monkeypatch.setattr(system_router, "system_stats", collector)
+    monkeypatch.setattr(collector, "sample", lambda: pytest.fail("sampled on request"))
+
+    response = client.get("/api/system/info")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["cpu"]["percent"] == sample["cpu_percent"]
+    assert data["sampled_at"] == sample["ts"]
+    assert data["addon_data_gb"] == 0.0
+    assert data["process"]["threads"] == sample["process"]["threads"]
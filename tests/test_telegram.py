@@ -249,3 +249,59 @@ def test_is_enabled_false_no_chat_ids(telegram_service, mock_config):
     
     with patch.object(telegram_service.settings_service, 'load_config', return_value=mock_config):
         assert telegram_service.is_enabled() is False
+
+
+@pytest.mark.asyncio
+async def test_multi_chat_reuses_uploaded_file_id(telegram_service, test_event, test_camera, test_image, mock_config):
+    """Test that the first upload's file_id is reused for other chats."""
+    mock_config.telegram.chat_ids = ["111", "222", "333"]
+    sent_message = Mock()
+    sent_message.photo = [Mock(file_id="small"), Mock(file_id="photo-file-id")]
+    mock_bot = AsyncMock()
+    mock_bot.send_photo = AsyncMock(return_value=sent_message)
+
+    with patch('app.services.telegram.Bot', return_value=mock_bot) as bot_class, \
+         patch.object(telegram_service.settings_service, 'load_config', return_value=mock_config):
+        result = await telegram_service.send_event_notification(
+            test_event,
+            test_camera,
+            collage_path=test_image,
+        )
+
+    assert result is True
+    photos = [call.kwargs["photo"] for call in mock_bot.send_photo.call_args_list]
+    assert isinstance(photos[0], bytes)
+    assert photos[1:] == ["photo-file-id", "photo-file-id"]
+    bot_class.assert_called_once()
+    telegram_service.stop()
+
+
+@pytest.mark.asyncio
+async def test_bot_reused_across_notifications(telegram_service, test_event, test_camera, mock_config):
+    """Test that one pooled Bot instance serves consecutive notifications."""
+    mock_config.telegram.rate_limit_seconds = 0
+    mock_config.telegram.cooldown_seconds = 0
+    mock_bot = AsyncMock()
+
+    with patch('app.services.telegram.Bot', return_value=mock_bot) as bot_class, \
+         patch.object(telegram_service.settings_service, 'load_config', return_value=mock_config):
+        assert await telegram_service.send_event_notification(test_event, test_camera) is True
+        assert await telegram_service.send_event_notification(test_event, test_camera) is True
+
+    bot_class.assert_called_once()
+    assert mock_bot.send_message.await_count == 2
+    telegram_service.stop()
+    mock_bot.shutdown.assert_awaited()
+
+
+def test_enqueue_from_thread_returns_future(telegram_service, test_event, mock_config):
+    """Test that worker threads can queue notifications without blocking."""
+    mock_bot = AsyncMock()
+
+    with patch('app.services.telegram.Bot', return_value=mock_bot), \
+         patch.object(telegram_service.settings_service, 'load_config', return_value=mock_config):
+        future = telegram_service.enqueue_event_notification(test_event)
+        assert future.result(timeout=5) is True
+
+    mock_bot.send_message.assert_awaited_once()
+    telegram_service.stop()
@@ -0,0 +1,102 @@
+"""
+Unit tests for the NumPy object tracker.
+
+Tests cover:
+- Vectorized IoU matrix
+- Stable track ids across frames and new ids for new objects
+- Temporal consistency parity with InferenceService
+- Displacement and best-box movement statistics
+"""
+import numpy as np
+import pytest
+
+from app.services.inference import InferenceService
+from app.services.tracker import ObjectTracker, iou_matrix
+
+
+def _det(x1, y1, x2, y2, conf=0.8):
+    return {"bbox": [x1, y1, x2, y2], "confidence": conf}
+
+
+def test_iou_matrix_matches_scalar_iou():
+    a = np.array([[0, 0, 10, 10], [5, 5, 15, 15]], dtype=np.float32)
+    b = np.array([[0, 0, 10, 10], [20, 20, 30, 30], [5, 0, 15, 10]], dtype=np.float32)
+
+    ious = iou_matrix(a, b)
+
+    assert ious.shape == (2, 3)
+    assert ious[0, 0] == pytest.approx(1.0)
+    assert ious[0, 1] == pytest.approx(0.0)
+    assert ious[0, 2] == pytest.approx(50 / 150)
+    assert iou_matrix(np.zeros((0, 4)), b).shape == (0, 3)
+
+
+def test_track_ids_follow_moving_objects():
+    tracker = ObjectTracker()
+    first = tracker.update([_det(0, 0, 20, 40), _det(100, 0, 120, 40)])
+    second = tracker.update([_det(104, 0, 124, 40), _det(4, 0, 24, 40)])
+    third = tracker.update([_det(8, 0, 28, 40), _det(300, 0, 320, 40)])
+
+    assert second == [first[1], first[0]]
+    assert third[0] == first[0]
+    assert third[1] not in first
+
+
+def test_tracks_expire_after_misses():
+    tracker = ObjectTracker(max_misses=1)
+    tracker.update([_det(0, 0, 20, 40)])
+    tracker.update([])
+    tracker.update([])
+
+    assert tracker.ids.size == 0
+
+
+@pytest.mark.parametrize(
+    "pattern,min_frames,max_gap",
+    [
+        ([1, 1, 1], 3, 1),
+        ([0, 1, 1], 3, 1),
+        ([0, 0, 1], 3, 1),
+        ([1, 1], 3, 1),
+        ([1, 0, 0, 1], 2, 0),
+        ([1, 0, 1, 0, 1], 3, 1),
+    ],
+)
+def test_temporal_consistency_matches_inference_service(pattern, min_frames, max_gap):
+    tracker = ObjectTracker()
+    history = []
+    for present in pattern:
+        dets = [_det(0, 0, 20, 40)] if present else []
+        tracker.update(dets)
+        history.append(dets)
+
+    expected = InferenceService().check_temporal_consistency(
+        history[-1], history[:-1], min_consecutive_frames=min_frames, max_gap_frames=max_gap
+    )
+    assert tracker.is_temporally_consistent(min_frames, max_gap) == expected
+
+
+def test_displacement_separates_static_and_moving():
+    tracker = ObjectTracker()
+    for step in range(4):
+        ids = tracker.update([_det(0, 0, 20, 40, 0.9), _det(100 + 10 * step, 0, 120 + 10 * step, 40, 0.5)])
+
+    static_id, moving_id = ids
+    assert tracker.displacement(static_id, min_lag=2) == pytest.approx(0.0)
+    assert tracker.displacement(moving_id, min_lag=2) == pytest.approx(20.0)
+    assert tracker.track_stats(moving_id)["net_displacement"] == pytest.approx(30.0)
+    assert tracker.track_stats(moving_id)["hits"] == 4
+
+
+def test_best_box_stats_for_walking_target():
+    tracker = ObjectTracker()
+    for step in range(5):
+        tracker.update([_det(100 + 10 * step, 50, 140 + 10 * step, 150)])
+    tracker.update([])
+
+    stats = tracker.best_box_stats(frame_width=640, frame_height=480, sample_frames=5)
+
+    assert stats["spread"] == pytest.approx(30.0)
+    assert stats["net_displacement"] == pytest.approx(30.0)
+    assert stats["median_iou"] == pytest.approx(30 * 100 / (2 * 40 * 100 - 30 * 100))
+    assert stats["edge_touch_ratio"] == 0.0
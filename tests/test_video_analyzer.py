@@ -0,0 +1,112 @@
+"""
+Unit tests for the video analyzer.
+
+Tests cover:
+- Fast mode: container metadata plus sampled duplicate estimate
+- Fast and deep mode agreeing on duplicate share, including slow motion in noise
+- Sample pair comparison without uint8 overflow
+- Parallel batch analysis and the /api/video/analyze batch form
+"""
+import cv2
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import video_analyzer
+from app.services.video_analyzer import analyze_video, analyze_videos, frame_mse, pair_duplicate_ratio
+
+
+def _write_clip(path, frames: int = 60, moving: int = 30, fps: float = 10.0) -> str:
+    """First `moving` frames show a moving box, the rest repeat a black frame."""
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, (320, 240))
+    for index in range(frames):
+        frame = np.zeros((240, 320, 3), dtype=np.uint8)
+        if index < moving:
+            left = (index * 8) % 272
+            cv2.rectangle(frame, (left, 60), (left + 48, 180), (255, 255, 255), -1)
+        writer.write(frame)
+    writer.release()
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def no_ffmpeg(monkeypatch):
+    # Exercise the OpenCV paths whether or not ffmpeg is installed.
+    monkeypatch.setattr(video_analyzer.shutil, "which", lambda _name: None)
+
+
+def test_fast_mode_reads_metadata_and_samples(tmp_path):
+    path = _write_clip(tmp_path / "clip.mp4")
+
+    result = analyze_video(path)
+
+    assert result["mode"] == "fast"
+    assert result["video_properties"] == {"width": 320, "height": 240, "fps": 10.0, "frame_count": 60, "duration": 6.0}
+    assert result["analysis"]["actual_duration"] == 6.0
+    assert result["analysis"]["sampled_pairs"] == 30
+    assert result["analysis"]["duplicate_percentage"] == pytest.approx(50.0, abs=5.0)
+    assert not result["ok"]
+
+
+def test_fast_and_deep_agree(tmp_path):
+    moving = _write_clip(tmp_path / "moving.mp4", frames=120, moving=120)
+    static = _write_clip(tmp_path / "static.mp4", frames=120, moving=0)
+
+    for path, expected in ((moving, 0.0), (static, 100.0)):
+        fast = analyze_video(path)
+        deep = analyze_video(path, deep=True)
+        assert deep["mode"] == "deep"
+        assert fast["analysis"]["duplicate_percentage"] == pytest.approx(expected, abs=2.0)
+        assert deep["analysis"]["duplicate_percentage"] == pytest.approx(expected, abs=2.0)
+
+    assert analyze_video(str(tmp_path / "missing.mp4")) is None
+
+
+def test_slow_motion_in_noise_is_not_duplicate(tmp_path):
+    # A small figure moving 1 px/frame over sensor noise: every frame differs.
+    rng = np.random.default_rng(0)
+    path = tmp_path / "slow.mp4"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 10.0, (640, 480))
+    for index in range(60):
+        frame = np.full((480, 640, 3), 90, dtype=np.uint8)
+        cv2.rectangle(frame, (200 + index, 200), (220 + index, 260), (150, 150, 150), -1)
+        noise = rng.normal(0, 1.5, frame.shape[:2])[..., None]
+        writer.write(np.clip(frame + noise, 0, 255).astype(np.uint8))
+    writer.release()
+
+    fast = analyze_video(str(path))
+    deep = analyze_video(str(path), deep=True)
+    assert deep["analysis"]["duplicate_percentage"] == 0.0
+    assert fast["analysis"]["duplicate_percentage"] == 0.0
+
+
+def test_pair_duplicate_ratio_does_not_overflow():
+    black = np.zeros((4, 4), dtype=np.uint8)
+    # A difference of 16 squares to 256, which wraps to 0 in uint8.
+    shifted = np.full((4, 4), 16, dtype=np.uint8)
+    errors = [frame_mse(black, shifted), frame_mse(black, black.copy())]
+
+    assert errors[0] == 256.0
+    assert pair_duplicate_ratio(errors) == {"sampled_pairs": 2, "duplicate_pairs": 1, "duplicate_percentage": 50.0}
+    assert pair_duplicate_ratio([])["sampled_pairs"] == 0
+
+
+def test_batch_analysis_and_endpoint(tmp_path):
+    first = _write_clip(tmp_path / "a.mp4", moving=60)
+    second = _write_clip(tmp_path / "b.mp4", moving=0)
+
+    results = analyze_videos([first, second, first], workers=2)
+    assert list(results) == [first, second]
+    assert results[second]["analysis"]["duplicate_percentage"] == pytest.approx(100.0, abs=2.0)
+
+    client = TestClient(app)
+    response = client.post("/api/video/analyze", json={"paths": [first, str(tmp_path / "nope.mp4")]})
+    assert response.status_code == 200
+    items = response.json()["results"]
+    assert items[0]["path"] == first and items[0]["result"]["mode"] == "fast"
+    assert items[1] == {"path": str(tmp_path / "nope.mp4"), "error": "INVALID_PATH"}
+
+    response = client.post("/api/video/analyze", json={"path": first, "deep": True})
+    assert response.status_code == 200
+    assert response.json()["mode"] == "deep"
@@ -0,0 +1,166 @@
+"""
+Unit tests for the WebSocket broadcaster.
+
+Tests cover:
+- Single serialization fan-out to all clients
+- Per-camera status coalescing
+- Drop-oldest-status backpressure
+- Slow clients not stalling fast ones
+- Timed-out clients dropped and their socket closed
+- Ping replies sent by the client's sender task
+"""
+import asyncio
+import json
+import threading
+
+import pytest
+
+from app.services.websocket import WebSocketManager, KIND_EVENT, KIND_STATUS, _ClientChannel
+
+
+class FakeWebSocket:
+    """Minimal stand-in for a Starlette WebSocket."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent = []
+        self.close_code = None
+
+    async def accept(self):
+        return None
+
+    async def send_text(self, text: str):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(json.loads(text))
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+
+
+async def _drain(seconds: float = 0.05):
+    await asyncio.sleep(seconds)
+
+
+async def test_event_fanout_to_all_clients():
+    manager = WebSocketManager()
+    clients = [FakeWebSocket() for _ in range(3)]
+    for ws in clients:
+        await manager.connect(ws)
+
+    await manager.broadcast_event({"id": "evt-1", "camera_id": "cam-1"})
+    await _drain()
+
+    for ws in clients:
+        assert ws.sent == [{"type": "event", "data": {"id": "evt-1", "camera_id": "cam-1"}}]
+    assert manager.get_stats()["broadcasts"] == 1
+
+
+async def test_status_updates_coalesced_per_camera():
+    manager = WebSocketManager(coalesce_seconds=0.02)
+    ws = FakeWebSocket()
+    await manager.connect(ws)
+
+    for status in ("retrying", "down", "connected"):
+        await manager.broadcast_status({"camera_id": "cam-1", "status": status})
+    await manager.broadcast_status({"camera_id": "cam-2", "status": "down"})
+    await _drain(0.1)
+
+    statuses = {(m["data"]["camera_id"], m["data"]["status"]) for m in ws.sent}
+    assert statuses == {("cam-1", "connected"), ("cam-2", "down")}
+    assert manager.get_stats()["status_coalesced"] == 2
+
+
+async def test_status_sync_from_worker_thread():
+    manager = WebSocketManager(coalesce_seconds=0.01)
+    ws = FakeWebSocket()
+    await manager.connect(ws)
+
+    thread = threading.Thread(
+        target=manager.broadcast_status_sync,
+        args=({"camera_id": "cam-1", "status": "connected"},),
+    )
+    thread.start()
+    thread.join()
+    manager.broadcast_event_sync({"id": "evt-2"})
+    await _drain(0.1)
+
+    kinds = sorted(m["type"] for m in ws.sent)
+    assert kinds == ["event", "status"]
+
+
+async def test_full_queue_drops_status_before_events():
+    channel = _ClientChannel(FakeWebSocket(), max_queue=3)
+    channel.enqueue(KIND_STATUS, "s1")
+    channel.enqueue(KIND_EVENT, "e1")
+    channel.enqueue(KIND_STATUS, "s2")
+
+    assert channel.enqueue(KIND_EVENT, "e2") is False
+    assert [payload for _, payload in channel.queue] == ["e1", "s2", "e2"]
+    assert channel.dropped == 1
+
+
+async def test_slow_client_does_not_block_fast_client():
+    manager = WebSocketManager()
+    slow = FakeWebSocket(delay=0.5)
+    fast = FakeWebSocket()
+    await manager.connect(slow)
+    await manager.connect(fast)
+
+    for i in range(5):
+        await manager.broadcast_event({"id": f"evt-{i}"})
+    await _drain(0.05)
+
+    assert len(fast.sent) == 5
+    assert len(slow.sent) < 5
+    await manager.disconnect(slow)
+    await manager.disconnect(fast)
+    assert manager.get_stats()["connections"] == 0
+
+
+async def test_timed_out_client_is_closed():
+    manager = WebSocketManager(send_timeout=0.05)
+    stuck = FakeWebSocket(delay=5.0)
+    await manager.connect(stuck)
+
+    await manager.broadcast_event({"id": "evt-1"})
+    await _drain(0.2)
+
+    assert stuck.close_code == 1013
+    assert manager.get_stats()["connections"] == 0
+    assert manager.get_stats()["disconnected_slow"] == 1
+
+
+async def test_reply_goes_through_client_sender():
+    manager = WebSocketManager()
+    ws = FakeWebSocket(delay=0.02)
+    sent_text = []
+    active = []
+
+    async def send_text(text):
+        active.append(text)
+        assert len(active) == 1, "concurrent writes on one socket"
+        await asyncio.sleep(ws.delay)
+        active.remove(text)
+        sent_text.append(text)
+
+    ws.send_text = send_text
+    await manager.connect(ws)
+
+    await manager.broadcast_event({"id": "evt-1"})
+    await asyncio.sleep(0.005)
+    # The event is still being written; the reply waits its turn.
+    assert manager.reply(ws, "pong") is True
+    await _drain(0.1)
+
+    assert len(sent_text) == 2 and sent_text[-1] == "pong"
+    assert manager.get_stats()["connections"] == 1
+    await manager.disconnect(ws)
+    assert manager.reply(ws, "pong") is False
+
+
+def test_sync_broadcast_without_clients_is_noop():
+    manager = WebSocketManager()
+    manager.broadcast_event_sync({"id": "evt-1"})
+    manager.broadcast_status_sync({"camera_id": "cam-1"})
+    assert manager.get_stats()["broadcasts"] == 0
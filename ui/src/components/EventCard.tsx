@@ -1,4 +1,4 @@
-import { memo } from 'react'
+import { memo, useState } from 'react'
 import { useTranslation } from 'react-i18next'
 import { MdPlayArrow, MdVisibility } from 'react-icons/md'
 import { resolveApiPath } from '../services/api'
@@ -12,6 +12,7 @@ interface EventCardProps {
   summary: string | null
   rejectedByAi?: boolean
   collageUrl: string | null
+  previewUrl?: string | null
   mp4Url: string | null
   selected?: boolean
   onSelect?: (id: string) => void
@@ -27,12 +28,14 @@ export const EventCard = memo(function EventCard({
   summary,
   rejectedByAi = false,
   collageUrl,
+  previewUrl = null,
   mp4Url,
   selected = false,
   onSelect,
   onClick,
 }: EventCardProps) {
   const { t } = useTranslation()
+  const [hovered, setHovered] = useState(false)
   const cameraLabel = cameraName || cameraId
   const isRecent = (value: string) => Date.now() - new Date(value).getTime() < 60000
   const collagePending = !collageUrl && isRecent(timestamp)
@@ -83,8 +86,29 @@ export const EventCard = memo(function EventCard({
         <div 
           className="flex-shrink-0 w-48 h-36 bg-surface2 rounded-lg overflow-hidden cursor-pointer"
           onClick={() => onClick(id)}
+          onMouseEnter={() => setHovered(true)}
+          onMouseLeave={() => setHovered(false)}
         >
-          {collageUrl ? (
+          {/* Preview loop on hover: WebP/GIF as an image, MP4 as a muted video */}
+          {hovered && previewUrl ? (
+            previewUrl.endsWith('.mp4') ? (
+              <video
+                src={resolveApiPath(previewUrl)}
+                autoPlay
+                loop
+                muted
+                playsInline
+                className="w-full h-full object-cover"
+              />
+            ) : (
+              <img
+                src={resolveApiPath(previewUrl)}
+                alt="Event preview"
+                decoding="async"
+                className="w-full h-full object-cover"
+              />
+            )
+          ) : collageUrl ? (
             <img
               src={resolveApiPath(collageUrl)}
               alt="Event collage"
@@ -88,6 +88,8 @@ export const CameraSettingsTab: React.FC<CameraSettingsTabProps> = ({ settings,
           <option value="openvino">OpenVINO (Intel iGPU/NPU)</option>
           <option value="tensorrt">TensorRT (NVIDIA GPU)</option>
           <option value="onnx">ONNX</option>
+          <option value="openvino_int8">OpenVINO INT8 (CPU)</option>
+          <option value="onnx_int8">ONNX INT8 (CPU)</option>
           <option value="cpu">CPU (PyTorch)</option>
         </select>
         <p className="text-xs text-muted mt-2">Addon yeniden başlatılınca etkinleşir.</p>
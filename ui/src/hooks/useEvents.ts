@@ -10,6 +10,7 @@ interface Event {
   summary: string | null
   collage_url: string | null
   gif_url: string | null
+  preview_url?: string | null
   mp4_url: string | null
   rejected_by_ai?: boolean
 }
@@ -28,6 +29,7 @@ interface UseEventsParams {
   date?: string
   minConfidence?: number
   rejected?: boolean
+  search?: string
 }
 
 export function useEvents(params: UseEventsParams = {}) {
@@ -57,6 +59,7 @@ export function useEvents(params: UseEventsParams = {}) {
         date: params.date,
         confidence: params.minConfidence,
         rejected: params.rejected,
+        q: params.search,
       }, { signal: controller.signal })
 
       if (!controller.signal.aborted) {
@@ -80,8 +83,9 @@ export function useEvents(params: UseEventsParams = {}) {
       params.date ?? '',
       params.minConfidence ?? '',
       params.rejected ?? '',
+      params.search ?? '',
     ].join('|')
-  }, [params.cameraId, params.date, params.minConfidence, params.rejected])
+  }, [params.cameraId, params.date, params.minConfidence, params.rejected, params.search])
 
   useEffect(() => {
     fetchEvents()
@@ -35,6 +35,7 @@ interface Event {
   summary: string | null
   collage_url: string | null
   gif_url: string | null
+  preview_url?: string | null
   mp4_url: string | null
 }
 
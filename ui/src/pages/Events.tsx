@@ -33,11 +33,13 @@ export function Events() {
   const [confidenceFilter, setConfidenceFilter] = useState<number>(0)
   const [confidenceInput, setConfidenceInput] = useState<number>(0)
   const [showRejected, setShowRejected] = useState(false)
+  const [searchFilter, setSearchFilter] = useState<string>('')
 
   // Fetch events with filters
   const debouncedCameraFilter = useDebounce(cameraFilter, 300)
   const debouncedDateFilter = useDebounce(dateFilter, 300)
   const debouncedConfidenceFilter = useDebounce(confidenceFilter, 300)
+  const debouncedSearchFilter = useDebounce(searchFilter.trim(), 300)
 
   const { 
     events, 
@@ -60,17 +62,18 @@ export function Events() {
     minConfidence: debouncedConfidenceFilter > 0 ? debouncedConfidenceFilter / 100 : undefined,
     // Confirmed tab must explicitly exclude AI-rejected events.
     rejected: showRejected ? true : false,
+    search: debouncedSearchFilter || undefined,
   })
 
   // handleEvent ref avoids WS reconnect when filters change (useWebSocket stores callbacks in refs)
   const handleEventRef = useRef<(data: any) => void>(() => {})
   handleEventRef.current = useCallback((data: any) => {
-    if (cameraFilter || dateFilter || confidenceFilter > 0) return
+    if (cameraFilter || dateFilter || confidenceFilter > 0 || searchFilter.trim()) return
     const isRejected = Boolean(data?.rejected_by_ai)
     if (showRejected && !isRejected) return
     if (!showRejected && isRejected) return
     prependEvent(data)
-  }, [cameraFilter, dateFilter, confidenceFilter, showRejected, prependEvent])
+  }, [cameraFilter, dateFilter, confidenceFilter, searchFilter, showRejected, prependEvent])
 
   const wsOptions = useMemo(() => ({
     onEvent: (data: any) => handleEventRef.current(data),
@@ -93,11 +96,11 @@ export function Events() {
 
   useEffect(() => {
     resetPage()
-  }, [debouncedCameraFilter, debouncedDateFilter, debouncedConfidenceFilter, showRejected, resetPage])
+  }, [debouncedCameraFilter, debouncedDateFilter, debouncedConfidenceFilter, debouncedSearchFilter, showRejected, resetPage])
 
   useEffect(() => {
     setSelectedIds(new Set())
-  }, [debouncedCameraFilter, debouncedDateFilter, debouncedConfidenceFilter, showRejected, page, pageSize])
+  }, [debouncedCameraFilter, debouncedDateFilter, debouncedConfidenceFilter, debouncedSearchFilter, showRejected, page, pageSize])
 
   useEffect(() => {
     const saved = safeGetItem('events_filters_open')
@@ -125,6 +128,7 @@ export function Events() {
     setDateFilter('')
     setConfidenceFilter(0)
     setConfidenceInput(0)
+    setSearchFilter('')
   }
 
   const handleSelect = useCallback((eventId: string) => {
@@ -147,7 +151,7 @@ export function Events() {
     setConfidenceFilter(confidenceInput)
   }, [confidenceInput])
 
-  const hasActiveFilters = Boolean(cameraFilter || dateFilter || confidenceFilter > 0)
+  const hasActiveFilters = Boolean(cameraFilter || dateFilter || confidenceFilter > 0 || searchFilter.trim())
 
   const refreshRef = useRef(refresh)
   useEffect(() => {
@@ -462,6 +466,21 @@ export function Events() {
       {showFilters && (
         <div className="bg-surface1 border border-border rounded-lg p-6 mb-6">
           <div className="grid grid-cols-1 md:grid-cols-3 gap-4">
+            {/* Summary search */}
+            <div className="md:col-span-3">
+              <label className="block text-sm font-medium text-muted mb-2">
+                {t('searchSummaries')}
+              </label>
+              <input
+                type="search"
+                value={searchFilter}
+                onChange={(e) => setSearchFilter(e.target.value)}
+                placeholder={t('searchSummariesPlaceholder')}
+                maxLength={200}
+                className="w-full px-4 py-2 bg-surface2 border border-border rounded-lg text-text focus:outline-none focus:border-accent"
+              />
+            </div>
+
             {/* Camera Filter */}
             <div>
               <label className="block text-sm font-medium text-muted mb-2">
@@ -580,6 +599,7 @@ export function Events() {
               summary={event.summary}
               rejectedByAi={Boolean(event.rejected_by_ai)}
               collageUrl={event.collage_url}
+              previewUrl={event.preview_url}
               mp4Url={event.mp4_url}
               selected={selectedIds.has(event.id)}
               onSelect={handleSelect}
@@ -78,7 +78,10 @@ export function VideoAnalysis() {
     setResult(null)
     setAnalyzing(true)
     try {
-      const params = selectedEventId ? { event_id: selectedEventId } : customPath ? { path: customPath } : null
+      // This page shows the frame-by-frame report, so always ask for deep mode
+      const params = selectedEventId
+        ? { event_id: selectedEventId, deep: true }
+        : customPath ? { path: customPath, deep: true } : null
       if (!params) {
         setError(t('videoAnalysisSelectEvent'))
         return
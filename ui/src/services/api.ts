@@ -2,7 +2,7 @@
  * API service for Smart Motion Detector v2
  */
 import axios from 'axios';
-import type { Settings, CameraTestRequest, CameraTestResponse, Zone } from '../types/api';
+import type { Settings, CameraTestRequest, CameraTestResponse, Zone, EventJob, EventStats } from '../types/api';
 
 /** Ingress base path (e.g. /api/hassio_ingress/TOKEN). HA addon Ingress full destek. */
 export const getIngressBase = (): string => {
@@ -181,6 +181,7 @@ export const getEvents = async (
     date?: string;
     confidence?: number;
     rejected?: boolean;
+    q?: string;
   },
   options?: { signal?: AbortSignal }
 ) => {
@@ -188,7 +189,7 @@ export const getEvents = async (
   return response.data;
 };
 
-export const analyzeVideo = async (params: { event_id?: string; path?: string }) => {
+export const analyzeVideo = async (params: { event_id?: string; path?: string; deep?: boolean }) => {
   const response = await apiClient.post('video/analyze', params);
   return response.data;
 };
@@ -203,20 +204,59 @@ export const deleteEvent = async (eventId: string) => {
   return response.data;
 };
 
-export const bulkDeleteEvents = async (eventIds: string[]) => {
-  const response = await apiClient.post('events/bulk-delete', { event_ids: eventIds });
+export const getEventStats = async (params: {
+  start?: string;
+  end?: string;
+  camera_id?: string;
+  bucket?: 'hour' | 'day';
+}): Promise<EventStats> => {
+  const response = await apiClient.get('events/stats', { params });
   return response.data;
 };
 
-export const deleteEventsFiltered = async (filters: {
-  camera_id?: string;
-  date?: string;
-  min_confidence?: number;
-}) => {
-  const response = await apiClient.post('events/clear', filters);
+export const getEventJob = async (jobId: string): Promise<EventJob> => {
+  const response = await apiClient.get(`events/jobs/${jobId}`);
   return response.data;
 };
 
+/** Bulk delete/clear run as background jobs; poll until the job finishes. */
+export const waitForEventJob = async (
+  job: EventJob,
+  onProgress?: (job: EventJob) => void,
+  intervalMs = 500,
+): Promise<EventJob> => {
+  let current = job;
+  while (current.status === 'queued' || current.status === 'running') {
+    onProgress?.(current);
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    current = await getEventJob(current.job_id);
+  }
+  if (current.status === 'failed') {
+    throw new Error(current.error || 'Event job failed');
+  }
+  return current;
+};
+
+export const bulkDeleteEvents = async (
+  eventIds: string[],
+  onProgress?: (job: EventJob) => void,
+): Promise<EventJob> => {
+  const response = await apiClient.post('events/bulk-delete', { event_ids: eventIds });
+  return waitForEventJob(response.data, onProgress);
+};
+
+export const deleteEventsFiltered = async (
+  filters: {
+    camera_id?: string;
+    date?: string;
+    min_confidence?: number;
+  },
+  onProgress?: (job: EventJob) => void,
+): Promise<EventJob> => {
+  const response = await apiClient.post('events/clear', filters);
+  return waitForEventJob(response.data, onProgress);
+};
+
 export const getCameraSnapshotUrl = (cameraId: string) =>
   joinApiUrl(`cameras/${cameraId}/snapshot`);
 
@@ -295,11 +335,13 @@ export const api = {
   testTelegram,
   testAiEvent,
   getEvents,
+  getEventStats,
   getEvent,
   analyzeVideo,
   deleteEvent,
   bulkDeleteEvents,
   deleteEventsFiltered,
+  getEventJob,
   getCamerasStatus,
   getLiveStreams,
   getLiveWebRTCUrl,
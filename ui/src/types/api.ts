@@ -2,7 +2,14 @@
  * API types for Smart Motion Detector v2
  */
 
-export type InferenceBackend = 'auto' | 'cpu' | 'onnx' | 'openvino' | 'tensorrt';
+export type InferenceBackend =
+  | 'auto'
+  | 'cpu'
+  | 'onnx'
+  | 'openvino'
+  | 'tensorrt'
+  | 'onnx_int8'
+  | 'openvino_int8';
 
 export interface DetectionConfig {
   model: 'yolov8n-person' | 'yolov8s-person' | 'yolov9t' | 'yolov9s' | 'yolov8s-thermal';
@@ -16,6 +23,9 @@ export interface DetectionConfig {
   aspect_ratio_min: number;
   aspect_ratio_max: number;
   enable_tracking: boolean;
+  roi_inference?: boolean;
+  roi_full_frame_interval?: number;
+  frame_change_gate?: boolean;
 }
 
 export interface MotionConfig {
@@ -55,11 +65,13 @@ export interface ThermalConfig {
 export interface StreamConfig {
   protocol: 'tcp' | 'udp';
   capture_backend: 'auto' | 'opencv' | 'ffmpeg';
+  shared_ingest: boolean;
   buffer_size: number;
   reconnect_delay_seconds: number;
   max_reconnect_attempts: number;
   read_failure_threshold: number;
   read_failure_timeout_seconds: number;
+  frozen_stream_seconds?: number;
 }
 
 export interface LiveConfig {
@@ -81,6 +93,8 @@ export interface EventConfig {
   postbuffer_seconds: number;
   record_fps: number;
   frame_buffer_size: number;
+  buffer_mode: 'raw' | 'jpeg';
+  buffer_jpeg_quality: number;
   frame_interval: number;
   min_event_duration: number;
 }
@@ -89,6 +103,7 @@ export interface MediaConfig {
   retention_days: number;
   cleanup_interval_hours: number;
   disk_limit_percent: number;
+  preview_format?: 'webp' | 'mp4' | 'gif';
 }
 
 export interface AIConfig {
@@ -133,6 +148,10 @@ export interface PerformanceConfig {
   worker_mode: 'threading' | 'multiprocessing';
   enable_metrics: boolean;
   metrics_port: number;
+  auto_tune?: boolean;
+  scheduler_min_fps?: number;
+  api_threads?: number;
+  stats_interval_seconds?: number;
 }
 
 export interface Settings {
@@ -174,3 +193,33 @@ export interface Zone {
   mode: 'person' | 'motion' | 'both';
   polygon: Array<[number, number]>;
 }
+
+export interface EventJob {
+  job_id: string;
+  kind: 'bulk_delete' | 'clear';
+  status: 'queued' | 'running' | 'completed' | 'failed' | 'cancelled';
+  total: number;
+  deleted_count: number;
+  media_failed: number;
+  failed_ids?: string[];
+  error: string | null;
+  created_at: string;
+  finished_at: string | null;
+}
+
+export interface EventStatsCounts {
+  event_count: number;
+  rejected_count: number;
+  max_confidence: number | null;
+  person_count: number;
+}
+
+export interface EventStats {
+  start: string;
+  end: string;
+  bucket: 'hour' | 'day';
+  bucket_hours: number;
+  totals: EventStatsCounts;
+  cameras: Array<EventStatsCounts & { camera_id: string }>;
+  buckets: Array<EventStatsCounts & { start: string }>;
+}